@@ -26,11 +26,13 @@ if DATABASE_URL:
 import app.models.address  # noqa: F401
 import app.models.load  # noqa: F401
 import app.models.match  # noqa: F401
+import app.models.match_suggestion  # noqa: F401
 import app.models.membership  # noqa: F401
 import app.models.offer  # noqa: F401
 import app.models.org_user  # noqa: F401
 import app.models.organization  # noqa: F401
 import app.models.rating  # noqa: F401
+import app.models.revoked_token  # noqa: F401
 import app.models.user  # noqa: F401
 import app.models.vehicle  # noqa: F401
 
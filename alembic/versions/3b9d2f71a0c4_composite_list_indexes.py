@@ -0,0 +1,110 @@
+"""composite indexes for list and membership queries
+
+Revision ID: 3b9d2f71a0c4
+Revises: fe6cca63d7ec
+Create Date: 2026-10-18 10:12:40.118203
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3b9d2f71a0c4"
+down_revision = "fe6cca63d7ec"
+branch_labels = None
+depends_on = None
+
+# (tablo, index adı, kolonlar, unique)
+NEW_INDEXES = [
+    ("load", "ix_load_owner_user_id_id", ["owner_user_id", "id"], False),
+    (
+        "load",
+        "ix_load_owner_user_id_organization_id_id",
+        ["owner_user_id", "organization_id", "id"],
+        False,
+    ),
+    ("vehicle", "ix_vehicle_owner_user_id_id", ["owner_user_id", "id"], False),
+    (
+        "vehicle",
+        "ix_vehicle_owner_user_id_organization_id_id",
+        ["owner_user_id", "organization_id", "id"],
+        False,
+    ),
+    (
+        "organization",
+        "ix_organization_owner_user_id_id",
+        ["owner_user_id", "id"],
+        False,
+    ),
+    (
+        "orguser",
+        "ix_orguser_organization_id_user_id",
+        ["organization_id", "user_id"],
+        True,
+    ),
+]
+
+# Yeni composite index'lerin öneki olduğu için gereksizleşen tek kolonlu index'ler
+REDUNDANT_INDEXES = [
+    ("load", "ix_load_owner_user_id", ["owner_user_id"]),
+    ("vehicle", "ix_vehicle_owner_user_id", ["owner_user_id"]),
+    ("orguser", "ix_orguser_organization_id", ["organization_id"]),
+]
+
+
+def _existing(table: str) -> set[str] | None:
+    # Şema henüz bu migration zinciriyle oluşturulmamış olabilir (boş veritabanı)
+    insp = sa.inspect(op.get_bind())
+    if not insp.has_table(table):
+        return None
+    return {ix["name"] for ix in insp.get_indexes(table)}
+
+
+def _check_duplicate_memberships() -> None:
+    # Unique index yinelenen üyeliklerde kurulamaz; hangi kaydın kalacağı (rol,
+    # durum) veri kararıdır, migration kayıt silmez
+    rows = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT organization_id, user_id, COUNT(*) FROM orguser"
+                " GROUP BY organization_id, user_id HAVING COUNT(*) > 1"
+                " ORDER BY organization_id, user_id"
+            )
+        )
+        .all()
+    )
+    if rows:
+        pairs = ", ".join(f"(org={o}, user={u}: {n} kayıt)" for o, u, n in rows[:20])
+        more = f" ve {len(rows) - 20} çift daha" if len(rows) > 20 else ""
+        raise RuntimeError(
+            "orguser tablosunda yinelenen (organization_id, user_id) üyelikleri var: "
+            f"{pairs}{more}. Unique index ix_orguser_organization_id_user_id "
+            "kurulamaz; her çift için tutulacak kaydı (rol/durum) seçip diğerlerini "
+            "silin ve migration'ı yeniden çalıştırın."
+        )
+
+
+def upgrade() -> None:
+    if _existing("orguser") is not None:
+        _check_duplicate_memberships()
+    for table, name, columns, unique in NEW_INDEXES:
+        existing = _existing(table)
+        if existing is not None and name not in existing:
+            op.create_index(name, table, columns, unique=unique)
+    for table, name, _columns in REDUNDANT_INDEXES:
+        existing = _existing(table)
+        if existing is not None and name in existing:
+            op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    for table, name, columns in REDUNDANT_INDEXES:
+        existing = _existing(table)
+        if existing is not None and name not in existing:
+            op.create_index(name, table, columns)
+    for table, name, _columns, _unique in reversed(NEW_INDEXES):
+        existing = _existing(table)
+        if existing is not None and name in existing:
+            op.drop_index(name, table_name=table)
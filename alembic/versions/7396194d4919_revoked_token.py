@@ -0,0 +1,53 @@
+"""revokedtoken table for refresh token rotation and logout
+
+Revision ID: 7396194d4919
+Revises: 7e25be661961
+Create Date: 2026-10-18 16:41:07.218934
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7396194d4919"
+down_revision = "7e25be661961"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(table: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    # Şema henüz bu migration zinciriyle oluşturulmamış olabilir (boş veritabanı)
+    if _has_table("revokedtoken") or not _has_table("user"):
+        return
+    op.create_table(
+        "revokedtoken",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        # Refresh token `jti` değeri ya da token ailesinin (`fam`) kimliği
+        sa.Column("jti", sa.String(64), nullable=False, unique=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_revokedtoken_user_id", "revokedtoken", ["user_id"])
+    op.create_index("ix_revokedtoken_expires_at", "revokedtoken", ["expires_at"])
+
+
+def downgrade() -> None:
+    if _has_table("revokedtoken"):
+        op.drop_table("revokedtoken")
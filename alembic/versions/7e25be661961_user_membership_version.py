@@ -0,0 +1,47 @@
+"""user.membership_version for org role claims in access tokens
+
+Revision ID: 7e25be661961
+Revises: 8e41c0d5b7a2
+Create Date: 2026-10-18 16:20:41.702135
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7e25be661961"
+down_revision = "8e41c0d5b7a2"
+branch_labels = None
+depends_on = None
+
+
+def _columns(table: str) -> set[str] | None:
+    # Şema henüz bu migration zinciriyle oluşturulmamış olabilir (boş veritabanı)
+    insp = sa.inspect(op.get_bind())
+    if not insp.has_table(table):
+        return None
+    return {c["name"] for c in insp.get_columns(table)}
+
+
+def upgrade() -> None:
+    columns = _columns("user")
+    if columns is None or "membership_version" in columns:
+        return
+    # Mevcut kullanıcılar 0 ile başlar: henüz claim'li token verilmedi
+    with op.batch_alter_table("user") as batch:
+        batch.add_column(
+            sa.Column(
+                "membership_version",
+                sa.Integer(),
+                server_default="0",
+                nullable=False,
+            )
+        )
+
+
+def downgrade() -> None:
+    columns = _columns("user")
+    if columns is not None and "membership_version" in columns:
+        with op.batch_alter_table("user") as batch:
+            batch.drop_column("membership_version")
@@ -0,0 +1,70 @@
+"""match suggestion table for batch rescoring
+
+Revision ID: 8e41c0d5b7a2
+Revises: 3b9d2f71a0c4
+Create Date: 2026-10-18 14:05:12.530417
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8e41c0d5b7a2"
+down_revision = "3b9d2f71a0c4"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(table: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    # Şema henüz bu migration zinciriyle oluşturulmamış olabilir (boş veritabanı)
+    if _has_table("matchsuggestion") or not (
+        _has_table("load") and _has_table("offer")
+    ):
+        return
+    op.create_table(
+        "matchsuggestion",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "load_id",
+            sa.Integer(),
+            sa.ForeignKey("load.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "offer_id",
+            sa.Integer(),
+            sa.ForeignKey("offer.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("rank", sa.SmallInteger(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_matchsuggestion_load_id_rank",
+        "matchsuggestion",
+        ["load_id", "rank"],
+        unique=True,
+    )
+    op.create_index("ix_matchsuggestion_offer_id", "matchsuggestion", ["offer_id"])
+
+
+def downgrade() -> None:
+    if _has_table("matchsuggestion"):
+        op.drop_table("matchsuggestion")
@@ -1,10 +1,22 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
-from app.crud import user as user_crud
-from app.deps import get_current_user, get_db
+from app import etag
+from app.auth_cache import Principal
+from app.config import settings
+from app.crud.aio import org_user as org_user_crud
+from app.crud.aio import run
+from app.crud.aio import user as user_crud
+from app.db import AnySession
+from app.deps import db_session, get_current_user
+from app.models.user import User
+from app.passwords import PasswordPoolSaturated, password_service
+from app.revocation import revocation_store
 from app.schemas.auth import (
     LoginRequest,
     RefreshRequest,
@@ -15,12 +27,108 @@ from app.schemas.auth import (
 from app.security import (
     create_access_token,
     create_refresh_token,
-    get_subject_from_token,
-    verify_password,
+    get_payload_from_token,
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+_BUSY_RESPONSE = {
+    503: {
+        "description": "Parola işlemleri için kapasite dolu",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Sunucu meşgul, lütfen tekrar deneyin"}
+            }
+        },
+    }
+}
+
+
+_INVALID_TOKEN_RESPONSE = {
+    401: {
+        "description": "Geçersiz veya süresi dolmuş token",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Geçersiz veya süresi dolmuş token"}
+            }
+        },
+    }
+}
+
+
+def _invalid_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Geçersiz veya süresi dolmuş token",
+    )
+
+
+def _refresh_claims(token: str) -> Dict[str, Any]:
+    try:
+        claims = get_payload_from_token(token, expected_type="refresh")
+        int(claims["sub"])
+        if not claims.get("jti") or not claims.get("fam"):
+            raise ValueError("Missing token id")
+    except Exception:
+        raise _invalid_token()
+    return claims
+
+
+def _revoke_family(db: Session, claims: Dict[str, Any]) -> None:
+    # Zincirdeki en yeni token en geç şimdi + refresh ömrü kadar geçerli olabilir
+    revocation_store.revoke(
+        db,
+        claims["fam"],
+        user_id=int(claims["sub"]),
+        expires_at=datetime.now(timezone.utc)
+        + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+    )
+
+
+def _rotate(db: Session, claims: Dict[str, Any]) -> bool:
+    """Sunulan refresh token'ı iptal ederek rotasyonu kaydeder.
+
+    Zincir iptal edilmişse ya da token daha önce rotasyona girmişse (yeniden
+    kullanım) False döner; ikinci durumda tüm zincir de iptal edilir.
+    """
+    if revocation_store.is_revoked(db, claims["fam"]):
+        return False
+    rotated = not revocation_store.is_revoked(
+        db, claims["jti"]
+    ) and revocation_store.revoke(
+        db,
+        claims["jti"],
+        user_id=int(claims["sub"]),
+        expires_at=datetime.fromtimestamp(claims["exp"], tz=timezone.utc),
+    )
+    if not rotated:
+        _revoke_family(db, claims)
+    return rotated
+
+
+async def _issue_tokens(
+    db: AnySession, u: User, *, family: str | None = None
+) -> TokenResponse:
+    extra_claims = None
+    if settings.TOKEN_ROLE_CLAIMS:
+        # org üyelikleri + sürüm damgası; yetki kontrolleri DB yerine bunu okur
+        extra_claims = {
+            "orgs": await org_user_crud.membership_claims(db, u.id),
+            "mv": u.membership_version or 0,
+        }
+    return TokenResponse(
+        access_token=create_access_token(str(u.id), extra_claims=extra_claims),
+        refresh_token=create_refresh_token(str(u.id), family=family),
+    )
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Sunucu meşgul, lütfen tekrar deneyin",
+        headers={"Retry-After": "1"},
+    )
+
 
 @router.post(
     "/register",
@@ -34,19 +142,26 @@ router = APIRouter(prefix="/auth", tags=["auth"])
             "content": {
                 "application/json": {"example": {"detail": "E-posta zaten kayıtlı"}}
             },
-        }
+        },
+        **_BUSY_RESPONSE,
     },
 )
-def register(payload: RegisterRequest, db: Session = Depends(get_db)) -> UserOut:
-    existing = user_crud.get_by_email(db, payload.email)
+async def register(
+    payload: RegisterRequest, db: AnySession = Depends(db_session)
+) -> UserOut:
+    existing = await user_crud.get_by_email(db, payload.email)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="E-posta zaten kayıtlı"
         )
-    created = user_crud.create(
+    try:
+        password_hash = await password_service.ahash(payload.password)
+    except PasswordPoolSaturated:
+        raise _busy()
+    created = await user_crud.create(
         db,
         email=payload.email,
-        password=payload.password,
+        password_hash=password_hash,
         phone=payload.phone,
         locale=payload.locale,
     )
@@ -64,42 +179,68 @@ def register(payload: RegisterRequest, db: Session = Depends(get_db)) -> UserOut
             "content": {
                 "application/json": {"example": {"detail": "Geçersiz kimlik bilgileri"}}
             },
-        }
+        },
+        **_BUSY_RESPONSE,
     },
 )
-def login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
-    u = user_crud.get_by_email(db, payload.email)
-    if not u or not verify_password(payload.password, u.password_hash):
+async def login(
+    payload: LoginRequest, db: AnySession = Depends(db_session)
+) -> TokenResponse:
+    u = await user_crud.get_by_email(db, payload.email)
+    try:
+        valid = u is not None and await password_service.averify(
+            payload.password, u.password_hash
+        )
+    except PasswordPoolSaturated:
+        raise _busy()
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Geçersiz kimlik bilgileri"
         )
-    access = create_access_token(str(u.id))
-    refresh = create_refresh_token(str(u.id))
-    return TokenResponse(access_token=access, refresh_token=refresh)
+    return await _issue_tokens(db, u)
 
 
 @router.post(
     "/refresh",
     response_model=TokenResponse,
     summary="Token yenileme",
-    description="Geçerli bir refresh token verildiğinde yeni access ve refresh token çifti döner.",
-    responses={
-        401: {
-            "description": "Geçersiz veya süresi dolmuş token",
-            "content": {
-                "application/json": {
-                    "example": {"detail": "Geçersiz veya süresi dolmuş token"}
-                }
-            },
-        }
-    },
+    description=(
+        "Geçerli bir refresh token verildiğinde yeni access ve refresh token çifti döner. "
+        "Kullanılan refresh token iptal edilir (rotasyon); aynı token ikinci kez "
+        "kullanılırsa tüm token zinciri iptal edilir."
+    ),
+    responses=_INVALID_TOKEN_RESPONSE,
 )
-def refresh(payload: RefreshRequest) -> TokenResponse:
-    # verify refresh token and issue a new access/refresh pair
-    user_id = get_subject_from_token(payload.refresh_token, expected_type="refresh")
-    access = create_access_token(user_id)
-    refresh = create_refresh_token(user_id)
-    return TokenResponse(access_token=access, refresh_token=refresh)
+async def refresh(
+    payload: RefreshRequest, db: AnySession = Depends(db_session)
+) -> TokenResponse:
+    claims = _refresh_claims(payload.refresh_token)
+    user_id, family = claims["sub"], claims["fam"]
+    if not await run(db, _rotate, claims):
+        raise _invalid_token()
+
+    if not settings.TOKEN_ROLE_CLAIMS:
+        return TokenResponse(
+            access_token=create_access_token(user_id),
+            refresh_token=create_refresh_token(user_id, family=family),
+        )
+    u = await user_crud.get(db, int(user_id))
+    if not u:
+        raise _invalid_token()
+    return await _issue_tokens(db, u, family=family)
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Oturumu kapat",
+    description="Verilen refresh token'ı ve ondan türeyen tüm token zincirini iptal eder.",
+    responses=_INVALID_TOKEN_RESPONSE,
+)
+async def logout(payload: RefreshRequest, db: AnySession = Depends(db_session)):
+    claims = _refresh_claims(payload.refresh_token)
+    await run(db, _revoke_family, claims)
+    return None
 
 
 @router.get(
@@ -115,8 +256,17 @@ def refresh(payload: RefreshRequest) -> TokenResponse:
                     "example": {"detail": "Geçersiz veya süresi dolmuş token"}
                 }
             },
-        }
+        },
+        **etag.NOT_MODIFIED_RESPONSE,
     },
 )
-def me(current_user: UserOut = Depends(get_current_user)) -> UserOut:
+async def me(
+    response: Response,
+    if_none_match: str | None = Header(None),
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    tag = etag.strong_etag("user", current_user.id, current_user.updated_at)
+    if etag.matches(if_none_match, tag):
+        return etag.not_modified(tag)
+    response.headers["ETag"] = tag
     return current_user
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.auth_cache import Principal
+from app.crud.aio import address as address_crud
+from app.db import AnySession
+from app.deps import get_current_user, get_read_db
+from app.distance import get_matrix
+from app.schemas.distance import DistanceOut
+
+router = APIRouter(tags=["distance"])
+
+
+@router.get(
+    "/distance",
+    response_model=DistanceOut,
+    summary="İki adres arası mesafe",
+    description=(
+        "Adreslerin bölgeleri (`country` / `admin1` / `admin2`; ilçe matriste "
+        "yoksa il) arasındaki karayolu mesafesi ve süre, önceden derlenmiş "
+        "matristen (`python -m app.distance build`). Matris derlenmemişse 503."
+    ),
+)
+async def distance(
+    from_address_id: int,
+    to_address_id: int,
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
+):
+    matrix = get_matrix()
+    if matrix is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Mesafe matrisi yüklü değil",
+        )
+    found = await address_crud.regions(db, [from_address_id, to_address_id])
+    if from_address_id not in found or to_address_id not in found:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Adres bulunamadı"
+        )
+    rows = [
+        matrix.index_of(a.country, a.admin1, a.admin2)
+        for a in (found[from_address_id], found[to_address_id])
+    ]
+    if rows[0] is None or rows[1] is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bu adreslerin bölgesi için mesafe bilinmiyor",
+        )
+    km, minutes = matrix.between(rows[0], rows[1])
+    return DistanceOut(
+        from_region=matrix.name(rows[0]),
+        to_region=matrix.name(rows[1]),
+        distance_km=round(km, 1),
+        duration_min=round(minutes),
+    )
@@ -1,31 +1,124 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Literal, NoReturn
 
-from app.crud import load as load_crud
-from app.crud import org_user as org_user_crud
-from app.deps import get_current_user, get_db
-from app.models.user import User
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app import etag, load_import
+from app.auth_cache import Principal
+from app.bulk import TOO_MANY_RESPONSE, bulk_create
+from app.config import settings
+from app.crud.aio import address as address_crud
+from app.crud.aio import load as load_crud
+from app.crud.aio import run
+from app.crud.rows import owned_select
+from app.db import AnySession
+from app.deps import (
+    admin_org_ids,
+    db_session,
+    get_current_user,
+    get_read_db,
+    is_org_admin,
+    stream_sessions,
+)
+from app.export import EXPORT_RESPONSES, ExportFormat, export_response
+from app.matching import matching_service
+from app.models.load import Load
+from app.pagination import NEXT_CURSOR_RESPONSE, after_id, fetch_limit, json_page
+from app.schemas.bulk import BulkCreateRequest, BulkCreateResponse, ImportResponse
 from app.schemas.load import LoadCreate, LoadOut, LoadUpdate
+from app.schemas.matching import SuggestedOffer
+from app.sparse import LOADS, Shape, load_shape, parse_shape
+
+# Liste ve dışa aktarma uç noktalarının seçtiği kolonlar: LoadOut alanları
+_LIST_COLUMNS = list(LoadOut.model_fields)
+# PATCH yanıtının ETag'i: parametresiz `GET /loads/{id}` ile aynı temsil
+_FULL_SHAPE = parse_shape(LOADS, None, None)
 
 router = APIRouter(prefix="/loads", tags=["loads"])
 
 
-@router.get("/", response_model=list[LoadOut], summary="Kullanıcının yükleri")
-def list_my_loads(
+@router.get(
+    "/",
+    response_model=list[LoadOut],
+    summary="Kullanıcının yükleri",
+    responses={**NEXT_CURSOR_RESPONSE, **etag.NOT_MODIFIED_RESPONSE},
+)
+async def list_my_loads(
+    request: Request,
     organization_id: int | None = None,
     limit: int | None = None,
     offset: int | None = None,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    after: str | None = None,
+    shape: Shape = Depends(load_shape),
+    if_none_match: str | None = Header(None),
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
 ):
-    return load_crud.list_my(
-        db,
+    # Zayıf ETag ucuz bir toplama sorgusundan; eşleşirse sayfa sorgusu çalışmaz
+    tag = etag.list_etag(
+        "loads",
         me.id,
+        request.query_params.multi_items(),
+        *await load_crud.list_my_version(
+            db, me.id, organization_id=organization_id, expand=shape.expand
+        ),
+    )
+    if etag.matches(if_none_match, tag):
+        return etag.not_modified(tag)
+    page_args = dict(
         organization_id=organization_id,
-        limit=limit,
+        limit=fetch_limit(limit),
         offset=offset,
+        after_id=after_id("loads", after, offset),
+    )
+    if shape.expand:
+        # İlişkiler ilişki başına tek selectinload sorgusuyla gelir
+        objs = await load_crud.list_my(db, me.id, options=shape.options(), **page_args)
+        return json_page("loads", objs, limit, dump=shape.dump, etag=tag)
+    # Hızlı yol: ORM nesnesi ve şema doğrulaması yok; istenen kolonların
+    # satırları doğrudan JSON'a yazılır
+    rows = await load_crud.list_my_rows(db, me.id, shape.columns, **page_args)
+    return json_page("loads", rows, limit, etag=tag)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Yükleri dışa aktar (NDJSON/CSV akışı)",
+    description=(
+        "`GET /loads/` ile aynı kayıtlar, sayfalamasız ve tek yanıtta. Sunucu tarafı "
+        "cursor ile akış halinde gönderilir; bellek kullanımı sonuç boyutundan "
+        "bağımsızdır."
+    ),
+    responses=EXPORT_RESPONSES,
+)
+async def export_loads(
+    format: ExportFormat = "ndjson",
+    organization_id: int | None = None,
+    sessions=Depends(stream_sessions),
+    me: Principal = Depends(get_current_user),
+):
+    return export_response(
+        sessions,
+        owned_select(Load, _LIST_COLUMNS, me.id, organization_id=organization_id),
+        _LIST_COLUMNS,
+        format,
+        me.id,
+        "loads",
     )
 
 
@@ -35,19 +128,19 @@ def list_my_loads(
     status_code=status.HTTP_201_CREATED,
     summary="Yük oluştur",
 )
-def create_load(
+async def create_load(
     payload: LoadCreate,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
 ):
     # Eğer organization_id verildiyse: sadece ilgili organizasyon adminleri yük oluşturabilir
     if payload.organization_id is not None:
-        if not org_user_crud.is_admin(db, payload.organization_id, me.id):
+        if not await is_org_admin(db, me, payload.organization_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Yetki yok (organization admin gerekli)",
             )
-    return load_crud.create(
+    return await load_crud.create(
         db,
         owner_user_id=me.id,
         organization_id=payload.organization_id,
@@ -62,46 +155,252 @@ def create_load(
     )
 
 
-@router.get("/{load_id}", response_model=LoadOut, summary="Yük detayı")
-def get_load(
-    load_id: int, db: Session = Depends(get_db), me: User = Depends(get_current_user)
+async def _missing_addresses(db: AnySession, items: Dict[int, Any]) -> Dict[int, str]:
+    # Tek bir geçersiz FK tüm çok satırlı INSERT'i düşürür; önceden elenir
+    found = await address_crud.existing_ids(
+        db,
+        {
+            a
+            for it in items.values()
+            for a in (it.pickup_address_id, it.dropoff_address_id)
+        },
+    )
+    return {
+        i: "Adres bulunamadı"
+        for i, it in items.items()
+        if it.pickup_address_id not in found or it.dropoff_address_id not in found
+    }
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkCreateResponse,
+    summary="Toplu yük oluştur",
+    description=(
+        "En fazla `BULK_MAX_ITEMS` yük tek istekte, tek işlemde oluşturulur. Her öğe "
+        "`LoadCreate` ile doğrulanır; hatalı, yetkisiz ya da adresi bulunmayan öğeler "
+        "atlanır ve `results` içinde indeksleriyle raporlanır."
+    ),
+    responses=TOO_MANY_RESPONSE,
+)
+async def create_loads_bulk(
+    payload: BulkCreateRequest,
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
+):
+    return await bulk_create(
+        db,
+        me,
+        payload.items,
+        LoadCreate,
+        load_crud.create_many,
+        precheck=_missing_addresses,
+    )
+
+
+# Gövde bu boyuta kadar bellekte, üstünde geçici dosyada tutulur
+_IMPORT_SPOOL_BYTES = 1024 * 1024
+
+_IMPORT_TOO_LARGE_RESPONSE = {
+    413: {
+        "description": "Gövde IMPORT_MAX_BYTES sınırını aşıyor",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Dosya en fazla 104857600 bayt olabilir"}
+            }
+        },
+    }
+}
+
+
+def _import_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Dosya en fazla {settings.IMPORT_MAX_BYTES} bayt olabilir",
+    )
+
+
+@router.post(
+    "/import",
+    response_model=ImportResponse,
+    summary="Yükleri CSV/NDJSON dosyasından içe aktar",
+    description=(
+        "İstek gövdesi ham dosyadır (`Content-Type: text/csv` ya da "
+        "`application/x-ndjson`; `format` parametresi içerik tipini ezer). CSV "
+        "başlığı `LoadBase` alan adlarıdır. Satırlar parça parça doğrulanıp "
+        "PostgreSQL `COPY` ile tek işlemde yazılır; hatalı satırlar atlanır ve "
+        "satır numaralarıyla raporlanır. Gövde en fazla `IMPORT_MAX_BYTES` "
+        "bayt olabilir."
+    ),
+    responses=_IMPORT_TOO_LARGE_RESPONSE,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_loads(
+    request: Request,
+    format: Literal["csv", "ndjson"] | None = None,
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
 ):
-    load_obj = load_crud.get(db, load_id)
-    if not load_obj:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = format or load_import.CONTENT_TYPES.get(content_type)
+    if fmt is None:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Yük bulunamadı"
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Desteklenmeyen içerik tipi (text/csv ya da application/x-ndjson)",
         )
-    # İzin: sahibi görebilir; org'a bağlı ise org admini de görebilir
-    if load_obj.owner_user_id is not None and load_obj.owner_user_id == me.id:
-        return load_obj
-    if load_obj.organization_id is not None and org_user_crud.is_admin(
-        db, load_obj.organization_id, me.id
-    ):
-        return load_obj
-    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Yük bulunamadı")
-
-
-@router.patch("/{load_id}", response_model=LoadOut, summary="Yük güncelle")
-def update_load(
+    limit = settings.IMPORT_MAX_BYTES
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise _import_too_large()
+    with tempfile.SpooledTemporaryFile(max_size=_IMPORT_SPOOL_BYTES) as spool:
+        # Content-Length'e güvenilmez (chunked gövdede yok): sınır akarken sayılır.
+        # Dosyaya taşan yazmalar loop'u bloklamasın diye thread havuzunda
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > limit:
+                raise _import_too_large()
+            await run_in_threadpool(spool.write, chunk)
+        spool.seek(0)
+        try:
+            return await run(
+                db,
+                load_import.import_loads,
+                spool,
+                fmt,
+                owner_user_id=me.id,
+                admin_org_ids=admin_org_ids(me),
+            )
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+            ) from exc
+
+
+@router.get(
+    "/{load_id}",
+    response_model=LoadOut,
+    summary="Yük detayı",
+    responses=etag.NOT_MODIFIED_RESPONSE,
+)
+async def get_load(
     load_id: int,
-    payload: LoadUpdate,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    shape: Shape = Depends(load_shape),
+    if_none_match: str | None = Header(None),
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
 ):
-    load_obj = load_crud.get(db, load_id)
-    if not load_obj:
+    # Sahiplik / org admin koşulu sorgunun içinde; görünmeyen kayıt 404
+    load_obj = await load_crud.get_visible(
+        db,
+        load_id,
+        user_id=me.id,
+        admin_org_ids=admin_org_ids(me),
+        options=shape.options(),
+    )
+    if load_obj is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Yük bulunamadı"
         )
-    authorized = load_obj.owner_user_id == me.id or (
-        load_obj.organization_id is not None
-        and org_user_crud.is_admin(db, load_obj.organization_id, me.id)
+    return etag.detail_response(load_obj, shape, if_none_match)
+
+
+@router.get(
+    "/{load_id}/suggested-offers",
+    response_model=list[SuggestedOffer],
+    summary="Yüke uygun teklifler",
+    description=(
+        "Alım iliyle aynı ilden, alım gününe `MATCH_DAY_WINDOW` gün içinde kalkan, "
+        "aracı yükün kategorisine (GIDA, TEHLIKELI) ve miktarına uygun açık "
+        "teklifler, skora göre. Adaylar worker başına bellek içi indeksten gelir; "
+        "yeni teklifler en geç `MATCH_INDEX_REBUILD_SECONDS` içinde görünür."
+    ),
+)
+async def suggested_offers(
+    load_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
+):
+    found = await run(
+        db,
+        matching_service.suggest_offers,
+        load_id,
+        user_id=me.id,
+        admin_org_ids=admin_org_ids(me),
+        limit=limit,
     )
-    if not authorized:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Yetki yok")
-    return load_crud.update(
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Yük bulunamadı"
+        )
+    return [
+        SuggestedOffer(
+            offer_id=offer.id,
+            vehicle_id=offer.vehicle_id,
+            from_address_id=offer.from_address_id,
+            to_address_id=offer.to_address_id,
+            depart_date=offer.depart_date,
+            score=score,
+        )
+        for offer, score in found
+    ]
+
+
+async def _raise_not_found_or_forbidden(
+    db: AnySession,
+    load_id: int,
+    me: Principal | None = None,
+    expected: list[datetime] | None = None,
+) -> NoReturn:
+    # Yalnızca koşullu mutasyon satır döndürmediğinde: 404 mü 403 mü (412 mi)?
+    if await load_crud.get(db, load_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Yük bulunamadı"
+        )
+    if expected is not None and me is not None:
+        visible = await load_crud.get_visible(
+            db, load_id, user_id=me.id, admin_org_ids=admin_org_ids(me)
+        )
+        if visible is not None:
+            raise etag.precondition_failed()
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Yetki yok")
+
+
+@router.patch(
+    "/{load_id}",
+    response_model=LoadOut,
+    summary="Yük güncelle",
+    description=(
+        "`If-Match` başlığı verilirse (detay ETag'i) kayıt yalnızca o sürümdeyse "
+        "güncellenir; arada değiştiyse 412 döner."
+    ),
+    responses=etag.PRECONDITION_FAILED_RESPONSE,
+)
+async def update_load(
+    load_id: int,
+    payload: LoadUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
+):
+    # Yetki ve If-Match koşulları UPDATE'in WHERE'inde; ayrı get / is_admin sorgusu yok
+    expected = etag.if_match_versions(if_match)
+    updated = await load_crud.update_authorized(
         db,
-        load_obj,
+        load_id,
+        user_id=me.id,
+        admin_org_ids=admin_org_ids(me),
+        expected_updated_at=expected,
         organization_id=payload.organization_id,
         name=payload.name,
         quantity_value=payload.quantity_value,
@@ -112,22 +411,21 @@ def update_load(
         pickup_day=payload.pickup_day,
         intl=payload.intl,
     )
+    if updated is None:
+        await _raise_not_found_or_forbidden(db, load_id, me, expected)
+    response.headers["ETag"] = etag.detail_etag(updated, _FULL_SHAPE)
+    return updated
 
 
 @router.delete("/{load_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Yük sil")
-def delete_load(
-    load_id: int, db: Session = Depends(get_db), me: User = Depends(get_current_user)
+async def delete_load(
+    load_id: int,
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
 ):
-    load_obj = load_crud.get(db, load_id)
-    if not load_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Yük bulunamadı"
-        )
-    authorized = load_obj.owner_user_id == me.id or (
-        load_obj.organization_id is not None
-        and org_user_crud.is_admin(db, load_obj.organization_id, me.id)
+    deleted = await load_crud.delete_authorized(
+        db, load_id, user_id=me.id, admin_org_ids=admin_org_ids(me)
     )
-    if not authorized:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Yetki yok")
-    load_crud.delete(db, load_obj)
+    if not deleted:
+        await _raise_not_found_or_forbidden(db, load_id)
     return None
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.config import settings
+from app.db import async_engine, engine, replicas
+from app.pool_metrics import pool_snapshot
+from app.request_context import checkout_metrics
+
+router = APIRouter(prefix="/metrics", tags=["health"])
+
+
+@router.get(
+    "/db-pool",
+    summary="Veritabanı bağlantı havuzu metrikleri",
+    description=(
+        "Worker süreci başına havuz durumu: kullanımdaki bağlantılar, overflow, "
+        "checkout bekleme süresi histogramı (ms, kümülatif), havuz timeout'ları, "
+        "başarısız pre-ping sayısı ve istek başına alınan bağlantı sayısının "
+        "dağılımı (`checkouts_per_request`, kümülatif)."
+    ),
+)
+def db_pool_metrics() -> Dict[str, Any]:
+    data: Dict[str, Any] = {
+        "config": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+        },
+        "sync": pool_snapshot(engine),
+        "checkouts_per_request": checkout_metrics.snapshot(),
+    }
+    if async_engine is not None:
+        data["async"] = pool_snapshot(async_engine.sync_engine)
+    if replicas is not None:
+        data["replicas"] = [
+            {**info, **pool_snapshot(e)}
+            for info, e in zip(replicas.stats(), replicas.engines)
+        ]
+    return data
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from typing import NoReturn
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.auth_cache import Principal
+from app.crud.aio import offer as offer_crud
+from app.crud.aio import run
+from app.crud.aio import vehicle as vehicle_crud
+from app.db import AnySession
+from app.deps import admin_org_ids, db_session, get_current_user, get_read_db
+from app.distance import get_matrix
+from app.matching import matching_service
+from app.schemas.matching import CorridorLoad, SuggestedLoad
+from app.schemas.offer import OfferCreate, OfferOut, OfferUpdate
+
+router = APIRouter(prefix="/offers", tags=["offers"])
+
+
+async def _require_vehicle(db: AnySession, me: Principal, vehicle_id: int) -> None:
+    # Teklif yalnızca kullanıcının yönetebildiği bir araca bağlanabilir
+    vehicle = await vehicle_crud.get_visible(
+        db, vehicle_id, user_id=me.id, admin_org_ids=admin_org_ids(me)
+    )
+    if vehicle is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Araç bulunamadı"
+        )
+
+
+async def _raise_not_found_or_forbidden(db: AnySession, offer_id: int) -> NoReturn:
+    if await offer_crud.get(db, offer_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Teklif bulunamadı"
+        )
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Yetki yok")
+
+
+@router.post(
+    "/",
+    response_model=OfferOut,
+    status_code=status.HTTP_201_CREATED,
+    summary="Teklif oluştur",
+    description=(
+        "Araç sahibi ya da aracın organizasyonunun admini oluşturur. Teklif bu "
+        "worker'ın eşleştirme indeksine ve ilgili yüklerin önerilerine hemen yansır."
+    ),
+)
+async def create_offer(
+    payload: OfferCreate,
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
+):
+    await _require_vehicle(db, me, payload.vehicle_id)
+    return await offer_crud.create(db, **payload.model_dump())
+
+
+@router.get("/{offer_id}", response_model=OfferOut, summary="Teklif detayı")
+async def get_offer(
+    offer_id: int,
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
+):
+    offer = await offer_crud.get_visible(
+        db, offer_id, user_id=me.id, admin_org_ids=admin_org_ids(me)
+    )
+    if offer is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Teklif bulunamadı"
+        )
+    return offer
+
+
+@router.patch("/{offer_id}", response_model=OfferOut, summary="Teklif güncelle")
+async def update_offer(
+    offer_id: int,
+    payload: OfferUpdate,
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
+):
+    if payload.vehicle_id is not None:
+        await _require_vehicle(db, me, payload.vehicle_id)
+    updated = await offer_crud.update_authorized(
+        db,
+        offer_id,
+        user_id=me.id,
+        admin_org_ids=admin_org_ids(me),
+        **payload.model_dump(),
+    )
+    if updated is None:
+        await _raise_not_found_or_forbidden(db, offer_id)
+    return updated
+
+
+@router.delete(
+    "/{offer_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Teklif sil"
+)
+async def delete_offer(
+    offer_id: int,
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
+):
+    deleted = await offer_crud.delete_authorized(
+        db, offer_id, user_id=me.id, admin_org_ids=admin_org_ids(me)
+    )
+    if not deleted:
+        await _raise_not_found_or_forbidden(db, offer_id)
+    return None
+
+
+@router.get(
+    "/{offer_id}/suggested-loads",
+    response_model=list[SuggestedLoad],
+    summary="Teklife uygun yükler",
+    description=(
+        "Teklifin çıkış iliyle aynı ilden, kalkış gününe `MATCH_DAY_WINDOW` gün "
+        "içinde alınacak, aracın taşıyabileceği açık yükler, skora göre. Teklif "
+        "aracın sahibine ya da aracın organizasyonunun adminine görünür."
+    ),
+)
+async def suggested_loads(
+    offer_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
+):
+    found = await run(
+        db,
+        matching_service.suggest_loads,
+        offer_id,
+        user_id=me.id,
+        admin_org_ids=admin_org_ids(me),
+        limit=limit,
+    )
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Teklif bulunamadı"
+        )
+    return [
+        SuggestedLoad(
+            load_id=load.id,
+            pickup_address_id=load.pickup_address_id,
+            dropoff_address_id=load.dropoff_address_id,
+            pickup_day=load.pickup_day,
+            quantity_value=load.quantity_value,
+            quantity_unit=load.quantity_unit,
+            category=load.category,
+            score=score,
+        )
+        for load, score in found
+    ]
+
+
+@router.get(
+    "/{offer_id}/corridor-loads",
+    response_model=list[CorridorLoad],
+    summary="Teklifin güzergahı üzerindeki yükler",
+    description=(
+        "Teklifin çıkış bölgesinden varış bölgesine giderken güzergaha en fazla "
+        "`detour_km` ekleyerek alınıp teslim edilebilen (alım teslimden önce), "
+        "kalkış gününe `MATCH_DAY_WINDOW` gün içinde alınacak, aracın "
+        "taşıyabileceği açık yükler; sapmaya göre artan sırada. Mesafeler "
+        "önceden derlenmiş matristen okunur; matris derlenmemişse 503."
+    ),
+)
+async def corridor_loads(
+    offer_id: int,
+    detour_km: float = Query(50, ge=0, le=1000),
+    limit: int = Query(20, ge=1, le=100),
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
+):
+    if get_matrix() is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Mesafe matrisi yüklü değil",
+        )
+    found = await run(
+        db,
+        matching_service.corridor_loads,
+        offer_id,
+        user_id=me.id,
+        admin_org_ids=admin_org_ids(me),
+        detour_km=detour_km,
+        limit=limit,
+    )
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Teklif bulunamadı"
+        )
+    return [
+        CorridorLoad(
+            load_id=load.id,
+            pickup_address_id=load.pickup_address_id,
+            dropoff_address_id=load.dropoff_address_id,
+            pickup_day=load.pickup_day,
+            quantity_value=load.quantity_value,
+            quantity_unit=load.quantity_unit,
+            category=load.category,
+            detour_km=round(detour, 1),
+        )
+        for load, detour in found
+    ]
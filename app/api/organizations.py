@@ -1,32 +1,74 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
 
-from app.crud import org_user as org_user_crud
-from app.crud import organization as org_crud
-from app.deps import get_current_user, get_db, require_org_admin
+from app import etag
+from app.auth_cache import Principal
+from app.crud.aio import load as load_crud
+from app.crud.aio import org_user as org_user_crud
+from app.crud.aio import organization as org_crud
+from app.crud.aio import vehicle as vehicle_crud
+from app.db import AnySession
+from app.deps import (
+    admin_org_ids,
+    db_session,
+    get_current_user,
+    get_read_db,
+    require_org_admin,
+)
 from app.models.enums import OrgRole
-from app.models.user import User
+from app.pagination import NEXT_CURSOR_RESPONSE, after_id, fetch_limit, json_page, page
+from app.schemas.load import LoadOut
 from app.schemas.organization import (
     OrganizationCreate,
     OrganizationOut,
     OrganizationUpdate,
 )
+from app.schemas.vehicle import VehicleOut
+from app.sparse import ORGS, Shape, org_shape, parse_shape
+
+# PATCH yanıtının ETag'i: parametresiz `GET /orgs/{id}` ile aynı temsil
+_FULL_SHAPE = parse_shape(ORGS, None, None)
 
 router = APIRouter(prefix="/orgs", tags=["organizations"])
 
 
 @router.get(
-    "/", response_model=list[OrganizationOut], summary="Sahip olunan organizasyonlar"
+    "/",
+    response_model=list[OrganizationOut],
+    summary="Sahip olunan organizasyonlar",
+    responses={**NEXT_CURSOR_RESPONSE, **etag.NOT_MODIFIED_RESPONSE},
 )
-def list_my_orgs(
+async def list_my_orgs(
+    request: Request,
     limit: int | None = None,
     offset: int | None = None,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    after: str | None = None,
+    shape: Shape = Depends(org_shape),
+    if_none_match: str | None = Header(None),
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
 ):
-    return org_crud.list_by_owner(db, me.id, limit=limit, offset=offset)
+    tag = etag.list_etag(
+        "orgs",
+        me.id,
+        request.query_params.multi_items(),
+        *await org_crud.list_by_owner_version(db, me.id, expand=shape.expand),
+    )
+    if etag.matches(if_none_match, tag):
+        return etag.not_modified(tag)
+    page_args = dict(
+        limit=fetch_limit(limit),
+        offset=offset,
+        after_id=after_id("orgs", after, offset),
+    )
+    if shape.expand:
+        objs = await org_crud.list_by_owner(
+            db, me.id, options=shape.options(), **page_args
+        )
+        return json_page("orgs", objs, limit, dump=shape.dump, etag=tag)
+    rows = await org_crud.list_by_owner_rows(db, me.id, shape.columns, **page_args)
+    return json_page("orgs", rows, limit, etag=tag)
 
 
 @router.post(
@@ -35,12 +77,12 @@ def list_my_orgs(
     status_code=status.HTTP_201_CREATED,
     summary="Organizasyon oluştur",
 )
-def create_org(
+async def create_org(
     payload: OrganizationCreate,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
 ):
-    org = org_crud.create(
+    org = await org_crud.create(
         db,
         title=payload.title,
         owner_user_id=me.id,
@@ -48,62 +90,152 @@ def create_org(
         tax_number=payload.tax_number,
     )
     # owner becomes corporate_admin by default
-    org_user_crud.assign_role(
+    await org_user_crud.assign_role(
         db, organization_id=org.id, user_id=me.id, role=OrgRole.corporate_admin
     )
     return org
 
 
-@router.get("/{org_id}", response_model=OrganizationOut, summary="Organizasyon detayı")
-def get_org(
-    org_id: int, db: Session = Depends(get_db), me: User = Depends(get_current_user)
+@router.get(
+    "/{org_id}",
+    response_model=OrganizationOut,
+    summary="Organizasyon detayı",
+    responses=etag.NOT_MODIFIED_RESPONSE,
+)
+async def get_org(
+    org_id: int,
+    shape: Shape = Depends(org_shape),
+    if_none_match: str | None = Header(None),
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
 ):
-    org = org_crud.get(db, org_id)
-    if not org:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Organizasyon bulunamadı"
-        )
-    # izin: sahibi ya da admin olan görebilir, aksi halde 404
-    if org.owner_user_id != me.id and not org_user_crud.is_admin(db, org_id, me.id):
+    # izin: sahibi ya da admin olan görebilir, aksi halde 404 (tek sorgu)
+    org = await org_crud.get_visible(
+        db,
+        org_id,
+        user_id=me.id,
+        admin_org_ids=admin_org_ids(me),
+        options=shape.options(),
+    )
+    if org is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Organizasyon bulunamadı"
         )
-    return org
+    return etag.detail_response(org, shape, if_none_match)
+
+
+@router.get(
+    "/{org_id}/loads",
+    response_model=list[LoadOut],
+    summary="Organizasyonun yükleri",
+    description=(
+        "Org adminleri organizasyonun tüm yüklerini, diğer kullanıcılar yalnızca "
+        "kendi yüklerini görür."
+    ),
+    responses=NEXT_CURSOR_RESPONSE,
+)
+async def list_org_loads(
+    org_id: int,
+    response: Response,
+    limit: int | None = None,
+    offset: int | None = None,
+    after: str | None = None,
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
+):
+    rows = await load_crud.list_visible(
+        db,
+        me.id,
+        organization_id=org_id,
+        admin_org_ids=admin_org_ids(me),
+        limit=fetch_limit(limit),
+        offset=offset,
+        after_id=after_id("org-loads", after, offset),
+    )
+    return page(response, "org-loads", rows, limit)
+
+
+@router.get(
+    "/{org_id}/vehicles",
+    response_model=list[VehicleOut],
+    summary="Organizasyonun araçları",
+    description=(
+        "Org adminleri organizasyonun tüm araçlarını, diğer kullanıcılar yalnızca "
+        "kendi araçlarını görür."
+    ),
+    responses=NEXT_CURSOR_RESPONSE,
+)
+async def list_org_vehicles(
+    org_id: int,
+    response: Response,
+    limit: int | None = None,
+    offset: int | None = None,
+    after: str | None = None,
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
+):
+    rows = await vehicle_crud.list_visible(
+        db,
+        me.id,
+        organization_id=org_id,
+        admin_org_ids=admin_org_ids(me),
+        limit=fetch_limit(limit),
+        offset=offset,
+        after_id=after_id("org-vehicles", after, offset),
+    )
+    return page(response, "org-vehicles", rows, limit)
 
 
 @router.patch(
-    "/{org_id}", response_model=OrganizationOut, summary="Organizasyon güncelle"
+    "/{org_id}",
+    response_model=OrganizationOut,
+    summary="Organizasyon güncelle",
+    description=(
+        "`If-Match` başlığı verilirse (detay ETag'i) organizasyon yalnızca o "
+        "sürümdeyse güncellenir; arada değiştiyse 412 döner."
+    ),
+    responses=etag.PRECONDITION_FAILED_RESPONSE,
 )
-def update_org(
+async def update_org(
     org_id: int,
     payload: OrganizationUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: str | None = Header(None),
+    db: AnySession = Depends(db_session),
     _: bool = Depends(require_org_admin),
 ):
-    org = org_crud.get(db, org_id)
-    if not org:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Organizasyon bulunamadı"
-        )
-    return org_crud.update(
+    # If-Match koşulu UPDATE'in WHERE'inde
+    expected = etag.if_match_versions(if_match)
+    org = await org_crud.update(
         db,
-        org,
+        org_id,
+        expected_updated_at=expected,
         title=payload.title,
         tax_office=payload.tax_office,
         tax_number=payload.tax_number,
     )
+    if org is None:
+        if expected is None or await org_crud.get(db, org_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Organizasyon bulunamadı"
+            )
+        raise etag.precondition_failed()
+    response.headers["ETag"] = etag.detail_etag(org, _FULL_SHAPE)
+    return org
 
 
 @router.delete(
     "/{org_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Organizasyon sil"
 )
-def delete_org(
-    org_id: int, db: Session = Depends(get_db), _: bool = Depends(require_org_admin)
+async def delete_org(
+    org_id: int,
+    db: AnySession = Depends(db_session),
+    _: bool = Depends(require_org_admin),
 ):
-    org = org_crud.get(db, org_id)
+    org = await org_crud.get(db, org_id)
     if not org:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Organizasyon bulunamadı"
         )
-    org_crud.delete(db, org)
+    await org_crud.delete(db, org)
     return None
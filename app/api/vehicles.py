@@ -1,31 +1,110 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import NoReturn
 
-from app.crud import org_user as org_user_crud
-from app.crud import vehicle as vehicle_crud
-from app.deps import get_current_user, get_db
-from app.models.user import User
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+
+from app import etag
+from app.auth_cache import Principal
+from app.bulk import TOO_MANY_RESPONSE, bulk_create
+from app.crud.aio import vehicle as vehicle_crud
+from app.crud.rows import owned_select
+from app.db import AnySession
+from app.deps import (
+    admin_org_ids,
+    db_session,
+    get_current_user,
+    get_read_db,
+    is_org_admin,
+    stream_sessions,
+)
+from app.export import EXPORT_RESPONSES, ExportFormat, export_response
+from app.models.vehicle import Vehicle
+from app.pagination import NEXT_CURSOR_RESPONSE, after_id, fetch_limit, json_page
+from app.schemas.bulk import BulkCreateRequest, BulkCreateResponse
 from app.schemas.vehicle import VehicleCreate, VehicleOut, VehicleUpdate
+from app.sparse import VEHICLES, Shape, parse_shape, vehicle_shape
+
+# Liste ve dışa aktarma uç noktalarının seçtiği kolonlar: VehicleOut alanları
+_LIST_COLUMNS = list(VehicleOut.model_fields)
+# PATCH yanıtının ETag'i: parametresiz `GET /vehicles/{id}` ile aynı temsil
+_FULL_SHAPE = parse_shape(VEHICLES, None, None)
 
 router = APIRouter(prefix="/vehicles", tags=["vehicles"])
 
 
-@router.get("/", response_model=list[VehicleOut], summary="Kullanıcının araçları")
-def list_my_vehicles(
+@router.get(
+    "/",
+    response_model=list[VehicleOut],
+    summary="Kullanıcının araçları",
+    responses={**NEXT_CURSOR_RESPONSE, **etag.NOT_MODIFIED_RESPONSE},
+)
+async def list_my_vehicles(
+    request: Request,
     organization_id: int | None = None,
     limit: int | None = None,
     offset: int | None = None,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    after: str | None = None,
+    shape: Shape = Depends(vehicle_shape),
+    if_none_match: str | None = Header(None),
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
 ):
-    return vehicle_crud.list_my(
-        db,
+    # Zayıf ETag ucuz bir toplama sorgusundan; eşleşirse sayfa sorgusu çalışmaz
+    tag = etag.list_etag(
+        "vehicles",
         me.id,
+        request.query_params.multi_items(),
+        *await vehicle_crud.list_my_version(
+            db, me.id, organization_id=organization_id, expand=shape.expand
+        ),
+    )
+    if etag.matches(if_none_match, tag):
+        return etag.not_modified(tag)
+    page_args = dict(
         organization_id=organization_id,
-        limit=limit,
+        limit=fetch_limit(limit),
         offset=offset,
+        after_id=after_id("vehicles", after, offset),
+    )
+    if shape.expand:
+        # İlişkiler ilişki başına tek selectinload sorgusuyla gelir
+        objs = await vehicle_crud.list_my(
+            db, me.id, options=shape.options(), **page_args
+        )
+        return json_page("vehicles", objs, limit, dump=shape.dump, etag=tag)
+    # Hızlı yol: ORM nesnesi ve şema doğrulaması yok; istenen kolonların
+    # satırları doğrudan JSON'a yazılır
+    rows = await vehicle_crud.list_my_rows(db, me.id, shape.columns, **page_args)
+    return json_page("vehicles", rows, limit, etag=tag)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Araçları dışa aktar (NDJSON/CSV akışı)",
+    description=(
+        "`GET /vehicles/` ile aynı kayıtlar, sayfalamasız ve tek yanıtta. Sunucu tarafı "
+        "cursor ile akış halinde gönderilir; bellek kullanımı sonuç boyutundan "
+        "bağımsızdır."
+    ),
+    responses=EXPORT_RESPONSES,
+)
+async def export_vehicles(
+    format: ExportFormat = "ndjson",
+    organization_id: int | None = None,
+    sessions=Depends(stream_sessions),
+    me: Principal = Depends(get_current_user),
+):
+    return export_response(
+        sessions,
+        owned_select(Vehicle, _LIST_COLUMNS, me.id, organization_id=organization_id),
+        _LIST_COLUMNS,
+        format,
+        me.id,
+        "vehicles",
     )
 
 
@@ -35,19 +114,19 @@ def list_my_vehicles(
     status_code=status.HTTP_201_CREATED,
     summary="Araç oluştur",
 )
-def create_vehicle(
+async def create_vehicle(
     payload: VehicleCreate,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
 ):
     # Eğer organization_id verildiyse: sadece ilgili organizasyon adminleri oluşturabilir
     if payload.organization_id is not None:
-        if not org_user_crud.is_admin(db, payload.organization_id, me.id):
+        if not await is_org_admin(db, me, payload.organization_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Yetki yok (organization admin gerekli)",
             )
-    return vehicle_crud.create(
+    return await vehicle_crud.create(
         db,
         owner_user_id=me.id,
         organization_id=payload.organization_id,
@@ -58,71 +137,124 @@ def create_vehicle(
     )
 
 
-@router.get("/{vehicle_id}", response_model=VehicleOut, summary="Araç detayı")
-def get_vehicle(
-    vehicle_id: int, db: Session = Depends(get_db), me: User = Depends(get_current_user)
+@router.post(
+    "/bulk",
+    response_model=BulkCreateResponse,
+    summary="Toplu araç oluştur",
+    description=(
+        "En fazla `BULK_MAX_ITEMS` araç tek istekte, tek işlemde oluşturulur. Her öğe "
+        "`VehicleCreate` ile doğrulanır; hatalı ya da yetkisiz öğeler atlanır ve "
+        "`results` içinde indeksleriyle raporlanır."
+    ),
+    responses=TOO_MANY_RESPONSE,
+)
+async def create_vehicles_bulk(
+    payload: BulkCreateRequest,
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
 ):
-    v = vehicle_crud.get(db, vehicle_id)
-    if not v:
+    return await bulk_create(
+        db, me, payload.items, VehicleCreate, vehicle_crud.create_many
+    )
+
+
+@router.get(
+    "/{vehicle_id}",
+    response_model=VehicleOut,
+    summary="Araç detayı",
+    responses=etag.NOT_MODIFIED_RESPONSE,
+)
+async def get_vehicle(
+    vehicle_id: int,
+    shape: Shape = Depends(vehicle_shape),
+    if_none_match: str | None = Header(None),
+    db: AnySession = Depends(get_read_db),
+    me: Principal = Depends(get_current_user),
+):
+    # Sahiplik / org admin koşulu sorgunun içinde; görünmeyen kayıt 404
+    v = await vehicle_crud.get_visible(
+        db,
+        vehicle_id,
+        user_id=me.id,
+        admin_org_ids=admin_org_ids(me),
+        options=shape.options(),
+    )
+    if v is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Araç bulunamadı"
         )
-    # İzin: sahibi görebilir. Eğer org'a bağlıysa ilgili org admini de görebilir.
-    if v.owner_user_id is not None and v.owner_user_id == me.id:
-        return v
-    if v.organization_id is not None and org_user_crud.is_admin(
-        db, v.organization_id, me.id
-    ):
-        return v
-    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Araç bulunamadı")
-
-
-@router.patch("/{vehicle_id}", response_model=VehicleOut, summary="Araç güncelle")
-def update_vehicle(
+    return etag.detail_response(v, shape, if_none_match)
+
+
+async def _raise_not_found_or_forbidden(
+    db: AnySession,
     vehicle_id: int,
-    payload: VehicleUpdate,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
-):
-    v = vehicle_crud.get(db, vehicle_id)
-    if not v:
+    me: Principal | None = None,
+    expected: list[datetime] | None = None,
+) -> NoReturn:
+    # Yalnızca koşullu mutasyon satır döndürmediğinde: 404 mü 403 mü (412 mi)?
+    if await vehicle_crud.get(db, vehicle_id) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Araç bulunamadı"
         )
-    # İzin: sahibi güncelleyebilir; org'a bağlı ise org admini de güncelleyebilir
-    authorized = v.owner_user_id == me.id or (
-        v.organization_id is not None
-        and org_user_crud.is_admin(db, v.organization_id, me.id)
-    )
-    if not authorized:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Yetki yok")
-    return vehicle_crud.update(
+    if expected is not None and me is not None:
+        visible = await vehicle_crud.get_visible(
+            db, vehicle_id, user_id=me.id, admin_org_ids=admin_org_ids(me)
+        )
+        if visible is not None:
+            raise etag.precondition_failed()
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Yetki yok")
+
+
+@router.patch(
+    "/{vehicle_id}",
+    response_model=VehicleOut,
+    summary="Araç güncelle",
+    description=(
+        "`If-Match` başlığı verilirse (detay ETag'i) kayıt yalnızca o sürümdeyse "
+        "güncellenir; arada değiştiyse 412 döner."
+    ),
+    responses=etag.PRECONDITION_FAILED_RESPONSE,
+)
+async def update_vehicle(
+    vehicle_id: int,
+    payload: VehicleUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
+):
+    # Yetki ve If-Match koşulları UPDATE'in WHERE'inde; ayrı get / is_admin sorgusu yok
+    expected = etag.if_match_versions(if_match)
+    updated = await vehicle_crud.update_authorized(
         db,
-        v,
+        vehicle_id,
+        user_id=me.id,
+        admin_org_ids=admin_org_ids(me),
+        expected_updated_at=expected,
         organization_id=payload.organization_id,
         capacity_value=payload.capacity_value,
         capacity_unit=payload.capacity_unit,
         can_food=payload.can_food,
         can_dg=payload.can_dg,
     )
+    if updated is None:
+        await _raise_not_found_or_forbidden(db, vehicle_id, me, expected)
+    response.headers["ETag"] = etag.detail_etag(updated, _FULL_SHAPE)
+    return updated
 
 
 @router.delete(
     "/{vehicle_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Araç sil"
 )
-def delete_vehicle(
-    vehicle_id: int, db: Session = Depends(get_db), me: User = Depends(get_current_user)
+async def delete_vehicle(
+    vehicle_id: int,
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
 ):
-    v = vehicle_crud.get(db, vehicle_id)
-    if not v:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Araç bulunamadı"
-        )
-    authorized = v.owner_user_id == me.id or (
-        v.organization_id is not None
-        and org_user_crud.is_admin(db, v.organization_id, me.id)
+    deleted = await vehicle_crud.delete_authorized(
+        db, vehicle_id, user_id=me.id, admin_org_ids=admin_org_ids(me)
     )
-    if not authorized:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Yetki yok")
-    vehicle_crud.delete(db, v)
+    if not deleted:
+        await _raise_not_found_or_forbidden(db, vehicle_id)
     return None
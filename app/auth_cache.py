@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from .config import settings
+from .models.enums import GenericStatus
+from .models.user import User
+from .request_context import current
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Session'dan bağımsız, önbelleğe alınabilir kullanıcı görünümü.
+
+    Endpoint'ler `me.id` vb. alanları okur; `/auth/me` ise `UserOut`
+    (from_attributes) ile doğrudan serialize eder. `org_roles` yalnızca
+    token'daki rol claim'leri güncelse doludur ({org_id: "a" | "u"}).
+    """
+
+    id: int
+    email: str
+    phone: Optional[str]
+    locale: Optional[str]
+    status: GenericStatus
+    membership_version: int = 0
+    org_roles: Optional[Mapping[int, str]] = None
+    # `/auth/me` ETag'i için (bkz. `app.etag`)
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(
+        cls, u: User, claims: Optional[Mapping[str, Any]] = None
+    ) -> "Principal":
+        org_roles = None
+        version = u.membership_version or 0
+        if claims is not None and "orgs" in claims and claims.get("mv") == version:
+            org_roles = {int(k): v for k, v in claims["orgs"].items()}
+        return cls(
+            id=u.id,
+            email=u.email,
+            phone=u.phone,
+            locale=u.locale,
+            status=u.status,
+            membership_version=version,
+            org_roles=org_roles,
+            updated_at=u.updated_at,
+        )
+
+
+class TokenCache:
+    """Doğrulanmış access token -> Principal için sınırlı (LRU) ve TTL'li önbellek.
+
+    Kayıtlar token'ın `exp` anında ya da en geç `ttl_seconds` sonra düşer.
+    Önbellek süreç içidir; her worker kendi kopyasını tutar.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: int) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl_seconds > 0
+
+    def get(self, token: str) -> Optional[Principal]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, principal = entry
+            if expires_at <= now:
+                del self._data[token]
+                self.misses += 1
+                return None
+            self._data.move_to_end(token)
+            self.hits += 1
+            return principal
+
+    def set(
+        self,
+        token: str,
+        principal: Principal,
+        exp: int,
+        ttl_seconds: Optional[int] = None,
+    ) -> None:
+        """`ttl_seconds` verilirse (daha kısa) önbellek süresi olarak kullanılır."""
+        ttl = (
+            self.ttl_seconds
+            if ttl_seconds is None
+            else min(ttl_seconds, self.ttl_seconds)
+        )
+        if not self.enabled or ttl <= 0:
+            return
+        expires_at = min(float(exp), time.time() + ttl)
+        with self._lock:
+            self._data[token] = (expires_at, principal)
+            self._data.move_to_end(token)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            stale = [t for t, (_, p) in self._data.items() if p.id == user_id]
+            for t in stale:
+                del self._data[t]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+token_cache = TokenCache(
+    maxsize=settings.AUTH_CACHE_MAXSIZE, ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+def _forget_user(user_id: int) -> None:
+    token_cache.invalidate_user(user_id)
+    ctx = current()
+    if ctx is not None:
+        ctx.forget_user(user_id)
+
+
+def forget_user(session: Session, user_id: int) -> None:
+    """Kullanıcının önbellekteki token'larını şimdi ve `session` commit
+    edilince bir kez daha düşürür. Attribute olayı tetiklemeyen SQL
+    `UPDATE`'lerle auth durumunu değiştiren çağıranlar içindir."""
+    _forget_user(user_id)
+    # Commit'e kadar başka bir istek eski değeri okuyup yeniden önbelleğe
+    # alabilir: commit sonrasında bir kez daha düşürülür
+    session.info.setdefault("auth_changed_users", set()).add(user_id)
+
+
+# Kullanıcının durumu/üyelikleri değiştiğinde ya da silindiğinde önbellekteki
+# token'ları düşür. Yalnızca bu worker'ın önbelleği; diğer worker'lar TTL ile
+# (rol claim'li token'larda `AUTH_ROLE_CLAIMS_TTL_SECONDS`) yakalar.
+@event.listens_for(User.status, "set")
+@event.listens_for(User.membership_version, "set")
+def _on_user_auth_state_set(target: User, value, oldvalue, initiator) -> None:
+    if target.id is not None and value != oldvalue:
+        session = object_session(target)
+        if session is None:
+            _forget_user(target.id)
+        else:
+            forget_user(session, target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session: Session) -> None:
+    for user_id in session.info.pop("auth_changed_users", ()):
+        _forget_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session: Session) -> None:
+    session.info.pop("auth_changed_users", None)
+
+
+@event.listens_for(User, "after_delete")
+def _on_user_delete(mapper, connection, target: User) -> None:
+    token_cache.invalidate_user(target.id)
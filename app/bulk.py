@@ -0,0 +1,100 @@
+"""Toplu oluşturma (`POST /loads/bulk`, `POST /vehicles/bulk`) ortak akışı.
+
+Öğeler tek tek şemayla doğrulanır, org yetkisi her farklı `organization_id`
+için bir kez (tek sorguda) kontrol edilir ve geçerli öğeler tek işlemde çok
+satırlı INSERT ile yazılır. Hatalı öğeler isteği düşürmez; sonuçta kendi
+indeksiyle raporlanır.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+from .auth_cache import Principal
+from .config import settings
+from .crud.aio import org_user as org_user_crud
+from .db import AnySession
+from .deps import admin_org_ids
+from .schemas.bulk import BulkCreateResponse, BulkItemResult
+
+Precheck = Callable[[AnySession, Dict[int, Any]], Awaitable[Dict[int, str]]]
+
+TOO_MANY_RESPONSE = {
+    413: {
+        "description": "Öğe sayısı BULK_MAX_ITEMS sınırını aşıyor",
+        "content": {
+            "application/json": {
+                "example": {"detail": "En fazla 500 öğe gönderilebilir"}
+            }
+        },
+    }
+}
+
+
+def validation_error_text(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()
+    )
+
+
+async def bulk_create(
+    db: AnySession,
+    me: Principal,
+    items: Sequence[Dict[str, Any]],
+    schema: type[BaseModel],
+    create_many: Callable[..., Awaitable[List[int]]],
+    *,
+    precheck: Optional[Precheck] = None,
+) -> BulkCreateResponse:
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"En fazla {settings.BULK_MAX_ITEMS} öğe gönderilebilir",
+        )
+
+    errors: Dict[int, str] = {}
+    valid: Dict[int, Any] = {}
+    for i, raw in enumerate(items):
+        try:
+            valid[i] = schema.model_validate(raw)
+        except ValidationError as exc:
+            errors[i] = validation_error_text(exc)
+
+    org_ids = {
+        item.organization_id
+        for item in valid.values()
+        if item.organization_id is not None
+    }
+    if org_ids:
+        claimed = admin_org_ids(me)
+        allowed = (
+            org_ids & set(claimed)
+            if claimed is not None
+            else await org_user_crud.admin_orgs_among(db, me.id, org_ids)
+        )
+        for i in [i for i, item in valid.items() if item.organization_id is not None]:
+            if valid[i].organization_id not in allowed:
+                errors[i] = "Yetki yok (organization admin gerekli)"
+                del valid[i]
+
+    if precheck is not None and valid:
+        for i, message in (await precheck(db, valid)).items():
+            errors[i] = message
+            del valid[i]
+
+    indices = sorted(valid)
+    ids = await create_many(
+        db, [{"owner_user_id": me.id, **valid[i].model_dump()} for i in indices]
+    )
+    created = dict(zip(indices, ids))
+    return BulkCreateResponse(
+        created=len(created),
+        failed=len(errors),
+        results=[
+            BulkItemResult(index=i, id=created.get(i), error=errors.get(i))
+            for i in range(len(items))
+        ],
+    )
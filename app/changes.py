@@ -0,0 +1,60 @@
+"""Yük / teklif / araç yazma olayları (süreç içi).
+
+CRUD yazma fonksiyonları commit'ten sonra `emit` ile neyin değiştiğini
+yayınlar; aboneler (eşleştirme indeksi, bkz. `app.matching`) aynı oturumla
+güncel satırları okur. Olay yalnızca id taşır, kaydın kendisini değil:
+abone her zaman commit edilmiş durumu görür, olaylar tekrar edilebilir.
+
+Olaylar yayınlandığı worker'da kalır; diğer worker'lar değişikliği kendi
+periyodik yeniden kurulumlarında görür.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Literal, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+Kind = Literal["load", "offer", "vehicle"]
+
+
+@dataclass(frozen=True, slots=True)
+class Change:
+    kind: Kind
+    # None: hangi kayıtların değiştiği bilinmiyor (ör. COPY ile içe aktarma)
+    ids: Optional[Tuple[int, ...]]
+    deleted: bool = False
+
+
+Subscriber = Callable[[Session, Change], None]
+
+_subscribers: List[Subscriber] = []
+
+
+def subscribe(fn: Subscriber) -> Subscriber:
+    _subscribers.append(fn)
+    return fn
+
+
+def emit(
+    db: Session,
+    kind: Kind,
+    ids: Optional[Iterable[int]] = None,
+    *,
+    deleted: bool = False,
+) -> None:
+    """Aboneleri çağırır. Yazma commit edilmiştir: abone hatası isteği
+    başarısız yapmaz, loglanır ve oturum geri alınır."""
+    change = Change(kind, None if ids is None else tuple(ids), deleted)
+    if change.ids == ():
+        return
+    for fn in list(_subscribers):
+        try:
+            fn(db, change)
+        except Exception:
+            logger.exception("Değişiklik abonesi başarısız: %r", change)
+            db.rollback()
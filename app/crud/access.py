@@ -0,0 +1,43 @@
+"""Kayıt düzeyinde yetki koşulları.
+
+Sahiplik / org admin kontrolü ayrı sorgularla değil, mutasyonun kendi
+`WHERE` koşulunun parçası olarak veritabanında değerlendirilir.
+"""
+
+from __future__ import annotations
+
+from typing import Collection, Optional
+
+from sqlalchemy import ColumnElement, and_, exists, false, or_
+
+from app.models.enums import GenericStatus, OrgRole
+from app.models.org_user import OrgUser
+
+
+def owner_or_org_admin(
+    model,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+    *,
+    org_column=None,
+) -> ColumnElement[bool]:
+    """Kaydın sahibi `user_id` ya da kaydın organizasyonunda aktif admin.
+
+    `admin_org_ids` verilirse (token'daki güncel rol claim'leri) org admin
+    kontrolü alt sorgu yerine `IN` listesiyle yapılır. Organizasyonun kendisi
+    için `org_column=Organization.id` verilir.
+    """
+    if org_column is None:
+        org_column = model.organization_id
+    if admin_org_ids is not None:
+        org_admin = org_column.in_(admin_org_ids) if admin_org_ids else false()
+    else:
+        org_admin = exists().where(
+            and_(
+                OrgUser.organization_id == org_column,
+                OrgUser.user_id == user_id,
+                OrgUser.role == OrgRole.corporate_admin,
+                OrgUser.status == GenericStatus.active,
+            )
+        )
+    return or_(model.owner_user_id == user_id, org_admin)
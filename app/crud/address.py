@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, Set
+
+from sqlalchemy import Row, select
+from sqlalchemy.orm import Session
+
+from app.models.address import Address
+
+
+def existing_ids(db: Session, address_ids: Iterable[int]) -> Set[int]:
+    ids = set(address_ids)
+    if not ids:
+        return set()
+    return set(db.scalars(select(Address.id).where(Address.id.in_(ids))))
+
+
+def regions(db: Session, address_ids: Iterable[int]) -> Dict[int, Row]:
+    """Adreslerin `(country, admin1, admin2)` satırları; bulunamayanlar dönmez."""
+    ids = set(address_ids)
+    if not ids:
+        return {}
+    rows = db.execute(
+        select(Address.id, Address.country, Address.admin1, Address.admin2).where(
+            Address.id.in_(ids)
+        )
+    )
+    return {row.id: row for row in rows}
@@ -0,0 +1,65 @@
+"""CRUD modüllerinin async karşılıkları.
+
+Sorgu mantığı tek yerde (senkron CRUD fonksiyonlarında) kalır. Oturum bir
+`AsyncSession` ise fonksiyon `AsyncSession.run_sync` ile async sürücü
+üzerinde çalıştırılır; senkron `Session` ise threadpool'a devredilir. Böylece
+`async def` router'lar iki dağıtım modunda da event loop'u bloklamaz::
+
+    from app.crud.aio import load as load_crud
+
+    load_obj = await load_crud.get(db, load_id)
+"""
+
+from __future__ import annotations
+
+from functools import partial
+from types import ModuleType
+from typing import Any, Awaitable, Callable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.db import AnySession
+
+from . import address as _address
+from . import load as _load
+from . import offer as _offer
+from . import org_user as _org_user
+from . import organization as _organization
+from . import user as _user
+from . import vehicle as _vehicle
+
+T = TypeVar("T")
+
+
+async def run(db: AnySession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """`fn(session, *args, **kwargs)` çağrısını oturum tipine uygun şekilde yürütür."""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: fn(session, *args, **kwargs))
+    return await run_in_threadpool(partial(fn, db, *args, **kwargs))
+
+
+class AsyncCrud:
+    """Bir CRUD modülünün fonksiyonlarını `await` edilebilir olarak sunar."""
+
+    def __init__(self, module: ModuleType) -> None:
+        self._module = module
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        # Çağrı anında çözülür: modül üzerindeki monkeypatch'ler de geçerli olur
+        getattr(self._module, name)
+
+        async def call(db: AnySession, *args: Any, **kwargs: Any) -> Any:
+            return await run(db, getattr(self._module, name), *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+
+address = AsyncCrud(_address)
+load = AsyncCrud(_load)
+offer = AsyncCrud(_offer)
+org_user = AsyncCrud(_org_user)
+organization = AsyncCrud(_organization)
+user = AsyncCrud(_user)
+vehicle = AsyncCrud(_vehicle)
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
-from typing import Optional, Sequence
+from datetime import datetime
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
 
+from sqlalchemy import Row, and_
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import insert, select
+from sqlalchemy import update as sa_update
 from sqlalchemy.orm import Session
 
+from app import changes
 from app.models.load import Load
 
+from . import pg_copy, rows
+from .access import owner_or_org_admin
+
 
 def get(db: Session, load_id: int) -> Optional[Load]:
     return db.query(Load).filter(Load.id == load_id).first()
@@ -18,14 +27,20 @@ def list_my(
     organization_id: Optional[int] = None,
     limit: int | None = None,
     offset: int | None = None,
+    after_id: int | None = None,
+    options: Sequence[Any] = (),
 ) -> Sequence[Load]:
     q = (
         db.query(Load)
+        .options(*options)
         .filter(Load.owner_user_id == owner_user_id)
         .order_by(Load.id.desc())
     )
     if organization_id is not None:
         q = q.filter(Load.organization_id == organization_id)
+    if after_id is not None:
+        # keyset: sıralama id desc olduğundan sonraki sayfa daha küçük id'lerdir
+        q = q.filter(Load.id < after_id)
     if offset:
         q = q.offset(offset)
     if limit:
@@ -33,6 +48,87 @@ def list_my(
     return q.all()
 
 
+def list_my_rows(
+    db: Session,
+    owner_user_id: int,
+    columns: Sequence[str],
+    *,
+    organization_id: Optional[int] = None,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_id: int | None = None,
+) -> Sequence[Row]:
+    """`list_my`'ın salt okunur hızlı yolu: ORM nesnesi yerine `columns` satırları."""
+    return rows.list_owned(
+        db,
+        Load,
+        columns,
+        owner_user_id,
+        organization_id=organization_id,
+        limit=limit,
+        offset=offset,
+        after_id=after_id,
+    )
+
+
+def list_my_version(
+    db: Session,
+    owner_user_id: int,
+    *,
+    organization_id: Optional[int] = None,
+    expand: Sequence[str] = (),
+) -> Tuple[int, Optional[datetime]]:
+    """`list_my` kümesinin (sayı, en büyük `updated_at`) çifti; liste ETag'i için.
+    `expand`: genişletilen ilişkilerin sürümleri de dahil edilir."""
+    return rows.owned_version(
+        db, Load, owner_user_id, organization_id=organization_id, expand=expand
+    )
+
+
+def get_visible(
+    db: Session,
+    load_id: int,
+    *,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+    options: Sequence[Any] = (),
+) -> Optional[Load]:
+    """Kayıt yalnızca sahibine ya da org'unun aktif adminine görünür; tek sorgu."""
+    return db.scalars(
+        select(Load)
+        .options(*options)
+        .where(
+            Load.id == load_id,
+            owner_or_org_admin(Load, user_id, admin_org_ids),
+        )
+    ).first()
+
+
+def list_visible(
+    db: Session,
+    user_id: int,
+    *,
+    organization_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_id: int | None = None,
+) -> Sequence[Load]:
+    """Organizasyonun kayıtları: admin hepsini, diğer üyeler yalnızca kendilerininkini görür."""
+    q = select(Load).where(
+        Load.organization_id == organization_id,
+        owner_or_org_admin(Load, user_id, admin_org_ids),
+    )
+    if after_id is not None:
+        q = q.where(Load.id < after_id)
+    q = q.order_by(Load.id.desc())
+    if offset:
+        q = q.offset(offset)
+    if limit:
+        q = q.limit(limit)
+    return db.scalars(q).all()
+
+
 def create(
     db: Session,
     *,
@@ -61,10 +157,45 @@ def create(
     )
     db.add(load_obj)
     db.commit()
-    db.refresh(load_obj)
+    changes.emit(db, "load", [load_obj.id])
     return load_obj
 
 
+def create_many(db: Session, rows: Sequence[Dict[str, Any]]) -> List[int]:
+    """Tek işlemde çok satırlı INSERT; id'ler `rows` sırasıyla döner."""
+    if not rows:
+        return []
+    ids = db.scalars(
+        insert(Load).returning(Load.id, sort_by_parameter_order=True), rows
+    ).all()
+    db.commit()
+    changes.emit(db, "load", ids)
+    return list(ids)
+
+
+# COPY ile yazılan kolonlar; id, created_at ve updated_at sunucu varsayılanından
+COPY_COLUMNS = (
+    "owner_user_id",
+    "organization_id",
+    "name",
+    "name_validated",
+    "quantity_value",
+    "quantity_unit",
+    "category",
+    "pickup_address_id",
+    "dropoff_address_id",
+    "pickup_day",
+    "intl",
+)
+
+
+def copy_in(db: Session, rows: Sequence[Dict[str, Any]]) -> None:
+    """Satırları PostgreSQL'de `COPY ... FROM STDIN` ile yazar (commit etmez;
+    bkz. `pg_copy.copy_rows`). id'ler dönmez: çağıran commit'ten sonra
+    `changes.emit(db, "load")` yayınlar."""
+    pg_copy.copy_rows(db, Load.__table__, COPY_COLUMNS, rows)
+
+
 def update(
     db: Session,
     load_obj: Load,
@@ -99,10 +230,71 @@ def update(
         load_obj.intl = intl
     db.add(load_obj)
     db.commit()
-    db.refresh(load_obj)
+    changes.emit(db, "load", [load_obj.id])
     return load_obj
 
 
 def delete(db: Session, load_obj: Load) -> None:
+    load_id = load_obj.id
     db.delete(load_obj)
     db.commit()
+    changes.emit(db, "load", [load_id], deleted=True)
+
+
+def update_authorized(
+    db: Session,
+    load_id: int,
+    *,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+    expected_updated_at: Optional[Collection[datetime]] = None,
+    **fields: Any,
+) -> Optional[Load]:
+    """Yetki koşulunu içeren tek `UPDATE ... RETURNING`; None ise kayıt yok ya da
+    yetki yok (ayrımı çağıran `get` ile yapar). None olan alanlar değişmez.
+
+    `expected_updated_at` verilirse (`If-Match`) kayıt yalnızca `updated_at`
+    bu değerlerden biriyse güncellenir; aynı WHERE koşulunda, yarış yok.
+    """
+    allowed = and_(
+        Load.id == load_id,
+        owner_or_org_admin(Load, user_id, admin_org_ids),
+    )
+    if expected_updated_at is not None:
+        allowed = and_(allowed, Load.updated_at.in_(list(expected_updated_at)))
+    values = {k: v for k, v in fields.items() if v is not None}
+    if not values:
+        return db.scalars(select(Load).where(allowed)).first()
+    load_obj = db.scalars(
+        sa_update(Load).where(allowed).values(**values).returning(Load),
+        # "fetch": oturumda yüklü nesne RETURNING değerleriyle güncellenir
+        # (RETURNING destekleyen veritabanlarında ek SELECT yapılmaz)
+        execution_options={"synchronize_session": "fetch"},
+    ).first()
+    db.commit()
+    if load_obj is not None:
+        changes.emit(db, "load", [load_id])
+    return load_obj
+
+
+def delete_authorized(
+    db: Session,
+    load_id: int,
+    *,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+) -> bool:
+    """Yetki koşulunu içeren tek `DELETE ... RETURNING`; silindiyse True."""
+    deleted = db.scalars(
+        sa_delete(Load)
+        .where(
+            Load.id == load_id,
+            owner_or_org_admin(Load, user_id, admin_org_ids),
+        )
+        .returning(Load.id),
+        execution_options={"synchronize_session": "fetch"},
+    ).first()
+    db.commit()
+    if deleted is not None:
+        changes.emit(db, "load", [load_id], deleted=True)
+    return deleted is not None
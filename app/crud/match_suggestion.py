@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import Any, Collection, Dict, List, Mapping, Sequence, Tuple
+
+from sqlalchemy import Row, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.match_suggestion import MatchSuggestion
+
+from . import pg_copy
+
+COPY_COLUMNS = ("load_id", "offer_id", "rank", "score")
+# `matchsuggestion` yazarlarını sıralayan PostgreSQL advisory lock anahtarı
+WRITE_LOCK_KEY = 0x6D736771
+
+
+def lock_writers(db: Session) -> None:
+    """Öneri yazarlarını (artımlı `replace_for_loads`, toplu
+    `app.match_batch.rescore_all`) işlem sonuna kadar sıralar: ikisi aynı
+    `(load_id, rank)` unique index'ine aynı anda yazmaz. PostgreSQL dışında bir
+    şey yapmaz (SQLite'ta yazma işlemleri zaten sıralıdır)."""
+    if db.connection().dialect.name == "postgresql":
+        db.execute(select(func.pg_advisory_xact_lock(WRITE_LOCK_KEY)))
+
+
+def try_lock_writers(db: Session) -> bool:
+    """`lock_writers`in beklemeyen hâli: kilit başka işlemdeyse (ör. süren toplu
+    yeniden skorlama) hemen False döner. İstek yolunda kullanılır."""
+    if db.connection().dialect.name != "postgresql":
+        return True
+    return bool(db.scalar(select(func.pg_try_advisory_xact_lock(WRITE_LOCK_KEY))))
+
+
+def list_for_load(db: Session, load_id: int) -> Sequence[Row]:
+    return db.execute(
+        select(MatchSuggestion.offer_id, MatchSuggestion.score)
+        .where(MatchSuggestion.load_id == load_id)
+        .order_by(MatchSuggestion.rank)
+    ).all()
+
+
+def clear(db: Session) -> None:
+    """Tüm önerileri siler (commit etmez)."""
+    db.execute(delete(MatchSuggestion))
+
+
+def copy_in(db: Session, rows: Sequence[Dict[str, Any]]) -> None:
+    """Öneri satırlarını `COPY` ile yazar (commit etmez)."""
+    pg_copy.copy_rows(db, MatchSuggestion.__table__, COPY_COLUMNS, rows)
+
+
+def loads_with_offers(db: Session, offer_ids: Collection[int]) -> List[int]:
+    """Önerilerinde bu tekliflerden biri bulunan yükler."""
+    return list(
+        db.scalars(
+            select(MatchSuggestion.load_id)
+            .where(MatchSuggestion.offer_id.in_(list(offer_ids)))
+            .distinct()
+        )
+    )
+
+
+def thresholds(db: Session, load_ids: Collection[int]) -> Dict[int, Tuple[int, float]]:
+    """Yük başına (öneri sayısı, en düşük skor); önerisi olmayan yük dönmez."""
+    rows = db.execute(
+        select(
+            MatchSuggestion.load_id,
+            func.count(MatchSuggestion.id),
+            func.min(MatchSuggestion.score),
+        )
+        .where(MatchSuggestion.load_id.in_(list(load_ids)))
+        .group_by(MatchSuggestion.load_id)
+    ).all()
+    return {load_id: (count, lowest) for load_id, count, lowest in rows}
+
+
+def replace_for_loads(
+    db: Session, lists: Mapping[int, Sequence[Tuple[int, float]]]
+) -> bool:
+    """Verilen yüklerin önerilerini `(offer_id, skor)` listeleriyle değiştirir
+    (sıra = liste sırası; commit etmez). Başka bir yazar kilidi tutuyorsa
+    (bkz. `lock_writers`) beklemez, hiçbir şey yazmadan False döner."""
+    if not lists:
+        return True
+    if not try_lock_writers(db):
+        return False
+    db.execute(delete(MatchSuggestion).where(MatchSuggestion.load_id.in_(list(lists))))
+    rows = [
+        {"load_id": load_id, "offer_id": offer_id, "rank": rank, "score": score}
+        for load_id, pairs in lists.items()
+        for rank, (offer_id, score) in enumerate(pairs, start=1)
+    ]
+    if rows:
+        db.execute(insert(MatchSuggestion), rows)
+    return True
@@ -0,0 +1,132 @@
+"""Eşleştirme indeksinin okuduğu Core satırları.
+
+Yük ve teklifler adresleriyle (alım/çıkış ve varış illeri) tek sorguda,
+ORM nesnesi üretilmeden seçilir. "Açık" kayıtlar: tarihi bugün ya da
+sonrası olan, kabul edilmiş/tamamlanmış bir eşleşmesi olmayan yükler ve
+aktif araçların bugün ya da sonrası kalkan teklifleri.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Collection, Optional, Sequence
+
+from sqlalchemy import Float, Row, Select, cast, exists, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.address import Address
+from app.models.enums import GenericStatus, MatchStatus
+from app.models.load import Load
+from app.models.match import Match
+from app.models.offer import Offer
+from app.models.vehicle import Vehicle
+
+from .access import owner_or_org_admin
+
+_CLOSED = (MatchStatus.accepted, MatchStatus.completed)
+
+
+def load_select() -> Select:
+    """Yük kolonları + alım (`origin_*`) ve varış (`destination_*`) ülke/il."""
+    pickup, dropoff = aliased(Address), aliased(Address)
+    return (
+        select(
+            Load.id,
+            Load.pickup_address_id,
+            Load.dropoff_address_id,
+            Load.pickup_day,
+            cast(Load.quantity_value, Float).label("quantity_value"),
+            Load.quantity_unit,
+            Load.category,
+            pickup.country.label("origin_country"),
+            pickup.admin1.label("origin_admin1"),
+            dropoff.country.label("destination_country"),
+            dropoff.admin1.label("destination_admin1"),
+        )
+        .join(pickup, pickup.id == Load.pickup_address_id)
+        .join(dropoff, dropoff.id == Load.dropoff_address_id)
+    )
+
+
+def offer_select() -> Select:
+    """Teklif ve araç yetenek kolonları + çıkış/varış ülke/il."""
+    origin, destination = aliased(Address), aliased(Address)
+    return (
+        select(
+            Offer.id,
+            Offer.vehicle_id,
+            Offer.from_address_id,
+            Offer.to_address_id,
+            Offer.depart_date,
+            Vehicle.can_food,
+            Vehicle.can_dg,
+            cast(Vehicle.capacity_value, Float).label("capacity_value"),
+            Vehicle.capacity_unit,
+            origin.country.label("origin_country"),
+            origin.admin1.label("origin_admin1"),
+            destination.country.label("destination_country"),
+            destination.admin1.label("destination_admin1"),
+        )
+        .join(Vehicle, Vehicle.id == Offer.vehicle_id)
+        .join(origin, origin.id == Offer.from_address_id)
+        .join(destination, destination.id == Offer.to_address_id)
+    )
+
+
+def open_load_rows(
+    db: Session, today: date, ids: Optional[Collection[int]] = None
+) -> Sequence[Row]:
+    """Açık yükler; `ids` verilirse yalnızca onlardan açık olanlar."""
+    closed = exists().where(Match.load_id == Load.id, Match.status.in_(_CLOSED))
+    q = load_select().where(Load.pickup_day >= today, ~closed)
+    if ids is not None:
+        q = q.where(Load.id.in_(list(ids)))
+    return db.execute(q).all()
+
+
+def open_offer_rows(
+    db: Session,
+    today: date,
+    ids: Optional[Collection[int]] = None,
+    *,
+    vehicle_ids: Optional[Collection[int]] = None,
+) -> Sequence[Row]:
+    """Açık teklifler; `ids` / `vehicle_ids` verilirse yalnızca onlardan."""
+    q = offer_select().where(
+        Offer.depart_date >= today, Vehicle.status == GenericStatus.active
+    )
+    if ids is not None:
+        q = q.where(Offer.id.in_(list(ids)))
+    if vehicle_ids is not None:
+        q = q.where(Offer.vehicle_id.in_(list(vehicle_ids)))
+    return db.execute(q).all()
+
+
+def visible_load_row(
+    db: Session,
+    load_id: int,
+    *,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+) -> Optional[Row]:
+    """Yük sahibine ya da org'unun aktif adminine görünürse satırı; tek sorgu."""
+    return db.execute(
+        load_select().where(
+            Load.id == load_id, owner_or_org_admin(Load, user_id, admin_org_ids)
+        )
+    ).first()
+
+
+def visible_offer_row(
+    db: Session,
+    offer_id: int,
+    *,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+) -> Optional[Row]:
+    """Teklif, aracın sahibine ya da aracın org'unun aktif adminine görünür."""
+    return db.execute(
+        offer_select().where(
+            Offer.id == offer_id, owner_or_org_admin(Vehicle, user_id, admin_org_ids)
+        )
+    ).first()
@@ -0,0 +1,109 @@
+"""Teklif CRUD'u. Teklifin sahibi yoktur: yetki aracın sahibinden / aracın
+organizasyonunun adminlerinden gelir."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Collection, Optional
+
+from sqlalchemy import ColumnElement, and_
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import select
+from sqlalchemy import update as sa_update
+from sqlalchemy.orm import Session
+
+from app import changes
+from app.models.offer import Offer
+from app.models.vehicle import Vehicle
+
+from .access import owner_or_org_admin
+
+
+def _vehicle_allowed(
+    user_id: int, admin_org_ids: Optional[Collection[int]]
+) -> ColumnElement[bool]:
+    return Offer.vehicle_id.in_(
+        select(Vehicle.id).where(owner_or_org_admin(Vehicle, user_id, admin_org_ids))
+    )
+
+
+def get(db: Session, offer_id: int) -> Optional[Offer]:
+    return db.get(Offer, offer_id)
+
+
+def get_visible(
+    db: Session,
+    offer_id: int,
+    *,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+) -> Optional[Offer]:
+    return db.scalars(
+        select(Offer).where(
+            Offer.id == offer_id, _vehicle_allowed(user_id, admin_org_ids)
+        )
+    ).first()
+
+
+def create(
+    db: Session,
+    *,
+    vehicle_id: int,
+    from_address_id: int,
+    to_address_id: int,
+    depart_date: date,
+) -> Offer:
+    offer = Offer(
+        vehicle_id=vehicle_id,
+        from_address_id=from_address_id,
+        to_address_id=to_address_id,
+        depart_date=depart_date,
+    )
+    db.add(offer)
+    db.commit()
+    changes.emit(db, "offer", [offer.id])
+    return offer
+
+
+def update_authorized(
+    db: Session,
+    offer_id: int,
+    *,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+    **fields: Any,
+) -> Optional[Offer]:
+    """Yetki koşulunu içeren tek `UPDATE ... RETURNING`; None ise kayıt yok ya da
+    yetki yok. Yeni `vehicle_id`'nin yetkisini çağıran kontrol eder."""
+    allowed = and_(Offer.id == offer_id, _vehicle_allowed(user_id, admin_org_ids))
+    values = {k: v for k, v in fields.items() if v is not None}
+    if not values:
+        return db.scalars(select(Offer).where(allowed)).first()
+    offer = db.scalars(
+        sa_update(Offer).where(allowed).values(**values).returning(Offer),
+        execution_options={"synchronize_session": "fetch"},
+    ).first()
+    db.commit()
+    if offer is not None:
+        changes.emit(db, "offer", [offer_id])
+    return offer
+
+
+def delete_authorized(
+    db: Session,
+    offer_id: int,
+    *,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+) -> bool:
+    """Yetki koşulunu içeren tek `DELETE ... RETURNING`; silindiyse True."""
+    deleted = db.scalars(
+        sa_delete(Offer)
+        .where(Offer.id == offer_id, _vehicle_allowed(user_id, admin_org_ids))
+        .returning(Offer.id),
+        execution_options={"synchronize_session": "fetch"},
+    ).first()
+    db.commit()
+    if deleted is not None:
+        changes.emit(db, "offer", [offer_id], deleted=True)
+    return deleted is not None
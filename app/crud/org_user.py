@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Dict, Iterable, Optional, Set
 
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from app.auth_cache import forget_user
 from app.models.enums import GenericStatus, OrgRole
 from app.models.org_user import OrgUser
+from app.models.user import User
+
+# Token claim'lerinde kullanılan kısa rol kodları
+ROLE_CLAIM_CODES = {OrgRole.corporate_admin: "a", OrgRole.corporate_user: "u"}
 
 
 def get_link(db: Session, organization_id: int, user_id: int) -> Optional[OrgUser]:
@@ -37,8 +43,15 @@ def assign_role(
         link.role = role
         link.status = status
         db.add(link)
+    # Artış SQL'de: eşzamanlı iki rol değişikliği aynı sürümü yazamaz
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(membership_version=User.membership_version + 1),
+        execution_options={"synchronize_session": "fetch"},
+    )
+    forget_user(db, user_id)
     db.commit()
-    db.refresh(link)
     return link
 
 
@@ -49,3 +62,27 @@ def is_admin(db: Session, organization_id: int, user_id: int) -> bool:
         and link.role == OrgRole.corporate_admin
         and link.status == GenericStatus.active
     )
+
+
+def admin_orgs_among(
+    db: Session, user_id: int, organization_ids: Iterable[int]
+) -> Set[int]:
+    """Verilen org'lardan kullanıcının aktif admin olduklarını tek sorguda döner."""
+    ids = set(organization_ids)
+    if not ids:
+        return set()
+    rows = db.query(OrgUser.organization_id).filter(
+        OrgUser.user_id == user_id,
+        OrgUser.organization_id.in_(ids),
+        OrgUser.role == OrgRole.corporate_admin,
+        OrgUser.status == GenericStatus.active,
+    )
+    return {org_id for (org_id,) in rows}
+
+
+def membership_claims(db: Session, user_id: int) -> Dict[str, str]:
+    """Kullanıcının aktif org üyelikleri: {"<org_id>": "a" | "u"}."""
+    rows = db.query(OrgUser.organization_id, OrgUser.role).filter(
+        OrgUser.user_id == user_id, OrgUser.status == GenericStatus.active
+    )
+    return {str(org_id): ROLE_CLAIM_CODES[role] for org_id, role in rows}
@@ -1,28 +1,61 @@
 from __future__ import annotations
 
-from typing import Optional, Sequence
+from datetime import datetime
+from typing import Any, Collection, Optional, Sequence, Tuple
 
+from sqlalchemy import Row, select
+from sqlalchemy import update as sa_update
 from sqlalchemy.orm import Session
 
 from app.models.organization import Organization
 
+from . import rows
+from .access import owner_or_org_admin
+
 
 def get(db: Session, org_id: int) -> Optional[Organization]:
     return db.query(Organization).filter(Organization.id == org_id).first()
 
 
+def get_visible(
+    db: Session,
+    org_id: int,
+    *,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+    options: Sequence[Any] = (),
+) -> Optional[Organization]:
+    """Organizasyon yalnızca sahibine ya da aktif adminine görünür; tek sorgu."""
+    return db.scalars(
+        select(Organization)
+        .options(*options)
+        .where(
+            Organization.id == org_id,
+            owner_or_org_admin(
+                Organization, user_id, admin_org_ids, org_column=Organization.id
+            ),
+        )
+    ).first()
+
+
 def list_by_owner(
     db: Session,
     owner_user_id: int,
     *,
     limit: int | None = None,
     offset: int | None = None,
+    after_id: int | None = None,
+    options: Sequence[Any] = (),
 ) -> Sequence[Organization]:
     q = (
         db.query(Organization)
+        .options(*options)
         .filter(Organization.owner_user_id == owner_user_id)
         .order_by(Organization.id.desc())
     )
+    if after_id is not None:
+        # keyset: sıralama id desc olduğundan sonraki sayfa daha küçük id'lerdir
+        q = q.filter(Organization.id < after_id)
     if offset:
         q = q.offset(offset)
     if limit:
@@ -30,6 +63,35 @@ def list_by_owner(
     return q.all()
 
 
+def list_by_owner_rows(
+    db: Session,
+    owner_user_id: int,
+    columns: Sequence[str],
+    *,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_id: int | None = None,
+) -> Sequence[Row]:
+    """`list_by_owner`'ın salt okunur hızlı yolu: ORM nesnesi yerine satırlar."""
+    return rows.list_owned(
+        db,
+        Organization,
+        columns,
+        owner_user_id,
+        limit=limit,
+        offset=offset,
+        after_id=after_id,
+    )
+
+
+def list_by_owner_version(
+    db: Session, owner_user_id: int, *, expand: Sequence[str] = ()
+) -> Tuple[int, Optional[datetime]]:
+    """`list_by_owner` kümesinin (sayı, en büyük `updated_at`) çifti; `expand`:
+    genişletilen ilişkilerin sürümleri de dahil edilir."""
+    return rows.owned_version(db, Organization, owner_user_id, expand=expand)
+
+
 def create(
     db: Session,
     *,
@@ -46,27 +108,30 @@ def create(
     )
     db.add(org)
     db.commit()
-    db.refresh(org)
     return org
 
 
 def update(
     db: Session,
-    org: Organization,
+    org_id: int,
     *,
-    title: Optional[str] = None,
-    tax_office: Optional[str] = None,
-    tax_number: Optional[str] = None,
-) -> Organization:
-    if title is not None:
-        org.title = title
-    if tax_office is not None:
-        org.tax_office = tax_office
-    if tax_number is not None:
-        org.tax_number = tax_number
-    db.add(org)
+    expected_updated_at: Optional[Collection[datetime]] = None,
+    **fields: Any,
+) -> Optional[Organization]:
+    """Tek `UPDATE ... RETURNING`; None ise kayıt yok ya da (`If-Match`)
+    `updated_at` `expected_updated_at` değerlerinden biri değil. Sürüm koşulu
+    aynı WHERE'dedir, yarış yok. None olan alanlar değişmez."""
+    where = [Organization.id == org_id]
+    if expected_updated_at is not None:
+        where.append(Organization.updated_at.in_(list(expected_updated_at)))
+    values = {k: v for k, v in fields.items() if v is not None}
+    if not values:
+        return db.scalars(select(Organization).where(*where)).first()
+    org = db.scalars(
+        sa_update(Organization).where(*where).values(**values).returning(Organization),
+        execution_options={"synchronize_session": "fetch"},
+    ).first()
     db.commit()
-    db.refresh(org)
     return org
 
 
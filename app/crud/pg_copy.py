@@ -0,0 +1,52 @@
+"""PostgreSQL `COPY ... FROM STDIN` ile toplu yazma (commit etmez).
+
+Diğer dialect'lerde (testlerdeki SQLite) executemany INSERT'e düşer. Async
+oturumda (`run_sync` içinde) psycopg'nin async COPY'si `await_only` ile
+çağrılır.
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import Any, Dict, Sequence
+
+import psycopg
+from sqlalchemy import Table, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+
+def copy_rows(
+    db: Session, table: Table, columns: Sequence[str], rows: Sequence[Dict[str, Any]]
+) -> None:
+    """`rows` sözlüklerinin `columns` değerlerini `table`'a yazar."""
+    if not rows:
+        return
+    conn = db.connection()
+    if conn.dialect.name != "postgresql":
+        db.execute(insert(table), list(rows))
+        return
+    prep = conn.dialect.identifier_preparer
+    sql = "COPY {} ({}) FROM STDIN".format(
+        prep.format_table(table), ", ".join(prep.quote(c) for c in columns)
+    )
+    values = [tuple(_copy_value(row.get(c)) for c in columns) for row in rows]
+    raw = conn.connection.driver_connection
+    if isinstance(raw, psycopg.AsyncConnection):
+
+        async def _copy() -> None:
+            async with raw.cursor() as cur:
+                async with cur.copy(sql) as copy:
+                    for v in values:
+                        await copy.write_row(v)
+
+        await_only(_copy())
+    else:
+        with raw.cursor() as cur, cur.copy(sql) as copy:
+            for v in values:
+                copy.write_row(v)
+
+
+def _copy_value(value: Any) -> Any:
+    # Enum kolonları adla saklanır (SAEnum); COPY metin biçimine ad yazılır
+    return value.name if isinstance(value, Enum) else value
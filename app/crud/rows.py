@@ -0,0 +1,91 @@
+"""ORM nesnesi üretmeyen (Core satırı) okuma sorguları.
+
+Liste ve dışa aktarma uç noktalarının hızlı yolu: yalnızca çıktı şemasının
+kolonları seçilir, satırlar identity map'e girmez ve attribute
+enstrümantasyonu çalışmaz. Satırlar doğrudan JSON'a kodlanabilecek tiplerle
+gelir (`Numeric` kolonlar float olarak seçilir).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from sqlalchemy import Float, Numeric, Row, Select, cast, func, select
+from sqlalchemy.orm import Session, aliased
+
+
+def _column(model: Any, name: str) -> Any:
+    col = getattr(model, name)
+    if isinstance(col.type, Numeric) and col.type.asdecimal:
+        # Çıktı şemaları float bekler: Decimal yerine DB'de float'a çevrilir
+        # (SQLite'ta tam sayı olarak saklanan değerler aksi halde int döner)
+        return cast(col, Float).label(name)
+    return col
+
+
+def owned_select(
+    model: Any,
+    columns: Sequence[str],
+    owner_user_id: int,
+    *,
+    organization_id: Optional[int] = None,
+) -> Select:
+    """`list_my` ile aynı filtre ve sıralama; yalnızca istenen kolonlar."""
+    stmt = (
+        select(*(_column(model, c) for c in columns))
+        .where(model.owner_user_id == owner_user_id)
+        .order_by(model.id.desc())
+    )
+    if organization_id is not None:
+        stmt = stmt.where(model.organization_id == organization_id)
+    return stmt
+
+
+def list_owned(
+    db: Session,
+    model: Any,
+    columns: Sequence[str],
+    owner_user_id: int,
+    *,
+    organization_id: Optional[int] = None,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_id: int | None = None,
+) -> Sequence[Row]:
+    stmt = owned_select(model, columns, owner_user_id, organization_id=organization_id)
+    if after_id is not None:
+        stmt = stmt.where(model.id < after_id)
+    if offset:
+        stmt = stmt.offset(offset)
+    if limit:
+        stmt = stmt.limit(limit)
+    return db.execute(stmt).all()
+
+
+def owned_version(
+    db: Session,
+    model: Any,
+    owner_user_id: int,
+    *,
+    organization_id: Optional[int] = None,
+    expand: Sequence[str] = (),
+) -> Tuple[int, Optional[datetime]]:
+    """`owned_select` kümesinin sayısı ve en büyük `updated_at` değeri (liste
+    ETag'i için). Sayfa kolonları okunmaz; tek toplama sorgusu.
+
+    `expand` verilirse genişletilen (çoka-bir) ilişkiler LEFT JOIN ile eklenir
+    ve onların en büyük `updated_at` değerleri de hesaba katılır: gömülen
+    kayıttaki değişiklik de liste ETag'ini değiştirir.
+    """
+    maxes = [func.max(model.updated_at)]
+    stmt = select(func.count(model.id)).where(model.owner_user_id == owner_user_id)
+    for name in expand:
+        attr = getattr(model, name)
+        target = aliased(attr.property.mapper.class_)
+        stmt = stmt.outerjoin(attr.of_type(target))
+        maxes.append(func.max(target.updated_at))
+    if organization_id is not None:
+        stmt = stmt.where(model.organization_id == organization_id)
+    count, *versions = db.execute(stmt.add_columns(*maxes)).one()
+    return count, max((v for v in versions if v is not None), default=None)
@@ -5,7 +5,7 @@ from typing import Optional
 from sqlalchemy.orm import Session
 
 from app.models.user import User
-from app.security import get_password_hash
+from app.passwords import password_service
 
 
 def get_by_email(db: Session, email: str) -> Optional[User]:
@@ -16,19 +16,22 @@ def create(
     db: Session,
     *,
     email: str,
-    password: str,
+    password: str | None = None,
+    password_hash: str | None = None,
     phone: str | None = None,
     locale: str | None = "tr",
 ) -> User:
+    # Async router'lar hash'i önceden (event loop'u bloklamadan) hesaplayıp verir
+    if password_hash is None:
+        password_hash = password_service.hash(password)
     user = User(
         email=email,
         phone=phone,
-        password_hash=get_password_hash(password),
+        password_hash=password_hash,
         locale=locale,
     )
     db.add(user)
     db.commit()
-    db.refresh(user)
     return user
 
 
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
-from typing import Optional, Sequence
+from datetime import datetime
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
 
+from sqlalchemy import Row, and_
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import insert, select
+from sqlalchemy import update as sa_update
 from sqlalchemy.orm import Session
 
+from app import changes
 from app.models.vehicle import Vehicle
 
+from . import rows
+from .access import owner_or_org_admin
+
 
 def get(db: Session, vehicle_id: int) -> Optional[Vehicle]:
     return db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
@@ -18,14 +27,20 @@ def list_my(
     organization_id: Optional[int] = None,
     limit: int | None = None,
     offset: int | None = None,
+    after_id: int | None = None,
+    options: Sequence[Any] = (),
 ) -> Sequence[Vehicle]:
     q = (
         db.query(Vehicle)
+        .options(*options)
         .filter(Vehicle.owner_user_id == owner_user_id)
         .order_by(Vehicle.id.desc())
     )
     if organization_id is not None:
         q = q.filter(Vehicle.organization_id == organization_id)
+    if after_id is not None:
+        # keyset: sıralama id desc olduğundan sonraki sayfa daha küçük id'lerdir
+        q = q.filter(Vehicle.id < after_id)
     if offset:
         q = q.offset(offset)
     if limit:
@@ -33,6 +48,87 @@ def list_my(
     return q.all()
 
 
+def list_my_rows(
+    db: Session,
+    owner_user_id: int,
+    columns: Sequence[str],
+    *,
+    organization_id: Optional[int] = None,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_id: int | None = None,
+) -> Sequence[Row]:
+    """`list_my`'ın salt okunur hızlı yolu: ORM nesnesi yerine `columns` satırları."""
+    return rows.list_owned(
+        db,
+        Vehicle,
+        columns,
+        owner_user_id,
+        organization_id=organization_id,
+        limit=limit,
+        offset=offset,
+        after_id=after_id,
+    )
+
+
+def list_my_version(
+    db: Session,
+    owner_user_id: int,
+    *,
+    organization_id: Optional[int] = None,
+    expand: Sequence[str] = (),
+) -> Tuple[int, Optional[datetime]]:
+    """`list_my` kümesinin (sayı, en büyük `updated_at`) çifti; liste ETag'i için.
+    `expand`: genişletilen ilişkilerin sürümleri de dahil edilir."""
+    return rows.owned_version(
+        db, Vehicle, owner_user_id, organization_id=organization_id, expand=expand
+    )
+
+
+def get_visible(
+    db: Session,
+    vehicle_id: int,
+    *,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+    options: Sequence[Any] = (),
+) -> Optional[Vehicle]:
+    """Kayıt yalnızca sahibine ya da org'unun aktif adminine görünür; tek sorgu."""
+    return db.scalars(
+        select(Vehicle)
+        .options(*options)
+        .where(
+            Vehicle.id == vehicle_id,
+            owner_or_org_admin(Vehicle, user_id, admin_org_ids),
+        )
+    ).first()
+
+
+def list_visible(
+    db: Session,
+    user_id: int,
+    *,
+    organization_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+    limit: int | None = None,
+    offset: int | None = None,
+    after_id: int | None = None,
+) -> Sequence[Vehicle]:
+    """Organizasyonun kayıtları: admin hepsini, diğer üyeler yalnızca kendilerininkini görür."""
+    q = select(Vehicle).where(
+        Vehicle.organization_id == organization_id,
+        owner_or_org_admin(Vehicle, user_id, admin_org_ids),
+    )
+    if after_id is not None:
+        q = q.where(Vehicle.id < after_id)
+    q = q.order_by(Vehicle.id.desc())
+    if offset:
+        q = q.offset(offset)
+    if limit:
+        q = q.limit(limit)
+    return db.scalars(q).all()
+
+
 def create(
     db: Session,
     *,
@@ -53,10 +149,20 @@ def create(
     )
     db.add(v)
     db.commit()
-    db.refresh(v)
     return v
 
 
+def create_many(db: Session, rows: Sequence[Dict[str, Any]]) -> List[int]:
+    """Tek işlemde çok satırlı INSERT; id'ler `rows` sırasıyla döner."""
+    if not rows:
+        return []
+    ids = db.scalars(
+        insert(Vehicle).returning(Vehicle.id, sort_by_parameter_order=True), rows
+    ).all()
+    db.commit()
+    return list(ids)
+
+
 def update(
     db: Session,
     v: Vehicle,
@@ -79,10 +185,71 @@ def update(
         v.can_dg = can_dg
     db.add(v)
     db.commit()
-    db.refresh(v)
+    changes.emit(db, "vehicle", [v.id])
     return v
 
 
 def delete(db: Session, v: Vehicle) -> None:
+    vehicle_id = v.id
     db.delete(v)
     db.commit()
+    changes.emit(db, "vehicle", [vehicle_id], deleted=True)
+
+
+def update_authorized(
+    db: Session,
+    vehicle_id: int,
+    *,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+    expected_updated_at: Optional[Collection[datetime]] = None,
+    **fields: Any,
+) -> Optional[Vehicle]:
+    """Yetki koşulunu içeren tek `UPDATE ... RETURNING`; None ise kayıt yok ya da
+    yetki yok (ayrımı çağıran `get` ile yapar). None olan alanlar değişmez.
+
+    `expected_updated_at` verilirse (`If-Match`) kayıt yalnızca `updated_at`
+    bu değerlerden biriyse güncellenir; aynı WHERE koşulunda, yarış yok.
+    """
+    allowed = and_(
+        Vehicle.id == vehicle_id,
+        owner_or_org_admin(Vehicle, user_id, admin_org_ids),
+    )
+    if expected_updated_at is not None:
+        allowed = and_(allowed, Vehicle.updated_at.in_(list(expected_updated_at)))
+    values = {k: v for k, v in fields.items() if v is not None}
+    if not values:
+        return db.scalars(select(Vehicle).where(allowed)).first()
+    v = db.scalars(
+        sa_update(Vehicle).where(allowed).values(**values).returning(Vehicle),
+        # "fetch": oturumda yüklü nesne RETURNING değerleriyle güncellenir
+        # (RETURNING destekleyen veritabanlarında ek SELECT yapılmaz)
+        execution_options={"synchronize_session": "fetch"},
+    ).first()
+    db.commit()
+    if v is not None:
+        changes.emit(db, "vehicle", [vehicle_id])
+    return v
+
+
+def delete_authorized(
+    db: Session,
+    vehicle_id: int,
+    *,
+    user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+) -> bool:
+    """Yetki koşulunu içeren tek `DELETE ... RETURNING`; silindiyse True."""
+    deleted = db.scalars(
+        sa_delete(Vehicle)
+        .where(
+            Vehicle.id == vehicle_id,
+            owner_or_org_admin(Vehicle, user_id, admin_org_ids),
+        )
+        .returning(Vehicle.id),
+        execution_options={"synchronize_session": "fetch"},
+    ).first()
+    db.commit()
+    if deleted is not None:
+        changes.emit(db, "vehicle", [vehicle_id], deleted=True)
+    return deleted is not None
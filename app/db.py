@@ -1,7 +1,113 @@
+from typing import Any, Dict, List, Optional, Union
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 
 from .config import settings
+from .pool_metrics import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    track_pre_ping_failures,
+)
+from .replicas import ReplicaSet, RoutingSession
+from .request_context import track_request_checkouts
+
+
+def _pool_kwargs(url: str, poolclass: type) -> Dict[str, Any]:
+    # SQLite (testler, yerel) kendi havuz sınıfını kullanır; boyut ayarları yok sayılır
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def _make_engine(url: str) -> Engine:
+    eng = create_engine(
+        url, pool_pre_ping=True, **_pool_kwargs(url, InstrumentedQueuePool)
+    )
+    track_pre_ping_failures(eng)
+    track_request_checkouts(eng)
+    return eng
+
+
+def _make_async_engine(url: str) -> AsyncEngine:
+    eng = create_async_engine(
+        url, pool_pre_ping=True, **_pool_kwargs(url, InstrumentedAsyncQueuePool)
+    )
+    track_pre_ping_failures(eng.sync_engine)
+    track_request_checkouts(eng.sync_engine)
+    return eng
+
+
+def _replica_set(
+    engines: List[Engine], probes: Optional[List[Engine]] = None
+) -> ReplicaSet:
+    return ReplicaSet(
+        engines,
+        health_check_seconds=settings.DB_REPLICA_HEALTH_CHECK_SECONDS,
+        read_your_writes_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
+        probes=probes,
+    )
+
+
+# Okuma replikaları (DATABASE_REPLICA_URLS, virgülle ayrılmış); yoksa her şey primary
+_replica_urls = [
+    u.strip() for u in (settings.DATABASE_REPLICA_URLS or "").split(",") if u.strip()
+]
+
+# expire_on_commit=False: commit sonrası nesneler geçerli kalır; sunucu
+# tarafı değerler zaten RETURNING ile geldiğinden yeniden SELECT yapılmaz
+engine = _make_engine(settings.DATABASE_URL)
+replicas: Optional[ReplicaSet] = None
+if _replica_urls:
+    replicas = _replica_set([_make_engine(u) for u in _replica_urls])
+    SessionLocal = sessionmaker(
+        class_=RoutingSession,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        bind=engine,
+        info={"replicas": replicas},
+    )
+else:
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+    )
+
+# Async yığın (DB_ASYNC=true): psycopg3 aynı URL ile async sürücü olarak da çalışır
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+async_engine: Optional[AsyncEngine] = None
+async_replica_engines: List[AsyncEngine] = []
+if settings.DB_ASYNC:
+    async_engine = _make_async_engine(
+        settings.ASYNC_DATABASE_URL or settings.DATABASE_URL
+    )
+    AsyncSessionLocal.configure(bind=async_engine)
+    if _replica_urls:
+        async_replica_engines = [_make_async_engine(u) for u in _replica_urls]
+        # get_bind run_sync içinde çalışır; replikaların senkron yüzü verilir
+        # Sağlık yoklaması arka plan thread'inde çalışır; async motorun senkron
+        # yüzü orada bağlanamaz, yoklama için havuzsuz senkron motorlar kullanılır
+        replicas = _replica_set(
+            [e.sync_engine for e in async_replica_engines],
+            probes=[create_engine(u, poolclass=NullPool) for u in _replica_urls],
+        )
+        AsyncSessionLocal.configure(
+            sync_session_class=RoutingSession, info={"replicas": replicas}
+        )
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Router'lar dağıtıma göre iki oturum tipinden birini alır
+AnySession = Union[Session, AsyncSession]
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
-from typing import Generator
+from typing import AsyncGenerator, Generator, List, Optional, Union
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
+from .auth_cache import Principal, token_cache
 from .config import settings
-from .crud import org_user as org_user_crud
-from .crud import user as user_crud
-from .db import SessionLocal
-from .security import get_subject_from_token
+from .crud.aio import org_user as org_user_crud
+from .crud.aio import user as user_crud
+from .db import AnySession, AsyncSessionLocal, SessionLocal
+from .request_context import current
+from .security import get_payload_from_token
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -21,6 +24,16 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Router'ların kullandığı oturum bağımlılığı; DB_ASYNC ile dağıtım başına seçilir.
+# Senkron modda `get_db`'nin kendisidir (testlerdeki override'lar geçerli kalır).
+db_session = get_async_db if settings.DB_ASYNC else get_db
+
+
 def get_settings():
     return settings
 
@@ -29,36 +42,121 @@ def get_settings():
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-):
+    db: AnySession = Depends(db_session),
+) -> Principal:
+    # Oturum bağlantıyı ilk SQL ifadesinde alır: buradaki 401'ler havuza dokunmaz
+    ctx = current()
+    if ctx is not None and token in ctx.principals:
+        cached: Principal | None = ctx.principals[token]
+    else:
+        # Aynı token daha önce doğrulandıysa imza kontrolü ve DB sorgusu atlanır
+        cached = token_cache.get(token)
+    if cached is not None:
+        db.info["user_id"] = cached.id
+        if ctx is not None:
+            ctx.principals[token] = cached
+        return cached
+
     try:
-        subject = get_subject_from_token(token, expected_type="access")
-        user_id = int(subject)
+        payload = get_payload_from_token(token, expected_type="access")
+        user_id = int(payload["sub"])
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Geçersiz veya süresi dolmuş token",
         )
 
-    u = user_crud.get(db, user_id)
+    u = await user_crud.get(db, user_id)
     if not u:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Kullanıcı bulunamadı"
         )
-    return u
+    principal = Principal.from_user(u, payload)
+    # Rol claim'leri yalnızca `membership_version` okunduğu an için doğrulandı;
+    # başka worker'daki rol değişikliği bu önbelleğe ulaşmaz, kısa tutulur
+    ttl = (
+        settings.AUTH_ROLE_CLAIMS_TTL_SECONDS
+        if principal.org_roles is not None
+        else None
+    )
+    token_cache.set(token, principal, int(payload["exp"]), ttl)
+    if ctx is not None:
+        ctx.principals[token] = principal
+    # Oturumun sahibi: commit edilen yazılar read-your-writes penceresini açar
+    db.info["user_id"] = principal.id
+    return principal
+
+
+async def get_read_db(
+    db: AnySession = Depends(db_session),
+    me: Principal = Depends(get_current_user),
+) -> AnySession:
+    """Salt okunur handler'ların oturumu: istek oturumunun kendisidir, yalnızca
+    SELECT'lerin replikaya gidebileceği işaretlenir. Replika yoksa ya da
+    kullanıcı yakın zamanda yazdıysa her şey primary'de kalır."""
+    allow_replica_reads(db, me.id)
+    return db
+
+
+def allow_replica_reads(db: AnySession, user_id: int) -> None:
+    """Oturumun SELECT'lerinin replikaya gidebileceğini işaretler (bkz.
+    `get_read_db`); kullanıcı yakın zamanda yazdıysa (bu worker'da ya da
+    istemcinin geri gönderdiği `X-Last-Write` / çerezine göre) primary'de bırakır."""
+    replicas = db.info.get("replicas")
+    if replicas is None:
+        return
+    ctx = current()
+    last_write = ctx.last_write if ctx is not None else None
+    if not replicas.recently_wrote(user_id, last_write):
+        db.info["replica_ok"] = True
+
+
+def stream_sessions() -> Union[sessionmaker, async_sessionmaker]:
+    """Akış yanıtlarının (`/loads/export` ...) oturum fabrikası.
+
+    `yield`'li bağımlılıkların kapanışı yanıt gövdesi gönderilmeden çalışır;
+    gövdeyi üreten generator istek oturumunu kullanamaz, kendi oturumunu bu
+    fabrikadan açar ve akış bitince kapatır.
+    """
+    return AsyncSessionLocal if settings.DB_ASYNC else SessionLocal
+
+
+async def is_org_admin(db: AnySession, me: Principal, organization_id: int) -> bool:
+    """Token'daki rol claim'i güncelse onu kullanır, değilse DB'ye sorar.
+
+    DB sonucu istek boyunca saklanır: aynı istekte aynı org için ikinci kontrol
+    (ör. `require_org_admin` + handler) sorgu çalıştırmaz.
+    """
+    if me.org_roles is not None:
+        return me.org_roles.get(organization_id) == "a"
+    ctx = current()
+    key = (organization_id, me.id)
+    if ctx is not None and key in ctx.org_admin:
+        return ctx.org_admin[key]
+    admin = await org_user_crud.is_admin(db, organization_id, me.id)
+    if ctx is not None:
+        ctx.org_admin[key] = admin
+    return admin
+
+
+def admin_org_ids(me: Principal) -> Optional[List[int]]:
+    """Token claim'lerine göre admin olunan org'lar; claim yoksa None (DB'ye sor)."""
+    if me.org_roles is None:
+        return None
+    return [org_id for org_id, role in me.org_roles.items() if role == "a"]
 
 
-def require_org_admin(
+async def require_org_admin(
     org_id: int,
-    db: Session = Depends(get_db),
+    db: AnySession = Depends(db_session),
     me=Depends(get_current_user),
 ):
     """Raise 403 if current user is not admin of given organization.
     Returns True if authorized (value itself is unused by endpoints).
     """
-    if not org_user_crud.is_admin(db, org_id, me.id):
+    if not await is_org_admin(db, me, org_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Yetki yok (organization admin gerekli)",
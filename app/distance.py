@@ -0,0 +1,304 @@
+"""Bölgeler (il / ilçe) arası karayolu mesafe ve süre matrisi.
+
+Bölge anahtarı `Address` ile aynıdır: `(country, admin1, admin2)`; `admin2`
+boşsa ilin kendisi. Matris derleme adımında paketli veri dosyasından
+(`app/data/regions_tr.csv`, bölge başına merkez koordinatı) üretilir:
+mesafe = büyük daire mesafesi × `ROAD_FACTOR`, süre = mesafe / `SPEED_KMH`.
+Bilinen gerçek karayolu mesafeleri `--pairs` dosyasıyla tahminin yerine
+yazılır. Sorgu anında dış servis çağrılmaz.
+
+    python -m app.distance build                        # -> DISTANCE_MATRIX_DIR
+    python -m app.distance build --pairs karayolu.csv   # from,to,km[,minutes]
+    python -m app.distance lookup TR/İstanbul TR/Ankara
+
+Çıktı: `regions.json` (satır sırası ve parametreler), `distance_km.npy` ve
+`duration_min.npy` (float32, n × n). Worker'lar `.npy` dosyalarını
+`mmap_mode="r"` ile açar: sayfalar işletim sisteminin sayfa önbelleğinden
+paylaşılır, worker başına kopya oluşmaz ve açılış matris boyutundan
+bağımsızdır. Dosyalar yerine yazılarak (rename) değiştirilir; açık worker'lar
+yeniden başlatılana kadar eski sürümü görür.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import settings
+
+REGIONS_FILE = Path(__file__).parent / "data" / "regions_tr.csv"
+META_FILE = "regions.json"
+DISTANCE_FILE = "distance_km.npy"
+DURATION_FILE = "duration_min.npy"
+
+EARTH_RADIUS_KM = 6371.0
+# Karayolu / kuş uçuşu oranı (ör. İstanbul–Ankara ~350 km kuş uçuşu, ~450 km yol)
+ROAD_FACTOR = 1.3
+# Yüklü kamyon ortalama hızı (mola hariç)
+SPEED_KMH = 70.0
+
+# (country, admin1, admin2); admin2 None ise il düzeyi
+RegionName = Tuple[str, str, Optional[str]]
+
+_FOLD = str.maketrans("ıİşŞğĞüÜöÖçÇâÂîÎûÛ", "iIsSgGuUoOcCaAiIuU")
+
+
+def normalize(name: str) -> str:
+    """Yazım farklarını (Türkçe karakter, büyük/küçük harf, boşluk) yok sayan anahtar."""
+    return " ".join(name.translate(_FOLD).lower().split())
+
+
+def _key(country: str, admin1: str, admin2: Optional[str]) -> Tuple[str, str, str]:
+    return country.strip().upper(), normalize(admin1), normalize(admin2 or "")
+
+
+def format_region(name: Sequence[Optional[str]]) -> str:
+    return "/".join(part for part in name if part)
+
+
+def parse_region(text: str) -> RegionName:
+    """`ÜLKE/il[/ilçe]` metnini bölge adına çevirir."""
+    parts = [part.strip() for part in text.split("/")]
+    if len(parts) not in (2, 3) or not all(parts):
+        raise ValueError(f"Geçersiz bölge: {text!r} (ÜLKE/il[/ilçe])")
+    return parts[0], parts[1], parts[2] if len(parts) == 3 else None
+
+
+@dataclass(frozen=True)
+class RegionPoint:
+    name: RegionName
+    lat: float
+    lon: float
+
+
+def read_regions(path: Path) -> List[RegionPoint]:
+    """`country,admin1,admin2,lat,lon` başlıklı CSV."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            RegionPoint(
+                (row["country"], row["admin1"], row["admin2"] or None),
+                float(row["lat"]),
+                float(row["lon"]),
+            )
+            for row in csv.DictReader(f)
+        ]
+
+
+def read_pairs(
+    path: Path,
+) -> List[Tuple[RegionName, RegionName, float, Optional[float]]]:
+    """`from,to,km[,minutes]` başlıklı CSV; bölgeler `ÜLKE/il[/ilçe]`."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            (
+                parse_region(row["from"]),
+                parse_region(row["to"]),
+                float(row["km"]),
+                float(row["minutes"]) if row.get("minutes") else None,
+            )
+            for row in csv.DictReader(f)
+        ]
+
+
+def great_circle_km(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Noktalar arası büyük daire mesafeleri (haversine), n × n."""
+    lat, lon = np.radians(lat)[:, None], np.radians(lon)[:, None]
+    a = (
+        np.sin((lat - lat.T) / 2) ** 2
+        + np.cos(lat) * np.cos(lat.T) * np.sin((lon - lon.T) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class DistanceMatrix:
+    """Bölge satırları ve `km` / `minutes` matrisleri (salt okunur)."""
+
+    def __init__(
+        self,
+        regions: Sequence[RegionName],
+        km: np.ndarray,
+        minutes: np.ndarray,
+        *,
+        road_factor: float = ROAD_FACTOR,
+        speed_kmh: float = SPEED_KMH,
+    ) -> None:
+        n = len(regions)
+        if km.shape != (n, n) or minutes.shape != (n, n):
+            raise ValueError("Matris boyutu bölge sayısıyla uyuşmuyor")
+        self.regions = [tuple(r) for r in regions]
+        self.km = km
+        self.minutes = minutes
+        self.road_factor = road_factor
+        self.speed_kmh = speed_kmh
+        self._rows: Dict[Tuple[str, str, str], int] = {}
+        for i, (country, admin1, admin2) in enumerate(self.regions):
+            key = _key(country, admin1, admin2)
+            if key in self._rows:
+                raise ValueError(f"Yinelenen bölge: {format_region(self.regions[i])}")
+            self._rows[key] = i
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    @classmethod
+    def open(cls, directory: Path, *, mmap: bool = True) -> "DistanceMatrix":
+        directory = Path(directory)
+        meta = json.loads((directory / META_FILE).read_text(encoding="utf-8"))
+        mode = "r" if mmap else None
+        return cls(
+            meta["regions"],
+            np.load(directory / DISTANCE_FILE, mmap_mode=mode),
+            np.load(directory / DURATION_FILE, mmap_mode=mode),
+            road_factor=meta["road_factor"],
+            speed_kmh=meta["speed_kmh"],
+        )
+
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "regions": self.regions,
+            "road_factor": self.road_factor,
+            "speed_kmh": self.speed_kmh,
+        }
+        # Önce geçici dosya, sonra rename: açık mmap'ler eski dosyayı görmeye devam eder
+        for name, array in ((DISTANCE_FILE, self.km), (DURATION_FILE, self.minutes)):
+            tmp = directory / f".{name}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, np.ascontiguousarray(array, dtype=np.float32))
+            os.replace(tmp, directory / name)
+        tmp = directory / f".{META_FILE}.tmp"
+        tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, directory / META_FILE)
+
+    def index_of(
+        self, country: str, admin1: Optional[str], admin2: Optional[str] = None
+    ) -> Optional[int]:
+        """Bölgenin satırı; ilçe matriste yoksa ilin satırı, il de yoksa None."""
+        if not country or not admin1:
+            return None
+        if admin2:
+            row = self._rows.get(_key(country, admin1, admin2))
+            if row is not None:
+                return row
+        return self._rows.get(_key(country, admin1, None))
+
+    def rows(self, regions: Iterable[Optional[Sequence[Optional[str]]]]) -> np.ndarray:
+        """Bölgelerin satırları (int32; bilinmeyen ya da None -> -1); toplu
+        aramalar `km[rows_a, rows_b]` ile yapılır."""
+        return np.fromiter(
+            (
+                -1 if r is None or (i := self.index_of(*r)) is None else i
+                for r in regions
+            ),
+            dtype=np.int32,
+        )
+
+    def between(self, a: int, b: int) -> Tuple[float, float]:
+        """İki satır arası (km, dakika)."""
+        return float(self.km[a, b]), float(self.minutes[a, b])
+
+    def name(self, row: int) -> str:
+        return format_region(self.regions[row])
+
+
+def build(
+    points: Sequence[RegionPoint],
+    *,
+    pairs: Iterable[Tuple[RegionName, RegionName, float, Optional[float]]] = (),
+    road_factor: float = ROAD_FACTOR,
+    speed_kmh: float = SPEED_KMH,
+) -> DistanceMatrix:
+    lat = np.array([p.lat for p in points], dtype=np.float64)
+    lon = np.array([p.lon for p in points], dtype=np.float64)
+    km = (great_circle_km(lat, lon) * road_factor).astype(np.float32)
+    minutes = (km * np.float32(60.0 / speed_kmh)).astype(np.float32)
+    matrix = DistanceMatrix(
+        [p.name for p in points],
+        km,
+        minutes,
+        road_factor=road_factor,
+        speed_kmh=speed_kmh,
+    )
+    for a, b, distance, duration in pairs:
+        i, j = matrix.index_of(*a), matrix.index_of(*b)
+        if i is None or j is None:
+            missing = format_region(a if i is None else b)
+            raise ValueError(f"Bilinmeyen bölge: {missing}")
+        if duration is None:
+            duration = distance / speed_kmh * 60.0
+        km[i, j] = km[j, i] = distance
+        minutes[i, j] = minutes[j, i] = duration
+    return matrix
+
+
+@lru_cache(maxsize=1)
+def get_matrix() -> Optional[DistanceMatrix]:
+    """`DISTANCE_MATRIX_DIR`'deki matris (worker başına bir kez, mmap ile açılır);
+    derlenmemişse None. Sonradan derlenen matris worker yeniden başlayınca görünür."""
+    directory = Path(settings.DISTANCE_MATRIX_DIR)
+    if not (directory / META_FILE).is_file():
+        return None
+    return DistanceMatrix.open(directory)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.distance",
+        description="Bölgeler arası mesafe/süre matrisini derler ve sorgular.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="Matrisi veri dosyasından derler")
+    p_build.add_argument("--regions", type=Path, default=REGIONS_FILE)
+    p_build.add_argument(
+        "--pairs", type=Path, default=None, help="Bilinen yol mesafeleri (CSV)"
+    )
+    p_build.add_argument("--out", type=Path, default=None)
+    p_build.add_argument("--road-factor", type=float, default=ROAD_FACTOR)
+    p_build.add_argument("--speed-kmh", type=float, default=SPEED_KMH)
+    p_lookup = sub.add_parser("lookup", help="İki bölge arası mesafe")
+    p_lookup.add_argument("origin", help="ÜLKE/il[/ilçe]")
+    p_lookup.add_argument("destination", help="ÜLKE/il[/ilçe]")
+    p_lookup.add_argument("--dir", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        out = args.out or Path(settings.DISTANCE_MATRIX_DIR)
+        t0 = time.perf_counter()
+        matrix = build(
+            read_regions(args.regions),
+            pairs=read_pairs(args.pairs) if args.pairs else (),
+            road_factor=args.road_factor,
+            speed_kmh=args.speed_kmh,
+        )
+        matrix.save(out)
+        size = matrix.km.nbytes + matrix.minutes.nbytes
+        print(
+            f"{len(matrix)} bölge, {size / 1e6:.1f} MB -> {out} "
+            f"({(time.perf_counter() - t0) * 1e3:.0f}ms)"
+        )
+        return 0
+
+    matrix = DistanceMatrix.open(args.dir or Path(settings.DISTANCE_MATRIX_DIR))
+    a = matrix.index_of(*parse_region(args.origin))
+    b = matrix.index_of(*parse_region(args.destination))
+    if a is None or b is None:
+        print("Bölge matriste yok")
+        return 1
+    km, minutes = matrix.between(a, b)
+    print(f"{matrix.name(a)} -> {matrix.name(b)}: {km:.0f} km, {minutes:.0f} dk")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
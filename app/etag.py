@@ -0,0 +1,160 @@
+"""`updated_at` tabanlı ETag'ler ve koşullu istekler.
+
+Detay yanıtları güçlü (strong) ETag taşır: kaydın `updated_at` sürümü ile
+yanıt biçiminden (`fields`/`expand` ve genişletilen ilişkilerin sürümleri)
+türetilir, gövde serialize edilmeden hesaplanır. `If-None-Match` eşleşirse
+gövdesiz 304 döner.
+
+Liste sayfaları zayıf (weak) ETag taşır: filtreye uyan kayıtların sayısı ve
+en büyük `updated_at` değeri tek bir toplama sorgusuyla okunur; eşleşirse
+sayfa sorgusu hiç çalışmaz. `expand` verilmişse genişletilen ilişkilerin en
+büyük `updated_at` değeri de aynı sorguda okunur; `fields`/`expand` biçimi
+sorgu parametreleriyle ETag'e girer. Sayfa değil tüm küme özetlendiğinden
+zayıftır.
+
+PATCH istekleri `If-Match` ile iyimser eşzamanlılık denetimi yapar: ETag'in
+başındaki sürüm `UPDATE`'in WHERE koşuluna eklenir, kayıt o arada değiştiyse
+412 döner.
+
+    ETag: "18c3f0a2b4e5d6-3f2a9c1e"        (detay: <sürüm>-<biçim özeti>)
+    ETag: W/"5d41402abc4b2a76b9719d91"     (liste sayfası)
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, List, Optional
+
+from fastapi import HTTPException, Response, status
+
+from .sparse import Shape
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+NOT_MODIFIED_RESPONSE = {
+    304: {"description": "Değişmedi (`If-None-Match` güncel ETag ile eşleşti)"}
+}
+PRECONDITION_FAILED_RESPONSE = {
+    412: {
+        "description": "Kayıt değişmiş (`If-Match` güncel ETag ile eşleşmedi)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Kayıt değişmiş, güncel hâlini yeniden alın"}
+            }
+        },
+    }
+}
+
+
+def version(ts: Optional[datetime]) -> int:
+    """`updated_at` değerinin epoch'tan beri mikro saniyesi (tz'siz değerler UTC)."""
+    if ts is None:
+        return 0
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return (ts - _EPOCH) // _MICROSECOND
+
+
+def _digest(*parts: Any) -> str:
+    raw = "\x1f".join(map(str, parts)).encode()
+    return hashlib.blake2b(raw, digest_size=12).hexdigest()
+
+
+def strong_etag(kind: str, id: int, updated_at: Optional[datetime], *parts: Any) -> str:
+    """`"<sürüm>-<özet>"`: sürüm `If-Match` için geri okunur, özet kaydı ve
+    temsili (`parts`) ayırt eder."""
+    return f'"{version(updated_at):x}-{_digest(kind, id, *parts)[:8]}"'
+
+
+def detail_etag(obj: Any, shape: Shape) -> str:
+    """Kaydın `shape` biçimindeki temsilinin güçlü ETag'i.
+
+    Nesnenin (ve genişletilen ilişkilerin) `updated_at` değerleri yüklenmiş
+    olmalıdır; `Shape.options` bunu sağlar.
+    """
+    related = [getattr(obj, name) for name in shape.expand]
+    return strong_etag(
+        shape.resource.model.__tablename__,
+        obj.id,
+        obj.updated_at,
+        ",".join(shape.columns),
+        ",".join(shape.expand),
+        *(version(r.updated_at) if r is not None else "-" for r in related),
+    )
+
+
+def list_etag(
+    kind: str,
+    user_id: int,
+    query: Iterable[tuple[str, str]],
+    count: int,
+    last_updated: Optional[datetime],
+) -> str:
+    """Liste sayfasının zayıf ETag'i: sorgu parametreleri + kayıt sayısı ve en
+    büyük `updated_at` (ekleme, silme ve güncellemelerin hepsi birini değiştirir)."""
+    return 'W/"{}"'.format(
+        _digest(kind, user_id, sorted(query), count, version(last_updated))
+    )
+
+
+def _tags(header: str) -> List[str]:
+    return [t.strip() for t in header.split(",") if t.strip()]
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """`If-None-Match` karşılaştırması (RFC 9110: zayıf karşılaştırma)."""
+    if not if_none_match:
+        return False
+    tags = _tags(if_none_match)
+    return "*" in tags or _opaque(etag) in {_opaque(t) for t in tags}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def detail_response(obj: Any, shape: Shape, if_none_match: Optional[str]) -> Response:
+    """Detay yanıtı: ETag eşleşiyorsa gövde hiç kodlanmadan 304."""
+    etag = detail_etag(obj, shape)
+    if matches(if_none_match, etag):
+        return not_modified(etag)
+    return Response(
+        shape.dump_one(obj), media_type="application/json", headers={"ETag": etag}
+    )
+
+
+def precondition_failed() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Kayıt değişmiş, güncel hâlini yeniden alın",
+    )
+
+
+def if_match_versions(if_match: Optional[str]) -> Optional[List[datetime]]:
+    """`If-Match` başlığındaki detay ETag'lerinin `updated_at` değerleri.
+
+    Başlık yoksa ya da `*` ise None (koşul yok). Güçlü karşılaştırma yapılır:
+    zayıf ya da bu API'ye ait olmayan ETag'ler hiçbir sürümle eşleşmez (boş
+    liste: güncelleme 412 ile reddedilir).
+    """
+    if not if_match:
+        return None
+    tags = _tags(if_match)
+    if "*" in tags:
+        return None
+    found = []
+    for tag in tags:
+        if tag.startswith("W/") or len(tag) < 2 or tag[0] != '"' or tag[-1] != '"':
+            continue
+        head, _, _ = tag[1:-1].partition("-")
+        try:
+            found.append(_EPOCH + int(head, 16) * _MICROSECOND)
+        except (ValueError, OverflowError):
+            continue
+    return found
@@ -0,0 +1,129 @@
+"""Sahip olunan kayıtların NDJSON/CSV olarak akış halinde dışa aktarılması.
+
+Sorgu (`app.crud.rows.owned_select`) sunucu tarafı cursor ile (`yield_per` → psycopg'de isimli cursor)
+`EXPORT_BATCH_SIZE`'lık partiler halinde okunur; her parti kodlanıp hemen
+gönderilir. ORM nesnesi ve pydantic modeli üretilmez, bellekte en fazla bir
+parti bulunur; yanıt boyutundan bağımsızdır. CSV çıktısı
+`POST /loads/import` ile geri okunabilir.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date
+from enum import Enum
+from typing import Any, AsyncIterator, Iterator, Literal, Sequence, Union
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from .config import settings
+from .deps import allow_replica_reads
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+EXPORT_RESPONSES = {
+    200: {
+        "description": "Kayıtlar (id azalan); CSV'nin ilk satırı başlıktır",
+        "content": {
+            "application/x-ndjson": {"schema": {"type": "string"}},
+            "text/csv": {"schema": {"type": "string"}},
+        },
+    }
+}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _csv_cell(value: Any) -> Any:
+    value = _plain(value)
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _csv_header(columns: Sequence[str]) -> bytes:
+    return (",".join(columns) + "\n").encode()
+
+
+def _encode(fmt: ExportFormat, columns: Sequence[str], rows: Sequence[Any]) -> bytes:
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode()
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerows(
+        [_csv_cell(v) for v in row] for row in rows
+    )
+    return buf.getvalue().encode()
+
+
+def iter_export(
+    sessions: sessionmaker,
+    stmt: Select,
+    columns: Sequence[str],
+    fmt: ExportFormat,
+    user_id: int,
+) -> Iterator[bytes]:
+    if fmt == "csv":
+        yield _csv_header(columns)
+    with sessions() as db:
+        allow_replica_reads(db, user_id)
+        result = db.execute(
+            stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        for rows in result.partitions():
+            yield _encode(fmt, columns, rows)
+
+
+async def aiter_export(
+    sessions: async_sessionmaker,
+    stmt: Select,
+    columns: Sequence[str],
+    fmt: ExportFormat,
+    user_id: int,
+) -> AsyncIterator[bytes]:
+    if fmt == "csv":
+        yield _csv_header(columns)
+    async with sessions() as db:
+        allow_replica_reads(db, user_id)
+        result = await db.stream(
+            stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield _encode(fmt, columns, rows)
+
+
+def export_response(
+    sessions: Union[sessionmaker, async_sessionmaker],
+    stmt: Select,
+    columns: Sequence[str],
+    fmt: ExportFormat,
+    user_id: int,
+    filename: str,
+) -> StreamingResponse:
+    body = (
+        aiter_export(sessions, stmt, columns, fmt, user_id)
+        if isinstance(sessions, async_sessionmaker)
+        else iter_export(sessions, stmt, columns, fmt, user_id)
+    )
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
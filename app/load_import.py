@@ -0,0 +1,252 @@
+"""CSV/NDJSON dosyalarından toplu yük içe aktarma (`POST /loads/import` ve CLI).
+
+Dosya satır satır okunur; satırlar `IMPORT_CHUNK_SIZE`'lık parçalar halinde
+`LoadBase` ile doğrulanır, adres ve org yetkisi kontrolleri parça başına tek
+sorguyla yapılır ve geçerli satırlar PostgreSQL `COPY` ile yazılır. Bellekte
+en fazla bir parça tutulur; tüm içe aktarma tek işlemdir (sonda commit).
+
+CLI (org yetkisi kontrol edilmez; operatör aracıdır)::
+
+    python -m app.load_import yukler.csv --owner-user-id 42
+    python -m app.load_import - --format ndjson --owner-user-id 42 < yukler.ndjson
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import sys
+from typing import IO, Any, Collection, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app import changes
+from app.bulk import validation_error_text
+from app.config import settings
+from app.crud import address as address_crud
+from app.crud import load as load_crud
+from app.crud import org_user as org_user_crud
+from app.db import SessionLocal
+from app.schemas.bulk import ImportResponse, ImportRowError
+from app.schemas.load import LoadBase
+
+FORMATS = ("csv", "ndjson")
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+}
+
+# Yanıtta raporlanan en fazla hata (toplam `failed` içinde sayılır)
+MAX_REPORTED_ERRORS = 100
+# Adres önbelleği bu boyutu aşınca boşaltılır (çok büyük dosyalarda bellek sınırı)
+_ADDRESS_CACHE_MAX = 100_000
+
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def iter_records(stream: IO[bytes], fmt: str) -> Iterator[Record]:
+    """(satır no, kayıt, hata) üçlüleri üretir; dosyayı bütünüyle okumaz."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                # Boş hücreler alan verilmemiş sayılır (opsiyonel alanlar None olur)
+                yield reader.line_num, {
+                    k: v for k, v in row.items() if k is not None and v != ""
+                }, None
+        else:
+            for line_no, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    obj = json.loads(line)
+                except ValueError:
+                    yield line_no, None, "Geçersiz JSON"
+                    continue
+                if isinstance(obj, dict):
+                    yield line_no, obj, None
+                else:
+                    yield line_no, None, "Satır bir JSON nesnesi olmalı"
+    finally:
+        # Alttaki akış çağırana aittir; wrapper kapanırken onu kapatmasın
+        text.detach()
+
+
+class _Importer:
+    def __init__(
+        self,
+        db: Session,
+        owner_user_id: int,
+        admin_org_ids: Optional[Collection[int]],
+        authorize_orgs: bool,
+    ) -> None:
+        self.db = db
+        self.owner_user_id = owner_user_id
+        self.authorize_orgs = authorize_orgs
+        # Claim'ler varsa yetki bilinir; yoksa org'lar ilk görüldüğünde sorulur
+        self.claims = set(admin_org_ids) if admin_org_ids is not None else None
+        self.allowed_orgs: Set[int] = set()
+        self.denied_orgs: Set[int] = set()
+        self.addresses: Set[int] = set()
+        self.missing_addresses: Set[int] = set()
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[ImportRowError] = []
+
+    def fail(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(line=line, error=error))
+
+    def _resolve_orgs(self, org_ids: Set[int]) -> None:
+        unknown = org_ids - self.allowed_orgs - self.denied_orgs
+        if not unknown:
+            return
+        if self.claims is not None:
+            ok = unknown & self.claims
+        else:
+            ok = org_user_crud.admin_orgs_among(self.db, self.owner_user_id, unknown)
+        self.allowed_orgs |= ok
+        self.denied_orgs |= unknown - ok
+
+    def _resolve_addresses(self, address_ids: Set[int]) -> None:
+        unknown = address_ids - self.addresses - self.missing_addresses
+        if not unknown:
+            return
+        if len(self.addresses) + len(self.missing_addresses) > _ADDRESS_CACHE_MAX:
+            self.addresses.clear()
+            self.missing_addresses.clear()
+        found = address_crud.existing_ids(self.db, unknown)
+        self.addresses |= found
+        self.missing_addresses |= unknown - found
+
+    def flush(self, chunk: List[Tuple[int, LoadBase]]) -> None:
+        if not chunk:
+            return
+        if self.authorize_orgs:
+            self._resolve_orgs(
+                {
+                    it.organization_id
+                    for _, it in chunk
+                    if it.organization_id is not None
+                }
+            )
+        self._resolve_addresses(
+            {
+                a
+                for _, it in chunk
+                for a in (it.pickup_address_id, it.dropoff_address_id)
+            }
+        )
+        rows = []
+        for line, it in chunk:
+            if self.authorize_orgs and it.organization_id in self.denied_orgs:
+                self.fail(line, "Yetki yok (organization admin gerekli)")
+            elif (
+                it.pickup_address_id in self.missing_addresses
+                or it.dropoff_address_id in self.missing_addresses
+            ):
+                self.fail(line, "Adres bulunamadı")
+            else:
+                rows.append(
+                    {
+                        "owner_user_id": self.owner_user_id,
+                        "name_validated": False,
+                        **it.model_dump(),
+                    }
+                )
+        load_crud.copy_in(self.db, rows)
+        self.imported += len(rows)
+
+
+def import_loads(
+    db: Session,
+    stream: IO[bytes],
+    fmt: str,
+    *,
+    owner_user_id: int,
+    admin_org_ids: Optional[Collection[int]] = None,
+    authorize_orgs: bool = True,
+    chunk_size: Optional[int] = None,
+) -> ImportResponse:
+    """`stream`'deki yükleri `owner_user_id` adına içe aktarır ve commit eder.
+
+    `authorize_orgs` açıkken `organization_id` taşıyan satırlar yalnızca
+    kullanıcının admin olduğu org'lar için kabul edilir (`admin_org_ids` token
+    claim'leridir; None ise DB'ye sorulur).
+    """
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    imp = _Importer(db, owner_user_id, admin_org_ids, authorize_orgs)
+    chunk: List[Tuple[int, LoadBase]] = []
+    try:
+        for line, record, error in iter_records(stream, fmt):
+            imp.rows += 1
+            if record is None:
+                imp.fail(line, error or "Geçersiz satır")
+                continue
+            try:
+                chunk.append((line, LoadBase.model_validate(record)))
+            except ValidationError as exc:
+                imp.fail(line, validation_error_text(exc))
+                continue
+            if len(chunk) >= chunk_size:
+                imp.flush(chunk)
+                chunk = []
+        imp.flush(chunk)
+        db.commit()
+    except UnicodeDecodeError:
+        db.rollback()
+        raise ValueError("Dosya UTF-8 değil")
+    except BaseException:
+        db.rollback()
+        raise
+    if imp.imported:
+        changes.emit(db, "load")
+    return ImportResponse(
+        rows=imp.rows, imported=imp.imported, failed=imp.failed, errors=imp.errors
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.load_import",
+        description="CSV/NDJSON dosyasından yükleri COPY ile içe aktarır.",
+    )
+    parser.add_argument("path", help="Dosya yolu; '-' stdin")
+    parser.add_argument("--owner-user-id", type=int, required=True)
+    parser.add_argument(
+        "--format", choices=FORMATS, help="Varsayılan: dosya uzantısından"
+    )
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        fmt = "ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv"
+
+    stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    try:
+        with SessionLocal() as db:
+            result = import_loads(
+                db,
+                stream,
+                fmt,
+                owner_user_id=args.owner_user_id,
+                authorize_orgs=False,
+                chunk_size=args.chunk_size,
+            )
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+    print(result.model_dump_json(indent=2))
+    return 0 if result.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
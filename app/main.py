@@ -1,15 +1,53 @@
-from fastapi import FastAPI
-from fastapi.openapi.docs import get_swagger_ui_html
-from fastapi.openapi.utils import get_openapi
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.staticfiles import StaticFiles
 
+from . import openapi
 from .api.auth import router as auth_router
+from .api.distance import router as distance_router
 from .api.loads import router as loads_router
+from .api.metrics import router as metrics_router
+from .api.offers import router as offers_router
 from .api.organizations import router as orgs_router
 from .api.vehicles import router as vehicles_router
 from .config import settings
+from .db import async_engine, async_replica_engines
+
+# Tüm modelleri kaydet: ilişkiler ("Address" vb.) mapper'lar kurulurken çözülebilsin
+from .models import address as _address  # noqa: F401
+from .models import load as _load  # noqa: F401
+from .models import match as _match  # noqa: F401
+from .models import match_suggestion as _match_suggestion  # noqa: F401
+from .models import membership as _membership  # noqa: F401
+from .models import offer as _offer  # noqa: F401
+from .models import org_user as _org_user  # noqa: F401
+from .models import organization as _organization  # noqa: F401
+from .models import rating as _rating  # noqa: F401
+from .models import revoked_token as _revoked_token  # noqa: F401
+from .models import user as _user  # noqa: F401
+from .models import vehicle as _vehicle  # noqa: F401
+from .passwords import password_service
+from .replicas import ReadYourWritesMiddleware
+from .request_context import RequestContextMiddleware
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    password_service.shutdown()
+    for eng in [async_engine, *async_replica_engines]:
+        if eng is not None:
+            await eng.dispose()
+
 
 app = FastAPI(
+    lifespan=lifespan,
+    # /openapi.json, /docs ve /redoc aşağıda tanımlanır (bkz. app.openapi)
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
     title="F4ST API",
     version="0.1.0",
     description=(
@@ -49,6 +87,14 @@ app = FastAPI(
             "name": "loads",
             "description": "Yük CRUD uç noktaları",
         },
+        {
+            "name": "offers",
+            "description": "Araç teklifleri CRUD, yük eşleştirme önerileri ve güzergah üzerindeki yükler",
+        },
+        {
+            "name": "distance",
+            "description": "Bölgeler arası karayolu mesafesi ve süre",
+        },
     ],
 )
 
@@ -56,42 +102,20 @@ app = FastAPI(
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
-    openapi_schema = get_openapi(
-        title=app.title,
-        version=app.version,
-        description=app.description,
-        routes=app.routes,
-    )
-    # Inject servers list dynamically from settings and ENV
-    servers = []
-    # always include local
-    if settings.LOCAL_API_URL:
-        servers.append({"url": settings.LOCAL_API_URL, "description": "Local"})
-    # include staging
-    if settings.STAGING_API_URL:
-        servers.append({"url": settings.STAGING_API_URL, "description": "Staging"})
-    # include prod
-    if settings.PROD_API_URL:
-        servers.append({"url": settings.PROD_API_URL, "description": "Production"})
-
-    # Re-order to put current ENV first
-    env_priority = {
-        "local": settings.LOCAL_API_URL,
-        "staging": settings.STAGING_API_URL,
-        "prod": settings.PROD_API_URL,
-        "production": settings.PROD_API_URL,
-    }
-    preferred = env_priority.get(str(settings.ENV).lower())
-    if preferred:
-        servers = sorted(servers, key=lambda s: 0 if s["url"] == preferred else 1)
-
-    openapi_schema["servers"] = servers
-    app.openapi_schema = openapi_schema
+    app.openapi_schema = openapi.build(app)
     return app.openapi_schema
 
 
 app.openapi = custom_openapi  # type: ignore[assignment]
 
+# Read-your-writes penceresi istemciyle taşınır; bağlamın içinde çalışır
+# (sonra eklenen middleware dışta kalır)
+app.add_middleware(
+    ReadYourWritesMiddleware, window_seconds=settings.DB_READ_YOUR_WRITES_SECONDS
+)
+# İstek kapsamlı yetki önbelleği ve istek başına bağlantı sayacı
+app.add_middleware(RequestContextMiddleware)
+
 
 @app.get(
     "/health",
@@ -113,12 +137,21 @@ app.include_router(auth_router)
 app.include_router(orgs_router)
 app.include_router(vehicles_router)
 app.include_router(loads_router)
+app.include_router(offers_router)
+app.include_router(distance_router)
+app.include_router(metrics_router)
 
 
 # Static assets (for Swagger UI branding)
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 
+@app.get("/openapi.json", include_in_schema=False)
+def openapi_json(request: Request):
+    # Önceden derlenmiş (OPENAPI_FILE) ya da bir kez üretilip sıkıştırılmış belge
+    return openapi.response(request, openapi.load(app))
+
+
 @app.get("/docs", include_in_schema=False)
 def custom_swagger_ui():
     return get_swagger_ui_html(
@@ -127,3 +160,8 @@ def custom_swagger_ui():
         swagger_favicon_url="/static/logo.svg",
         swagger_css_url="/static/swagger.css",
     )
+
+
+@app.get("/redoc", include_in_schema=False)
+def redoc():
+    return get_redoc_html(openapi_url="/openapi.json", title=f"{app.title} — ReDoc")
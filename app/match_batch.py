@@ -0,0 +1,398 @@
+"""Tüm açık yükler × açık teklifler için toplu yeniden skorlama (NumPy).
+
+Tekil öneriler (`app.matching`) bellek içi indeksten anlık gelir; bu modül
+periyodik tam hesaplamadır: süresi geçen teklifler düşer, sıralama tazelenir
+ve her yükün en iyi `MATCH_TOP_K` teklifi `matchsuggestion` tablosuna yazılır.
+
+Açık kayıtlar `LoadEntry` / `OfferEntry` özellikleriyle (aynı kurallar) NumPy
+dizilerine alınır: bölge kodu, gün, GIDA/TEHLIKELI bayrakları, birim ailesi
+ve aile taban birimine çevrilmiş miktar/kapasite. Yükler `(bölge, gün)`
+sırasıyla `MATCH_BATCH_LOAD_BLOCK`'luk bloklara bölünür; her blok yalnızca
+aynı bölgenin gün penceresindeki tekliflerle, `MATCH_BATCH_OFFER_BLOCK`
+sütunluk parçalar halinde skorlanır. Diğer bloklar (farklı il ya da pencere
+dışı gün) tanım gereği uyumsuzdur ve hesaplanmaz; tüm matris hiçbir zaman
+bellekte oluşmaz. Parçalar arasında yük başına en iyi K tutulur.
+
+Skor ve teklif id'si tek bir int64 anahtarda birleşir (kuruş cinsinden skor
+üst 32 bit, ters çevrilmiş id alt 32 bit): `argpartition` ile seçilen en iyi
+K, `CandidateIndex` ile aynı sıradadır (eşit skorda küçük id önce).
+
+Yazma tek işlemdir: eski öneriler silinir, bloklar `COPY` ile eklenir, sonda
+commit edilir; okuyucular işlem bitene kadar eski önerileri görür. İşlem
+anlık görüntüden önce öneri yazarlarının advisory lock'unu alır
+(`match_suggestion.lock_writers`): artımlı yazmalar (`app.matching`) bitişi
+bekler, toplu iş de onların commit ettiği satırlarla çakışmaz.
+
+    python -m app.match_batch [--top-k 10] [--quiet]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .crud import match_suggestion as suggestion_crud
+from .crud import matching as matching_crud
+from .db import SessionLocal
+from .matching import (
+    DATE_WEIGHT,
+    DESTINATION_WEIGHT,
+    FILL_WEIGHT,
+    MASS,
+    VOLUME,
+    LoadEntry,
+    OfferEntry,
+    Region,
+)
+
+_FAMILIES = {None: 0, MASS: 1, VOLUME: 2}
+_ID_MASK = np.int64(0xFFFFFFFF)
+
+
+class RegionCodes:
+    """`(country, admin1)` -> int32 kod; bilinmeyen bölge -1."""
+
+    def __init__(self) -> None:
+        self.codes: Dict[Region, int] = {}
+        self.names: List[Region] = []
+
+    def __call__(self, region: Optional[Region]) -> int:
+        if region is None:
+            return -1
+        code = self.codes.get(region)
+        if code is None:
+            code = self.codes[region] = len(self.names)
+            self.names.append(region)
+        return code
+
+
+@dataclass(frozen=True)
+class LoadArrays:
+    id: np.ndarray  # int64
+    region: np.ndarray  # int32
+    destination: np.ndarray  # int32
+    day: np.ndarray  # int32 (gün sırası)
+    food: np.ndarray  # bool
+    dg: np.ndarray  # bool
+    family: np.ndarray  # int8
+    amount: np.ndarray  # float64, NaN = bilinmiyor
+
+    @classmethod
+    def of(cls, entries: Iterable[LoadEntry], regions: RegionCodes) -> "LoadArrays":
+        items = list(entries)
+        return cls(
+            id=np.array([e.id for e in items], dtype=np.int64),
+            region=np.array([regions(e.origin) for e in items], dtype=np.int32),
+            destination=np.array(
+                [regions(e.destination) for e in items], dtype=np.int32
+            ),
+            day=np.array([e.day for e in items], dtype=np.int32),
+            food=np.array([e.need[0] for e in items], dtype=bool),
+            dg=np.array([e.need[1] for e in items], dtype=bool),
+            family=np.array([_FAMILIES[e.need[2]] for e in items], dtype=np.int8),
+            amount=np.array(
+                [np.nan if e.amount is None else e.amount for e in items],
+                dtype=np.float64,
+            ),
+        )
+
+    def take(self, idx: np.ndarray) -> "LoadArrays":
+        return type(self)(*(getattr(self, f.name)[idx] for f in fields(self)))
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+
+@dataclass(frozen=True)
+class OfferArrays:
+    id: np.ndarray
+    region: np.ndarray
+    destination: np.ndarray
+    day: np.ndarray
+    food: np.ndarray
+    dg: np.ndarray
+    family: np.ndarray
+    capacity: np.ndarray  # float64, NaN = sınırsız/bilinmiyor
+
+    @classmethod
+    def of(cls, entries: Iterable[OfferEntry], regions: RegionCodes) -> "OfferArrays":
+        items = list(entries)
+        return cls(
+            id=np.array([e.id for e in items], dtype=np.int64),
+            region=np.array([regions(e.origin) for e in items], dtype=np.int32),
+            destination=np.array(
+                [regions(e.destination) for e in items], dtype=np.int32
+            ),
+            day=np.array([e.day for e in items], dtype=np.int32),
+            food=np.array([e.cap[0] for e in items], dtype=bool),
+            dg=np.array([e.cap[1] for e in items], dtype=bool),
+            family=np.array([_FAMILIES[e.cap[2]] for e in items], dtype=np.int8),
+            capacity=np.array(
+                [np.nan if e.capacity is None else e.capacity for e in items],
+                dtype=np.float64,
+            ),
+        )
+
+    def take(self, idx: np.ndarray) -> "OfferArrays":
+        return type(self)(*(getattr(self, f.name)[idx] for f in fields(self)))
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+
+def _sorted(arrays):  # type: ignore[no-untyped-def]
+    # Bölgesi bilinmeyen kayıtlar hiçbir adayla eşleşmez
+    known = np.flatnonzero(arrays.region >= 0)
+    order = known[np.lexsort((arrays.day[known], arrays.region[known]))]
+    return arrays.take(order)
+
+
+def _key(region: np.ndarray, day: np.ndarray) -> np.ndarray:
+    return (region.astype(np.int64) << 32) | day.astype(np.int64)
+
+
+def block_keys(loads: LoadArrays, offers: OfferArrays, window: int) -> np.ndarray:
+    """(yük × teklif) skor anahtarları; uyumsuz çiftler -1.
+
+    `app.matching.compatible` + `score` ile aynı kurallar; iki taraf da aynı
+    bölgeden gelmelidir (bloklar bölge içinde kurulur).
+    """
+    gap = np.abs(offers.day[None, :] - loads.day[:, None])
+    ok = gap <= window
+    ok &= ~loads.food[:, None] | offers.food[None, :]
+    ok &= ~loads.dg[:, None] | offers.dg[None, :]
+    lf, of = loads.family[:, None], offers.family[None, :]
+    ok &= (lf == 0) | (of == 0) | (lf == of)
+    amount, capacity = loads.amount[:, None], offers.capacity[None, :]
+    # NaN karşılaştırmaları False: miktarı ya da kapasitesi bilinmeyen sığar
+    ok &= ~(amount > capacity)
+
+    value = DATE_WEIGHT * (1 - gap / (window + 1))
+    dest = loads.destination[:, None]
+    value += np.where(
+        (dest >= 0) & (dest == offers.destination[None, :]), DESTINATION_WEIGHT, 0.0
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fill = np.where((amount > 0) & (capacity > 0), amount / capacity, 0.0)
+    value += FILL_WEIGHT * fill
+    cents = np.rint(value * 100).astype(np.int64)
+    keys = (cents << 32) | (_ID_MASK - offers.id)[None, :]
+    return np.where(ok, keys, -1)
+
+
+def _merge_top(best: np.ndarray, keys: np.ndarray, k: int) -> np.ndarray:
+    both = np.concatenate([best, keys], axis=1)
+    if both.shape[1] <= k:
+        return both
+    idx = np.argpartition(both, -k, axis=1)[:, -k:]
+    return np.take_along_axis(both, idx, axis=1)
+
+
+@dataclass
+class Block:
+    """Bir yük bloğunun sonucu; `offer_ids`/`scores` satır başına en iyi K (-1 = yok)."""
+
+    region: Region
+    load_ids: np.ndarray
+    offer_ids: np.ndarray
+    scores: np.ndarray
+    # Skorlanan teklif sütunu ve (yük × teklif) çift sayısı
+    offers: int
+    pairs: int
+    score_ms: float
+    write_ms: float = 0.0
+
+    def rows(self) -> List[Dict[str, object]]:
+        out = []
+        for load_id, offer_ids, scores in zip(
+            self.load_ids.tolist(), self.offer_ids.tolist(), self.scores.tolist()
+        ):
+            for rank, (offer_id, s) in enumerate(zip(offer_ids, scores), start=1):
+                if offer_id < 0:
+                    break
+                out.append(
+                    {"load_id": load_id, "offer_id": offer_id, "rank": rank, "score": s}
+                )
+        return out
+
+
+def top_k_blocks(
+    loads: LoadArrays,
+    offers: OfferArrays,
+    regions: RegionCodes,
+    *,
+    k: int,
+    window: int,
+    load_block: int,
+    offer_block: int,
+) -> Iterator[Block]:
+    """Yükleri `(bölge, gün)` bloklarında skorlar; her blok için en iyi K."""
+    loads, offers = _sorted(loads), _sorted(offers)
+    offer_keys = _key(offers.region, offers.day)
+    bounds = np.flatnonzero(np.diff(loads.region)) + 1
+    for seg_lo, seg_hi in zip(
+        np.r_[0, bounds].tolist(), np.r_[bounds, len(loads)].tolist()
+    ):
+        region = int(loads.region[seg_lo])
+        for lo in range(seg_lo, seg_hi, load_block):
+            t0 = time.perf_counter()
+            hi = min(lo + load_block, seg_hi)
+            block = loads.take(np.arange(lo, hi))
+            # Teklifler (bölge, gün) sıralı: blok penceresi tek bir dilimdir
+            o_lo = int(
+                np.searchsorted(
+                    offer_keys, (region << 32) | (int(block.day[0]) - window)
+                )
+            )
+            o_hi = int(
+                np.searchsorted(
+                    offer_keys,
+                    (region << 32) | (int(block.day[-1]) + window),
+                    side="right",
+                )
+            )
+            best = np.empty((hi - lo, 0), dtype=np.int64)
+            for c_lo in range(o_lo, o_hi, offer_block):
+                c_hi = min(c_lo + offer_block, o_hi)
+                chunk = offers.take(np.arange(c_lo, c_hi))
+                best = _merge_top(best, block_keys(block, chunk, window), k)
+            best = -np.sort(-best, axis=1)
+            valid = best >= 0
+            yield Block(
+                region=regions.names[region],
+                load_ids=block.id,
+                offer_ids=np.where(valid, _ID_MASK - (best & _ID_MASK), -1),
+                scores=np.where(valid, (best >> 32) / 100, 0.0),
+                offers=int(o_hi - o_lo),
+                pairs=int((hi - lo) * (o_hi - o_lo)),
+                score_ms=(time.perf_counter() - t0) * 1e3,
+            )
+
+
+@dataclass
+class BatchResult:
+    loads: int
+    offers: int
+    suggestions: int = 0
+    snapshot_ms: float = 0.0
+    score_ms: float = 0.0
+    write_ms: float = 0.0
+    total_ms: float = 0.0
+    blocks: List[Block] = field(default_factory=list)
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def rescore_all(
+    db: Session,
+    *,
+    k: Optional[int] = None,
+    window: Optional[int] = None,
+    load_block: Optional[int] = None,
+    offer_block: Optional[int] = None,
+    write: bool = True,
+    on_block: Optional[Callable[[Block], None]] = None,
+) -> BatchResult:
+    """Açık yüklerin en iyi K teklifini hesaplar ve `matchsuggestion`'a yazar."""
+    k = k or settings.MATCH_TOP_K
+    window = settings.MATCH_DAY_WINDOW if window is None else window
+    started = time.perf_counter()
+    today = _today()
+    if write:
+        # Anlık görüntüden önce: arada commit edilen artımlı yazmalar eski
+        # görüntüyle ezilmez, işlem boyunca da öneri tablosuna yazılmaz
+        suggestion_crud.lock_writers(db)
+    regions = RegionCodes()
+    loads = LoadArrays.of(
+        map(LoadEntry.from_row, matching_crud.open_load_rows(db, today)), regions
+    )
+    offers = OfferArrays.of(
+        map(OfferEntry.from_row, matching_crud.open_offer_rows(db, today)), regions
+    )
+    result = BatchResult(loads=len(loads), offers=len(offers))
+    result.snapshot_ms = (time.perf_counter() - started) * 1e3
+    try:
+        if write:
+            suggestion_crud.clear(db)
+        for block in top_k_blocks(
+            loads,
+            offers,
+            regions,
+            k=k,
+            window=window,
+            load_block=load_block or settings.MATCH_BATCH_LOAD_BLOCK,
+            offer_block=offer_block or settings.MATCH_BATCH_OFFER_BLOCK,
+        ):
+            rows = block.rows()
+            if write:
+                t0 = time.perf_counter()
+                suggestion_crud.copy_in(db, rows)
+                block.write_ms = (time.perf_counter() - t0) * 1e3
+            result.suggestions += len(rows)
+            result.score_ms += block.score_ms
+            result.write_ms += block.write_ms
+            result.blocks.append(block)
+            if on_block is not None:
+                on_block(block)
+        if write:
+            t0 = time.perf_counter()
+            db.commit()
+            result.write_ms += (time.perf_counter() - t0) * 1e3
+    except BaseException:
+        db.rollback()
+        raise
+    result.total_ms = (time.perf_counter() - started) * 1e3
+    return result
+
+
+def format_block(block: Block) -> str:
+    country, admin1 = block.region
+    return (
+        f"{country}/{admin1:<16} yük={len(block.load_ids):<6} "
+        f"teklif={block.offers:<6} çift={block.pairs:<10} "
+        f"skor={block.score_ms:8.1f}ms yazma={block.write_ms:8.1f}ms"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.match_batch",
+        description="Açık yükler için en iyi K teklifi hesaplar ve yazar.",
+    )
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--load-block", type=int, default=None)
+    parser.add_argument("--offer-block", type=int, default=None)
+    parser.add_argument(
+        "--quiet", action="store_true", help="Blok başına süreleri yazdırma"
+    )
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        result = rescore_all(
+            db,
+            k=args.top_k,
+            load_block=args.load_block,
+            offer_block=args.offer_block,
+            on_block=None if args.quiet else lambda b: print(format_block(b)),
+        )
+    print(
+        f"{result.loads} yük × {result.offers} teklif, {len(result.blocks)} blok, "
+        f"{result.suggestions} öneri | anlık görüntü {result.snapshot_ms:.0f}ms, "
+        f"skor {result.score_ms:.0f}ms, yazma {result.write_ms:.0f}ms, "
+        f"toplam {result.total_ms:.0f}ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,758 @@
+"""Yük–teklif eşleştirme: bellek içi aday indeksi.
+
+Açık yükler ve teklifler worker başına bir indekste kovalara ayrılır. Kova
+anahtarı `(bölge, gün, yetenek)`:
+
+- bölge: alım/çıkış adresinin `(country, admin1)` ikilisi (il),
+- gün: yükün `pickup_day`'i ya da teklifin `depart_date`'i,
+- yetenek: yük için gereksinim (GIDA -> `can_food`, TEHLIKELI -> `can_dg`,
+  miktar birimi ailesi), teklif için aracın `can_food`/`can_dg` bayrakları ve
+  kapasite birimi ailesi (KG/TON kütle, LITRE hacim).
+
+Bir yükün adayları, aynı bölgede `MATCH_DAY_WINDOW` gün içindeki ve yükün
+gereksinimini karşılayan yetenek kovalarındaki tekliflerdir (en fazla
+`(2 * pencere + 1) * 12` sözlük araması); kapasite yetmeyenler elenir, kalanlar
+`score` ile sıralanır. Tarama yalnızca o kovalardaki kayıtlar kadardır, toplam
+kayıt sayısından bağımsızdır.
+
+İndeks `MATCH_INDEX_REBUILD_SECONDS` aralıkla (ve gün dönünce) DB'den yeniden
+kurulur; sorgulanan yük/teklifin kendisi her istekte DB'den okunur.
+
+Bu worker'daki yazmalar (`app.changes` olayları) ayrıca anında uygulanır:
+yalnızca değişen kayıtlar DB'den yeniden okunup kovalarına taşınır ve
+etkilenen yüklerin en iyi `MATCH_TOP_K` öneri satırları (`matchsuggestion`)
+yeniden yazılır. Yazma başına en fazla `MATCH_REFRESH_MAX_LOADS` yükün listesi
+yazılır. Toplu yeniden skorlama öneri yazarı kilidini tutuyorsa istek
+beklemez. İki durumda da kalan yükler ertelenir ve bu worker'daki sonraki
+yazmada yeniden denenir; arada toplu yeniden skorlama hepsini zaten yazar.
+Değişen satırların okunması, yazar kilidi ve öneri yazımı her zaman
+primary'dedir (sorgu handler'ının okuma oturumunda da).
+
+Değişiklikler bir kuyruktan tek yazarla sırayla işlenir. DB okumaları kilit
+dışındadır; kilit yalnızca kovaların güncellenmesini korur (async sürücüde
+okuma loop'a dönerken başka istek thread kilidinde beklemez).
+Henüz indeksi olmayan worker'da yazma indeks kurdurmaz; değişiklik ilk
+kurulumdan sonra işlenir. Diğer worker'lardaki yazmalar bu worker'ın indeksine
+en geç bir yeniden kurulum aralığı sonra yansır.
+
+Güzergah (koridor) araması için yükler ayrıca `(alım bölgesi, teslim bölgesi,
+gün)` kovalarındadır; bölgeler mesafe matrisinin (`app.distance`) satırlarıdır.
+`A -> B` teklifi için `P -> D` yükünün sapması
+`km[A,P] + km[P,D] + km[D,B] - km[A,B]`; sıra bu toplamın içindedir (ters
+yöndeki yük güzergahı iki kez katettirir). Önce matris satırları üzerinde
+vektörel olarak `km[A,r] + km[r,B]` elipsine giren bölgeler, sonra bu
+bölgelerin çiftlerinden bütçeye sığanlar bulunur; yalnızca o çiftlerin pencere
+içindeki kovaları okunur. Ön eleme üçgen eşitsizliğine dayanır: tahmini
+matriste geçerlidir, `--pairs` ile yazılan mesafeler bunu bozarsa sınırdaki
+bazı yükler atlanabilir.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Collection, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+
+from . import changes
+from .config import settings
+from .crud import match_suggestion as suggestion_crud
+from .crud import matching as matching_crud
+from .distance import DistanceMatrix, get_matrix
+from .replicas import on_primary
+from .models.enums import Category, Unit
+
+MASS = "mass"
+VOLUME = "volume"
+# Birim -> (aile, aile taban birimine çarpan)
+_UNITS = {Unit.KG: (MASS, 1.0), Unit.TON: (MASS, 1000.0), Unit.LITRE: (VOLUME, 1.0)}
+
+# (can_food / GIDA, can_dg / TEHLIKELI, birim ailesi)
+Capability = Tuple[bool, bool, Optional[str]]
+Region = Tuple[str, str]
+
+CAPABILITIES: List[Capability] = [
+    (food, dg, family)
+    for food in (False, True)
+    for dg in (False, True)
+    for family in (None, MASS, VOLUME)
+]
+
+# İndeks kurulmadan biriken değişikliklerin üst sınırı (bkz. `MatchingService.apply`)
+MAX_QUEUED_CHANGES = 10_000
+
+# Skor bileşenleri (toplam 0-100): varış ili aynıysa, tarih yakınlığı, doluluk
+DESTINATION_WEIGHT = 50.0
+DATE_WEIGHT = 30.0
+FILL_WEIGHT = 20.0
+
+
+def compatible(need: Capability, cap: Capability) -> bool:
+    """Araç yeteneği yükün gereksinimini karşılıyor mu (kapasite hariç)."""
+    food, dg, family = need
+    return (
+        (not food or cap[0])
+        and (not dg or cap[1])
+        and (family is None or cap[2] is None or family == cap[2])
+    )
+
+
+_CAPS_FOR_NEED = {
+    n: [c for c in CAPABILITIES if compatible(n, c)] for n in CAPABILITIES
+}
+_NEEDS_FOR_CAP = {
+    c: [n for n in CAPABILITIES if compatible(n, c)] for c in CAPABILITIES
+}
+
+
+def _amount(value: Optional[float], unit: Any) -> Tuple[Optional[str], Optional[float]]:
+    if unit is None:
+        return None, None
+    family, scale = _UNITS[Unit(unit)]
+    return family, None if value is None else float(value) * scale
+
+
+def _region(country: Optional[str], admin1: Optional[str]) -> Optional[Region]:
+    return (country, admin1) if country and admin1 else None
+
+
+@dataclass(frozen=True, slots=True)
+class LoadEntry:
+    id: int
+    pickup_address_id: int
+    dropoff_address_id: int
+    pickup_day: date
+    quantity_value: Optional[float]
+    quantity_unit: Optional[Unit]
+    category: Optional[Category]
+    origin: Optional[Region]
+    destination: Optional[Region]
+    day: int
+    need: Capability
+    # Miktarın aile taban birimindeki değeri (kg / litre)
+    amount: Optional[float]
+
+    @classmethod
+    def from_row(cls, row: Any) -> "LoadEntry":
+        family, amount = _amount(row.quantity_value, row.quantity_unit)
+        return cls(
+            id=row.id,
+            pickup_address_id=row.pickup_address_id,
+            dropoff_address_id=row.dropoff_address_id,
+            pickup_day=row.pickup_day,
+            quantity_value=row.quantity_value,
+            quantity_unit=row.quantity_unit,
+            category=row.category,
+            origin=_region(row.origin_country, row.origin_admin1),
+            destination=_region(row.destination_country, row.destination_admin1),
+            day=row.pickup_day.toordinal(),
+            need=(
+                row.category == Category.GIDA,
+                row.category == Category.TEHLIKELI,
+                family,
+            ),
+            amount=amount,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class OfferEntry:
+    id: int
+    vehicle_id: int
+    from_address_id: int
+    to_address_id: int
+    depart_date: date
+    origin: Optional[Region]
+    destination: Optional[Region]
+    day: int
+    cap: Capability
+    capacity: Optional[float]
+
+    @classmethod
+    def from_row(cls, row: Any) -> "OfferEntry":
+        family, capacity = _amount(row.capacity_value, row.capacity_unit)
+        return cls(
+            id=row.id,
+            vehicle_id=row.vehicle_id,
+            from_address_id=row.from_address_id,
+            to_address_id=row.to_address_id,
+            depart_date=row.depart_date,
+            origin=_region(row.origin_country, row.origin_admin1),
+            destination=_region(row.destination_country, row.destination_admin1),
+            day=row.depart_date.toordinal(),
+            cap=(bool(row.can_food), bool(row.can_dg), family),
+            capacity=capacity,
+        )
+
+
+def fits(load: LoadEntry, offer: OfferEntry) -> bool:
+    """Aracın kapasitesi yükün miktarına yetiyor mu (bilinmiyorsa yeter)."""
+    return (
+        load.amount is None or offer.capacity is None or load.amount <= offer.capacity
+    )
+
+
+def score(load: LoadEntry, offer: OfferEntry, window: int) -> Optional[float]:
+    """Uyumlu (aynı kovalardan gelen) çiftin skoru; kapasite yetmiyorsa None."""
+    if not fits(load, offer):
+        return None
+    value = DATE_WEIGHT * (1 - abs(offer.day - load.day) / (window + 1))
+    if load.destination is not None and load.destination == offer.destination:
+        value += DESTINATION_WEIGHT
+    if load.amount and offer.capacity:
+        value += FILL_WEIGHT * load.amount / offer.capacity
+    return round(value, 2)
+
+
+def _top(
+    scored: Iterable[Tuple[Any, float]], limit: Optional[int]
+) -> List[Tuple[Any, float]]:
+    # Eşit skorlarda küçük id önce: sonuç deterministik
+    def key(pair: Tuple[Any, float]) -> Tuple[float, int]:
+        return pair[1], -pair[0].id
+
+    if limit is None:
+        return sorted(scored, key=key, reverse=True)
+    return heapq.nlargest(limit, scored, key=key)
+
+
+BucketKey = Tuple[Region, int, Capability]
+# (alım bölgesinin matris satırı, teslim bölgesinin matris satırı, gün)
+RouteKey = Tuple[int, int, int]
+
+# Elips ön elemesinde float32 yuvarlama payı (km); kesin kontrol ayrıca yapılır
+_DETOUR_EPS = 1e-3
+
+
+def _put(buckets: Dict[Any, Dict[int, Any]], key: Any, entry: Any) -> None:
+    # Kova kopyalanıp yerine konur (copy-on-write): kilitsiz okuyan istekler
+    # dolaştıkları kovanın değiştiğini görmez
+    bucket = dict(buckets.get(key, ()))
+    bucket[entry.id] = entry
+    buckets[key] = bucket
+
+
+def _drop(buckets: Dict[Any, Dict[int, Any]], key: Any, id: int) -> None:
+    bucket = buckets.get(key)
+    if bucket is None or id not in bucket:
+        return
+    bucket = {k: v for k, v in bucket.items() if k != id}
+    if bucket:
+        buckets[key] = bucket
+    else:
+        del buckets[key]
+
+
+class CandidateIndex:
+    """Yük ve tekliflerin `(bölge, gün, yetenek)` kovaları; mesafe matrisi
+    verilmişse yüklerin `(alım, teslim, gün)` güzergah kovaları da.
+
+    Okuma kilitsizdir; `put_*` / `remove_*` tek yazar tarafından çağrılmalıdır
+    (bkz. `MatchingService.apply`).
+    """
+
+    def __init__(
+        self,
+        loads: Iterable[LoadEntry],
+        offers: Iterable[OfferEntry],
+        *,
+        window: int,
+        today: Optional[date] = None,
+        matrix: Optional[DistanceMatrix] = None,
+    ) -> None:
+        self.window = window
+        self.today = today
+        self.matrix = matrix
+        self.loads: Dict[int, LoadEntry] = {}
+        self.offers: Dict[int, OfferEntry] = {}
+        self._load_buckets: Dict[BucketKey, Dict[int, LoadEntry]] = {}
+        self._offer_buckets: Dict[BucketKey, Dict[int, OfferEntry]] = {}
+        self._route_buckets: Dict[RouteKey, Dict[int, LoadEntry]] = {}
+        # Bölge -> matris satırı (il başına bir `index_of`)
+        self._rows: Dict[Region, Optional[int]] = {}
+        for load in loads:
+            self.loads[load.id] = load
+            if load.origin is not None:
+                key = (load.origin, load.day, load.need)
+                self._load_buckets.setdefault(key, {})[load.id] = load
+                route = self._route_key(load)
+                if route is not None:
+                    self._route_buckets.setdefault(route, {})[load.id] = load
+        for offer in offers:
+            self.offers[offer.id] = offer
+            if offer.origin is not None:
+                key = (offer.origin, offer.day, offer.cap)
+                self._offer_buckets.setdefault(key, {})[offer.id] = offer
+
+    def _row(self, region: Optional[Region]) -> Optional[int]:
+        if region is None or self.matrix is None:
+            return None
+        if region not in self._rows:
+            self._rows[region] = self.matrix.index_of(*region)
+        return self._rows[region]
+
+    def _route_key(self, load: LoadEntry) -> Optional[RouteKey]:
+        pickup, dropoff = self._row(load.origin), self._row(load.destination)
+        if pickup is None or dropoff is None:
+            return None
+        return pickup, dropoff, load.day
+
+    def put_load(self, load: LoadEntry) -> None:
+        self.remove_load(load.id)
+        self.loads[load.id] = load
+        if load.origin is not None:
+            _put(self._load_buckets, (load.origin, load.day, load.need), load)
+            route = self._route_key(load)
+            if route is not None:
+                _put(self._route_buckets, route, load)
+
+    def remove_load(self, load_id: int) -> None:
+        old = self.loads.pop(load_id, None)
+        if old is not None and old.origin is not None:
+            _drop(self._load_buckets, (old.origin, old.day, old.need), load_id)
+            route = self._route_key(old)
+            if route is not None:
+                _drop(self._route_buckets, route, load_id)
+
+    def put_offer(self, offer: OfferEntry) -> None:
+        self.remove_offer(offer.id)
+        self.offers[offer.id] = offer
+        if offer.origin is not None:
+            _put(self._offer_buckets, (offer.origin, offer.day, offer.cap), offer)
+
+    def remove_offer(self, offer_id: int) -> None:
+        old = self.offers.pop(offer_id, None)
+        if old is not None and old.origin is not None:
+            _drop(self._offer_buckets, (old.origin, old.day, old.cap), offer_id)
+
+    def _days(self, day: int) -> range:
+        return range(day - self.window, day + self.window + 1)
+
+    def offers_for(
+        self, load: LoadEntry, limit: Optional[int]
+    ) -> List[Tuple[OfferEntry, float]]:
+        if load.origin is None:
+            return []
+        buckets = self._offer_buckets
+        scored = []
+        for day in self._days(load.day):
+            for cap in _CAPS_FOR_NEED[load.need]:
+                bucket = buckets.get((load.origin, day, cap))
+                if bucket:
+                    for offer in bucket.values():
+                        s = score(load, offer, self.window)
+                        if s is not None:
+                            scored.append((offer, s))
+        return _top(scored, limit)
+
+    def loads_for(
+        self, offer: OfferEntry, limit: Optional[int]
+    ) -> List[Tuple[LoadEntry, float]]:
+        if offer.origin is None:
+            return []
+        buckets = self._load_buckets
+        scored = []
+        for day in self._days(offer.day):
+            for need in _NEEDS_FOR_CAP[offer.cap]:
+                bucket = buckets.get((offer.origin, day, need))
+                if bucket:
+                    for load in bucket.values():
+                        s = score(load, offer, self.window)
+                        if s is not None:
+                            scored.append((load, s))
+        return _top(scored, limit)
+
+    def loads_along(
+        self, offer: OfferEntry, detour_km: float, limit: Optional[int]
+    ) -> List[Tuple[LoadEntry, float]]:
+        """Teklifin güzergahına en fazla `detour_km` ekleyerek alınıp teslim
+        edilebilen, aracın taşıyabileceği yükler; sapmaya, sonra gün farkına
+        göre artan sırada `(yük, sapma km)`."""
+        matrix = self.matrix
+        if matrix is None or offer.origin is None or offer.destination is None:
+            return []
+        a = matrix.index_of(*offer.origin)
+        b = matrix.index_of(*offer.destination)
+        if a is None or b is None:
+            return []
+        from_a = np.asarray(matrix.km[a], dtype=np.float64)
+        to_b = np.asarray(matrix.km[:, b], dtype=np.float64)
+        direct = from_a[b]
+        # Yükün iki ucu da güzergah elipsinin içinde olmalı
+        near = np.flatnonzero(from_a + to_b - direct <= detour_km + _DETOUR_EPS)
+        detours = (
+            from_a[near, None]
+            + np.asarray(matrix.km[np.ix_(near, near)], dtype=np.float64)
+            + to_b[None, near]
+            - direct
+        )
+        pairs = np.argwhere(detours <= detour_km)
+        rows = near.tolist()
+        buckets = self._route_buckets
+        days = self._days(offer.day)
+        found = []
+        for i, j in pairs.tolist():
+            extra = max(float(detours[i, j]), 0.0)
+            for day in days:
+                bucket = buckets.get((rows[i], rows[j], day))
+                if bucket:
+                    for load in bucket.values():
+                        if compatible(load.need, offer.cap) and fits(load, offer):
+                            found.append((load, extra))
+
+        def key(pair: Tuple[LoadEntry, float]) -> Tuple[float, int, int]:
+            return pair[1], abs(pair[0].day - offer.day), pair[0].id
+
+        if limit is None:
+            return sorted(found, key=key)
+        return heapq.nsmallest(limit, found, key=key)
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+class MatchingService:
+    """Worker başına aday indeksi; periyodik olarak (ve gün dönünce) DB'den
+    kurulur, aradaki yazmalar `apply` ile artımlı işlenir."""
+
+    def __init__(
+        self, window: int, rebuild_seconds: int, top_k: int, max_refresh: int
+    ) -> None:
+        self.window = window
+        self.rebuild_seconds = rebuild_seconds
+        self.top_k = top_k
+        self.max_refresh = max_refresh
+        self._index: Optional[CandidateIndex] = None
+        self._built_at = 0.0
+        # Yeniden kurulumu tek istek yapar; yalnızca beklemeden alınır (async
+        # modda sahibi DB okumasında loop'a dönmüşken loop thread'i bloklanmasın)
+        self._lock = threading.Lock()
+        # Süren kurulumun bitiş işareti (kurulum yokken işaretli)
+        self._built = threading.Event()
+        self._built.set()
+        # İndeksin, kuyruğun ve kurulum durumunun G/Ç'siz kısa bölümleri; bu
+        # kilit tutulurken DB'ye gidilmez
+        self._write_lock = threading.Lock()
+        # İşlenecek değişiklikler; tek yazar (`_drain`) sırayla işler
+        self._queue: Deque[changes.Change] = deque()
+        self._draining = False
+        # Yeniden kurulum sürerken gelen değişiklikler; yeni indekse de uygulanır
+        self._pending: Optional[List[changes.Change]] = None
+        # Öneri listesi henüz yeniden yazılamamış yükler (sınır aşıldı ya da
+        # yazar kilidi meşguldü); yalnızca kuyruğu işleyen yazar değiştirir
+        self._deferred: Set[int] = set()
+
+    def rebuild(self, db: Session) -> CandidateIndex:
+        today = _today()
+        with self._write_lock:
+            self._pending = []
+        try:
+            index = CandidateIndex(
+                map(LoadEntry.from_row, matching_crud.open_load_rows(db, today)),
+                map(OfferEntry.from_row, matching_crud.open_offer_rows(db, today)),
+                window=self.window,
+                today=today,
+                matrix=get_matrix(),
+            )
+        except BaseException:
+            with self._write_lock:
+                self._pending = None
+            raise
+        with self._write_lock:
+            pending, self._pending = self._pending, None
+            built_at = time.monotonic()
+            for change in pending:
+                # Anlık görüntüden sonra commit edilmiş olabilir; satırlar yeniden
+                # okunduğundan zaten yansımış bir değişikliği uygulamak zararsızdır
+                if change.ids is None:
+                    built_at = float("-inf")
+                else:
+                    self._queue.append(change)
+            self._index, self._built_at = index, built_at
+        # Kurulum sırasında ve indeks yokken biriken değişiklikler
+        self._drain(db)
+        return index
+
+    def invalidate(self) -> None:
+        """Bir sonraki sorguda indeksi yeniden kurdurur."""
+        with self._write_lock:
+            self._index = None
+            self._queue.clear()
+            self._deferred.clear()
+
+    def _stale(self, index: Optional[CandidateIndex]) -> bool:
+        return (
+            index is None
+            or index.today != _today()
+            or index.matrix is not get_matrix()
+            or time.monotonic() - self._built_at >= self.rebuild_seconds
+        )
+
+    def index(self, db: Session) -> CandidateIndex:
+        while True:
+            index = self._index
+            if not self._stale(index):
+                return index  # type: ignore[return-value]
+            # İndeksi tek istek yeniden kurar; o sırada gelenler eskisini kullanır
+            if self._lock.acquire(blocking=False):
+                built = self._built = threading.Event()
+                try:
+                    index = self._index
+                    if self._stale(index):
+                        index = self.rebuild(db)
+                    return index  # type: ignore[return-value]
+                finally:
+                    self._lock.release()
+                    built.set()
+            if index is not None:
+                return index
+            # Henüz hiç kurulmadı: süren kurulum beklenir (başarısız olduysa
+            # döngü bu isteğe yeniden denetir)
+            self._wait(self._built)
+
+    @staticmethod
+    def _wait(built: threading.Event) -> None:
+        if in_greenlet():
+            # Async sürücü (`run_sync`): kurulum aynı loop'taki başka bir
+            # greenlet'te sürer; loop'a dönerek beklenir, thread bloklanmaz
+            while not built.is_set():
+                await_only(asyncio.sleep(0.01))
+        else:
+            built.wait()
+
+    def apply(self, db: Session, change: changes.Change) -> None:
+        """`changes` abonesi: değişen kayıtları indekse işler ve etkilenen
+        yüklerin öneri satırlarını yeniden yazar (commit eder).
+
+        Değişiklik kuyruğa girer; kuyruğu o sırada işleyen istek yoksa bu istek
+        işler, varsa o istek bu değişikliği de sırayla işler. İndeks henüz
+        kurulmadıysa değişiklik ilk kurulumdan sonra işlenir (kurulum istekte
+        yapılmaz). id'leri bilinmeyen değişiklik (COPY ile içe aktarma) indeksi
+        bayat işaretler; bir sonraki sorgu yeniden kurar, öneri satırları toplu
+        yeniden skorlamada (`app.match_batch`) güncellenir.
+        """
+        with self._write_lock:
+            if self._pending is not None:
+                self._pending.append(change)
+            if change.ids is None:
+                self._built_at = float("-inf")
+                return
+            if self._index is None and len(self._queue) >= MAX_QUEUED_CHANGES:
+                # Uzun süre sorgu gelmeyen soğuk worker: indeks kurulunca DB'den
+                # okunur, bu yüklerin önerileri toplu yeniden skorlamaya kalır
+                self._queue.clear()
+            self._queue.append(change)
+        self._drain(db)
+
+    def _drain(self, db: Session) -> None:
+        """Kuyruğu tek yazar olarak işler: DB okumaları ve öneri yazımı kilit
+        dışında, indeks güncellemesi `_write_lock` altında yapılır. Async modda
+        okuma loop'a dönerken başka istek kilidi beklemez; kuyruğa ekleyip
+        döner."""
+        with self._write_lock:
+            if self._draining or self._index is None:
+                return
+            self._draining = True
+        try:
+            # Sorgu handler'ının okuma oturumunda da (indeks yeniden kurulumu)
+            # değişen satırlar, yazar kilidi ve öneri yazımı primary'dedir
+            with on_primary(db):
+                while True:
+                    with self._write_lock:
+                        index = self._index
+                        if not self._queue or index is None:
+                            self._draining = False
+                            return
+                        change = self._queue.popleft()
+                    entries = self._read_changed(db, index.today or _today(), change)
+                    with self._write_lock:
+                        # Bu arada yeniden kurulduysa değişiklik yeni indekse
+                        # de (bekleyenlerden) uygulanır; mevcut olana işlemek
+                        # zararsızdır
+                        index = self._index or index
+                        load_ids, offer_ids = self._apply_index(index, change, entries)
+                    self._refresh_suggestions(db, index, load_ids, offer_ids)
+        except BaseException:
+            with self._write_lock:
+                self._draining = False
+                # İşlenemeyen değişiklikler kaybolur; indeks bir sonraki sorguda
+                # DB'den yeniden kurulur
+                self._queue.clear()
+                self._deferred.clear()
+                self._built_at = float("-inf")
+            raise
+
+    @staticmethod
+    def _read_changed(
+        db: Session, today: date, change: changes.Change
+    ) -> Dict[int, Any]:
+        """Değişen kayıtların açık olanlarını DB'den okur: {id: kayıt}."""
+        ids = change.ids or ()
+        if change.deleted:
+            return {}
+        if change.kind == "load":
+            rows = matching_crud.open_load_rows(db, today, ids)
+            return {row.id: LoadEntry.from_row(row) for row in rows}
+        if change.kind == "vehicle":
+            rows = matching_crud.open_offer_rows(db, today, vehicle_ids=ids)
+        else:
+            rows = matching_crud.open_offer_rows(db, today, ids)
+        return {row.id: OfferEntry.from_row(row) for row in rows}
+
+    @staticmethod
+    def _apply_index(
+        index: CandidateIndex, change: changes.Change, entries: Dict[int, Any]
+    ) -> Tuple[Set[int], Set[int]]:
+        """Okunan kayıtları indekse yazar (açık olmayanları çıkarır); öneri
+        listesi doğrudan değişen yükleri ve değişen teklifleri döner."""
+        ids = change.ids or ()
+        if change.kind == "load":
+            # İndekste olmayan ve olmayacak yükün (geçmiş tarihli, kapalı)
+            # öneri listesi de yoktur
+            touched = {i for i in ids if i in entries or i in index.loads}
+            for load_id in ids:
+                if load_id in entries:
+                    index.put_load(entries[load_id])
+                else:
+                    index.remove_load(load_id)
+            return touched, set()
+
+        if change.kind == "vehicle":
+            vehicle_ids = set(ids)
+            offer_ids = {
+                o.id for o in index.offers.values() if o.vehicle_id in vehicle_ids
+            }
+        else:
+            offer_ids = set(ids)
+        offer_ids |= entries.keys()
+        for offer_id in offer_ids:
+            if offer_id in entries:
+                index.put_offer(entries[offer_id])
+            else:
+                index.remove_offer(offer_id)
+        return set(), offer_ids
+
+    def _refresh_suggestions(
+        self,
+        db: Session,
+        index: CandidateIndex,
+        load_ids: Set[int],
+        offer_ids: Set[int],
+    ) -> None:
+        """Listesi değişebilecek yüklerin en iyi K önerisini yeniden yazar.
+
+        Bir teklif değişince etkilenen yükler: listesinde o teklif olanlar ve
+        teklifin yeni skoru listesine girebilecek olanlar (listesi K'dan kısa
+        ya da K'ncı skoru bu skordan büyük olmayan adaylar). Teklif başına en
+        iyi `max_refresh` aday yüke bakılır ve en fazla `max_refresh` liste
+        yazılır; kalanlar ile yazar kilidi meşgulken yazılamayanlar ertelenir.
+        """
+        affected = set(load_ids) | self._deferred
+        self._deferred = set()
+        if offer_ids:
+            affected.update(suggestion_crud.loads_with_offers(db, offer_ids))
+            best: Dict[int, float] = {}
+            for offer_id in offer_ids:
+                offer = index.offers.get(offer_id)
+                if offer is not None:
+                    for load, s in index.loads_for(offer, self.max_refresh):
+                        best[load.id] = max(s, best.get(load.id, s))
+            if best:
+                current = suggestion_crud.thresholds(db, best)
+                for load_id, s in best.items():
+                    count, lowest = current.get(load_id, (0, 0.0))
+                    if count < self.top_k or s >= lowest:
+                        affected.add(load_id)
+        if not affected:
+            return
+        if len(affected) > self.max_refresh:
+            ordered = sorted(affected)
+            affected = set(ordered[: self.max_refresh])
+            self._deferred.update(ordered[self.max_refresh :])
+        lists = {}
+        for load_id in affected:
+            load = index.loads.get(load_id)
+            lists[load_id] = (
+                []
+                if load is None
+                else [(o.id, s) for o, s in index.offers_for(load, self.top_k)]
+            )
+        if not suggestion_crud.replace_for_loads(db, lists):
+            # Toplu yeniden skorlama sürüyor: onun commit'inden sonraki bir
+            # yazmada yeniden denenir
+            self._deferred.update(lists)
+            db.rollback()
+            return
+        db.commit()
+
+    def suggest_offers(
+        self,
+        db: Session,
+        load_id: int,
+        *,
+        user_id: int,
+        admin_org_ids: Optional[Collection[int]] = None,
+        limit: int = 20,
+    ) -> Optional[List[Tuple[OfferEntry, float]]]:
+        """Yüke en uygun teklifler; yük kullanıcıya görünmüyorsa None."""
+        row = matching_crud.visible_load_row(
+            db, load_id, user_id=user_id, admin_org_ids=admin_org_ids
+        )
+        if row is None:
+            return None
+        return self.index(db).offers_for(LoadEntry.from_row(row), limit)
+
+    def suggest_loads(
+        self,
+        db: Session,
+        offer_id: int,
+        *,
+        user_id: int,
+        admin_org_ids: Optional[Collection[int]] = None,
+        limit: int = 20,
+    ) -> Optional[List[Tuple[LoadEntry, float]]]:
+        """Teklife en uygun yükler; teklif kullanıcıya görünmüyorsa None."""
+        row = matching_crud.visible_offer_row(
+            db, offer_id, user_id=user_id, admin_org_ids=admin_org_ids
+        )
+        if row is None:
+            return None
+        return self.index(db).loads_for(OfferEntry.from_row(row), limit)
+
+    def corridor_loads(
+        self,
+        db: Session,
+        offer_id: int,
+        *,
+        user_id: int,
+        admin_org_ids: Optional[Collection[int]] = None,
+        detour_km: float,
+        limit: int = 20,
+    ) -> Optional[List[Tuple[LoadEntry, float]]]:
+        """Teklifin güzergahı üzerindeki yükler (`CandidateIndex.loads_along`);
+        teklif kullanıcıya görünmüyorsa None."""
+        row = matching_crud.visible_offer_row(
+            db, offer_id, user_id=user_id, admin_org_ids=admin_org_ids
+        )
+        if row is None:
+            return None
+        return self.index(db).loads_along(OfferEntry.from_row(row), detour_km, limit)
+
+
+matching_service = MatchingService(
+    window=settings.MATCH_DAY_WINDOW,
+    rebuild_seconds=settings.MATCH_INDEX_REBUILD_SECONDS,
+    top_k=settings.MATCH_TOP_K,
+    max_refresh=settings.MATCH_REFRESH_MAX_LOADS,
+)
+changes.subscribe(matching_service.apply)
@@ -1,26 +1,56 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
 
 from sqlalchemy import DateTime, Integer, func
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase, Mapped, declared_attr, mapped_column
+from sqlalchemy.sql.functions import FunctionElement
 
 
 class Base(DeclarativeBase):
+    # INSERT/UPDATE sunucu tarafı değerleri (id, created_at, updated_at, ...)
+    # RETURNING ile aynı ifadede geri okur; yazma sonrası refresh gerekmez
+    __mapper_args__ = {"eager_defaults": True}
+
     # Tekil tablo adları (kullanıcı talebi): class name'i küçük harfe çevirir
     @declared_attr.directive
     def __tablename__(cls) -> str:  # type: ignore[override]
         return cls.__name__.lower()
 
 
+class db_now(FunctionElement):
+    """Sunucu saati: `func.now()` ile aynı, SQLite'ta milisaniye çözünürlüklü.
+
+    `updated_at` ETag/If-Match sürümü olarak kullanılır (bkz. `app.etag`);
+    SQLite'ın `CURRENT_TIMESTAMP`'i saniye çözünürlüklüdür ve SQLAlchemy'nin
+    datetime parametreleriyle aynı metin biçiminde değildir.
+    """
+
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(db_now)
+def _db_now(element: db_now, compiler: Any, **kw: Any) -> str:
+    return compiler.process(func.now(), **kw)
+
+
+@compiles(db_now, "sqlite")
+def _db_now_sqlite(element: db_now, compiler: Any, **kw: Any) -> str:
+    # SQLAlchemy'nin SQLite DATETIME biçimi: "YYYY-MM-DD HH:MM:SS.ffffff"
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'NOW')"
+
+
 class TimestampMixin:
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True), server_default=db_now(), nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        server_default=func.now(),
-        onupdate=func.now(),
+        server_default=db_now(),
+        onupdate=db_now(),
         nullable=False,
     )
 
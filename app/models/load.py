@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import date
 from typing import Optional
 
-from sqlalchemy import Boolean, Date, ForeignKey, Numeric, String
+from sqlalchemy import Boolean, Date, ForeignKey, Index, Numeric, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, PKMixin, TimestampMixin
@@ -11,9 +11,18 @@ from .enums import CategoryEnum, UnitEnum
 
 
 class Load(PKMixin, TimestampMixin, Base):
-    owner_user_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("user.id"), index=True
+    # Liste sorguları: owner_user_id = ? [AND organization_id = ?] ORDER BY id DESC
+    __table_args__ = (
+        Index("ix_load_owner_user_id_id", "owner_user_id", "id"),
+        Index(
+            "ix_load_owner_user_id_organization_id_id",
+            "owner_user_id",
+            "organization_id",
+            "id",
+        ),
     )
+
+    owner_user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("user.id"))
     organization_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("organization.id"), index=True
     )
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from sqlalchemy import Float, ForeignKey, Index, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base, PKMixin, TimestampMixin
+
+
+class MatchSuggestion(PKMixin, TimestampMixin, Base):
+    """Toplu eşleştirmenin (`app.match_batch`) yük başına en iyi K teklifi."""
+
+    # Yükün önerileri: load_id = ? ORDER BY rank
+    __table_args__ = (
+        Index("ix_matchsuggestion_load_id_rank", "load_id", "rank", unique=True),
+    )
+
+    load_id: Mapped[int] = mapped_column(
+        ForeignKey("load.id", ondelete="CASCADE"), nullable=False
+    )
+    offer_id: Mapped[int] = mapped_column(
+        ForeignKey("offer.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    # 1 = en iyi
+    rank: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, PKMixin, TimestampMixin
@@ -8,8 +8,18 @@ from .enums import GenericStatus, OrgRole, OrgRoleEnum, StatusEnum
 
 
 class OrgUser(PKMixin, TimestampMixin, Base):
+    # Bir kullanıcı bir organizasyonda tek kayıtla temsil edilir (get_link / is_admin)
+    __table_args__ = (
+        Index(
+            "ix_orguser_organization_id_user_id",
+            "organization_id",
+            "user_id",
+            unique=True,
+        ),
+    )
+
     organization_id: Mapped[int] = mapped_column(
-        ForeignKey("organization.id"), nullable=False, index=True
+        ForeignKey("organization.id"), nullable=False
     )
     user_id: Mapped[int] = mapped_column(
         ForeignKey("user.id"), nullable=False, index=True
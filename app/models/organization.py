@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, PKMixin, TimestampMixin
@@ -10,6 +10,9 @@ from .enums import GenericStatus, StatusEnum
 
 
 class Organization(PKMixin, TimestampMixin, Base):
+    # list_by_owner: owner_user_id = ? ORDER BY id DESC
+    __table_args__ = (Index("ix_organization_owner_user_id_id", "owner_user_id", "id"),)
+
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     tax_office: Mapped[Optional[str]] = mapped_column(String(128))
     tax_number: Mapped[Optional[str]] = mapped_column(String(16), index=True)
@@ -20,6 +23,7 @@ class Organization(PKMixin, TimestampMixin, Base):
     )
 
     owner = relationship("User", backref="owned_organizations")
+    address = relationship("Address")
     users = relationship(
         "OrgUser", back_populates="organization", cascade="all, delete-orphan"
     )
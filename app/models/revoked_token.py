@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base, PKMixin, TimestampMixin
+
+
+class RevokedToken(PKMixin, TimestampMixin, Base):
+    # Refresh token `jti` değeri ya da bir token ailesinin (`fam`) kimliği
+    jti: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("user.id"), index=True)
+    # Bu tarihten sonra ilgili token zaten geçersizdir; kayıt silinebilir
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy import String
+from sqlalchemy import Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, PKMixin, TimestampMixin
@@ -21,6 +21,11 @@ class User(PKMixin, TimestampMixin, Base):
     status: Mapped[GenericStatus] = mapped_column(
         StatusEnum, default=GenericStatus.active, nullable=False
     )
+    # Org üyelikleri/rolleri her değiştiğinde artar; token'daki rol claim'leri
+    # bu değerle eşleşmiyorsa bayat kabul edilir
+    membership_version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
 
     # ilişkiler (ileride kullanılacak)
     organizations = relationship(
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy import Boolean, ForeignKey, Numeric
+from sqlalchemy import Boolean, ForeignKey, Index, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, PKMixin, TimestampMixin
@@ -10,9 +10,18 @@ from .enums import GenericStatus, StatusEnum, UnitEnum
 
 
 class Vehicle(PKMixin, TimestampMixin, Base):
-    owner_user_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("user.id"), index=True
+    # Liste sorguları: owner_user_id = ? [AND organization_id = ?] ORDER BY id DESC
+    __table_args__ = (
+        Index("ix_vehicle_owner_user_id_id", "owner_user_id", "id"),
+        Index(
+            "ix_vehicle_owner_user_id_organization_id_id",
+            "owner_user_id",
+            "organization_id",
+            "id",
+        ),
     )
+
+    owner_user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("user.id"))
     organization_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("organization.id"), index=True
     )
@@ -0,0 +1,170 @@
+"""OpenAPI belgesi: derleme adımı ve önceden sıkıştırılmış sunum.
+
+Şema üretimi (tüm route'ların pydantic şemalarının çözülmesi) pahalıdır ve
+önceden ilk `/openapi.json` isteğinde yapılıyordu. Belge derleme adımında
+dosyaya yazılabilir; `OPENAPI_FILE` ayarlıysa uygulama şemayı hiç üretmez,
+dosyayı ve yanındaki `.gz` kopyasını bayt olarak sunar. Dosya yoksa belge ilk
+istekte bir kez üretilip sıkıştırılır ve worker ömrü boyunca önbellekte kalır.
+
+    python -m app.openapi --env prod --output app/static/openapi.prod.json
+
+`OPENAPI_FILE` içindeki `{env}` yer tutucusu `ENV` ile değiştirilir; böylece
+tek imajda her ortam için (sunucu sıralaması farklı) ayrı belge bulunur.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request, Response, status
+from fastapi.openapi.utils import get_openapi
+
+from .config import settings
+from .etag import matches
+
+# Belge yalnızca dağıtımla değişir; ETag ile ucuz yeniden doğrulama
+CACHE_CONTROL = "public, max-age=300"
+
+
+def servers(env: Optional[str] = None) -> List[Dict[str, str]]:
+    """Ayarlı API adresleri; `env` (varsayılan `ENV`) ortamınınki ilk sırada."""
+    found = []
+    # always include local
+    if settings.LOCAL_API_URL:
+        found.append({"url": settings.LOCAL_API_URL, "description": "Local"})
+    # include staging
+    if settings.STAGING_API_URL:
+        found.append({"url": settings.STAGING_API_URL, "description": "Staging"})
+    # include prod
+    if settings.PROD_API_URL:
+        found.append({"url": settings.PROD_API_URL, "description": "Production"})
+
+    # Re-order to put current ENV first
+    env_priority = {
+        "local": settings.LOCAL_API_URL,
+        "staging": settings.STAGING_API_URL,
+        "prod": settings.PROD_API_URL,
+        "production": settings.PROD_API_URL,
+    }
+    preferred = env_priority.get(str(env or settings.ENV).lower())
+    if preferred:
+        found = sorted(found, key=lambda s: 0 if s["url"] == preferred else 1)
+    return found
+
+
+def build(app: FastAPI, env: Optional[str] = None) -> Dict[str, Any]:
+    schema = get_openapi(
+        title=app.title,
+        version=app.version,
+        description=app.description,
+        routes=app.routes,
+    )
+    schema["servers"] = servers(env)
+    return schema
+
+
+def render(schema: Dict[str, Any]) -> bytes:
+    return json.dumps(schema, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def compress(body: bytes) -> bytes:
+    # mtime=0: aynı belge her derlemede aynı baytlar (ve aynı ETag)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+@dataclass(frozen=True)
+class Document:
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+    @classmethod
+    def of(cls, body: bytes, gzipped: Optional[bytes] = None) -> "Document":
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        return cls(body, gzipped or compress(body), f'"{digest}"')
+
+
+def document_path() -> Optional[Path]:
+    if not settings.OPENAPI_FILE:
+        return None
+    return Path(settings.OPENAPI_FILE.replace("{env}", str(settings.ENV).lower()))
+
+
+def load(app: FastAPI) -> Document:
+    """Sunulacak belge: önceden derlenmiş dosya ya da (bir kez) üretilmiş şema."""
+    doc = getattr(app.state, "openapi_document", None)
+    if doc is None:
+        path = document_path()
+        if path is not None and path.is_file():
+            gz = path.with_name(path.name + ".gz")
+            doc = Document.of(
+                path.read_bytes(), gz.read_bytes() if gz.is_file() else None
+            )
+        else:
+            doc = Document.of(render(app.openapi()))
+        app.state.openapi_document = doc
+    return doc
+
+
+def response(request: Request, doc: Document) -> Response:
+    headers = {
+        "ETag": doc.etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if matches(request.headers.get("if-none-match"), doc.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        body = doc.gzipped
+    else:
+        body = doc.body
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def write(app: FastAPI, output: Path, env: Optional[str] = None) -> Document:
+    doc = Document.of(render(build(app, env)))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(doc.body)
+    output.with_name(output.name + ".gz").write_bytes(doc.gzipped)
+    return doc
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.openapi",
+        description="OpenAPI belgesini (ve .gz kopyasını) dosyaya yazar.",
+    )
+    parser.add_argument(
+        "--env",
+        default=None,
+        help="Sunucu sıralaması için ortam (varsayılan: ENV ayarı)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Çıktı dosyası (varsayılan: OPENAPI_FILE, {env} yer tutucusuyla)",
+    )
+    args = parser.parse_args(argv)
+    env = args.env or settings.ENV
+    output = args.output
+    if output is None:
+        if not settings.OPENAPI_FILE:
+            parser.error("--output ya da OPENAPI_FILE gerekli")
+        output = Path(settings.OPENAPI_FILE.replace("{env}", str(env).lower()))
+
+    from .main import app
+
+    doc = write(app, output, env)
+    print(f"{output}: {len(doc.body)} bayt ({len(doc.gzipped)} gzip)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Opak cursor (keyset) sayfalama yardımcıları.
+
+Liste uç noktaları `id desc` sıralıdır. Cursor, sayfadaki son kaydın id'sini
+ve hangi listeye ait olduğunu taşır; bir sonraki sayfa `id < son_id`
+koşuluyla çekilir, böylece sayfa derinliği sorgu maliyetini artırmaz.
+"""
+
+from __future__ import annotations
+
+import base64
+from typing import Any, Callable, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, Response, status
+from pydantic_core import to_json
+
+from .config import settings
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+NEXT_CURSOR_RESPONSE = {
+    200: {
+        "headers": {
+            NEXT_CURSOR_HEADER: {
+                "description": "Sonraki sayfanın cursor'ı (`after`); son sayfada yoktur",
+                "schema": {"type": "string"},
+            }
+        }
+    },
+    400: {
+        "description": "Geçersiz cursor",
+        "content": {"application/json": {"example": {"detail": "Geçersiz cursor"}}},
+    },
+}
+
+
+def encode_cursor(kind: str, last_id: int) -> str:
+    raw = f"{kind}:{last_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(kind: str, cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, _, value = base64.urlsafe_b64decode(padded).decode().partition(":")
+        if prefix != kind:
+            raise ValueError("Cursor başka bir listeye ait")
+        return int(value)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Geçersiz cursor"
+        )
+
+
+def after_id(kind: str, after: Optional[str], offset: Optional[int]) -> Optional[int]:
+    """`after` parametresini id'ye çevirir; offset ile birlikte kullanılamaz."""
+    if after is None:
+        return None
+    if offset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="after ve offset birlikte kullanılamaz",
+        )
+    return decode_cursor(kind, after)
+
+
+def page_size(limit: Optional[int]) -> int:
+    """İstenen `limit`'in uygulanan karşılığı: verilmezse `LIST_DEFAULT_LIMIT`,
+    en fazla `LIST_MAX_LIMIT`. Liste yanıtları hiçbir zaman sınırsız değildir."""
+    return min(limit or settings.LIST_DEFAULT_LIMIT, settings.LIST_MAX_LIMIT)
+
+
+def fetch_limit(limit: Optional[int]) -> int:
+    # Bir fazla kayıt istenir: sonraki sayfa var mı, ek sorgu olmadan anlaşılır
+    return page_size(limit) + 1
+
+
+def page(
+    response: Response, kind: str, rows: Sequence[T], limit: Optional[int]
+) -> Sequence[T]:
+    """`fetch_limit` ile çekilen satırları kırpar ve sonraki cursor'ı başlığa yazar."""
+    limit = page_size(limit)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(kind, rows[-1].id)  # type: ignore[attr-defined]
+    return rows
+
+
+def json_page(
+    kind: str,
+    rows: Sequence[Any],
+    limit: Optional[int],
+    *,
+    dump: Optional[Callable[[Sequence[Any]], bytes]] = None,
+    etag: Optional[str] = None,
+) -> Response:
+    """Önceden kodlanmış JSON liste yanıtı.
+
+    Varsayılan olarak Core satırları (`app.crud.rows`) `response_model`
+    doğrulamasından geçmeden pydantic-core'un kodlayıcısıyla doğrudan JSON'a
+    yazılır; kolonlar çıktı şemasıyla aynı olmalıdır. ORM nesneleri için
+    `dump` verilir (bkz. `app.sparse.Shape.dump`). Sonraki sayfa varsa
+    `X-Next-Cursor` başlığı, `etag` verilirse `ETag` başlığı eklenir.
+    """
+    limit = page_size(limit)
+    headers = {"ETag": etag} if etag else {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(kind, rows[-1].id)
+    return Response(
+        dump(rows) if dump else to_json([row._asdict() for row in rows]),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .config import settings
+from .security import get_password_hash, verify_password
+
+
+class PasswordPoolSaturated(Exception):
+    """Havuz ve bekleme kuyruğu dolu; istek hemen reddedilmeli (503)."""
+
+
+class PasswordService:
+    """bcrypt işlemlerini API thread'lerinden ayrı, sınırlı bir process havuzunda çalıştırır.
+
+    Aynı anda en fazla `workers + max_pending` iş kabul edilir; fazlası
+    beklemeden `PasswordPoolSaturated` ile reddedilir. `workers=0` ise
+    işlemler bu süreçte yapılır (testler / tek süreçli kurulumlar): senkron
+    çağrılarda çağıran thread'de, `ahash`/`averify`'da event loop
+    bloklanmasın diye bir thread havuzunda (aynı slot sınırıyla).
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max(1, workers + max_pending))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _get_threads(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(
+                    max_workers=max(1, self.workers + self.max_pending),
+                    thread_name_prefix="bcrypt",
+                )
+            return self._threads
+
+    def _submit(
+        self, fn: Callable[..., Any], *args: Any, in_thread: bool = False
+    ) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolSaturated()
+        try:
+            if self.workers <= 0 and in_thread:
+                fut = self._get_threads().submit(fn, *args)
+            elif self.workers <= 0:
+                fut = Future()
+                try:
+                    fut.set_result(fn(*args))
+                except Exception as exc:  # pragma: no cover - passlib hataları
+                    fut.set_exception(exc)
+            else:
+                fut = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        fut.add_done_callback(lambda _: self._slots.release())
+        return fut
+
+    def hash(self, password: str) -> str:
+        return self._submit(get_password_hash, password).result()
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._submit(verify_password, plain_password, hashed_password).result()
+
+    async def ahash(self, password: str) -> str:
+        return await asyncio.wrap_future(
+            self._submit(get_password_hash, password, in_thread=True)
+        )
+
+    async def averify(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(
+            self._submit(
+                verify_password, plain_password, hashed_password, in_thread=True
+            )
+        )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+            if self._threads is not None:
+                self._threads.shutdown(wait=True, cancel_futures=True)
+                self._threads = None
+
+
+password_service = PasswordService(
+    workers=settings.PASSWORD_POOL_WORKERS,
+    max_pending=settings.PASSWORD_POOL_MAX_PENDING,
+)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolMetrics:
+    """Bağlantı havuzu sayaçları: checkout bekleme histogramı, timeout ve
+    pre-ping hataları. Anlık doluluk (checked-out, overflow) havuzdan okunur."""
+
+    # Bekleme histogramı kova sınırları (ms); son kova +Inf
+    BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.wait_buckets = [0] * (len(self.BUCKETS_MS) + 1)
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.timeouts = 0
+        self.pre_ping_failures = 0
+
+    def observe_wait(self, seconds: float) -> None:
+        ms = seconds * 1000.0
+        idx = next(
+            (i for i, le in enumerate(self.BUCKETS_MS) if ms <= le),
+            len(self.BUCKETS_MS),
+        )
+        with self._lock:
+            self.wait_buckets[idx] += 1
+            self.wait_count += 1
+            self.wait_sum_ms += ms
+
+    def count_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def count_pre_ping_failure(self) -> None:
+        with self._lock:
+            self.pre_ping_failures += 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for le, n in zip(self.BUCKETS_MS + ("+Inf",), self.wait_buckets):
+                cumulative += n
+                buckets[str(le)] = cumulative
+            data: Dict[str, Any] = {
+                "checkout_wait_ms": {
+                    "buckets": buckets,
+                    "count": self.wait_count,
+                    "sum": round(self.wait_sum_ms, 3),
+                },
+                "timeouts": self.timeouts,
+                "pre_ping_failures": self.pre_ping_failures,
+            }
+        if isinstance(pool, QueuePool):
+            data.update(
+                pool_size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=pool.overflow(),
+            )
+        return data
+
+
+class _InstrumentedPoolMixin:
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)  # type: ignore[call-arg]
+        self.metrics = PoolMetrics()
+
+    def recreate(self):  # type: ignore[no-untyped-def]
+        new = super().recreate()  # type: ignore[misc]
+        new.metrics = self.metrics
+        return new
+
+    def _do_get(self):  # type: ignore[no-untyped-def]
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        except sa_exc.TimeoutError:
+            self.metrics.count_timeout()
+            raise
+        finally:
+            self.metrics.observe_wait(time.perf_counter() - t0)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def track_pre_ping_failures(engine: Engine) -> None:
+    @event.listens_for(engine, "handle_error")
+    def _on_error(ctx) -> None:  # type: ignore[no-untyped-def]
+        metrics = getattr(engine.pool, "metrics", None)
+        if ctx.is_pre_ping and metrics is not None:
+            metrics.count_pre_ping_failure()
+
+
+def pool_snapshot(engine: Engine) -> Dict[str, Any]:
+    metrics = getattr(engine.pool, "metrics", None)
+    if metrics is None:
+        return {"instrumented": False}
+    return metrics.snapshot(engine.pool)
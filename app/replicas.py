@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.cookies import CookieError, SimpleCookie
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from .request_context import current
+
+# Yazma commit eden isteğin yanıtında son yazma anı (unix zamanı); istemci
+# çerezi (tarayıcıda otomatik) ya da başlığı geri gönderir
+WRITE_HEADER = "X-Last-Write"
+WRITE_COOKIE = "last_write"
+
+
+class ReplicaSet:
+    """Okuma replikaları: round-robin seçim, periyodik sağlık kontrolü ve
+    yazma sonrası okuma (read-your-writes) penceresi.
+
+    Sağlık kontrolü istek yolunda yapılmaz: seçim yalnızca son yoklamanın
+    sonucunu okur, yoklama `health_check_seconds` aralıkla arka plan
+    thread'inde `SELECT 1` ile yapılır (ilk yoklama bitene kadar okumalar
+    primary'de kalır). Sorgu sırasında bağlantı kopması da replikayı hemen
+    devre dışı bırakır. Sağlıklı replika yoksa okumalar primary'ye düşer.
+    Async motorların senkron yüzü thread'den bağlanamaz; `probes` ile yoklama
+    için ayrı senkron motorlar verilir.
+
+    Yazma yapan kullanıcının okumaları `read_your_writes_seconds` boyunca
+    primary'de kalır: istemcinin geri gönderdiği son yazma anı (bkz.
+    `ReadYourWritesMiddleware`) her worker'da geçerlidir; geri göndermeyen
+    istemciler için worker içi kayıt da tutulur.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[Engine],
+        *,
+        health_check_seconds: float,
+        read_your_writes_seconds: float,
+        probes: Optional[Sequence[Engine]] = None,
+    ) -> None:
+        self.engines = list(engines)
+        self.probes = list(probes) if probes is not None else self.engines
+        self.health_check_seconds = health_check_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self._rr = itertools.count()
+        self._healthy = {id(e): False for e in self.engines}
+        self._checked_at: Optional[float] = None
+        self._checking = False
+        self._last_write: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        for e in self.engines:
+            event.listen(e, "handle_error", self._on_error(e))
+
+    def _on_error(self, engine: Engine):  # type: ignore[no-untyped-def]
+        def handler(ctx) -> None:  # type: ignore[no-untyped-def]
+            if ctx.is_disconnect:
+                self._healthy[id(engine)] = False
+
+        return handler
+
+    def check(self) -> None:
+        """Tüm replikaları yoklar (arka plan thread'i; testlerde doğrudan)."""
+        for engine, probe in zip(self.engines, self.probes):
+            try:
+                with probe.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                healthy = True
+            except Exception:
+                healthy = False
+            self._healthy[id(engine)] = healthy
+
+    def _schedule_check(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._checking or (
+                self._checked_at is not None
+                and now - self._checked_at < self.health_check_seconds
+            ):
+                return
+            self._checking = True
+            self._checked_at = now
+        threading.Thread(
+            target=self._run_check, name="replica-health-check", daemon=True
+        ).start()
+
+    def _run_check(self) -> None:
+        try:
+            self.check()
+        finally:
+            with self._lock:
+                self._checking = False
+
+    def pick(self) -> Optional[Engine]:
+        """Sıradaki sağlıklı replikayı döner; hiçbiri sağlıklı değilse None."""
+        self._schedule_check()
+        n = len(self.engines)
+        start = next(self._rr)
+        for i in range(n):
+            engine = self.engines[(start + i) % n]
+            if self._healthy[id(engine)]:
+                return engine
+        return None
+
+    def note_write(self, user_id: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._last_write[user_id] = now
+            if len(self._last_write) > 10_000:
+                cutoff = now - self.read_your_writes_seconds
+                self._last_write = {
+                    k: t for k, t in self._last_write.items() if t >= cutoff
+                }
+
+    def recently_wrote(self, user_id: int, last_write: Optional[float] = None) -> bool:
+        """Kullanıcı pencere içinde yazdı mı: bu worker'da ya da istemcinin
+        bildirdiği son yazma anına (`last_write`, unix zamanı) göre."""
+        window = self.read_your_writes_seconds
+        # Saat farkına pay: gelecekteki değer de pencere içindeyse kabul edilir
+        if last_write is not None and abs(time.time() - last_write) < window:
+            return True
+        t = self._last_write.get(user_id)
+        return t is not None and time.monotonic() - t < window
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Replika başına durum; kimliği `DATABASE_REPLICA_URLS` içindeki
+        sırasıdır. Kimlik doğrulamasız `/metrics/db-pool` uç noktasında döner:
+        URL, host ve kullanıcı adı içermez."""
+        return [
+            {"replica": i, "healthy": self._healthy[id(e)]}
+            for i, e in enumerate(self.engines)
+        ]
+
+
+class RoutingSession(Session):
+    """Okuma işaretli oturumların SELECT'lerini replikaya yönlendiren Session.
+
+    `info["replica_ok"]` True olmadıkça (bkz. `app.deps.get_read_db`) her şey
+    primary'ye gider. Oturum bir kez yazdıktan sonra da primary'de kalır.
+    Replika istek boyunca sabittir.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):  # type: ignore[override]
+        replicas: Optional[ReplicaSet] = self.info.get("replicas")
+        if (
+            replicas is None
+            or not self.info.get("replica_ok")
+            or self.info.get("wrote")
+            or self._flushing
+            or isinstance(clause, UpdateBase)
+        ):
+            return super().get_bind(mapper, clause=clause, **kw)
+        if "replica" not in self.info:
+            self.info["replica"] = replicas.pick()
+        return self.info["replica"] or super().get_bind(mapper, clause=clause, **kw)
+
+
+@contextmanager
+def on_primary(session: Session) -> Iterator[Session]:
+    """Blok boyunca oturumun tüm sorgularını primary'ye gönderir.
+
+    Okuma oturumunda (`get_read_db`) yapılan ama az önce commit edilmiş
+    satırları okuyup yazan işler içindir (ör. eşleştirme değişiklik kuyruğu):
+    gecikmeli replika bu satırları henüz görmeyebilir, advisory lock da
+    yalnızca primary'de anlamlıdır. Blok bitince replika işareti geri konur.
+    """
+    saved = {
+        k: session.info.pop(k) for k in ("replica_ok", "replica") if k in session.info
+    }
+    try:
+        yield session
+    finally:
+        session.info.update(saved)
+
+
+def _mark_wrote(session: Session) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session: Session, _flush_context: Any) -> None:
+    _mark_wrote(session)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _on_execute(state: Any) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        _mark_wrote(state.session)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session: Session) -> None:
+    if not session.info.get("wrote"):
+        return
+    # Yanıt son yazma anını taşır (bkz. `ReadYourWritesMiddleware`)
+    ctx = current()
+    if ctx is not None:
+        ctx.wrote_at = time.time()
+    replicas: Optional[ReplicaSet] = session.info.get("replicas")
+    user_id = session.info.get("user_id")
+    if replicas is not None and user_id is not None:
+        replicas.note_write(user_id)
+
+
+def _parse_time(value: Any) -> Optional[float]:
+    try:
+        t = float(value)
+    except (TypeError, ValueError):
+        return None
+    return t if math.isfinite(t) else None
+
+
+def _client_last_write(headers: Sequence[Any]) -> Optional[float]:
+    header = WRITE_HEADER.lower().encode()
+    found: Optional[float] = None
+    for name, value in headers:
+        if name == header:
+            found = _parse_time(value.decode("latin-1"))
+        elif name == b"cookie" and found is None:
+            try:
+                cookie = SimpleCookie(value.decode("latin-1"))
+            except CookieError:
+                continue
+            if WRITE_COOKIE in cookie:
+                found = _parse_time(cookie[WRITE_COOKIE].value)
+    return found
+
+
+class ReadYourWritesMiddleware:
+    """Read-your-writes penceresini istemciyle taşır (saf ASGI).
+
+    Yazma commit eden isteğin yanıtına son yazma anı `X-Last-Write` başlığı ve
+    `last_write` çerezi olarak eklenir; gelen istekteki değer (başlık ya da
+    çerez) `RequestContext.last_write`'a yazılır. Böylece yazmadan hemen sonraki
+    okuma başka bir worker'a düşse de primary'den yapılır.
+    `RequestContextMiddleware`'in içinde çalışmalıdır.
+    """
+
+    def __init__(self, app: Any, *, window_seconds: float) -> None:
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        ctx = current()
+        if scope["type"] != "http" or ctx is None or self.window_seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+        ctx.last_write = _client_last_write(scope.get("headers", ()))
+
+        async def send_with_last_write(message: Any) -> None:
+            if message["type"] == "http.response.start" and ctx.wrote_at is not None:
+                value = f"{ctx.wrote_at:.3f}"
+                cookie = (
+                    f"{WRITE_COOKIE}={value}; Max-Age={math.ceil(self.window_seconds)}"
+                    "; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", ()),
+                        (WRITE_HEADER.lower().encode(), value.encode()),
+                        (b"set-cookie", cookie.encode()),
+                    ],
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_with_last_write)
@@ -0,0 +1,132 @@
+"""İstek kapsamlı bağlam: yetki sorgusu önbelleği ve bağlantı sayacı.
+
+Her HTTP isteği için `RequestContextMiddleware` bir `RequestContext` açar;
+istek boyunca (threadpool ve async sürücünün greenlet'leri dahil)
+`current()` ile erişilir.
+
+- `principals`: doğrulanmış token -> `Principal` (aynı istekte token önbelleği
+  ve imza kontrolü tekrar edilmez).
+- `org_admin`: `(org_id, user_id)` -> admin mi; `require_org_admin` ve
+  handler içi kontroller aynı üyelik sorgusunu bir kez çalıştırır. Kullanıcının
+  üyelikleri istek içinde değişirse (`membership_version`) kayıtları düşer.
+- `last_write` / `wrote_at`: read-your-writes için istemcinin bildirdiği ve
+  bu istekte commit edilen son yazma anı (bkz. `app.replicas`).
+- `checkouts`: istek boyunca havuzdan alınan bağlantı sayısı. SQLAlchemy
+  oturumu bağlantıyı ilk SQL ifadesinde alır; token'ı reddedilen istekler
+  (401/403) havuza hiç dokunmaz. Dağılım `GET /metrics/db-pool` altında
+  `checkouts_per_request` olarak görünür.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+if TYPE_CHECKING:
+    from .auth_cache import Principal
+
+
+@dataclass
+class RequestContext:
+    principals: Dict[str, "Principal"] = field(default_factory=dict)
+    org_admin: Dict[Tuple[int, int], bool] = field(default_factory=dict)
+    checkouts: int = 0
+    # Read-your-writes (bkz. `app.replicas.ReadYourWritesMiddleware`): istemcinin
+    # bildirdiği son yazma anı ve bu istekte commit edilen yazmanın anı
+    last_write: Optional[float] = None
+    wrote_at: Optional[float] = None
+
+    def forget_user(self, user_id: int) -> None:
+        self.org_admin = {k: v for k, v in self.org_admin.items() if k[1] != user_id}
+        self.principals = {t: p for t, p in self.principals.items() if p.id != user_id}
+
+
+_current: ContextVar[Optional[RequestContext]] = ContextVar(
+    "request_context", default=None
+)
+
+
+def current() -> Optional[RequestContext]:
+    """Çalışan isteğin bağlamı; istek dışında (CLI, testlerde doğrudan çağrı) None."""
+    return _current.get()
+
+
+class CheckoutMetrics:
+    """İstek başına havuzdan alınan bağlantı sayısının dağılımı (worker başına)."""
+
+    # Kova üst sınırları; son kova "+Inf"
+    BUCKETS = (0, 1, 2, 3, 5, 10)
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.buckets = [0] * (len(self.BUCKETS) + 1)
+        self.requests = 0
+        self.total = 0
+        self.max = 0
+
+    def observe(self, checkouts: int) -> None:
+        idx = next(
+            (i for i, le in enumerate(self.BUCKETS) if checkouts <= le),
+            len(self.BUCKETS),
+        )
+        with self._lock:
+            self.buckets[idx] += 1
+            self.requests += 1
+            self.total += checkouts
+            self.max = max(self.max, checkouts)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for le, n in zip(self.BUCKETS + ("+Inf",), self.buckets):
+                cumulative += n
+                buckets[str(le)] = cumulative
+            return {
+                "buckets": buckets,
+                "requests": self.requests,
+                "sum": self.total,
+                "max": self.max,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.buckets = [0] * (len(self.BUCKETS) + 1)
+            self.requests = self.total = self.max = 0
+
+
+checkout_metrics = CheckoutMetrics()
+
+
+def track_request_checkouts(engine: Engine) -> None:
+    """Motorun havuz checkout'larını çalışan isteğin sayacına yazar."""
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy) -> None:  # type: ignore[no-untyped-def]
+        ctx = _current.get()
+        if ctx is not None:
+            ctx.checkouts += 1
+
+
+class RequestContextMiddleware:
+    """Her HTTP isteği için yeni bir `RequestContext` (saf ASGI; akış yanıtlarının
+    gövdesi de bağlam içinde üretilir)."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        ctx = RequestContext()
+        token = _current.set(ctx)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            checkout_metrics.observe(ctx.checkouts)
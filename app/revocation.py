@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models.revoked_token import RevokedToken
+
+
+class BloomFilter:
+    """Sabit boyutlu Bloom filtresi: yanlış negatif yok, yanlış pozitif ~error_rate."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key)
+        )
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class RevocationStore:
+    """İptal edilmiş refresh token / token ailesi kimlikleri.
+
+    Kalıcı kayıt DB'dedir (`revokedtoken`); önünde süreç içi bir Bloom filtresi
+    durur. Filtre "yok" diyorsa DB'ye hiç gidilmez, "belki" diyorsa DB'den
+    teyit edilir. Filtre periyodik olarak DB'den yeniden kurulur (süresi
+    dolmuş kayıtlar bu sırada temizlenir); böylece başka worker'larda yapılan
+    iptaller en geç `rebuild_seconds` içinde görünür olur.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, rebuild_seconds: int) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_seconds = rebuild_seconds
+        self.filter_negatives = 0
+        self.db_checks = 0
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._built_at: Optional[float] = None
+        # Yeniden kurulum sürerken eklenen anahtarlar yeni filtreye de aktarılır
+        self._added_during_rebuild: Optional[List[str]] = None
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+
+    def rebuild(self, db: Session) -> None:
+        """Süresi dolmuş kayıtları siler ve filtreyi DB'den yeniden kurar.
+
+        `db`'nin bağlantı kaynağından açılan ayrı bir oturumla çalışır: çağıran
+        isteğin işlemine dokunmaz, commit etmez.
+        """
+        with self._lock:
+            self._added_during_rebuild = []
+        try:
+            with Session(bind=db.get_bind()) as own:
+                own.query(RevokedToken).filter(
+                    RevokedToken.expires_at < _utcnow()
+                ).delete(synchronize_session=False)
+                own.commit()
+                keys = [jti for (jti,) in own.query(RevokedToken.jti)]
+        except BaseException:
+            with self._lock:
+                self._added_during_rebuild = None
+            raise
+        bloom = BloomFilter(max(self.capacity, 2 * len(keys)), self.error_rate)
+        for key in keys:
+            bloom.add(key)
+        with self._lock:
+            for key in self._added_during_rebuild or ():
+                bloom.add(key)
+            self._added_during_rebuild = None
+            self._bloom = bloom
+            self._built_at = time.monotonic()
+
+    def _maybe_rebuild(self, db: Session) -> bool:
+        """Süresi geldiyse filtreyi yeniden kurar; kurulmuş bir filtre varsa True.
+
+        Aynı anda tek istek kurar (kilit beklenmez: async modda olay döngüsünü
+        bloklamaz); diğerleri eski filtreyi, hiç filtre yoksa DB'yi kullanır.
+        """
+        built_at = self._built_at
+        if built_at is not None and time.monotonic() - built_at < self.rebuild_seconds:
+            return True
+        if self._rebuild_lock.acquire(blocking=False):
+            try:
+                self.rebuild(db)
+            finally:
+                self._rebuild_lock.release()
+        return self._built_at is not None
+
+    def is_revoked(self, db: Session, key: str) -> bool:
+        if self._maybe_rebuild(db) and key not in self._bloom:
+            self.filter_negatives += 1
+            return False
+        self.db_checks += 1
+        return (
+            db.query(RevokedToken.id).filter(RevokedToken.jti == key).first()
+            is not None
+        )
+
+    def revoke(
+        self, db: Session, key: str, *, user_id: Optional[int], expires_at: datetime
+    ) -> bool:
+        """Kaydı ekler; anahtar zaten iptal edilmişse False döner."""
+        db.add(RevokedToken(jti=key, user_id=user_id, expires_at=expires_at))
+        try:
+            db.commit()
+            created = True
+        except IntegrityError:
+            db.rollback()
+            created = False
+        with self._lock:
+            self._bloom.add(key)
+            if self._added_during_rebuild is not None:
+                self._added_during_rebuild.append(key)
+        return created
+
+    def stats(self) -> Dict[str, int]:
+        return {"filter_negatives": self.filter_negatives, "db_checks": self.db_checks}
+
+
+revocation_store = RevocationStore(
+    capacity=settings.REFRESH_REVOCATION_CAPACITY,
+    error_rate=settings.REFRESH_REVOCATION_ERROR_RATE,
+    rebuild_seconds=settings.REFRESH_REVOCATION_REBUILD_SECONDS,
+)
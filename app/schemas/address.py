@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, ConfigDict
+
+
+class AddressOut(BaseModel):
+    id: int
+    country: str
+    admin1: str | None = None
+    admin2: str | None = None
+    admin3: str | None = None
+    line_optional: str | None = None
+    model_config = ConfigDict(from_attributes=True)
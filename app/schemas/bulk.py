@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class BulkCreateRequest(BaseModel):
+    # Öğeler tek tek doğrulanır (LoadCreate / VehicleCreate); hatalı öğe tüm
+    # isteği düşürmez, sonuçta kendi indeksiyle raporlanır
+    items: list[dict[str, Any]] = Field(min_length=1)
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: int | None = None
+    error: str | None = None
+
+
+class BulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkItemResult]
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "created": 1,
+                "failed": 1,
+                "results": [
+                    {"index": 0, "id": 42, "error": None},
+                    {
+                        "index": 1,
+                        "id": None,
+                        "error": "Yetki yok (organization admin gerekli)",
+                    },
+                ],
+            }
+        }
+    )
+
+
+class ImportRowError(BaseModel):
+    # CSV'de başlık 1. satırdır; NDJSON'da dosyadaki satır numarası
+    line: int
+    error: str
+
+
+class ImportResponse(BaseModel):
+    rows: int
+    imported: int
+    failed: int
+    # İlk MAX_REPORTED_ERRORS hata; `failed` toplam sayıyı verir
+    errors: list[ImportRowError]
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, ConfigDict
+
+
+class DistanceOut(BaseModel):
+    # Matristeki bölgeler (ilçe matriste yoksa il): ÜLKE/il[/ilçe]
+    from_region: str
+    to_region: str
+    distance_km: float
+    duration_min: float
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "from_region": "TR/İstanbul",
+                "to_region": "TR/Ankara",
+                "distance_km": 456.2,
+                "duration_min": 391.0,
+            }
+        }
+    )
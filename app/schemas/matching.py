@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from datetime import date
+
+from pydantic import BaseModel, ConfigDict
+
+from app.models.enums import Category, Unit
+
+
+class SuggestedOffer(BaseModel):
+    offer_id: int
+    vehicle_id: int
+    from_address_id: int
+    to_address_id: int
+    depart_date: date
+    # 0-100: varış ili aynı (50), tarih yakınlığı (30), araç doluluğu (20)
+    score: float
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "offer_id": 7,
+                "vehicle_id": 3,
+                "from_address_id": 1,
+                "to_address_id": 2,
+                "depart_date": "2025-12-31",
+                "score": 92.5,
+            }
+        }
+    )
+
+
+class SuggestedLoad(BaseModel):
+    load_id: int
+    pickup_address_id: int
+    dropoff_address_id: int
+    pickup_day: date
+    quantity_value: float | None = None
+    quantity_unit: Unit | None = None
+    category: Category | None = None
+    score: float
+
+
+class CorridorLoad(BaseModel):
+    load_id: int
+    pickup_address_id: int
+    dropoff_address_id: int
+    pickup_day: date
+    quantity_value: float | None = None
+    quantity_unit: Unit | None = None
+    category: Category | None = None
+    # Yükü almak ve teslim etmek için teklifin güzergahına eklenen yol
+    detour_km: float
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "load_id": 42,
+                "pickup_address_id": 5,
+                "dropoff_address_id": 9,
+                "pickup_day": "2025-12-31",
+                "quantity_value": 12.5,
+                "quantity_unit": "TON",
+                "category": None,
+                "detour_km": 18.4,
+            }
+        }
+    )
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from datetime import date
+
+from pydantic import BaseModel, ConfigDict
+
+
+class OfferBase(BaseModel):
+    vehicle_id: int
+    from_address_id: int
+    to_address_id: int
+    depart_date: date
+
+
+class OfferCreate(OfferBase):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "vehicle_id": 3,
+                "from_address_id": 1,
+                "to_address_id": 2,
+                "depart_date": "2025-12-31",
+            }
+        }
+    )
+
+
+class OfferUpdate(BaseModel):
+    vehicle_id: int | None = None
+    from_address_id: int | None = None
+    to_address_id: int | None = None
+    depart_date: date | None = None
+
+
+class OfferOut(OfferBase):
+    id: int
+    model_config = ConfigDict(from_attributes=True)
@@ -1,61 +1,103 @@
 from __future__ import annotations
 
+import uuid
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
-
-from jose import jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict
 
 from .config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# python-jose (cryptography backend'iyle) ve passlib içe aktarması soğuk
+# başlangıca ~40 ms ekler; ilk token/parola işleminde yüklenirler
+
+
+@lru_cache(maxsize=1)
+def _jwt() -> Any:
+    from jose import jwt
+
+    return jwt
+
+
+@lru_cache(maxsize=1)
+def pwd_context() -> "CryptContext":
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 
-def _create_token(subject: str, expires_delta: timedelta, token_type: str) -> str:
+def _create_token(
+    subject: str,
+    expires_delta: timedelta,
+    token_type: str,
+    extra_claims: Dict[str, Any] | None = None,
+) -> str:
     now = datetime.now(timezone.utc)
-    to_encode: Dict[str, Any] = {
-        "sub": subject,
-        "type": token_type,
-        "iat": int(now.timestamp()),
-        "exp": int((now + expires_delta).timestamp()),
-    }
-    return jwt.encode(
+    to_encode: Dict[str, Any] = dict(extra_claims or {})
+    to_encode.update(
+        {
+            "sub": subject,
+            "type": token_type,
+            "iat": int(now.timestamp()),
+            "exp": int((now + expires_delta).timestamp()),
+        }
+    )
+    return _jwt().encode(
         to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
     )
 
 
-def create_access_token(subject: str) -> str:
+def create_access_token(
+    subject: str, *, extra_claims: Dict[str, Any] | None = None
+) -> str:
     return _create_token(
-        subject, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES), "access"
+        subject,
+        timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        "access",
+        extra_claims,
     )
 
 
-def create_refresh_token(subject: str) -> str:
+def create_refresh_token(subject: str, *, family: str | None = None) -> str:
+    """Her refresh token benzersiz bir `jti` taşır; `fam` girişte oluşturulan
+    rotasyon zincirini tanımlar ve yeniden kullanımda tüm zincir iptal edilir."""
     return _create_token(
-        subject, timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES), "refresh"
+        subject,
+        timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+        "refresh",
+        {"jti": uuid.uuid4().hex, "fam": family or uuid.uuid4().hex},
     )
 
 
 def decode_token(token: str) -> Dict[str, Any]:
     """Decode JWT and return payload without validation beyond signature/exp."""
-    return jwt.decode(
+    return _jwt().decode(
         token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
     )
 
 
-def get_subject_from_token(token: str, *, expected_type: str | None = None) -> str:
+def get_payload_from_token(
+    token: str, *, expected_type: str | None = None
+) -> Dict[str, Any]:
+    """Decode JWT and validate its type and subject; return the full payload."""
     payload = decode_token(token)
     if expected_type and payload.get("type") != expected_type:
         raise ValueError("Invalid token type")
     sub = payload.get("sub")
     if not isinstance(sub, str) or not sub:
         raise ValueError("Invalid token subject")
-    return sub
+    return payload
+
+
+def get_subject_from_token(token: str, *, expected_type: str | None = None) -> str:
+    return get_payload_from_token(token, expected_type=expected_type)["sub"]
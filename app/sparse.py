@@ -0,0 +1,174 @@
+"""`?fields=` (seyrek alan kümesi) ve `?expand=` (ilişki genişletme).
+
+`fields` yalnızca istenen kolonları SELECT listesine koyar (`id` her zaman
+döner; cursor için gerekir). `expand` ilişkili kaydı yanıta gömer; ilişki
+başına tek bir `selectinload` sorgusu çalışır, satır sayısından bağımsızdır
+(N+1 yok). Genişletme yoksa listeler ORM'siz Core satırı yolunda kalır.
+
+    GET /loads/?fields=name,pickup_day
+    GET /loads/42?expand=pickup_address,dropoff_address
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy.orm import load_only, selectinload
+
+from .models.load import Load
+from .models.organization import Organization
+from .models.vehicle import Vehicle
+from .schemas.address import AddressOut
+from .schemas.load import LoadOut
+from .schemas.organization import OrganizationOut
+from .schemas.vehicle import VehicleOut
+
+
+@dataclass(frozen=True)
+class Relation:
+    name: str
+    # selectinload üst kaydın FK'sını kullanır; projeksiyonda yoksa eklenir
+    fk: str
+    schema: type[BaseModel]
+
+
+@dataclass(frozen=True)
+class Resource:
+    model: Any
+    schema: type[BaseModel]
+    relations: Tuple[Relation, ...] = ()
+
+    def relation(self, name: str) -> Relation:
+        return next(r for r in self.relations if r.name == name)
+
+
+LOADS = Resource(
+    Load,
+    LoadOut,
+    (
+        Relation("pickup_address", "pickup_address_id", AddressOut),
+        Relation("dropoff_address", "dropoff_address_id", AddressOut),
+        Relation("organization", "organization_id", OrganizationOut),
+    ),
+)
+VEHICLES = Resource(
+    Vehicle, VehicleOut, (Relation("organization", "organization_id", OrganizationOut),)
+)
+ORGS = Resource(
+    Organization, OrganizationOut, (Relation("address", "address_id", AddressOut),)
+)
+
+
+@dataclass(frozen=True)
+class Shape:
+    """Bir isteğin istediği yanıt biçimi: kolonlar (şema sırasıyla) ve ilişkiler."""
+
+    resource: Resource
+    columns: Tuple[str, ...]
+    expand: Tuple[str, ...] = ()
+
+    def options(self) -> List[Any]:
+        """Sorguya eklenecek ORM seçenekleri: `load_only` + ilişki başına `selectinload`.
+
+        `updated_at` her zaman yüklenir: ETag bundan türetilir (`app.etag`).
+        """
+        model = self.resource.model
+        relations = [self.resource.relation(n) for n in self.expand]
+        columns = dict.fromkeys(
+            [*self.columns, *(r.fk for r in relations), "updated_at"]
+        )
+        opts: List[Any] = [load_only(*(getattr(model, c) for c in columns))]
+        for r in relations:
+            attr = getattr(model, r.name)
+            target = attr.property.mapper.class_
+            opts.append(
+                selectinload(attr).load_only(
+                    *(getattr(target, f) for f in r.schema.model_fields),
+                    target.updated_at,
+                )
+            )
+        return opts
+
+    def dump(self, objs: Sequence[Any]) -> bytes:
+        """ORM nesnelerini bu biçimde JSON dizisine kodlar."""
+        adapter = _list_adapter(self)
+        return adapter.dump_json(adapter.validate_python(objs, from_attributes=True))
+
+    def dump_one(self, obj: Any) -> bytes:
+        # Dizi kodlayıcısı yeniden kullanılır: baştaki "[" ve sondaki "]" atılır
+        return self.dump([obj])[1:-1]
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(shape: Shape) -> TypeAdapter:
+    schema = shape.resource.schema
+    fields: dict[str, Any] = {
+        c: (schema.model_fields[c].annotation, ...) for c in shape.columns
+    }
+    for name in shape.expand:
+        fields[name] = (Optional[shape.resource.relation(name).schema], None)
+    model = create_model(  # type: ignore[call-overload]
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **fields,
+    )
+    return TypeAdapter(list[model])  # type: ignore[valid-type]
+
+
+def _names(value: Optional[str]) -> List[str]:
+    return [n.strip() for n in (value or "").split(",") if n.strip()]
+
+
+def parse_shape(
+    resource: Resource, fields: Optional[str], expand: Optional[str]
+) -> Shape:
+    all_fields = tuple(resource.schema.model_fields)
+    requested = set(_names(fields))
+    unknown = requested - set(all_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bilinmeyen alan: {', '.join(sorted(unknown))}",
+        )
+    columns = (
+        tuple(f for f in all_fields if f in requested or f == "id")
+        if requested
+        else all_fields
+    )
+    names = set(_names(expand))
+    allowed = [r.name for r in resource.relations]
+    unknown = names - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Genişletilemeyen ilişki: {', '.join(sorted(unknown))}",
+        )
+    return Shape(resource, columns, tuple(n for n in allowed if n in names))
+
+
+def shape_param(resource: Resource) -> Callable[..., Shape]:
+    """`fields` ve `expand` sorgu parametrelerini okuyan bağımlılık."""
+    field_names = ", ".join(resource.schema.model_fields)
+    relation_names = ", ".join(r.name for r in resource.relations)
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description=f"Virgülle ayrılmış alanlar (`id` her zaman döner): {field_names}",
+        ),
+        expand: Optional[str] = Query(
+            None, description=f"Yanıta gömülecek ilişkiler: {relation_names}"
+        ),
+    ) -> Shape:
+        return parse_shape(resource, fields, expand)
+
+    return dependency
+
+
+load_shape = shape_param(LOADS)
+vehicle_shape = shape_param(VEHICLES)
+org_shape = shape_param(ORGS)
@@ -0,0 +1,41 @@
+"""get_current_user: önbelleksiz (JWT doğrulama + DB) ve önbellekli yol.
+
+    python -m benchmarks.bench_auth_cache
+"""
+
+from __future__ import annotations
+
+from app.auth_cache import token_cache
+from app.crud import user as user_crud
+from app.deps import get_current_user
+from app.security import create_access_token
+
+from .common import make_sessionmaker, measure, report
+
+N = 5000
+
+
+def main() -> None:
+    SessionLocal = make_sessionmaker()
+    with SessionLocal() as db:
+        u = user_crud.create(db, email="bench@example.com", password="secret123")
+        token = create_access_token(str(u.id))
+
+    def uncached() -> None:
+        token_cache.clear()
+        with SessionLocal() as db:
+            get_current_user(token, db)
+
+    def cached() -> None:
+        with SessionLocal() as db:
+            get_current_user(token, db)
+
+    report("miss (decode + SELECT user)", measure(uncached, N))
+    token_cache.clear()
+    cached()
+    report("hit (cache)", measure(cached, N))
+    print("cache stats:", token_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
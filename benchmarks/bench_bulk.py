@@ -0,0 +1,74 @@
+"""Toplu oluşturma verimi: N adet `POST /loads/` vs tek `POST /loads/bulk`.
+
+    python -m benchmarks.bench_bulk
+"""
+
+from __future__ import annotations
+
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.db import SessionLocal
+from app.deps import get_db
+from app.main import app
+from app.models.address import Address
+
+from .common import make_sessionmaker
+
+N = 500
+
+
+def main() -> None:
+    engine = make_sessionmaker().kw["bind"]
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.post("/auth/register", json={"email": "b@example.com", "password": "x" * 8})
+    token = client.post(
+        "/auth/login", json={"email": "b@example.com", "password": "x" * 8}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    with Session() as db:
+        a = Address(country="TR", admin1="IST")
+        db.add(a)
+        db.commit()
+        address_id = a.id
+    items = [
+        {
+            "name": f"Koli {i}",
+            "pickup_address_id": address_id,
+            "dropoff_address_id": address_id,
+            "pickup_day": "2025-12-31",
+        }
+        for i in range(N)
+    ]
+    client.get("/auth/me", headers=headers)  # token önbelleğini ısıt
+
+    t0 = time.perf_counter()
+    for item in items:
+        assert client.post("/loads/", json=item, headers=headers).status_code == 201
+    single = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    res = client.post("/loads/bulk", json={"items": items}, headers=headers)
+    assert res.status_code == 200 and res.json()["created"] == N, res.text
+    bulk = time.perf_counter() - t0
+
+    print(
+        f"{N} x POST /loads/       {single * 1e3:>9.1f} ms  {N / single:>9.0f} öğe/sn"
+    )
+    print(f"1 x POST /loads/bulk     {bulk * 1e3:>9.1f} ms  {N / bulk:>9.0f} öğe/sn")
+
+
+if __name__ == "__main__":
+    main()
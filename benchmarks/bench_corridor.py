@@ -0,0 +1,150 @@
+"""Güzergah (koridor) araması: güzergah kovaları vs tüm yüklerin taranması.
+
+`bench_matching` ile aynı veri (100k açık yük, 20k teklif, 81 il, 60 günlük
+ufuk) üretilir; iller paketli il merkezlerinden derlenen matrisin satırlarına
+eşlenir. Rastgele teklifler için farklı sapma bütçelerinde en iyi 20 yük:
+
+- indeks: `CandidateIndex.loads_along` (elips ön elemesi + `(alım, teslim,
+  gün)` kovaları),
+- tarama: tüm açık yüklerin sapması NumPy ile tek seferde hesaplanır, yetenek
+  ve kapasite kontrolü eşleşenlerde Python'da (aynı sonuç).
+
+Ayrıca güzergah kovalarının indeks kurulumuna eklediği süre ölçülür.
+
+    python -m benchmarks.bench_corridor [yük sayısı] [teklif sayısı]
+"""
+
+from __future__ import annotations
+
+import heapq
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app import distance
+from app.config import settings
+from app.distance import RegionPoint, build, read_regions
+from app.matching import CandidateIndex, compatible, fits, matching_service
+
+from .bench_matching import LOADS, OFFERS, PROVINCES, seed
+from .common import make_sessionmaker, measure, report
+
+LIMIT = 20
+QUERIES = 300
+DETOURS = (25, 50, 100, 200)
+
+
+def _matrix(directory: Path) -> None:
+    # `seed`'in IL00..IL80 illeri paketli dosyadaki il merkezlerine oturtulur
+    points = read_regions(distance.REGIONS_FILE)[:PROVINCES]
+    build(
+        [
+            RegionPoint(("TR", f"IL{i:02d}", None), p.lat, p.lon)
+            for i, p in enumerate(points)
+        ]
+    ).save(directory)
+
+
+class FullScan:
+    """Tüm açık yüklerin sapmasını her sorguda vektörel hesaplar."""
+
+    def __init__(self, index: CandidateIndex) -> None:
+        matrix = index.matrix
+        self.window = index.window
+        self.matrix = matrix
+        self.km = np.asarray(matrix.km, dtype=np.float64)
+        self.loads = list(index.loads.values())
+        self.pickup = matrix.rows(load.origin for load in self.loads)
+        self.dropoff = matrix.rows(load.destination for load in self.loads)
+        self.day = np.array([load.day for load in self.loads])
+        self.valid = (self.pickup >= 0) & (self.dropoff >= 0)
+
+    def __call__(self, offer, detour_km: float):
+        a = self.matrix.index_of(*offer.origin)
+        b = self.matrix.index_of(*offer.destination)
+        km = self.km
+        extra = (
+            km[a, self.pickup]
+            + km[self.pickup, self.dropoff]
+            + km[self.dropoff, b]
+            - km[a, b]
+        )
+        hit = np.flatnonzero(
+            self.valid
+            & (extra <= detour_km)
+            & (np.abs(self.day - offer.day) <= self.window)
+        )
+        found = [
+            (self.loads[i], max(float(extra[i]), 0.0))
+            for i in hit.tolist()
+            if compatible(self.loads[i].need, offer.cap) and fits(self.loads[i], offer)
+        ]
+        return heapq.nsmallest(
+            LIMIT, found, key=lambda p: (p[1], abs(p[0].day - offer.day), p[0].id)
+        )
+
+
+def main() -> None:
+    n_loads = int(sys.argv[1]) if len(sys.argv) > 1 else LOADS
+    n_offers = int(sys.argv[2]) if len(sys.argv) > 2 else OFFERS
+    rng = random.Random(42)
+    Session = make_sessionmaker()
+    with Session() as db, tempfile.TemporaryDirectory() as directory:
+        t0 = time.perf_counter()
+        seed(db, n_loads, n_offers, rng)
+        print(
+            f"veri: {n_loads} yük, {n_offers} teklif ({time.perf_counter() - t0:.1f}s)"
+        )
+
+        settings.DISTANCE_MATRIX_DIR = str(Path(directory) / "yok")
+        distance.get_matrix.cache_clear()
+        t0 = time.perf_counter()
+        matching_service.rebuild(db)
+        print(f"indeks kurulumu (matrissiz): {(time.perf_counter() - t0) * 1e3:.0f}ms")
+
+        _matrix(Path(directory))
+        settings.DISTANCE_MATRIX_DIR = directory
+        distance.get_matrix.cache_clear()
+        t0 = time.perf_counter()
+        index = matching_service.rebuild(db)
+        print(
+            f"indeks kurulumu (güzergah kovalarıyla): "
+            f"{(time.perf_counter() - t0) * 1e3:.0f}ms, "
+            f"{len(index._route_buckets)} kova"
+        )
+
+        scan = FullScan(index)
+        offers = [o for o in index.offers.values() if o.origin != o.destination]
+        offers = rng.sample(offers, QUERIES)
+        for offer in offers[:20]:
+            for detour_km in DETOURS:
+                assert index.loads_along(offer, detour_km, LIMIT) == scan(
+                    offer, detour_km
+                )
+
+        def each(items, fn):
+            it = iter(items)
+            return lambda: fn(next(it))
+
+        for detour_km in DETOURS:
+            found = sum(len(index.loads_along(o, detour_km, None)) for o in offers)
+            print(f"sapma {detour_km} km: teklif başına ort. {found / QUERIES:.0f} yük")
+            report(
+                f"index  sapma={detour_km:<3}",
+                measure(
+                    each(offers, lambda o: index.loads_along(o, detour_km, LIMIT)),
+                    QUERIES,
+                ),
+            )
+            report(
+                f"tarama sapma={detour_km:<3}",
+                measure(each(offers, lambda o: scan(o, detour_km)), QUERIES),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Mesafe matrisi: worker başına açılış süresi ve bellek (mmap vs kopya).
+
+İlçe ölçeğinde (varsayılan 1000 bölge; Türkiye'de 973 ilçe) sentetik bir
+matris derlenir. Her modda aynı anda çalışan `WORKERS` süreç matrisi açar,
+tüm sayfalara dokunur (`km.sum()` + rastgele aramalar) ve hepsi hazır
+olduğunda `/proc/self/smaps_rollup`'tan ölçer:
+
+- açılış: `DistanceMatrix.open` süresi,
+- RSS: süreçte yerleşik bellek artışı,
+- PSS: paylaşılan sayfalar süreç sayısına bölünmüş pay,
+- private: yalnızca bu sürece ait sayfalar.
+
+mmap'te RSS her worker'da matris kadar artar ama sayfalar paylaşılır (PSS ve
+private küçük); kopyada (`mmap=False`) her worker matrisin tamamını özel
+bellekte tutar.
+
+    python -m benchmarks.bench_distance [bölge sayısı] [worker sayısı]
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from app.distance import DistanceMatrix, RegionPoint, build
+
+REGIONS = 1000
+WORKERS = 4
+LOOKUPS = 100_000
+
+
+def _memory() -> Dict[str, float]:
+    """Sürecin RSS / PSS / private belleği (MB)."""
+    values: Dict[str, float] = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "private": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def _worker(directory: str, use_mmap: bool, ready, results) -> None:
+    before = _memory()
+    t0 = time.perf_counter()
+    matrix = DistanceMatrix.open(Path(directory), mmap=use_mmap)
+    open_ms = (time.perf_counter() - t0) * 1e3
+
+    rng = np.random.default_rng()
+    a = rng.integers(0, len(matrix), LOOKUPS)
+    b = rng.integers(0, len(matrix), LOOKUPS)
+    t0 = time.perf_counter()
+    matrix.km.sum(), matrix.minutes.sum()
+    touch_ms = (time.perf_counter() - t0) * 1e3
+    t0 = time.perf_counter()
+    matrix.km[a, b]
+    lookup_us = (time.perf_counter() - t0) * 1e6 / LOOKUPS
+
+    # Ölçüm, tüm worker'lar matrise dokunduktan sonra (paylaşım PSS'e yansısın)
+    ready.wait()
+    after = _memory()
+    results.put(
+        {
+            "open_ms": open_ms,
+            "touch_ms": touch_ms,
+            "lookup_us": lookup_us,
+            **{k: after[k] - before[k] for k in after},
+        }
+    )
+
+
+def _run(directory: str, use_mmap: bool, workers: int):
+    ctx = mp.get_context("spawn")
+    ready = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(directory, use_mmap, ready, results))
+        for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return rows
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else REGIONS
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else WORKERS
+    rng = random.Random(42)
+    # Türkiye sınırları içinde rastgele "ilçe" merkezleri
+    points = [
+        RegionPoint(
+            ("TR", f"IL{i // 12:02d}", f"ILCE{i}"),
+            rng.uniform(36.0, 42.0),
+            rng.uniform(26.0, 44.8),
+        )
+        for i in range(n)
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        t0 = time.perf_counter()
+        matrix = build(points)
+        matrix.save(Path(directory))
+        size = (matrix.km.nbytes + matrix.minutes.nbytes) / 2**20
+        print(
+            f"matris: {n} bölge, {size:.1f} MB "
+            f"(derleme {(time.perf_counter() - t0) * 1e3:.0f}ms), {workers} worker"
+        )
+        for label, use_mmap in (("mmap", True), ("kopya", False)):
+            rows = _run(directory, use_mmap, workers)
+            for i, r in enumerate(rows):
+                print(
+                    f"{label:<6} worker {i}: açılış={r['open_ms']:6.2f}ms "
+                    f"dokunma={r['touch_ms']:6.1f}ms arama={r['lookup_us']:5.3f}us "
+                    f"RSS=+{r['rss']:5.1f}MB PSS=+{r['pss']:5.1f}MB "
+                    f"private=+{r['private']:5.1f}MB"
+                )
+            total = sum(r["pss"] for r in rows)
+            print(f"{label:<6} toplam PSS artışı: {total:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
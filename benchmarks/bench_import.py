@@ -0,0 +1,69 @@
+"""CSV içe aktarma verimi ve bellek: `app.load_import.import_loads`.
+
+Diske N satırlık bir CSV yazılır ve parça parça içe aktarılır; satır/sn ile
+içe aktarma öncesi ve sonrası tepe RSS raporlanır (tepe RSS'in dosya
+boyutundan bağımsız kalması beklenir). PostgreSQL'de (`BENCH_DATABASE_URL`)
+yazma `COPY` ile, SQLite'ta executemany INSERT ile yapılır. Bellek içi
+SQLite'ta tablo da RSS'e yazılır; bellek ölçümü için dosya URL'i verin
+(`BENCH_DATABASE_URL=sqlite:////tmp/bench.db`).
+
+    python -m benchmarks.bench_import [satır sayısı]
+"""
+
+from __future__ import annotations
+
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from app.load_import import import_loads
+from app.models.address import Address
+from app.models.user import User
+
+from .common import make_sessionmaker
+
+
+def _peak_rss_mb() -> float:
+    # Linux'ta ru_maxrss KB cinsindendir
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    Session = make_sessionmaker()
+    with Session() as db:
+        user = User(email="import@example.com", password_hash="x")
+        a = Address(country="TR", admin1="IST")
+        db.add_all([user, a])
+        db.commit()
+        user_id, address_id = user.id, a.id
+
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+        f.write("name,pickup_address_id,dropoff_address_id,pickup_day,quantity_value\n")
+        for i in range(n):
+            f.write(f"Koli {i},{address_id},{address_id},2025-12-31,{i % 500}\n")
+        path = f.name
+    size_mb = os.path.getsize(path) / 1e6
+
+    before = _peak_rss_mb()
+    try:
+        with Session() as db, open(path, "rb") as stream:
+            t0 = time.perf_counter()
+            result = import_loads(
+                db, stream, "csv", owner_user_id=user_id, authorize_orgs=False
+            )
+            elapsed = time.perf_counter() - t0
+    finally:
+        os.unlink(path)
+    assert result.imported == n, result
+
+    print(f"dosya            {size_mb:>9.1f} MB  {n} satır")
+    print(f"süre             {elapsed:>9.2f} s   {n / elapsed:>9.0f} satır/sn")
+    print(f"tepe RSS (önce)  {before:>9.1f} MB")
+    print(f"tepe RSS (sonra) {_peak_rss_mb():>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
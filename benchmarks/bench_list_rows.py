@@ -0,0 +1,94 @@
+"""Liste serileştirme maliyeti: ORM + `LoadOut` yolu vs Core satırı hızlı yolu.
+
+1000 satırlık bir `GET /loads/?limit=1000` sayfasının handler içindeki işi
+ölçülür (sorgu + nesne/satır üretimi + JSON). Eski yol: `load.list_my` ile
+ORM nesneleri, FastAPI'nin `response_model` işi gibi `list[LoadOut]`
+doğrulaması (`from_attributes`) ve JSON. Yeni yol: `load.list_my_rows` ve
+`pagination.json_page`. Süre süreç CPU zamanıdır.
+
+    python -m benchmarks.bench_list_rows
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import time
+from datetime import date
+from typing import Callable
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import load as load_crud
+from app.db import SessionLocal
+from app.models.address import Address
+from app.models.load import Load
+from app.models.user import User
+from app.pagination import json_page
+from app.schemas.load import LoadOut
+
+from .common import make_sessionmaker
+
+ROWS = 1000
+REPEAT = 50
+
+_adapter = TypeAdapter(list[LoadOut])
+_columns = list(LoadOut.model_fields)
+
+
+def _cpu_ms(fn: Callable[[], object]) -> float:
+    samples = []
+    for _ in range(REPEAT):
+        t0 = time.process_time()
+        fn()
+        samples.append(time.process_time() - t0)
+    return statistics.median(samples) * 1e3
+
+
+def main() -> None:
+    engine = make_sessionmaker().kw["bind"]
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+    with Session() as db:
+        user = User(email="list@example.com", password_hash="x")
+        a = Address(country="TR", admin1="IST")
+        db.add_all([user, a])
+        db.flush()
+        db.add_all(
+            Load(
+                owner_user_id=user.id,
+                name=f"Koli {i}",
+                quantity_value=i % 500,
+                pickup_address_id=a.id,
+                dropoff_address_id=a.id,
+                pickup_day=date(2025, 12, 31),
+            )
+            for i in range(ROWS)
+        )
+        db.commit()
+        user_id = user.id
+
+    def orm_path() -> bytes:
+        # İstek başına yeni oturum: identity map ısınmış olmasın
+        with Session() as db:
+            objs = load_crud.list_my(db, user_id, limit=ROWS + 1)
+            data = _adapter.dump_python(
+                _adapter.validate_python(objs[:ROWS], from_attributes=True),
+                mode="json",
+            )
+            return json.dumps(data).encode()
+
+    def rows_path() -> bytes:
+        with Session() as db:
+            rows = load_crud.list_my_rows(db, user_id, _columns, limit=ROWS + 1)
+            return json_page("loads", rows, ROWS).body
+
+    assert json.loads(orm_path()) == json.loads(rows_path())
+    orm_ms, rows_ms = _cpu_ms(orm_path), _cpu_ms(rows_path)
+    print(f"ORM + LoadOut        {orm_ms:>7.2f} ms CPU / {ROWS} satır")
+    print(f"Core satırı + to_json {rows_ms:>6.2f} ms CPU / {ROWS} satır")
+    print(f"hızlanma             {orm_ms / rows_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
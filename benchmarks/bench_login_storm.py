@@ -0,0 +1,107 @@
+"""Login fırtınası sırasında `GET /loads/` gecikmesi (p99).
+
+bcrypt'in istek thread'inde (PASSWORD_POOL_WORKERS=0) ve ayrı process
+havuzunda çalıştığı iki mod karşılaştırılır:
+
+    python -m benchmarks.bench_login_storm
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import auth as auth_api
+from app.crud import user as user_crud
+from app.deps import get_db
+from app.main import app
+from app.models.base import Base
+from app.passwords import PasswordService
+from app.security import create_access_token
+
+from .common import report
+
+STORM_CLIENTS = int(os.getenv("BENCH_STORM_CLIENTS", "64"))
+PROBES = int(os.getenv("BENCH_PROBES", "300"))
+PORT = 8765
+
+
+def _serve() -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=PORT, log_level="error")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def _run(label: str, svc: PasswordService, token: str) -> None:
+    auth_api.password_service = svc
+    stop = threading.Event()
+    statuses: dict[int, int] = {}
+
+    def storm() -> None:
+        with httpx.Client(base_url=f"http://127.0.0.1:{PORT}", timeout=60) as c:
+            while not stop.is_set():
+                r = c.post(
+                    "/auth/login",
+                    json={"email": "storm@example.com", "password": "secret123"},
+                )
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+    threads = [threading.Thread(target=storm) for _ in range(STORM_CLIENTS)]
+    for t in threads:
+        t.start()
+    time.sleep(1.0)
+
+    samples = []
+    headers = {"Authorization": f"Bearer {token}"}
+    with httpx.Client(base_url=f"http://127.0.0.1:{PORT}", timeout=60) as c:
+        for _ in range(PROBES):
+            t0 = time.perf_counter()
+            c.get("/loads/", headers=headers)
+            samples.append(time.perf_counter() - t0)
+    stop.set()
+    for t in threads:
+        t.join()
+    svc.shutdown()
+    report(f"GET /loads/ [{label}]", samples)
+    print("  login status counts:", dict(sorted(statuses.items())))
+
+
+def main() -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(
+        f"sqlite+pysqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    with SessionLocal() as db:
+        u = user_crud.create(db, email="storm@example.com", password="secret123")
+        token = create_access_token(str(u.id))
+
+    _serve()
+    _run("inline bcrypt", PasswordService(workers=0, max_pending=1000), token)
+    _run("process pool 2+16", PasswordService(workers=2, max_pending=16), token)
+
+
+if __name__ == "__main__":
+    main()
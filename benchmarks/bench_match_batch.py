@@ -0,0 +1,63 @@
+"""Toplu yeniden skorlama: 200k açık yük × 50k açık teklif.
+
+Veri `bench_matching` ile aynı dağılımdadır (81 il, çarpık; 60 günlük ufuk).
+`rescore_all` blok başına skor ve yazma sürelerini raporlar; en yavaş
+bloklar, toplamlar ve tepe RSS yazdırılır. Tam matris (200k × 50k int64
+= 80 GB) hiçbir zaman oluşmaz; tepe bellek blok boyutuyla sınırlıdır.
+
+    python -m benchmarks.bench_match_batch [yük sayısı] [teklif sayısı]
+"""
+
+from __future__ import annotations
+
+import random
+import resource
+import sys
+import time
+
+from app.match_batch import format_block, rescore_all
+
+from .bench_matching import seed
+from .common import make_sessionmaker
+
+LOADS = 200_000
+OFFERS = 50_000
+
+
+def _peak_rss_mb() -> float:
+    # Linux'ta ru_maxrss KB cinsindendir
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    n_loads = int(sys.argv[1]) if len(sys.argv) > 1 else LOADS
+    n_offers = int(sys.argv[2]) if len(sys.argv) > 2 else OFFERS
+    Session = make_sessionmaker()
+    with Session() as db:
+        t0 = time.perf_counter()
+        seed(db, n_loads, n_offers, random.Random(42))
+        print(
+            f"veri: {n_loads} yük, {n_offers} teklif ({time.perf_counter() - t0:.1f}s)"
+        )
+        print(f"tepe RSS (önce) {_peak_rss_mb():>9.1f} MB")
+
+        for write in (False, True):
+            result = rescore_all(db, write=write)
+            label = "skor + yazma" if write else "yalnızca skor"
+            print(
+                f"\n{label}: {len(result.blocks)} blok, {result.suggestions} öneri, "
+                f"{sum(b.pairs for b in result.blocks):,} çift skorlandı"
+            )
+            print(
+                f"  anlık görüntü {result.snapshot_ms:8.0f}ms  skor "
+                f"{result.score_ms:8.0f}ms  yazma {result.write_ms:8.0f}ms  "
+                f"toplam {result.total_ms:8.0f}ms"
+            )
+            print("  en yavaş bloklar:")
+            for block in sorted(result.blocks, key=lambda b: -b.score_ms)[:5]:
+                print("   ", format_block(block))
+        print(f"\ntepe RSS (sonra) {_peak_rss_mb():>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
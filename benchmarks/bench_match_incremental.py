@@ -0,0 +1,127 @@
+"""Artımlı eşleştirme: tek yazmanın indekse ve öneri tablosuna yansıma süresi.
+
+Veri `bench_matching` ile aynıdır (100k yük, 20k teklif). Öneri tablosu önce
+`rescore_all` ile doldurulur ve indeks kurulur; ardından CRUD üzerinden
+rastgele yük / teklif oluşturma ve güncellemeleri ölçülür. Süre commit'ten
+abonenin (`MatchingService.apply`) öneri satırlarını yazıp commit etmesine
+kadar tüm yazma çağrısını kapsar. Sonda indeks ve tablo tam yeniden hesapla
+karşılaştırılır.
+
+    python -m benchmarks.bench_match_incremental [yük sayısı] [teklif sayısı]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.crud import load as load_crud
+from app.crud import offer as offer_crud
+from app.match_batch import rescore_all
+from app.matching import matching_service
+from app.models.match_suggestion import MatchSuggestion
+from app.models.vehicle import Vehicle
+
+from .bench_matching import HORIZON_DAYS, PROVINCES, seed
+from .common import make_sessionmaker, measure, report
+
+LOADS = 100_000
+OFFERS = 20_000
+WRITES = 200
+
+
+def _suggestions(db):
+    return db.execute(
+        select(
+            MatchSuggestion.load_id,
+            MatchSuggestion.rank,
+            MatchSuggestion.offer_id,
+            MatchSuggestion.score,
+        ).order_by(MatchSuggestion.load_id, MatchSuggestion.rank)
+    ).all()
+
+
+def main() -> None:
+    n_loads = int(sys.argv[1]) if len(sys.argv) > 1 else LOADS
+    n_offers = int(sys.argv[2]) if len(sys.argv) > 2 else OFFERS
+    rng = random.Random(42)
+    Session = make_sessionmaker()
+    with Session() as db:
+        t0 = time.perf_counter()
+        seed(db, n_loads, n_offers, rng)
+        result = rescore_all(db, k=matching_service.top_k)
+        matching_service.rebuild(db)
+        print(
+            f"veri: {n_loads} yük, {n_offers} teklif, {result.suggestions} öneri "
+            f"({time.perf_counter() - t0:.1f}s)"
+        )
+        matching_service.rebuild_seconds = 10**9
+
+        user_id = 1
+        vehicle_ids = db.scalars(select(Vehicle.id)).all()
+        today = date.today()
+
+        def place() -> int:
+            return rng.randint(1, PROVINCES)
+
+        def day() -> date:
+            return today + timedelta(days=rng.randrange(HORIZON_DAYS))
+
+        def create_load() -> None:
+            load_crud.create(
+                db,
+                owner_user_id=user_id,
+                organization_id=None,
+                name="Yeni",
+                quantity_value=rng.uniform(1, 20),
+                quantity_unit="TON",
+                category=None,
+                pickup_address_id=place(),
+                dropoff_address_id=place(),
+                pickup_day=day(),
+                intl=False,
+            )
+
+        def create_offer() -> None:
+            offer_crud.create(
+                db,
+                vehicle_id=rng.choice(vehicle_ids),
+                from_address_id=place(),
+                to_address_id=place(),
+                depart_date=day(),
+            )
+
+        offer_ids = rng.sample(sorted(matching_service.index(db).offers), WRITES)
+
+        def move_offer() -> None:
+            offer_crud.update_authorized(
+                db,
+                offer_ids.pop(),
+                user_id=user_id,
+                admin_org_ids=(),
+                from_address_id=place(),
+                depart_date=day(),
+            )
+
+        report("load create (+suggestions)", measure(create_load, WRITES))
+        report("offer create (+suggestions)", measure(create_offer, WRITES))
+        report("offer update (+suggestions)", measure(move_offer, WRITES))
+
+        incremental = matching_service.index(db)
+        lists = _suggestions(db)
+        full = matching_service.rebuild(db)
+        rescore_all(db, k=matching_service.top_k)
+        same = (
+            incremental.loads == full.loads
+            and incremental.offers == full.offers
+            and lists == _suggestions(db)
+        )
+        print(f"tam yeniden hesapla aynı: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Eşleştirme önerileri: bellek içi aday indeksi vs naif SQL join.
+
+100k açık yük ve 20k teklif (81 il, nüfusa benzer çarpık dağılım, 60 günlük
+ufuk) üretilir. Her yöntem için rastgele yük/teklif başına en iyi 20 aday
+bulunur:
+
+- indeks: `CandidateIndex.offers_for` / `loads_for` (kova aramaları),
+- naif: il ve gün penceresiyle `JOIN` eden SQL sorgusu, yetenek ve kapasite
+  kontrolü ile skor Python'da (`compatible` / `score`; aynı sonuç).
+
+Sorgulanan kaydın kendi satırını okuyan görünürlük sorgusu iki yolda da
+aynıdır ve ölçüme dahil edilmez.
+
+    python -m benchmarks.bench_matching [yük sayısı] [teklif sayısı]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from app.crud import matching as matching_crud
+from app.matching import (
+    CandidateIndex,
+    LoadEntry,
+    OfferEntry,
+    compatible,
+    matching_service,
+    score,
+)
+from app.models.address import Address
+from app.models.enums import Category, Unit
+from app.models.load import Load
+from app.models.offer import Offer
+from app.models.user import User
+from app.models.vehicle import Vehicle
+
+from .common import make_sessionmaker, measure, report
+
+LOADS = 100_000
+OFFERS = 20_000
+PROVINCES = 81
+HORIZON_DAYS = 60
+LIMIT = 20
+QUERIES = 300
+
+
+def seed(db, n_loads: int, n_offers: int, rng: random.Random) -> None:
+    user = User(email="match@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    db.execute(
+        insert(Address),
+        [{"country": "TR", "admin1": f"IL{i:02d}"} for i in range(PROVINCES)],
+    )
+    address_ids = list(range(1, PROVINCES + 1))
+    # Büyük iller çok daha fazla yük/teklif üretir (~1/sıra)
+    weights = [1 / (i + 1) for i in range(PROVINCES)]
+    today = date.today()
+
+    def place() -> int:
+        return rng.choices(address_ids, weights)[0]
+
+    def day() -> date:
+        return today + timedelta(days=rng.randrange(HORIZON_DAYS))
+
+    loads = []
+    for i in range(n_loads):
+        unit = rng.choice([None, Unit.KG, Unit.TON, Unit.LITRE])
+        loads.append(
+            {
+                "owner_user_id": user.id,
+                "name": f"Yük {i}",
+                "quantity_value": rng.uniform(1, 20) if unit else None,
+                "quantity_unit": unit,
+                "category": rng.choice([None, *Category]),
+                "pickup_address_id": place(),
+                "dropoff_address_id": place(),
+                "pickup_day": day(),
+            }
+        )
+    db.execute(insert(Load), loads)
+
+    vehicles = [
+        {
+            "owner_user_id": user.id,
+            "can_food": rng.random() < 0.4,
+            "can_dg": rng.random() < 0.2,
+            "capacity_value": rng.uniform(5, 40),
+            "capacity_unit": rng.choice([Unit.TON, Unit.LITRE]),
+        }
+        for _ in range(n_offers // 2)
+    ]
+    db.execute(insert(Vehicle), vehicles)
+    db.execute(
+        insert(Offer),
+        [
+            {
+                "vehicle_id": rng.randrange(len(vehicles)) + 1,
+                "from_address_id": place(),
+                "to_address_id": place(),
+                "depart_date": day(),
+            }
+            for _ in range(n_offers)
+        ],
+    )
+    db.commit()
+
+
+def _naive_offers(db, load: LoadEntry, window: int):
+    stmt = matching_crud.offer_select()
+    cols = stmt.selected_columns
+    rows = db.execute(
+        stmt.where(
+            cols.origin_country == load.origin[0],
+            cols.origin_admin1 == load.origin[1],
+            Offer.depart_date.between(
+                load.pickup_day - timedelta(days=window),
+                load.pickup_day + timedelta(days=window),
+            ),
+            Offer.depart_date >= date.today(),
+            Vehicle.status == "active",
+        )
+    ).all()
+    scored = []
+    for offer in map(OfferEntry.from_row, rows):
+        if compatible(load.need, offer.cap):
+            s = score(load, offer, window)
+            if s is not None:
+                scored.append((offer, s))
+    scored.sort(key=lambda p: (-p[1], p[0].id))
+    return scored[:LIMIT]
+
+
+def _naive_loads(db, offer: OfferEntry, window: int):
+    stmt = matching_crud.load_select()
+    cols = stmt.selected_columns
+    rows = db.execute(
+        stmt.where(
+            cols.origin_country == offer.origin[0],
+            cols.origin_admin1 == offer.origin[1],
+            Load.pickup_day.between(
+                offer.depart_date - timedelta(days=window),
+                offer.depart_date + timedelta(days=window),
+            ),
+            Load.pickup_day >= date.today(),
+        )
+    ).all()
+    scored = []
+    for load in map(LoadEntry.from_row, rows):
+        if compatible(load.need, offer.cap):
+            s = score(load, offer, window)
+            if s is not None:
+                scored.append((load, s))
+    scored.sort(key=lambda p: (-p[1], p[0].id))
+    return scored[:LIMIT]
+
+
+def main() -> None:
+    n_loads = int(sys.argv[1]) if len(sys.argv) > 1 else LOADS
+    n_offers = int(sys.argv[2]) if len(sys.argv) > 2 else OFFERS
+    rng = random.Random(42)
+    Session = make_sessionmaker()
+    with Session() as db:
+        t0 = time.perf_counter()
+        seed(db, n_loads, n_offers, rng)
+        print(
+            f"veri: {n_loads} yük, {n_offers} teklif ({time.perf_counter() - t0:.1f}s)"
+        )
+
+        t0 = time.perf_counter()
+        index: CandidateIndex = matching_service.rebuild(db)
+        print(f"indeks kurulumu: {(time.perf_counter() - t0) * 1e3:.0f}ms")
+
+        window = index.window
+        loads = rng.sample(list(index.loads.values()), QUERIES)
+        offers = rng.sample(list(index.offers.values()), QUERIES)
+        for load in loads[:20]:
+            assert index.offers_for(load, LIMIT) == _naive_offers(db, load, window)
+        for offer in offers[:20]:
+            assert index.loads_for(offer, LIMIT) == _naive_loads(db, offer, window)
+
+        def each(items, fn):
+            it = iter(items)
+            return lambda: fn(next(it))
+
+        report(
+            "index  load -> offers",
+            measure(each(loads, lambda ld: index.offers_for(ld, LIMIT)), QUERIES),
+        )
+        report(
+            "naive  load -> offers",
+            measure(each(loads, lambda ld: _naive_offers(db, ld, window)), QUERIES),
+        )
+        report(
+            "index  offer -> loads",
+            measure(each(offers, lambda o: index.loads_for(o, LIMIT)), QUERIES),
+        )
+        report(
+            "naive  offer -> loads",
+            measure(each(offers, lambda o: _naive_loads(db, o, window)), QUERIES),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Derin sayfa gecikmesi: OFFSET/LIMIT vs keyset (`after`) sayfalama.
+
+Tek bir kullanıcıya BENCH_ROWS yük yazılır; her derinlikte aynı sayfa iki
+yöntemle okunur. OFFSET maliyeti derinlikle artar, keyset sabit kalır.
+
+    BENCH_ROWS=50000 python -m benchmarks.bench_pagination
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import date
+
+from sqlalchemy import insert
+
+from app.crud import load as load_crud
+from app.crud import user as user_crud
+from app.models.address import Address
+from app.models.load import Load
+
+from .common import make_sessionmaker, measure, report
+
+ROWS = int(os.getenv("BENCH_ROWS", "20000"))
+PAGE = 50
+REPEAT = int(os.getenv("BENCH_REPEAT", "50"))
+
+
+def main() -> None:
+    with make_sessionmaker()() as db:
+        u = user_crud.create(db, email="pages@example.com", password_hash="x")
+        a = Address(country="TR", admin1="IST")
+        db.add(a)
+        db.commit()
+        db.execute(
+            insert(Load),
+            [
+                {
+                    "owner_user_id": u.id,
+                    "name": f"Yük {i}",
+                    "pickup_address_id": a.id,
+                    "dropoff_address_id": a.id,
+                    "pickup_day": date(2025, 12, 31),
+                    "intl": False,
+                }
+                for i in range(ROWS)
+            ],
+        )
+        db.commit()
+        ids = [row.id for row in load_crud.list_my(db, u.id)]  # id desc
+
+        for depth in (0, ROWS // 10, ROWS // 2, ROWS - PAGE):
+            offset_rows = load_crud.list_my(db, u.id, limit=PAGE, offset=depth)
+            cursor_id = ids[depth - 1] if depth else None
+            keyset_rows = load_crud.list_my(db, u.id, limit=PAGE, after_id=cursor_id)
+            assert [r.id for r in offset_rows] == [r.id for r in keyset_rows]
+            report(
+                f"offset depth={depth}",
+                measure(
+                    lambda: load_crud.list_my(db, u.id, limit=PAGE, offset=depth),
+                    REPEAT,
+                ),
+            )
+            report(
+                f"keyset depth={depth}",
+                measure(
+                    lambda: load_crud.list_my(db, u.id, limit=PAGE, after_id=cursor_id),
+                    REPEAT,
+                ),
+            )
+            db.expunge_all()
+
+
+if __name__ == "__main__":
+    main()
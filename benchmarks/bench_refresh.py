@@ -0,0 +1,77 @@
+"""`/auth/refresh` throughput: Bloom filtresi önünde vs her kontrolde DB sorgusu.
+
+    python -m benchmarks.bench_refresh
+"""
+
+from __future__ import annotations
+
+import os
+import time
+
+from fastapi.testclient import TestClient
+
+from app.api import auth as auth_api
+from app.deps import get_db
+from app.main import app
+from app.revocation import RevocationStore
+
+from .common import make_sessionmaker
+
+N = int(os.getenv("BENCH_REFRESHES", "2000"))
+
+
+class _AlwaysMaybe:
+    def __contains__(self, key: str) -> bool:
+        return True
+
+    def add(self, key: str) -> None:
+        pass
+
+
+def _run(label: str, store: RevocationStore, client: TestClient) -> None:
+    auth_api.revocation_store = store
+    email = f"{label.replace(' ', '-')}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "secret123"})
+    token = client.post(
+        "/auth/login", json={"email": email, "password": "secret123"}
+    ).json()["refresh_token"]
+    t0 = time.perf_counter()
+    for _ in range(N):
+        res = client.post("/auth/refresh", json={"refresh_token": token})
+        assert res.status_code == 200, res.text
+        token = res.json()["refresh_token"]
+    elapsed = time.perf_counter() - t0
+    print(
+        f"{label:<24} {N / elapsed:>8.1f} refresh/s  "
+        f"db_checks={store.db_checks} filter_negatives={store.filter_negatives}"
+    )
+
+
+def main() -> None:
+    SessionLocal = make_sessionmaker()
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    naive = RevocationStore(capacity=1000, error_rate=0.001, rebuild_seconds=10**9)
+    with SessionLocal() as db:
+        naive.rebuild(db)
+    naive._bloom = _AlwaysMaybe()  # type: ignore[assignment]
+    _run("db lookup per check", naive, client)
+    _run(
+        "bloom filter",
+        RevocationStore(capacity=100_000, error_rate=0.001, rebuild_seconds=60),
+        client,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Tek worker başına istek/saniye: senkron (DB_ASYNC=false) vs async (DB_ASYNC=true).
+
+Her mod için ayrı bir uvicorn süreci (1 worker) başlatılır ve `GET /loads/`
+eşzamanlı istemcilerle dövülür. Varsayılan veritabanı geçici bir SQLite
+dosyasıdır; gerçek ölçüm için PostgreSQL verin:
+
+    BENCH_DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_sync_vs_async
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import load as load_crud
+from app.crud import user as user_crud
+from app.models.address import Address
+from app.models.base import Base
+from app.security import create_access_token
+
+from . import common  # noqa: F401  (modelleri kaydeder)
+
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "32"))
+DURATION = float(os.getenv("BENCH_DURATION", "5"))
+PORT = 8766
+
+
+def _prepare(sync_url: str) -> str:
+    engine = create_engine(sync_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        u = user_crud.create(db, email="rps@example.com", password="secret123")
+        a = Address(country="TR", admin1="IST")
+        db.add(a)
+        db.commit()
+        for i in range(20):
+            load_crud.create(
+                db,
+                owner_user_id=u.id,
+                organization_id=None,
+                name=f"Yük {i}",
+                quantity_value=None,
+                quantity_unit=None,
+                category=None,
+                pickup_address_id=a.id,
+                dropoff_address_id=a.id,
+                pickup_day=date(2025, 12, 31),
+                intl=False,
+            )
+        return create_access_token(str(u.id))
+
+
+async def _hammer(token: str) -> int:
+    done = 0
+    deadline = time.perf_counter() + DURATION
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=30) as c:
+
+        async def worker() -> None:
+            nonlocal done
+            while time.perf_counter() < deadline:
+                r = await c.get("/loads/?limit=20", headers=headers)
+                r.raise_for_status()
+                done += 1
+
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return done
+
+
+def _run(label: str, env: dict, token: str) -> None:
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(PORT),
+            "--workers",
+            "1",
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, **env},
+    )
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{PORT}/health")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        done = asyncio.run(_hammer(token))
+        print(f"{label:<8} {done / DURATION:>8.1f} req/s  (concurrency={CONCURRENCY})")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    sync_url = os.getenv("BENCH_DATABASE_URL")
+    async_url = os.getenv("BENCH_ASYNC_DATABASE_URL")
+    if not sync_url:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        sync_url = f"sqlite:///{path}"
+        async_url = f"sqlite+aiosqlite:///{path}"
+    token = _prepare(sync_url)
+    base = {"DATABASE_URL": sync_url, "PASSWORD_POOL_WORKERS": "0"}
+    _run("sync", {**base, "DB_ASYNC": "false"}, token)
+    _run(
+        "async",
+        {**base, "DB_ASYNC": "true", "ASYNC_DATABASE_URL": async_url or sync_url},
+        token,
+    )
+
+
+if __name__ == "__main__":
+    main()
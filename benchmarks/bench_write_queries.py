@@ -0,0 +1,89 @@
+"""İstek başına SQL ifadesi sayısı: `POST /loads/` ve `PATCH /vehicles/{id}`.
+
+Uygulamanın kendi oturum ayarlarıyla (`SessionLocal`) çalışır; token önbelleği
+ısındıktan sonra her istekte çalışan ifadeler sayılır.
+
+    python -m benchmarks.bench_write_queries
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import SessionLocal
+from app.deps import get_db
+from app.main import app
+from app.models.address import Address
+
+from .common import make_sessionmaker
+
+
+def main() -> None:
+    engine = make_sessionmaker().kw["bind"]
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.post("/auth/register", json={"email": "w@example.com", "password": "x" * 8})
+    token = client.post(
+        "/auth/login", json={"email": "w@example.com", "password": "x" * 8}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    with Session() as db:
+        a = Address(country="TR", admin1="IST")
+        db.add(a)
+        db.commit()
+        address_id = a.id
+    client.get("/auth/me", headers=headers)  # token önbelleğini ısıt
+    vehicle_id = client.post(
+        "/vehicles/", json={"capacity_value": 1}, headers=headers
+    ).json()["id"]
+
+    statements: List[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split(None, 1)[0].upper())
+
+    def run(label: str, fn) -> None:
+        statements.clear()
+        res = fn()
+        assert res.status_code < 300, res.text
+        kinds = ", ".join(f"{k}={v}" for k, v in sorted(Counter(statements).items()))
+        print(f"{label:<24} {len(statements)} ifade  ({kinds})")
+
+    run(
+        "POST /loads/",
+        lambda: client.post(
+            "/loads/",
+            json={
+                "name": "Koli",
+                "pickup_address_id": address_id,
+                "dropoff_address_id": address_id,
+                "pickup_day": "2025-12-31",
+            },
+            headers=headers,
+        ),
+    )
+    run(
+        "PATCH /vehicles/{id}",
+        lambda: client.patch(
+            f"/vehicles/{vehicle_id}", json={"capacity_value": 2}, headers=headers
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark scriptleri için ortak yardımcılar.
+
+Scriptler depo kökünden `python -m benchmarks.<ad>` ile çalıştırılır. Aksi
+belirtilmedikçe testlerdeki gibi bellek içi SQLite kullanılır; gerçek
+PostgreSQL ile ölçmek için `BENCH_DATABASE_URL` verilebilir.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models.address  # noqa: F401
+import app.models.load  # noqa: F401
+import app.models.match  # noqa: F401
+import app.models.match_suggestion  # noqa: F401
+import app.models.membership  # noqa: F401
+import app.models.offer  # noqa: F401
+import app.models.org_user  # noqa: F401
+import app.models.organization  # noqa: F401
+import app.models.rating  # noqa: F401
+import app.models.revoked_token  # noqa: F401
+import app.models.user  # noqa: F401
+import app.models.vehicle  # noqa: F401
+from app.models.base import Base
+
+
+def make_sessionmaker() -> sessionmaker:
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url:
+        engine = create_engine(url)
+    else:
+        engine = create_engine(
+            "sqlite+pysqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def measure(fn: Callable[[], object], n: int) -> List[float]:
+    """`fn`'i n kez çalıştırır ve her çağrının süresini (saniye) döner."""
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p50_us": ordered[len(ordered) // 2] * 1e6,
+        "p99_us": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6,
+    }
+
+
+def report(label: str, samples: List[float]) -> None:
+    s = summarize(samples)
+    print(
+        f"{label:<32} n={s['n']:<6} mean={s['mean_us']:>9.1f}us "
+        f"p50={s['p50_us']:>9.1f}us p99={s['p99_us']:>9.1f}us"
+    )
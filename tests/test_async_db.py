@@ -0,0 +1,104 @@
+import asyncio
+from typing import AsyncGenerator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.crud.aio import load as load_crud_async
+from app.deps import get_db
+from app.main import app
+
+# ensure models registered
+from app.models import address as _address  # noqa: F401
+from app.models import load as _load  # noqa: F401
+from app.models import organization as _organization  # noqa: F401
+from app.models import user as _user  # noqa: F401
+from app.models import vehicle as _vehicle  # noqa: F401
+from app.models.address import Address
+from app.models.base import Base
+
+client = TestClient(app)
+
+
+def _setup_async_db() -> async_sessionmaker:
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    async def _create_all():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(_create_all())
+    return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def async_db():
+    """Router'ları bu testte AsyncSession ile çalıştırır (DB_ASYNC modu)."""
+    AsyncTestingSessionLocal = _setup_async_db()
+
+    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        async with AsyncTestingSessionLocal() as s:
+            yield s
+            await s.commit()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield AsyncTestingSessionLocal
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+
+
+def test_async_session_load_crud_flow(async_db):
+    email = "async@example.com"
+    assert (
+        client.post(
+            "/auth/register", json={"email": email, "password": "secret123"}
+        ).status_code
+        == 201
+    )
+    tokens = client.post(
+        "/auth/login", json={"email": email, "password": "secret123"}
+    ).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    async def _addresses():
+        async with async_db() as db:
+            a, b = Address(country="TR", admin1="IST"), Address(country="TR")
+            db.add_all([a, b])
+            await db.commit()
+            return a.id, b.id
+
+    pickup_id, dropoff_id = asyncio.run(_addresses())
+    res = client.post(
+        "/loads/",
+        json={
+            "name": "Koli",
+            "pickup_address_id": pickup_id,
+            "dropoff_address_id": dropoff_id,
+            "pickup_day": "2025-12-31",
+        },
+        headers=headers,
+    )
+    assert res.status_code == 201, res.text
+    lid = res.json()["id"]
+
+    res = client.patch(f"/loads/{lid}", json={"name": "Yeni"}, headers=headers)
+    assert res.status_code == 200 and res.json()["name"] == "Yeni"
+    assert len(client.get("/loads/", headers=headers).json()) == 1
+
+    async def _fetch():
+        async with async_db() as db:
+            return await load_crud_async.get(db, lid)
+
+    assert asyncio.run(_fetch()).name == "Yeni"
+    assert client.delete(f"/loads/{lid}", headers=headers).status_code == 204
@@ -0,0 +1,106 @@
+import time
+from contextlib import contextmanager
+from typing import Generator
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.auth_cache import Principal, TokenCache, token_cache
+from app.deps import get_db
+from app.main import app
+from app.models import user as _user  # noqa: F401
+from app.models.base import Base
+from app.models.enums import GenericStatus
+from app.models.user import User
+
+
+def _setup_test_db():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    @contextmanager
+    def _session_scope() -> Generator[Session, None, None]:
+        db = TestingSessionLocal()
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    def override_get_db() -> Generator[Session, None, None]:
+        with _session_scope() as s:
+            yield s
+
+    return override_get_db
+
+
+app.dependency_overrides[get_db] = _setup_test_db()
+client = TestClient(app)
+
+
+def _principal(user_id: int) -> Principal:
+    return Principal(
+        id=user_id,
+        email=f"u{user_id}@example.com",
+        phone=None,
+        locale="tr",
+        status=GenericStatus.active,
+    )
+
+
+def test_token_cache_lru_bound_and_expiry():
+    cache = TokenCache(maxsize=2, ttl_seconds=60)
+    far = int(time.time()) + 3600
+    cache.set("a", _principal(1), far)
+    cache.set("b", _principal(2), far)
+    assert cache.get("a") is not None  # "a" artık en yeni
+    cache.set("c", _principal(3), far)
+    assert cache.get("b") is None  # en eski düştü
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+    # exp geçmişse kayıt kullanılmaz
+    cache.set("old", _principal(4), int(time.time()) - 1)
+    assert cache.get("old") is None
+    assert cache.stats()["hits"] == 3
+
+
+def test_token_cache_disabled():
+    cache = TokenCache(maxsize=0, ttl_seconds=60)
+    cache.set("a", _principal(1), int(time.time()) + 60)
+    assert cache.get("a") is None
+
+
+def test_me_uses_cache_and_status_change_invalidates():
+    email = "cache@example.com"
+    client.post("/auth/register", json={"email": email, "password": "secret123"})
+    tokens = client.post(
+        "/auth/login", json={"email": email, "password": "secret123"}
+    ).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    token_cache.clear()
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    stats = token_cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 1
+
+    gen = app.dependency_overrides[get_db]()
+    db = next(gen)
+    try:
+        u = db.query(User).filter(User.email == email).one()
+        u.status = GenericStatus.suspended
+        db.commit()
+    finally:
+        db.close()
+    assert token_cache.get(tokens["access_token"]) is None
+
+    res = client.get("/auth/me", headers=headers)
+    assert res.status_code == 200
+    assert res.json()["email"] == email
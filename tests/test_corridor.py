@@ -0,0 +1,255 @@
+import random
+from dataclasses import replace
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import distance
+from app.config import settings
+from app.db import SessionLocal
+from app.deps import get_db
+from app.distance import RegionPoint, build, read_regions
+from app.main import app
+from app.matching import (
+    CAPABILITIES,
+    MASS,
+    CandidateIndex,
+    LoadEntry,
+    OfferEntry,
+    compatible,
+    fits,
+    matching_service,
+)
+from app.models.address import Address
+from app.models.base import Base
+from app.models.offer import Offer
+
+client = TestClient(app)
+
+TODAY = date.today()
+REGIONS = 12
+
+
+def _entries(rng, n_loads, n_offers):
+    regions = [("TR", f"IL{i}") for i in range(REGIONS)]
+    loads = [
+        LoadEntry(
+            id=i,
+            pickup_address_id=1,
+            dropoff_address_id=1,
+            pickup_day=date.fromordinal(1),
+            quantity_value=None,
+            quantity_unit=None,
+            category=None,
+            origin=rng.choice(regions + [None, ("TR", "Bilinmeyen")]),
+            destination=rng.choice(regions + [None]),
+            day=rng.randrange(10),
+            need=(rng.random() < 0.3, rng.random() < 0.2, MASS),
+            amount=rng.choice([None, rng.uniform(1, 30)]),
+        )
+        for i in range(n_loads)
+    ]
+    offers = [
+        OfferEntry(
+            id=i,
+            vehicle_id=i,
+            from_address_id=1,
+            to_address_id=1,
+            depart_date=date.fromordinal(1),
+            origin=rng.choice(regions),
+            destination=rng.choice(regions),
+            day=rng.randrange(10),
+            cap=rng.choice(CAPABILITIES),
+            capacity=rng.choice([None, rng.uniform(1, 30)]),
+        )
+        for i in range(n_offers)
+    ]
+    return loads, offers
+
+
+def _brute_force(matrix, loads, offer, detour_km, window):
+    km = np.asarray(matrix.km, dtype=np.float64)
+    a, b = matrix.index_of(*offer.origin), matrix.index_of(*offer.destination)
+    found = []
+    for load in loads:
+        if load.origin is None or load.destination is None:
+            continue
+        p, d = matrix.index_of(*load.origin), matrix.index_of(*load.destination)
+        if p is None or d is None:
+            continue
+        extra = km[a, p] + km[p, d] + km[d, b] - km[a, b]
+        if (
+            extra <= detour_km
+            and abs(load.day - offer.day) <= window
+            and compatible(load.need, offer.cap)
+            and fits(load, offer)
+        ):
+            found.append((load, max(extra, 0.0)))
+    found.sort(key=lambda p: (p[1], abs(p[0].day - offer.day), p[0].id))
+    return found
+
+
+def test_loads_along_matches_brute_force():
+    rng = random.Random(11)
+    matrix = build(
+        [
+            RegionPoint(
+                ("TR", f"IL{i}", None), rng.uniform(36, 42), rng.uniform(26, 45)
+            )
+            for i in range(REGIONS)
+        ]
+    )
+    loads, offers = _entries(rng, 600, 60)
+    index = CandidateIndex(loads, [], window=2, matrix=matrix)
+    for offer in offers:
+        for detour_km in (0, 50, 200, 800):
+            expected = _brute_force(matrix, loads, offer, detour_km, 2)
+            assert index.loads_along(offer, detour_km, None) == expected
+            assert index.loads_along(offer, detour_km, 5) == expected[:5]
+
+    # Artımlı yazmalar güzergah kovalarına da yansır
+    moved, dropped = loads[:50], loads[50:100]
+    for load in dropped:
+        index.remove_load(load.id)
+    for load in moved:
+        index.put_load(replace(load, destination=rng.choice(moved).origin))
+    current = list(index.loads.values())
+    rebuilt = CandidateIndex(current, [], window=2, matrix=matrix)
+    assert index._route_buckets == rebuilt._route_buckets
+    for offer in offers[:20]:
+        assert index.loads_along(offer, 200, None) == _brute_force(
+            matrix, current, offer, 200, 2
+        )
+
+
+def test_loads_along_without_matrix():
+    rng = random.Random(3)
+    loads, offers = _entries(rng, 20, 1)
+    index = CandidateIndex(loads, offers, window=2)
+    assert index._route_buckets == {}
+    assert index.loads_along(offers[0], 1000, None) == []
+
+
+@pytest.fixture
+def Session(tmp_path, monkeypatch):
+    build(read_regions(distance.REGIONS_FILE)).save(tmp_path)
+    monkeypatch.setattr(settings, "DISTANCE_MATRIX_DIR", str(tmp_path))
+    distance.get_matrix.cache_clear()
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    matching_service.invalidate()
+    try:
+        yield Session
+    finally:
+        matching_service.invalidate()
+        distance.get_matrix.cache_clear()
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+
+
+def _headers(email):
+    client.post("/auth/register", json={"email": email, "password": "secret123"})
+    tokens = client.post(
+        "/auth/login", json={"email": email, "password": "secret123"}
+    ).json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def _load(headers, pickup, dropoff, days, **extra):
+    res = client.post(
+        "/loads/",
+        json={
+            "name": "Koli",
+            "pickup_address_id": pickup,
+            "dropoff_address_id": dropoff,
+            "pickup_day": (TODAY + timedelta(days=days)).isoformat(),
+            **extra,
+        },
+        headers=headers,
+    )
+    assert res.status_code == 201, res.text
+    return res.json()["id"]
+
+
+def test_corridor_loads_endpoint(Session):
+    h = _headers("corridor-shipper@example.com")
+    carrier = _headers("corridor-carrier@example.com")
+    with Session() as db:
+        addrs = [
+            Address(country="TR", admin1="İstanbul", admin2="Kadıköy"),
+            *(
+                Address(country="TR", admin1=a)
+                for a in ("Kocaeli", "Bolu", "Ankara", "İzmir", "Sakarya", "Eskişehir")
+            ),
+        ]
+        db.add_all(addrs)
+        db.commit()
+        ist, koc, bolu, ank, izm, sak, esk = (a.id for a in addrs)
+    v = client.post("/vehicles/", json={}, headers=carrier).json()["id"]
+    with Session() as db:
+        offer = Offer(
+            vehicle_id=v,
+            from_address_id=ist,
+            to_address_id=ank,
+            depart_date=TODAY + timedelta(days=1),
+        )
+        db.add(offer)
+        db.commit()
+        offer_id = offer.id
+
+    same = _load(h, ist, ank, 1)
+    on_way = _load(h, koc, bolu, 2)  # ~20 km sapma
+    side = _load(h, sak, esk, 1)  # ~106 km
+    reverse = _load(h, bolu, koc, 1)  # ters yön, ~363 km
+    _load(h, izm, ank, 1)  # ~648 km
+    _load(h, koc, bolu, 5)  # pencere dışı
+    _load(h, koc, bolu, 1, category="GIDA")  # araç taşıyamaz
+
+    url = f"/offers/{offer_id}/corridor-loads"
+    res = client.get(url, headers=carrier)
+    assert res.status_code == 200, res.text
+    rows = res.json()
+    assert [r["load_id"] for r in rows] == [same, on_way]
+    assert rows[0]["detour_km"] == 0 and 10 < rows[1]["detour_km"] < 30
+    assert rows[1]["pickup_address_id"] == koc and rows[1]["dropoff_address_id"] == bolu
+
+    res = client.get(f"{url}?detour_km=400", headers=carrier)
+    assert [r["load_id"] for r in res.json()] == [same, on_way, side, reverse]
+    res = client.get(f"{url}?detour_km=400&limit=1", headers=carrier)
+    assert [r["load_id"] for r in res.json()] == [same]
+
+    assert client.get(f"{url}?detour_km=-1", headers=carrier).status_code == 422
+    assert client.get(url, headers=h).status_code == 404
+    res = client.get("/offers/999999/corridor-loads", headers=carrier)
+    assert res.status_code == 404
+
+
+def test_corridor_loads_without_matrix(Session, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DISTANCE_MATRIX_DIR", str(tmp_path / "yok"))
+    distance.get_matrix.cache_clear()
+    res = client.get(
+        "/offers/1/corridor-loads", headers=_headers("corridor-none@example.com")
+    )
+    assert res.status_code == 503
@@ -0,0 +1,152 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import distance
+from app.config import settings
+from app.db import SessionLocal
+from app.deps import get_db
+from app.distance import DistanceMatrix, RegionPoint, build, read_regions
+from app.main import app
+from app.models.address import Address
+from app.models.base import Base
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def matrix_dir(tmp_path, monkeypatch):
+    build(read_regions(distance.REGIONS_FILE)).save(tmp_path)
+    monkeypatch.setattr(settings, "DISTANCE_MATRIX_DIR", str(tmp_path))
+    distance.get_matrix.cache_clear()
+    yield tmp_path
+    distance.get_matrix.cache_clear()
+
+
+def test_build_and_mmap_lookup(tmp_path):
+    points = read_regions(distance.REGIONS_FILE)
+    assert len(points) == 81
+    (tmp_path / "pairs.csv").write_text(
+        "from,to,km,minutes\nTR/İstanbul,TR/Kocaeli,111,95\nTR/Bursa,TR/Yalova,70,\n",
+        encoding="utf-8",
+    )
+    built = build(points, pairs=distance.read_pairs(tmp_path / "pairs.csv"))
+    built.save(tmp_path)
+
+    matrix = DistanceMatrix.open(tmp_path)
+    assert isinstance(matrix.km, np.memmap) and matrix.km.dtype == np.float32
+    assert np.array_equal(matrix.km, matrix.km.T)
+    assert not matrix.km.diagonal().any()
+
+    ist = matrix.index_of("TR", "İstanbul")
+    # Türkçe karakter ve büyük/küçük harf farkı yok sayılır
+    assert ist == matrix.index_of("tr", "ISTANBUL") == matrix.index_of("TR", "istanbul")
+    km, minutes = matrix.between(ist, matrix.index_of("TR", "Ankara"))
+    assert 400 < km < 500 and minutes == pytest.approx(km / 70 * 60, rel=1e-4)
+    # Bilinen yol mesafeleri tahminin yerine yazılır (süre verilmezse hızdan)
+    assert matrix.between(ist, matrix.index_of("TR", "Kocaeli")) == (111, 95)
+    bursa, yalova = matrix.index_of("TR", "Bursa"), matrix.index_of("TR", "Yalova")
+    assert matrix.between(yalova, bursa) == pytest.approx((70, 60))
+
+    # İlçe matriste yoksa il satırı; bilinmeyen bölge None / -1
+    assert matrix.index_of("TR", "İstanbul", "Kadıköy") == ist
+    assert matrix.index_of("TR", "Atlantis") is None
+    assert matrix.index_of("TR", None) is None
+    rows = matrix.rows([("TR", "İstanbul"), None, ("DE", "Bayern")])
+    assert rows.tolist() == [ist, -1, -1]
+
+
+def test_district_rows_take_precedence():
+    matrix = build(
+        [
+            RegionPoint(("TR", "İstanbul", None), 41.01, 28.98),
+            RegionPoint(("TR", "İstanbul", "Kadıköy"), 40.99, 29.03),
+            RegionPoint(("TR", "Ankara", None), 39.93, 32.86),
+        ]
+    )
+    assert matrix.index_of("TR", "istanbul", "KADIKÖY") == 1
+    assert matrix.index_of("TR", "İstanbul", "Beşiktaş") == 0
+    with pytest.raises(ValueError):
+        build([RegionPoint(("TR", "Ankara", None), 0, 0)] * 2)
+    with pytest.raises(ValueError):
+        build(
+            [RegionPoint(("TR", "Ankara", None), 0, 0)],
+            pairs=[(("TR", "Ankara", None), ("TR", "Van", None), 1.0, None)],
+        )
+
+
+@pytest.fixture
+def Session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield Session
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+
+
+def _headers():
+    client.post(
+        "/auth/register", json={"email": "dist@example.com", "password": "secret123"}
+    )
+    tokens = client.post(
+        "/auth/login", json={"email": "dist@example.com", "password": "secret123"}
+    ).json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def test_distance_endpoint(Session, matrix_dir):
+    h = _headers()
+    with Session() as db:
+        addrs = [
+            Address(country="TR", admin1="İstanbul", admin2="Kadıköy"),
+            Address(country="TR", admin1="Ankara"),
+            Address(country="TR", admin1=None),
+        ]
+        db.add_all(addrs)
+        db.commit()
+        ist, ank, bare = (a.id for a in addrs)
+
+    res = client.get(f"/distance?from_address_id={ist}&to_address_id={ank}", headers=h)
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert body["from_region"] == "TR/İstanbul" and body["to_region"] == "TR/Ankara"
+    assert 400 < body["distance_km"] < 500 and body["duration_min"] > 300
+
+    res = client.get(f"/distance?from_address_id={ist}&to_address_id={bare}", headers=h)
+    assert res.status_code == 404
+    res = client.get(f"/distance?from_address_id={ist}&to_address_id=999", headers=h)
+    assert res.status_code == 404
+
+
+def test_distance_without_matrix(Session, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DISTANCE_MATRIX_DIR", str(tmp_path / "yok"))
+    distance.get_matrix.cache_clear()
+    try:
+        res = client.get(
+            "/distance?from_address_id=1&to_address_id=2", headers=_headers()
+        )
+        assert res.status_code == 503
+    finally:
+        distance.get_matrix.cache_clear()
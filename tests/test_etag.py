@@ -0,0 +1,244 @@
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import SessionLocal
+from app.deps import get_db
+from app.main import app
+from app.models.address import Address
+from app.models.base import Base
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def statements():
+    """Kendi DB'si; çalışan SQL ifadelerini kaydeder."""
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    seen: List[str] = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: seen.append(statement),
+    )
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield Session, seen
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+
+
+def _headers(email):
+    client.post("/auth/register", json={"email": email, "password": "secret123"})
+    tokens = client.post(
+        "/auth/login", json={"email": email, "password": "secret123"}
+    ).json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def _create_load(Session, headers, name="Koli"):
+    with Session() as db:
+        a = Address(country="TR", admin1="IST")
+        db.add(a)
+        db.commit()
+        address_id = a.id
+    res = client.post(
+        "/loads/",
+        json={
+            "name": name,
+            "pickup_address_id": address_id,
+            "dropoff_address_id": address_id,
+            "pickup_day": "2025-12-31",
+        },
+        headers=headers,
+    )
+    assert res.status_code == 201, res.text
+    return res.json()
+
+
+def test_detail_etag_and_if_none_match(statements):
+    Session, seen = statements
+    h = _headers("etag-detail@example.com")
+    load = _create_load(Session, h)
+
+    res = client.get(f"/loads/{load['id']}", headers=h)
+    tag = res.headers["ETag"]
+    assert tag.startswith('"') and not tag.startswith("W/")
+    # Aynı kayıt, aynı temsil: aynı ETag
+    assert client.get(f"/loads/{load['id']}", headers=h).headers["ETag"] == tag
+
+    seen.clear()
+    res = client.get(
+        f"/loads/{load['id']}", headers={**h, "If-None-Match": f'"x", {tag}'}
+    )
+    assert res.status_code == 304 and res.content == b""
+    assert res.headers["ETag"] == tag
+    assert len(seen) == 1  # yalnızca görünürlük sorgusu
+    res = client.get(f"/loads/{load['id']}", headers={**h, "If-None-Match": "W/" + tag})
+    assert res.status_code == 304
+
+    # Farklı temsil (fields/expand) farklı ETag
+    narrow = client.get(f"/loads/{load['id']}?fields=name", headers=h)
+    assert narrow.headers["ETag"] != tag
+    expanded = client.get(f"/loads/{load['id']}?expand=pickup_address", headers=h)
+    assert expanded.headers["ETag"] not in (tag, narrow.headers["ETag"])
+
+    # Güncelleme sürümü değiştirir; PATCH yanıtı yeni ETag'i taşır
+    res = client.patch(f"/loads/{load['id']}", json={"name": "Yeni"}, headers=h)
+    new_tag = res.headers["ETag"]
+    assert new_tag != tag
+    res = client.get(f"/loads/{load['id']}", headers={**h, "If-None-Match": tag})
+    assert res.status_code == 200 and res.headers["ETag"] == new_tag
+    res = client.get(f"/loads/{load['id']}", headers={**h, "If-None-Match": new_tag})
+    assert res.status_code == 304
+
+
+def test_patch_if_match(statements):
+    Session, _ = statements
+    h = _headers("etag-match@example.com")
+    load = _create_load(Session, h)
+    url = f"/loads/{load['id']}"
+    tag = client.get(url, headers=h).headers["ETag"]
+    # Seyrek alanlı GET'in ETag'i de aynı sürümü taşır
+    narrow_tag = client.get(url + "?fields=name", headers=h).headers["ETag"]
+
+    res = client.patch(
+        url, json={"name": "Ahmet"}, headers={**h, "If-Match": narrow_tag}
+    )
+    assert res.status_code == 200, res.text
+    # Eski sürümle ikinci yazma reddedilir, kayıt değişmez
+    res = client.patch(url, json={"name": "Bora"}, headers={**h, "If-Match": tag})
+    assert res.status_code == 412
+    assert client.get(url, headers=h).json()["name"] == "Ahmet"
+    # Zayıf ya da yabancı ETag eşleşmez; "*" koşulsuzdur
+    res = client.patch(
+        url, json={"name": "Bora"}, headers={**h, "If-Match": "W/" + tag}
+    )
+    assert res.status_code == 412
+    res = client.patch(url, json={"name": "Bora"}, headers={**h, "If-Match": '"zz"'})
+    assert res.status_code == 412
+    res = client.patch(url, json={"name": "Bora"}, headers={**h, "If-Match": "*"})
+    assert res.status_code == 200
+
+    current = client.get(url, headers=h).headers["ETag"]
+    res = client.patch(url, json={"name": "Cem"}, headers={**h, "If-Match": current})
+    assert res.status_code == 200 and res.json()["name"] == "Cem"
+
+    # Yetkisiz kullanıcıya 412 değil 403; olmayan kayıt 404
+    other = _headers("etag-match-other@example.com")
+    res = client.patch(url, json={"name": "Xx"}, headers={**other, "If-Match": current})
+    assert res.status_code == 403
+    res = client.patch(
+        "/loads/999999", json={"name": "Xx"}, headers={**h, "If-Match": current}
+    )
+    assert res.status_code == 404
+
+    v = client.post("/vehicles/", json={"capacity_value": 3}, headers=h).json()
+    vtag = client.get(f"/vehicles/{v['id']}", headers=h).headers["ETag"]
+    res = client.patch(
+        f"/vehicles/{v['id']}", json={"can_dg": True}, headers={**h, "If-Match": vtag}
+    )
+    assert res.status_code == 200
+    res = client.patch(
+        f"/vehicles/{v['id']}", json={"can_food": True}, headers={**h, "If-Match": vtag}
+    )
+    assert res.status_code == 412
+
+
+def test_list_weak_etag(statements):
+    Session, seen = statements
+    h = _headers("etag-list@example.com")
+    load = _create_load(Session, h, "Ada")
+
+    res = client.get("/loads/", headers=h)
+    tag = res.headers["ETag"]
+    assert tag.startswith('W/"')
+
+    seen.clear()
+    res = client.get("/loads/", headers={**h, "If-None-Match": tag})
+    assert res.status_code == 304 and res.content == b""
+    # Sayfa sorgusu çalışmaz: yalnızca sayı/en büyük updated_at toplaması
+    (version_sql,) = seen
+    assert "count(" in version_sql.lower()
+
+    # Farklı sorgu parametreleri farklı sayfa
+    assert client.get("/loads/?limit=1", headers=h).headers["ETag"] != tag
+
+    # Ekleme, güncelleme ve silme ETag'i değiştirir
+    _create_load(Session, h, "Bal")
+    res = client.get("/loads/", headers={**h, "If-None-Match": tag})
+    assert res.status_code == 200 and len(res.json()) == 2
+    tag = res.headers["ETag"]
+    client.patch(f"/loads/{load['id']}", json={"name": "Ada2"}, headers=h)
+    res = client.get("/loads/", headers={**h, "If-None-Match": tag})
+    assert res.status_code == 200
+    tag = res.headers["ETag"]
+    client.delete(f"/loads/{load['id']}", headers=h)
+    res = client.get("/loads/", headers={**h, "If-None-Match": tag})
+    assert res.status_code == 200 and len(res.json()) == 1
+
+    # Genişletilen ilişkideki değişiklik genişletilmiş listenin ETag'ini değiştirir
+    url = "/loads/?expand=pickup_address"
+    expanded = client.get(url, headers=h).headers["ETag"]
+    assert expanded != client.get("/loads/", headers=h).headers["ETag"]
+    assert client.get(url, headers={**h, "If-None-Match": expanded}).status_code == 304
+    with Session() as db:
+        db.get(Address, res.json()[0]["pickup_address_id"]).admin1 = "ANK"
+        db.commit()
+    res = client.get(url, headers={**h, "If-None-Match": expanded})
+    assert res.status_code == 200
+    assert res.json()[0]["pickup_address"]["admin1"] == "ANK"
+
+    # Başka kullanıcının listesiyle karışmaz
+    other = _headers("etag-list-other@example.com")
+    empty = client.get("/vehicles/", headers=other).headers["ETag"]
+    assert client.get("/vehicles/", headers=h).headers["ETag"] != empty
+
+
+def test_orgs_and_me_etags(statements):
+    _, _ = statements
+    h = _headers("etag-org@example.com")
+    org = client.post("/orgs/", json={"title": "Nakliye"}, headers=h).json()
+    url = f"/orgs/{org['id']}"
+
+    tag = client.get(url, headers=h).headers["ETag"]
+    assert client.get(url, headers={**h, "If-None-Match": tag}).status_code == 304
+    list_tag = client.get("/orgs/", headers=h).headers["ETag"]
+    assert (
+        client.get("/orgs/", headers={**h, "If-None-Match": list_tag}).status_code
+        == 304
+    )
+
+    res = client.patch(url, json={"title": "Yeni"}, headers={**h, "If-Match": tag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] == client.get(url, headers=h).headers["ETag"] != tag
+    res = client.patch(url, json={"title": "Eski"}, headers={**h, "If-Match": tag})
+    assert res.status_code == 412
+
+    res = client.get("/auth/me", headers=h)
+    me_tag = res.headers["ETag"]
+    res = client.get("/auth/me", headers={**h, "If-None-Match": me_tag})
+    assert res.status_code == 304
+    assert client.get("/auth/me", headers=h).json()["email"] == "etag-org@example.com"
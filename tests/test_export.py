@@ -0,0 +1,236 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.crud.rows import owned_select
+from app.db import SessionLocal
+from app.deps import get_db, stream_sessions
+from app.export import iter_export
+from app.main import app
+from app.models.address import Address
+from app.models.base import Base
+from app.models.load import Load
+from app.pagination import NEXT_CURSOR_HEADER
+from app.schemas.load import LoadOut
+
+client = TestClient(app)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def Session():
+    """Kendi DB'si; hem istek oturumu hem akış oturumları buradan açılır."""
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[stream_sessions] = lambda: Session
+    try:
+        yield Session
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+
+
+def _headers(email):
+    client.post("/auth/register", json={"email": email, "password": "secret123"})
+    tokens = client.post(
+        "/auth/login", json={"email": email, "password": "secret123"}
+    ).json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def _create_loads(Session, headers, n):
+    with Session() as db:
+        a = Address(country="TR", admin1="IST")
+        db.add(a)
+        db.commit()
+        address_id = a.id
+    for i in range(n):
+        res = client.post(
+            "/loads/",
+            json={
+                "name": f"Koli {i}",
+                "quantity_value": 2.5 * i,
+                "quantity_unit": "KG",
+                "pickup_address_id": address_id,
+                "dropoff_address_id": address_id,
+                "pickup_day": "2025-12-31",
+            },
+            headers=headers,
+        )
+        assert res.status_code == 201, res.text
+
+
+def test_export_ndjson_and_csv(Session):
+    h = _headers("export@example.com")
+    _create_loads(Session, h, 3)
+    client.post("/vehicles/", json={"capacity_value": 7}, headers=h)
+    other = _headers("export-other@example.com")
+    _create_loads(Session, other, 1)
+
+    res = client.get("/loads/export", headers=h)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert [r["name"] for r in rows] == ["Koli 2", "Koli 1", "Koli 0"]
+    # Liste uç noktasıyla aynı temsil
+    assert rows == client.get("/loads/", headers=h).json()
+
+    res = client.get("/loads/export?format=csv", headers=h)
+    assert res.status_code == 200
+    assert 'filename="loads.csv"' in res.headers["content-disposition"]
+    records = list(csv.DictReader(io.StringIO(res.text)))
+    assert [r["name"] for r in records] == ["Koli 2", "Koli 1", "Koli 0"]
+    assert records[0]["quantity_value"] == "5.0"
+    assert records[0]["quantity_unit"] == "KG"
+    assert records[0]["organization_id"] == "" and records[0]["intl"] == "false"
+
+    res = client.get("/vehicles/export", headers=h)
+    assert [json.loads(line)["capacity_value"] for line in res.text.splitlines()] == [7]
+    assert client.get("/loads/export?organization_id=999", headers=h).text == ""
+    assert client.get("/loads/export?format=xml", headers=h).status_code == 422
+    assert client.get("/loads/export").status_code == 401
+
+
+def test_list_endpoints_have_default_cap(Session, monkeypatch):
+    h = _headers("cap@example.com")
+    _create_loads(Session, h, 4)
+    monkeypatch.setattr(settings, "LIST_DEFAULT_LIMIT", 2)
+    monkeypatch.setattr(settings, "LIST_MAX_LIMIT", 3)
+
+    res = client.get("/loads/", headers=h)
+    assert len(res.json()) == 2 and NEXT_CURSOR_HEADER in res.headers
+    res = client.get("/loads/?limit=100", headers=h)
+    assert len(res.json()) == 3 and NEXT_CURSOR_HEADER in res.headers
+    nxt = client.get(
+        f"/loads/?limit=100&after={res.headers[NEXT_CURSOR_HEADER]}", headers=h
+    )
+    assert len(nxt.json()) == 1 and NEXT_CURSOR_HEADER not in nxt.headers
+
+
+def _export_peak(tmp_path, n):
+    """`n` yüklük dışa aktarmanın (satır, bayt, tracemalloc tepe bellek) üçlüsü."""
+    engine = create_engine(f"sqlite:///{tmp_path / f'export-{n}.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO load (owner_user_id, name, name_validated,"
+                " quantity_value, pickup_address_id, dropoff_address_id,"
+                " pickup_day, intl)"
+                " WITH RECURSIVE seq(n) AS"
+                " (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :n)"
+                " SELECT 1, 'Koli ' || n, 0, n % 500, 1, 2, '2025-12-31', 0 FROM seq"
+            ),
+            {"n": n},
+        )
+    cols = list(LoadOut.model_fields)
+    rows = size = 0
+    tracemalloc.start()
+    try:
+        for chunk in iter_export(
+            sessionmaker(bind=engine), owned_select(Load, cols, 1), cols, "ndjson", 1
+        ):
+            rows += chunk.count(b"\n")
+            size += len(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        engine.dispose()
+    return rows, size, peak
+
+
+def test_export_memory_does_not_grow_with_row_count(tmp_path):
+    small_rows, _, small_peak = _export_peak(tmp_path, 5_000)
+    rows, size, peak = _export_peak(tmp_path, 50_000)
+    assert (small_rows, rows) == (5_000, 50_000)
+    # Tepe bellek parti boyutuyla sınırlı: 10 kat satırda aynı kalır ve
+    # çıktının küçük bir kesridir
+    assert peak < small_peak * 1.5, (small_peak, peak)
+    assert peak < size / 4, (size, peak)
+
+
+# Ayrı süreçte: tepe RSS ölçümü test oturumunun geri kalanından etkilenmesin
+_MILLION_ROWS = textwrap.dedent(
+    """
+    import resource, sys
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+
+    from app.crud.rows import owned_select
+    from app.export import iter_export
+    from app.models import address, organization, user  # noqa: F401
+    from app.models.base import Base
+    from app.models.load import Load
+    from app.schemas.load import LoadOut
+
+    engine = create_engine("sqlite:///" + sys.argv[1])
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO load (owner_user_id, name, name_validated, quantity_value,"
+            " pickup_address_id, dropoff_address_id, pickup_day, intl)"
+            " WITH RECURSIVE seq(n) AS"
+            " (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < 1000000)"
+            " SELECT 1, 'Koli ' || n, 0, n % 500, 1, 2, '2025-12-31', 0 FROM seq"
+        ))
+    cols = list(LoadOut.model_fields)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rows = size = 0
+    for chunk in iter_export(
+        sessionmaker(bind=engine), owned_select(Load, cols, 1), cols, "ndjson", 1
+    ):
+        rows += chunk.count(b"\\n")
+        size += len(chunk)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(rows, size, (after - before) // 1024)
+    """
+)
+
+
+@pytest.mark.skipif(
+    not os.getenv("RUN_SLOW_TESTS"),
+    reason="yavaş (~20 sn); RUN_SLOW_TESTS=1 ile çalışır",
+)
+@pytest.mark.skipif(sys.platform == "win32", reason="resource modülü yok")
+def test_export_million_rows_constant_memory(tmp_path):
+    out = subprocess.run(
+        [sys.executable, "-c", _MILLION_ROWS, str(tmp_path / "export.db")],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    rows, size, rss_growth_mb = map(int, out.split())
+    assert rows == 1_000_000
+    # Çıktı ~240 MB; bellek artışı parti boyutuyla sınırlı kalmalı
+    assert size > 200_000_000
+    assert rss_growth_mb < 32, rss_growth_mb
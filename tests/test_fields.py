@@ -0,0 +1,196 @@
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import SessionLocal
+from app.deps import get_db
+from app.main import app
+from app.models.address import Address
+from app.models.base import Base
+from app.models.organization import Organization
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def statements():
+    """Kendi DB'si; çalışan SELECT ifadelerini kaydeder."""
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    seen: List[str] = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: seen.append(statement),
+    )
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield Session, seen
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+
+
+def _headers(email):
+    client.post("/auth/register", json={"email": email, "password": "secret123"})
+    tokens = client.post(
+        "/auth/login", json={"email": email, "password": "secret123"}
+    ).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    client.get("/auth/me", headers=headers)  # token önbelleği: auth sorgusu yok
+    return headers
+
+
+def _seed(Session, headers, n):
+    org = client.post("/orgs/", json={"title": "Nakliye"}, headers=headers).json()
+    with Session() as db:
+        addrs = [Address(country="TR", admin1=f"IL{i}") for i in range(2 * n)]
+        db.add_all(addrs)
+        db.commit()
+        db.get(Organization, org["id"]).address_id = addrs[0].id
+        db.commit()
+        address_ids = [a.id for a in addrs]
+    for i in range(n):
+        res = client.post(
+            "/loads/",
+            json={
+                "name": f"Koli {i}",
+                "organization_id": org["id"] if i % 2 else None,
+                "pickup_address_id": address_ids[2 * i],
+                "dropoff_address_id": address_ids[2 * i + 1],
+                "pickup_day": "2025-12-31",
+            },
+            headers=headers,
+        )
+        assert res.status_code == 201, res.text
+    return org
+
+
+def test_fields_projection_is_pushed_into_select(statements):
+    Session, seen = statements
+    h = _headers("fields@example.com")
+    _seed(Session, h, 2)
+
+    seen.clear()
+    res = client.get("/loads/?fields=pickup_day,name", headers=h)
+    assert res.status_code == 200
+    assert [sorted(r) for r in res.json()] == [["id", "name", "pickup_day"]] * 2
+    # ETag toplama sorgusu + sayfa sorgusu
+    version_sql, select_sql = seen
+    assert "max(" in version_sql.lower()
+    assert "pickup_day" in select_sql and "quantity_value" not in select_sql
+
+    load_id = res.json()[0]["id"]
+    seen.clear()
+    res = client.get(f"/loads/{load_id}?fields=name", headers=h)
+    assert res.json() == {"id": load_id, "name": "Koli 1"}
+    assert "dropoff_address_id" not in seen[0]
+
+    # Parametresiz yanıt tam şemadır
+    full = client.get(f"/loads/{load_id}", headers=h).json()
+    assert set(full) == {
+        "id",
+        "owner_user_id",
+        "organization_id",
+        "name",
+        "quantity_value",
+        "quantity_unit",
+        "category",
+        "pickup_address_id",
+        "dropoff_address_id",
+        "pickup_day",
+        "intl",
+    }
+
+    res = client.get("/loads/?fields=name,password", headers=h)
+    assert res.status_code == 400 and "password" in res.json()["detail"]
+    res = client.get("/vehicles/?expand=pickup_address", headers=h)
+    assert res.status_code == 400
+
+
+@pytest.mark.parametrize("n", [2, 6])
+def test_expanded_list_query_count_is_constant(statements, n):
+    Session, seen = statements
+    h = _headers(f"expand{n}@example.com")
+    org = _seed(Session, h, n)
+
+    seen.clear()
+    res = client.get(
+        "/loads/?expand=pickup_address,dropoff_address,organization", headers=h
+    )
+    assert res.status_code == 200
+    # ETag sorgusu + ana sorgu + ilişki başına bir selectinload; satır
+    # sayısından bağımsız
+    assert len(seen) == 5, seen
+    rows = res.json()
+    assert len(rows) == n
+    for row in rows:
+        assert row["pickup_address"]["id"] == row["pickup_address_id"]
+        assert row["dropoff_address"]["id"] == row["dropoff_address_id"]
+        if row["organization_id"]:
+            assert row["organization"]["title"] == org["title"]
+        else:
+            assert row["organization"] is None
+
+    seen.clear()
+    res = client.get("/loads/?fields=name&expand=pickup_address&limit=1", headers=h)
+    assert len(seen) == 3
+    (row,) = res.json()
+    assert set(row) == {"id", "name", "pickup_address"}
+    assert "X-Next-Cursor" in res.headers
+
+
+def test_expand_on_detail_vehicles_and_orgs(statements):
+    Session, seen = statements
+    h = _headers("expand-detail@example.com")
+    org = _seed(Session, h, 1)
+    load_id = client.get("/loads/", headers=h).json()[0]["id"]
+
+    res = client.get(f"/loads/{load_id}?expand=dropoff_address", headers=h)
+    assert res.status_code == 200
+    assert res.json()["dropoff_address"]["admin1"] == "IL1"
+
+    v = client.post("/vehicles/", json={"organization_id": org["id"]}, headers=h).json()
+    res = client.get(f"/vehicles/{v['id']}?expand=organization", headers=h)
+    assert res.json()["organization"]["id"] == org["id"]
+    res = client.get("/vehicles/?fields=can_food&expand=organization", headers=h)
+    assert res.json() == [
+        {
+            "id": v["id"],
+            "can_food": False,
+            "organization": {
+                "id": org["id"],
+                "title": "Nakliye",
+                "tax_office": None,
+                "tax_number": None,
+                "owner_user_id": org["owner_user_id"],
+            },
+        }
+    ]
+
+    seen.clear()
+    res = client.get("/orgs/?expand=address", headers=h)
+    assert len(seen) == 3
+    assert res.json()[0]["address"]["admin1"] == "IL0"
+    res = client.get(f"/orgs/{org['id']}?fields=title", headers=h)
+    assert res.json() == {"id": org["id"], "title": "Nakliye"}
@@ -74,6 +74,21 @@ app.dependency_overrides[get_db] = _setup_test_db()
 client = TestClient(app)
 
 
+def _create_addresses_in_active_db():
+    # Adres kontrolleri DB'ye gider: modülün kendi DB'si yerine o an etkin olan
+    # get_db override'ının oturumu kullanılır (test sırasından bağımsız)
+    from app.models.address import Address
+
+    db = next(app.dependency_overrides[get_db]())
+    try:
+        addrs = [Address(country="TR", admin1="IST"), Address(country="TR")]
+        db.add_all(addrs)
+        db.commit()
+        return addrs[0].id, addrs[1].id
+    finally:
+        db.close()
+
+
 def _register(email: str, password: str = "secret123"):
     r = client.post("/auth/register", json={"email": email, "password": password})
     assert r.status_code == 201
@@ -234,3 +249,181 @@ def test_load_rbac_with_organization():
     assert res.status_code == 200
     res = client.delete(f"/loads/{lid}", headers=h_user)
     assert res.status_code == 204
+
+
+def test_loads_bulk_create_reports_per_item(monkeypatch):
+    _register("bulk-own@example.com")
+    h_owner = {
+        "Authorization": f"Bearer {_login('bulk-own@example.com')['access_token']}"
+    }
+    own_org = client.post("/orgs/", json={"title": "BulkOrg"}, headers=h_owner).json()
+    _register("bulk-other@example.com")
+    h_other = {
+        "Authorization": f"Bearer {_login('bulk-other@example.com')['access_token']}"
+    }
+    foreign_org = client.post(
+        "/orgs/", json={"title": "Foreign"}, headers=h_other
+    ).json()
+    pickup_id, dropoff_id = _create_addresses_in_active_db()
+
+    def item(name, **extra):
+        return {
+            "name": name,
+            "pickup_address_id": pickup_id,
+            "dropoff_address_id": dropoff_id,
+            "pickup_day": "2025-12-31",
+            **extra,
+        }
+
+    items = [
+        item("Kişisel"),
+        item("Org yükü", organization_id=own_org["id"]),
+        item("X"),  # min_length=2
+        item("Yabancı org", organization_id=foreign_org["id"]),
+        item("Adressiz", pickup_address_id=999999),
+        item("Org yükü 2", organization_id=own_org["id"]),
+    ]
+    res = client.post("/loads/bulk", json={"items": items}, headers=h_owner)
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert body["created"] == 3 and body["failed"] == 3
+    results = body["results"]
+    assert [r["index"] for r in results] == list(range(6))
+    assert all(results[i]["id"] for i in (0, 1, 5))
+    assert "name" in results[2]["error"]
+    assert results[3]["error"] == "Yetki yok (organization admin gerekli)"
+    assert results[4]["error"] == "Adres bulunamadı"
+    # sıralama korunur: id'ler istek sırasıyla artar
+    assert results[0]["id"] < results[1]["id"] < results[5]["id"]
+
+    res = client.get(f"/loads/{results[1]['id']}", headers=h_owner)
+    assert res.status_code == 200 and res.json()["name"] == "Org yükü"
+
+    monkeypatch.setattr(settings, "BULK_MAX_ITEMS", 2)
+    res = client.post("/loads/bulk", json={"items": items[:3]}, headers=h_owner)
+    assert res.status_code == 413
+    assert (
+        client.post("/loads/bulk", json={"items": []}, headers=h_owner).status_code
+        == 422
+    )
+
+
+def test_loads_import_csv_and_ndjson(monkeypatch):
+    _register("import@example.com")
+    h = {"Authorization": f"Bearer {_login('import@example.com')['access_token']}"}
+    pickup_id, dropoff_id = _create_addresses_in_active_db()
+    # Birden fazla COPY parçası oluşsun
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_SIZE", 2)
+
+    csv_body = "\n".join(
+        [
+            "name,pickup_address_id,dropoff_address_id,pickup_day,quantity_value,"
+            "quantity_unit,category,intl",
+            f"Koli A,{pickup_id},{dropoff_id},2025-12-31,10,KG,GIDA,false",
+            f"Koli B,{pickup_id},{dropoff_id},2025-12-30,,,,",
+            f"X,{pickup_id},{dropoff_id},2025-12-30,,,,",
+            f"Adressiz,999999,{dropoff_id},2025-12-30,,,,",
+            f"Koli C,{pickup_id},{dropoff_id},2025-12-29,5,TON,GENEL,true",
+        ]
+    )
+    res = client.post(
+        "/loads/import",
+        content=csv_body.encode(),
+        headers={**h, "Content-Type": "text/csv"},
+    )
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert (body["rows"], body["imported"], body["failed"]) == (5, 3, 2)
+    assert [e["line"] for e in body["errors"]] == [4, 5]
+    assert "name" in body["errors"][0]["error"]
+    assert body["errors"][1]["error"] == "Adres bulunamadı"
+
+    mine = client.get("/loads/", headers=h).json()
+    assert [x["name"] for x in mine] == ["Koli C", "Koli B", "Koli A"]
+    assert mine[0]["quantity_unit"] == "TON" and mine[0]["intl"] is True
+    assert mine[2]["category"] == "GIDA"
+
+    ndjson_body = "\n".join(
+        [
+            '{"name": "Satır 1", "pickup_address_id": %d, "dropoff_address_id": %d,'
+            ' "pickup_day": "2025-11-01"}' % (pickup_id, dropoff_id),
+            "{bozuk",
+            "",
+            "[1, 2]",
+        ]
+    )
+    res = client.post(
+        "/loads/import?format=ndjson",
+        content=ndjson_body.encode(),
+        headers={**h, "Content-Type": "application/octet-stream"},
+    )
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert (body["rows"], body["imported"], body["failed"]) == (3, 1, 2)
+    assert [e["line"] for e in body["errors"]] == [2, 4]
+
+    res = client.post(
+        "/loads/import",
+        content=b"name\n",
+        headers={**h, "Content-Type": "application/json"},
+    )
+    assert res.status_code == 415
+
+    monkeypatch.setattr(settings, "IMPORT_MAX_BYTES", len(csv_body) - 1)
+    res = client.post(
+        "/loads/import",
+        content=csv_body.encode(),
+        headers={**h, "Content-Type": "text/csv"},
+    )
+    assert res.status_code == 413
+
+    # Content-Length'siz (chunked) gövde de akarken sayılır
+    def chunks():
+        yield csv_body.encode()[:10]
+        yield csv_body.encode()[10:]
+
+    res = client.post(
+        "/loads/import", content=chunks(), headers={**h, "Content-Type": "text/csv"}
+    )
+    assert res.status_code == 413
+    assert [x["name"] for x in client.get("/loads/", headers=h).json()][0] == "Satır 1"
+
+
+def test_list_fast_path_matches_load_out():
+    # Liste Core satırlarından doğrudan kodlanır; LoadOut ile aynı JSON olmalı
+    from app.crud import load as load_sync
+    from app.schemas.load import LoadOut
+
+    _register("fastlist@example.com")
+    h = {"Authorization": f"Bearer {_login('fastlist@example.com')['access_token']}"}
+    pickup_id, dropoff_id = _create_addresses_in_active_db()
+    for qty, unit in ((5, "KG"), (None, None), (2.25, "TON")):
+        res = client.post(
+            "/loads/",
+            json={
+                "name": "Koli",
+                "quantity_value": qty,
+                "quantity_unit": unit,
+                "category": "GIDA",
+                "pickup_address_id": pickup_id,
+                "dropoff_address_id": dropoff_id,
+                "pickup_day": "2025-12-31",
+            },
+            headers=h,
+        )
+        assert res.status_code == 201
+    res = client.get("/loads/", headers=h)
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/json"
+
+    db = next(app.dependency_overrides[get_db]())
+    try:
+        owner_id = db.get(_load.Load, res.json()[0]["id"]).owner_user_id
+        expected = [
+            LoadOut.model_validate(obj).model_dump(mode="json")
+            for obj in load_sync.list_my(db, owner_id)
+        ]
+    finally:
+        db.close()
+    assert res.json() == expected
+    assert '"quantity_value":5.0' in res.text
@@ -0,0 +1,240 @@
+import os
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.crud import match_suggestion as suggestion_crud
+from app.db import SessionLocal
+from app.match_batch import (
+    LoadArrays,
+    OfferArrays,
+    RegionCodes,
+    block_keys,
+    rescore_all,
+)
+from app.matching import CandidateIndex, LoadEntry, OfferEntry, matching_service
+from app.models import membership as _membership  # noqa: F401
+from app.models import organization as _organization  # noqa: F401
+from app.models import rating as _rating  # noqa: F401
+from app.models.address import Address
+from app.models.base import Base
+from app.models.enums import Category, Unit
+from app.models.load import Load
+from app.models.match_suggestion import MatchSuggestion
+from app.models.offer import Offer
+from app.models.user import User
+from app.models.vehicle import Vehicle
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+    # Önceki testlerin indeksi ve bekleyen değişiklikleri başka DB'ye aittir
+    matching_service.invalidate()
+    try:
+        with Session() as session:
+            yield session
+    finally:
+        matching_service.invalidate()
+
+
+def _seed(db, rng, n_loads, n_offers):
+    user = User(email="batch@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    db.execute(
+        insert(Address),
+        [{"country": "TR", "admin1": f"IL{i}"} for i in range(4)]
+        + [{"country": "TR", "admin1": None}],
+    )
+    units = [None, Unit.KG, Unit.TON, Unit.LITRE]
+    db.execute(
+        insert(Load),
+        [
+            {
+                "owner_user_id": user.id,
+                "name": f"Yük {i}",
+                "quantity_value": rng.choice([None, rng.randint(1, 20)]),
+                "quantity_unit": rng.choice(units),
+                "category": rng.choice([None, *Category]),
+                "pickup_address_id": rng.randint(1, 5),
+                "dropoff_address_id": rng.randint(1, 4),
+                "pickup_day": TODAY + timedelta(days=rng.randint(-2, 8)),
+            }
+            for i in range(n_loads)
+        ],
+    )
+    db.execute(
+        insert(Vehicle),
+        [
+            {
+                "owner_user_id": user.id,
+                "can_food": rng.random() < 0.5,
+                "can_dg": rng.random() < 0.3,
+                "capacity_value": rng.choice([None, 0, rng.randint(1, 30)]),
+                "capacity_unit": rng.choice(units),
+            }
+            for _ in range(20)
+        ],
+    )
+    db.execute(
+        insert(Offer),
+        [
+            {
+                "vehicle_id": rng.randint(1, 20),
+                "from_address_id": rng.randint(1, 5),
+                "to_address_id": rng.randint(1, 4),
+                "depart_date": TODAY + timedelta(days=rng.randint(-1, 8)),
+            }
+            for _ in range(n_offers)
+        ],
+    )
+    db.commit()
+
+
+@pytest.mark.parametrize("load_block,offer_block", [(512, 2048), (7, 5)])
+def test_batch_matches_candidate_index(db, load_block, offer_block):
+    _seed(db, random.Random(11), 300, 200)
+    result = rescore_all(db, k=5, load_block=load_block, offer_block=offer_block)
+    assert result.loads > 0 and result.offers > 0
+    assert result.suggestions == db.scalar(select(func.count(MatchSuggestion.id)))
+    assert all(b.score_ms >= 0 and b.pairs >= 0 for b in result.blocks)
+    if load_block == 7:
+        # Küçük bloklar: parçalar arası en iyi K birleştirmesi de sınanır
+        assert max(len(b.load_ids) for b in result.blocks) == 7
+        assert any(b.offers > offer_block for b in result.blocks)
+
+    index = matching_service.rebuild(db)
+    matching_service.invalidate()
+    for load in index.loads.values():
+        expected = [(o.id, s) for o, s in index.offers_for(load, 5)]
+        got = [tuple(r) for r in suggestion_crud.list_for_load(db, load.id)]
+        assert got == expected, load
+
+
+def test_rescore_replaces_previous_suggestions(db):
+    _seed(db, random.Random(3), 120, 80)
+    first = rescore_all(db, k=3)
+    before = db.execute(select(MatchSuggestion.load_id, MatchSuggestion.rank)).all()
+    second = rescore_all(db, k=3)
+    assert first.suggestions == second.suggestions == len(before)
+    assert sorted(before) == sorted(
+        db.execute(select(MatchSuggestion.load_id, MatchSuggestion.rank)).all()
+    )
+
+    dry = rescore_all(db, k=1, write=False)
+    assert dry.write_ms == 0 and dry.suggestions <= dry.loads
+    assert db.scalar(select(func.count(MatchSuggestion.id))) == first.suggestions
+
+
+def test_block_keys_order_ties_by_offer_id():
+    regions = RegionCodes()
+    load = LoadEntry(
+        id=1,
+        pickup_address_id=1,
+        dropoff_address_id=1,
+        pickup_day=TODAY,
+        quantity_value=None,
+        quantity_unit=None,
+        category=None,
+        origin=("TR", "A"),
+        destination=("TR", "B"),
+        day=100,
+        need=(False, False, None),
+        amount=None,
+    )
+
+    def offer(id, day):
+        return OfferEntry(
+            id=id,
+            vehicle_id=1,
+            from_address_id=1,
+            to_address_id=1,
+            depart_date=TODAY,
+            origin=("TR", "A"),
+            destination=("TR", "B"),
+            day=day,
+            cap=(False, False, None),
+            capacity=None,
+        )
+
+    offers = [offer(9, 100), offer(4, 100), offer(5, 103), offer(6, 99)]
+    keys = block_keys(
+        LoadArrays.of([load], regions), OfferArrays.of(offers, regions), window=2
+    )[0]
+    assert keys[2] == -1  # pencere dışı
+    ranked = [offers[i].id for i in np.argsort(-keys) if keys[i] >= 0]
+    index = CandidateIndex([load], offers, window=2)
+    assert ranked == [o.id for o, _ in index.offers_for(load, 10)] == [4, 9, 6]
+
+
+def test_batch_and_incremental_writers_take_the_same_lock(db, monkeypatch):
+    _seed(db, random.Random(4), 40, 30)
+    calls = []
+    lock_writers = suggestion_crud.lock_writers
+    try_lock_writers = suggestion_crud.try_lock_writers
+    monkeypatch.setattr(
+        suggestion_crud,
+        "lock_writers",
+        lambda s: calls.append("wait") or lock_writers(s),
+    )
+    monkeypatch.setattr(
+        suggestion_crud,
+        "try_lock_writers",
+        lambda s: calls.append("try") or try_lock_writers(s),
+    )
+    rescore_all(db, k=3, write=False)
+    assert calls == []
+    rescore_all(db, k=3)
+    assert calls == ["wait"]
+    # Artımlı yazar (istek yolu) kilidi beklemez
+    load_id = db.scalar(select(MatchSuggestion.load_id).limit(1))
+    assert suggestion_crud.replace_for_loads(db, {load_id: []})
+    db.commit()
+    assert calls == ["wait", "try"]
+    assert suggestion_crud.list_for_load(db, load_id) == []
+
+
+PG_URL = os.getenv("EXPLAIN_DATABASE_URL") or settings.DATABASE_URL
+
+
+def test_writer_lock_serializes_sessions_on_postgres():
+    if not PG_URL.startswith("postgresql"):
+        pytest.skip("PostgreSQL gerekli")
+    engine = create_engine(PG_URL, connect_args={"connect_timeout": 3})
+    try:
+        with engine.connect():
+            pass
+    except OperationalError:
+        engine.dispose()
+        pytest.skip("PostgreSQL erişilemiyor")
+    Session = sessionmaker(bind=engine)
+    probe = select(func.pg_try_advisory_xact_lock(suggestion_crud.WRITE_LOCK_KEY))
+    try:
+        with Session() as holder, Session() as other:
+            suggestion_crud.lock_writers(holder)
+            assert other.scalar(probe) is False
+            other.rollback()
+            # Kilit doluyken artımlı yazma beklemeden vazgeçer
+            assert suggestion_crud.replace_for_loads(other, {1: []}) is False
+            other.rollback()
+            holder.commit()  # kilit işlemle birlikte bırakılır
+            assert other.scalar(probe) is True
+            other.rollback()
+    finally:
+        engine.dispose()
@@ -0,0 +1,449 @@
+import asyncio
+import random
+import shutil
+import threading
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, insert, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.changes import Change
+from app.crud import load as load_crud
+from app.crud import match_suggestion as suggestion_crud
+from app.crud import offer as offer_crud
+from app.crud import vehicle as vehicle_crud
+from app.db import SessionLocal
+from app.match_batch import rescore_all
+from app.matching import CandidateIndex, matching_service
+from app.models import membership as _membership  # noqa: F401
+from app.models import organization as _organization  # noqa: F401
+from app.models import rating as _rating  # noqa: F401
+from app.models.address import Address
+from app.models.base import Base
+from app.models.enums import Category, Unit
+from app.models.load import Load
+from app.models.match_suggestion import MatchSuggestion
+from app.models.offer import Offer
+from app.models.user import User
+from app.models.vehicle import Vehicle
+from app.replicas import ReplicaSet, RoutingSession
+
+TODAY = date.today()
+K = 3
+ADDRESSES = 5
+UNITS = [None, Unit.KG, Unit.TON, Unit.LITRE]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+    monkeypatch.setattr(matching_service, "top_k", K)
+    monkeypatch.setattr(matching_service, "rebuild_seconds", 3600)
+    matching_service.invalidate()
+    try:
+        with Session() as session:
+            yield session
+    finally:
+        matching_service.invalidate()
+
+
+def _day(rng):
+    return TODAY + timedelta(days=rng.randint(-1, 6))
+
+
+def _load_fields(rng):
+    return {
+        "quantity_value": rng.choice([None, rng.randint(1, 20)]),
+        "quantity_unit": rng.choice(UNITS),
+        "category": rng.choice([None, *Category]),
+        "pickup_address_id": rng.randint(1, ADDRESSES),
+        "dropoff_address_id": rng.randint(1, ADDRESSES - 1),
+        "pickup_day": _day(rng),
+    }
+
+
+def _offer_fields(rng, vehicle_ids):
+    return {
+        "vehicle_id": rng.choice(vehicle_ids),
+        "from_address_id": rng.randint(1, ADDRESSES),
+        "to_address_id": rng.randint(1, ADDRESSES - 1),
+        "depart_date": _day(rng),
+    }
+
+
+def _seed(db, rng):
+    user = User(email="incremental@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    # Son adresin ili yok: bu adresten alınan yük / kalkan teklif eşleşmez
+    db.execute(
+        insert(Address),
+        [{"country": "TR", "admin1": f"IL{i}"} for i in range(ADDRESSES - 1)]
+        + [{"country": "TR", "admin1": None}],
+    )
+    vehicle_ids = db.scalars(
+        insert(Vehicle).returning(Vehicle.id),
+        [
+            {
+                "owner_user_id": user.id,
+                "can_food": rng.random() < 0.5,
+                "can_dg": rng.random() < 0.3,
+                "capacity_value": rng.choice([None, rng.randint(1, 30)]),
+                "capacity_unit": rng.choice(UNITS),
+            }
+            for _ in range(8)
+        ],
+    ).all()
+    db.execute(
+        insert(Load),
+        [
+            {"owner_user_id": user.id, "name": f"Yük {i}", **_load_fields(rng)}
+            for i in range(120)
+        ],
+    )
+    db.execute(insert(Offer), [_offer_fields(rng, vehicle_ids) for _ in range(60)])
+    db.commit()
+    return user.id, list(vehicle_ids)
+
+
+def _random_writes(db, rng, user_id, vehicle_ids, n):
+    auth = {"user_id": user_id, "admin_org_ids": ()}
+    for i in range(n):
+        load_ids = db.scalars(select(Load.id)).all()
+        offer_ids = db.scalars(select(Offer.id)).all()
+        op = rng.choice(
+            ["load+", "load~", "load-", "offer+", "offer~", "offer-", "vehicle~"]
+        )
+        if op == "load+":
+            load_crud.create(
+                db,
+                owner_user_id=user_id,
+                organization_id=None,
+                name=f"Yeni {i}",
+                intl=False,
+                **_load_fields(rng),
+            )
+        elif op == "load~":
+            fields = _load_fields(rng)
+            keep = rng.sample(sorted(fields), rng.randint(1, len(fields)))
+            load_crud.update_authorized(
+                db,
+                rng.choice(load_ids),
+                **auth,
+                **{k: fields[k] for k in keep},
+            )
+        elif op == "load-":
+            load_crud.delete_authorized(db, rng.choice(load_ids), **auth)
+        elif op == "offer+":
+            offer_crud.create(db, **_offer_fields(rng, vehicle_ids))
+        elif op == "offer~" and offer_ids:
+            fields = _offer_fields(rng, vehicle_ids)
+            keep = rng.sample(sorted(fields), rng.randint(1, len(fields)))
+            offer_crud.update_authorized(
+                db,
+                rng.choice(offer_ids),
+                **auth,
+                **{k: fields[k] for k in keep},
+            )
+        elif op == "offer-" and offer_ids:
+            offer_crud.delete_authorized(db, rng.choice(offer_ids), **auth)
+        elif op == "vehicle~":
+            vehicle_crud.update_authorized(
+                db,
+                rng.choice(vehicle_ids),
+                **auth,
+                can_food=rng.random() < 0.5,
+                can_dg=rng.random() < 0.3,
+                capacity_value=rng.choice([0, rng.randint(1, 30)]),
+            )
+
+
+def _suggestions(db):
+    lists = {}
+    for load_id, offer_id, score in db.execute(
+        select(
+            MatchSuggestion.load_id, MatchSuggestion.offer_id, MatchSuggestion.score
+        ).order_by(MatchSuggestion.load_id, MatchSuggestion.rank)
+    ):
+        lists.setdefault(load_id, []).append((offer_id, score))
+    return lists
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_incremental_matches_full_recompute(db, seed):
+    rng = random.Random(seed)
+    user_id, vehicle_ids = _seed(db, rng)
+    rescore_all(db, k=K)
+    matching_service.rebuild(db)
+
+    _random_writes(db, rng, user_id, vehicle_ids, 150)
+
+    incremental = matching_service.index(db)
+    incremental_lists = _suggestions(db)
+    full = matching_service.rebuild(db)
+    assert full is not incremental
+    assert incremental.loads == full.loads
+    assert incremental.offers == full.offers
+    assert incremental._load_buckets == full._load_buckets
+    assert incremental._offer_buckets == full._offer_buckets
+    assert incremental._route_buckets == full._route_buckets
+
+    result = rescore_all(db, k=K)
+    assert result.suggestions > 0
+    assert incremental_lists == _suggestions(db)
+
+
+def test_changes_during_rebuild_are_replayed(db, monkeypatch):
+    rng = random.Random(5)
+    _, vehicle_ids = _seed(db, rng)
+    matching_service.rebuild(db)
+    created = []
+
+    class IndexWithConcurrentWrite(CandidateIndex):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            # Kurulumun anlık görüntüsü okunduktan sonra commit edilen yazma
+            if not created:
+                offer = offer_crud.create(
+                    db,
+                    vehicle_id=vehicle_ids[0],
+                    from_address_id=1,
+                    to_address_id=2,
+                    depart_date=TODAY,
+                )
+                created.append(offer.id)
+
+    monkeypatch.setattr("app.matching.CandidateIndex", IndexWithConcurrentWrite)
+    index = matching_service.rebuild(db)
+    assert created and created[0] in index.offers
+    monkeypatch.setattr("app.matching.CandidateIndex", CandidateIndex)
+    assert index.offers == matching_service.rebuild(db).offers
+
+
+def test_first_write_on_cold_worker_does_not_build_index(db, monkeypatch):
+    rng = random.Random(9)
+    _, vehicle_ids = _seed(db, rng)
+    rescore_all(db, k=K)
+    before = _suggestions(db)
+    rebuilds = []
+    rebuild = matching_service.rebuild
+    monkeypatch.setattr(
+        matching_service, "rebuild", lambda s: rebuilds.append(1) or rebuild(s)
+    )
+
+    for _ in range(5):
+        offer_crud.create(db, **_offer_fields(rng, vehicle_ids))
+    assert rebuilds == [] and matching_service._index is None
+    assert _suggestions(db) == before
+
+    # İlk sorgu indeksi kurar ve biriken değişikliklerin önerilerini yazar
+    matching_service.index(db)
+    assert rebuilds == [1]
+    incremental_lists = _suggestions(db)
+    assert incremental_lists != before
+    rescore_all(db, k=K)
+    assert incremental_lists == _suggestions(db)
+
+
+def test_busy_writer_lock_defers_suggestions(db, monkeypatch):
+    rng = random.Random(11)
+    _, vehicle_ids = _seed(db, rng)
+    rescore_all(db, k=K)
+    matching_service.rebuild(db)
+    before = _suggestions(db)
+
+    # Toplu yeniden skorlama kilidi tutuyor: istek beklemez, hiçbir şey yazmaz
+    try_lock = suggestion_crud.try_lock_writers
+    monkeypatch.setattr(suggestion_crud, "try_lock_writers", lambda session: False)
+    for _ in range(5):
+        offer_crud.create(db, **_offer_fields(rng, vehicle_ids))
+    assert _suggestions(db) == before
+    assert matching_service._deferred
+
+    # Kilit boşalınca sonraki yazma ertelenenleri de yazar
+    monkeypatch.setattr(suggestion_crud, "try_lock_writers", try_lock)
+    offer_crud.create(db, **_offer_fields(rng, vehicle_ids))
+    assert not matching_service._deferred
+    incremental_lists = _suggestions(db)
+    rescore_all(db, k=K)
+    assert incremental_lists == _suggestions(db)
+
+
+def test_suggestion_refresh_is_bounded_per_write(db, monkeypatch):
+    rng = random.Random(17)
+    user_id, vehicle_ids = _seed(db, rng)
+    rescore_all(db, k=K)
+    matching_service.rebuild(db)
+    monkeypatch.setattr(matching_service, "max_refresh", 4)
+    sizes = []
+    replace = suggestion_crud.replace_for_loads
+    monkeypatch.setattr(
+        suggestion_crud,
+        "replace_for_loads",
+        lambda session, lists: sizes.append(len(lists)) or replace(session, lists),
+    )
+
+    _random_writes(db, rng, user_id, vehicle_ids, 40)
+    assert sizes and max(sizes) <= 4
+
+
+def test_drain_on_read_session_stays_on_primary(tmp_path, monkeypatch):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    Base.metadata.create_all(bind=primary)
+    rng = random.Random(21)
+    with sessionmaker(bind=primary)() as db:
+        user_id, _ = _seed(db, rng)
+        rescore_all(db, k=K)
+    # Gecikmeli replika: aşağıdaki yükü henüz görmez
+    shutil.copy(tmp_path / "primary.db", tmp_path / "replica.db")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    with sessionmaker(bind=primary)() as db:
+        fields = {**_load_fields(rng), "pickup_address_id": 1, "pickup_day": TODAY}
+        load_id = db.scalar(
+            insert(Load)
+            .values(owner_user_id=user_id, name="Yeni", **fields)
+            .returning(Load.id)
+        )
+        db.commit()
+    replicas = ReplicaSet(
+        [replica], health_check_seconds=60, read_your_writes_seconds=0
+    )
+    replicas.check()
+    Session = sessionmaker(
+        **{**SessionLocal.kw, "bind": primary},
+        class_=RoutingSession,
+        info={"replicas": replicas},
+    )
+    monkeypatch.setattr(matching_service, "top_k", K)
+    monkeypatch.setattr(matching_service, "rebuild_seconds", 3600)
+    matching_service.invalidate()
+    on_replica = []
+    event.listen(
+        replica,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: on_replica.append(statement),
+    )
+    locked_on = []
+    try_lock = suggestion_crud.try_lock_writers
+    monkeypatch.setattr(
+        suggestion_crud,
+        "try_lock_writers",
+        lambda s: locked_on.append(s.connection().engine) or try_lock(s),
+    )
+    try:
+        with Session() as db:
+            # Sorgu handler'ı (`get_read_db`): kurulum okumaları replikaya gider
+            db.info["replica_ok"] = True
+            matching_service.index(db)
+            assert on_replica
+            on_replica.clear()
+            matching_service.apply(db, Change("load", (load_id,)))
+            assert on_replica == []
+            assert locked_on == [primary]
+            assert db.info["replica_ok"] is True
+            assert load_id in matching_service._index.loads
+        with sessionmaker(bind=primary)() as db:
+            incremental_lists = _suggestions(db)
+            assert load_id in incremental_lists
+            rescore_all(db, k=K)
+            assert incremental_lists == _suggestions(db)
+    finally:
+        matching_service.invalidate()
+        primary.dispose()
+        replica.dispose()
+
+
+def _run_concurrently(*calls):
+    """Coroutine'leri tek event loop'ta eşzamanlı çalıştırır. Loop thread'i
+    bloklanırsa test takılmak yerine zaman aşımıyla başarısız olur."""
+    outcome = {}
+
+    async def gather():
+        return await asyncio.gather(*(call() for call in calls))
+
+    def main():
+        try:
+            outcome["result"] = asyncio.run(gather())
+        except BaseException as exc:
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=main, daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive(), "event loop kilitlendi"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def test_concurrent_async_applies_do_not_block_the_loop(tmp_path, monkeypatch):
+    path = tmp_path / "incremental.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    rng = random.Random(13)
+    with Session() as db:
+        _, vehicle_ids = _seed(db, rng)
+        rescore_all(db, k=K)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    AsyncSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    monkeypatch.setattr(matching_service, "top_k", K)
+    monkeypatch.setattr(matching_service, "rebuild_seconds", 3600)
+    matching_service.invalidate()
+
+    def through_session(fn):
+        async def call():
+            async with AsyncSession() as s:
+                return await s.run_sync(fn)
+
+        return call
+
+    try:
+        (index,) = _run_concurrently(through_session(matching_service.index))
+        # Başka isteklerin commit ettiği yazmalar; olaylar aynı loop'ta eşzamanlı
+        with Session() as db:
+            offer_ids = db.scalars(select(Offer.id).limit(10)).all()
+            load_ids = db.scalars(select(Load.id).limit(10)).all()
+            for offer_id in offer_ids:
+                db.execute(
+                    update(Offer)
+                    .where(Offer.id == offer_id)
+                    .values(**_offer_fields(rng, vehicle_ids))
+                )
+            for load_id in load_ids:
+                db.execute(
+                    update(Load).where(Load.id == load_id).values(**_load_fields(rng))
+                )
+            db.commit()
+        changed = [Change("offer", (i,)) for i in offer_ids] + [
+            Change("load", (i,)) for i in load_ids
+        ]
+        _run_concurrently(
+            *(
+                through_session(lambda s, c=c: matching_service.apply(s, c))
+                for c in changed
+            )
+        )
+
+        assert matching_service._index is index
+        with Session() as db:
+            incremental_lists = _suggestions(db)
+            full = matching_service.rebuild(db)
+            assert index.loads == full.loads and index.offers == full.offers
+            assert index._load_buckets == full._load_buckets
+            assert index._offer_buckets == full._offer_buckets
+            rescore_all(db, k=K)
+            assert incremental_lists == _suggestions(db)
+    finally:
+        matching_service.invalidate()
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
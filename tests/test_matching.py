@@ -0,0 +1,464 @@
+import asyncio
+import random
+import threading
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import changes
+from app.crud import match_suggestion as suggestion_crud
+from app.db import SessionLocal
+from app.deps import get_db
+from app.main import app
+from app.matching import (
+    CAPABILITIES,
+    MASS,
+    VOLUME,
+    CandidateIndex,
+    LoadEntry,
+    OfferEntry,
+    compatible,
+    matching_service,
+    score,
+)
+from app.models.address import Address
+from app.models.base import Base
+from app.models.enums import GenericStatus, Unit
+from app.models.load import Load
+from app.models.match import Match
+from app.models.offer import Offer
+from app.models.user import User
+from app.models.vehicle import Vehicle
+
+client = TestClient(app)
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def Session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    matching_service.invalidate()
+    try:
+        yield Session
+    finally:
+        matching_service.invalidate()
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+
+
+def _headers(email):
+    client.post("/auth/register", json={"email": email, "password": "secret123"})
+    tokens = client.post(
+        "/auth/login", json={"email": email, "password": "secret123"}
+    ).json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def _addresses(Session, *admin1s):
+    with Session() as db:
+        addrs = [Address(country="TR", admin1=a) for a in admin1s]
+        db.add_all(addrs)
+        db.commit()
+        return [a.id for a in addrs]
+
+
+def _offer(Session, vehicle_id, from_id, to_id, days):
+    with Session() as db:
+        offer = Offer(
+            vehicle_id=vehicle_id,
+            from_address_id=from_id,
+            to_address_id=to_id,
+            depart_date=TODAY + timedelta(days=days),
+        )
+        db.add(offer)
+        db.commit()
+        return offer.id
+
+
+def _load(headers, pickup, dropoff, days, **extra):
+    res = client.post(
+        "/loads/",
+        json={
+            "name": "Koli",
+            "pickup_address_id": pickup,
+            "dropoff_address_id": dropoff,
+            "pickup_day": (TODAY + timedelta(days=days)).isoformat(),
+            **extra,
+        },
+        headers=headers,
+    )
+    assert res.status_code == 201, res.text
+    return res.json()["id"]
+
+
+def test_suggested_offers_filters_and_ranks(Session):
+    h = _headers("match-shipper@example.com")
+    carrier = _headers("match-carrier@example.com")
+    ist, ank, izm = _addresses(Session, "İstanbul", "Ankara", "İzmir")
+
+    def vehicle(**fields):
+        res = client.post("/vehicles/", json=fields, headers=carrier)
+        return res.json()["id"]
+
+    food = vehicle(can_food=True, capacity_value=10, capacity_unit="TON")
+    plain = vehicle(capacity_value=10, capacity_unit="TON")
+    small = vehicle(can_food=True, capacity_value=200, capacity_unit="KG")
+    tanker = vehicle(can_food=True, capacity_value=30000, capacity_unit="LITRE")
+    idle = vehicle(can_food=True)
+    with Session() as db:
+        db.get(Vehicle, idle).status = GenericStatus.inactive
+        db.commit()
+
+    best = _offer(Session, food, ist, ank, 1)  # aynı gün, aynı varış ili
+    other_dest = _offer(Session, food, ist, izm, 1)
+    later = _offer(Session, food, ist, ank, 3)
+    _offer(Session, food, ist, ank, 4)  # pencere dışı
+    _offer(Session, food, ank, ist, 1)  # başka alım ili
+    _offer(Session, plain, ist, ank, 1)  # GIDA taşıyamaz
+    _offer(Session, small, ist, ank, 1)  # kapasite yetmez
+    _offer(Session, tanker, ist, ank, 1)  # birim ailesi farklı
+    _offer(Session, idle, ist, ank, 1)  # araç aktif değil
+    _offer(Session, food, ist, ank, -1)  # geçmiş
+
+    load_id = _load(
+        h, ist, ank, 1, category="GIDA", quantity_value=2, quantity_unit="TON"
+    )
+    res = client.get(f"/loads/{load_id}/suggested-offers", headers=h)
+    assert res.status_code == 200, res.text
+    rows = res.json()
+    assert [r["offer_id"] for r in rows] == [best, later, other_dest]
+    assert rows[0]["vehicle_id"] == food
+    assert rows[0]["score"] == pytest.approx(50 + 30 + 20 * 2000 / 10000)
+    assert rows[1]["score"] == pytest.approx(50 + 30 * (1 - 2 / 3) + 4)
+
+    res = client.get(f"/loads/{load_id}/suggested-offers?limit=1", headers=h)
+    assert [r["offer_id"] for r in res.json()] == [best]
+
+    # Başka kullanıcının yükü görünmez
+    res = client.get(f"/loads/{load_id}/suggested-offers", headers=carrier)
+    assert res.status_code == 404
+    res = client.get("/loads/999999/suggested-offers", headers=h)
+    assert res.status_code == 404
+
+
+def test_suggested_loads_for_offer(Session):
+    h = _headers("match-shipper2@example.com")
+    carrier = _headers("match-carrier2@example.com")
+    ist, ank = _addresses(Session, "İstanbul", "Ankara")
+    v = client.post(
+        "/vehicles/", json={"can_dg": True, "capacity_value": 5}, headers=carrier
+    ).json()["id"]
+
+    dg = _load(h, ist, ank, 2, category="TEHLIKELI", quantity_value=1000)
+    general = _load(h, ist, ist, 0)
+    food = _load(h, ist, ank, 2, category="GIDA")
+    closed = _load(h, ist, ank, 2)
+    offer_id = _offer(Session, v, ist, ank, 2)
+    with Session() as db:
+        db.add(Match(load_id=closed, offer_id=offer_id, status="accepted"))
+        db.commit()
+        # Eşleşmelerin CRUD yazma yolu yok: kapanan yük olayla bildirilir
+        changes.emit(db, "load", [closed])
+
+    res = client.get(f"/offers/{offer_id}/suggested-loads", headers=carrier)
+    assert res.status_code == 200, res.text
+    rows = res.json()
+    assert [r["load_id"] for r in rows] == [dg, general]
+    assert rows[0]["category"] == "TEHLIKELI" and rows[0]["quantity_value"] == 1000
+    assert food not in {r["load_id"] for r in rows}
+
+    assert client.get(f"/offers/{offer_id}/suggested-loads", headers=h).status_code == (
+        404
+    )
+    res = client.get("/offers/999999/suggested-loads", headers=carrier)
+    assert res.status_code == 404
+
+
+def test_index_is_rebuilt_periodically(Session, monkeypatch):
+    h = _headers("match-stale@example.com")
+    carrier = _headers("match-stale-carrier@example.com")
+    ist, ank = _addresses(Session, "İstanbul", "Ankara")
+    v = client.post("/vehicles/", json={}, headers=carrier).json()["id"]
+    first = _offer(Session, v, ist, ank, 1)
+    load_id = _load(h, ist, ank, 1)
+    url = f"/loads/{load_id}/suggested-offers"
+    assert [r["offer_id"] for r in client.get(url, headers=h).json()] == [first]
+
+    # İndeks kurulduktan sonra eklenen teklif yeniden kurulumda görünür
+    second = _offer(Session, v, ist, ank, 1)
+    assert [r["offer_id"] for r in client.get(url, headers=h).json()] == [first]
+    monkeypatch.setattr(matching_service, "rebuild_seconds", 0)
+    assert [r["offer_id"] for r in client.get(url, headers=h).json()] == [
+        first,
+        second,
+    ]
+
+    # Sorgulanan yükün kendisi her istekte DB'den okunur
+    client.patch(f"/loads/{load_id}", json={"pickup_address_id": ank}, headers=h)
+    monkeypatch.setattr(matching_service, "rebuild_seconds", 3600)
+    assert client.get(url, headers=h).json() == []
+
+
+def _random_entries(rng, n_loads, n_offers):
+    regions = [("TR", f"IL{i}") for i in range(5)]
+    units = [None, Unit.KG, Unit.TON, Unit.LITRE]
+
+    def amount(unit):
+        if unit is None:
+            return None, None
+        value = rng.choice([None, rng.uniform(1, 30)])
+        scale = 1000.0 if unit == Unit.TON else 1.0
+        family = VOLUME if unit == Unit.LITRE else MASS
+        return family, None if value is None else value * scale
+
+    loads = []
+    for i in range(n_loads):
+        unit = rng.choice(units)
+        family, value = amount(unit)
+        day = rng.randrange(10)
+        loads.append(
+            LoadEntry(
+                id=i,
+                pickup_address_id=1,
+                dropoff_address_id=1,
+                pickup_day=date.fromordinal(day + 1),
+                quantity_value=None,
+                quantity_unit=unit,
+                category=None,
+                origin=rng.choice(regions + [None]),
+                destination=rng.choice(regions),
+                day=day,
+                need=(rng.random() < 0.3, rng.random() < 0.2, family),
+                amount=value,
+            )
+        )
+    offers = []
+    for i in range(n_offers):
+        cap = rng.choice(CAPABILITIES)
+        _, capacity = amount({None: None, MASS: Unit.TON, VOLUME: Unit.LITRE}[cap[2]])
+        offers.append(
+            OfferEntry(
+                id=i,
+                vehicle_id=i,
+                from_address_id=1,
+                to_address_id=1,
+                depart_date=date.fromordinal(1),
+                origin=rng.choice(regions),
+                destination=rng.choice(regions),
+                day=rng.randrange(10),
+                cap=cap,
+                capacity=capacity,
+            )
+        )
+    return loads, offers
+
+
+def _brute_force(candidates, pair, window, limit):
+    scored = []
+    for other in candidates:
+        load, offer = pair(other)
+        if (
+            load.origin is None
+            or load.origin != offer.origin
+            or abs(load.day - offer.day) > window
+            or not compatible(load.need, offer.cap)
+        ):
+            continue
+        s = score(load, offer, window)
+        if s is not None:
+            scored.append((other, s))
+    scored.sort(key=lambda p: (-p[1], p[0].id))
+    return scored[:limit]
+
+
+def test_index_matches_brute_force():
+    rng = random.Random(7)
+    loads, offers = _random_entries(rng, 400, 300)
+    index = CandidateIndex(loads, offers, window=2)
+    for load in loads[:100]:
+        expected = _brute_force(offers, lambda o: (load, o), 2, 10)
+        assert index.offers_for(load, 10) == expected
+    for offer in offers[:100]:
+        expected = _brute_force(loads, lambda ld: (ld, offer), 2, 10)
+        assert index.loads_for(offer, 10) == expected
+
+
+def test_writes_update_index_without_rebuild(Session, monkeypatch):
+    h = _headers("match-live@example.com")
+    carrier = _headers("match-live-carrier@example.com")
+    ist, ank = _addresses(Session, "İstanbul", "Ankara")
+    v = client.post("/vehicles/", json={}, headers=carrier).json()["id"]
+    monkeypatch.setattr(matching_service, "rebuild_seconds", 3600)
+
+    payload = {
+        "vehicle_id": v,
+        "from_address_id": ist,
+        "to_address_id": ank,
+        "depart_date": (TODAY + timedelta(days=1)).isoformat(),
+    }
+    # Başkasının aracına teklif verilemez
+    assert client.post("/offers/", json=payload, headers=h).status_code == 404
+    res = client.post("/offers/", json=payload, headers=carrier)
+    assert res.status_code == 201, res.text
+    offer_id = res.json()["id"]
+    assert client.get(f"/offers/{offer_id}", headers=carrier).json()["vehicle_id"] == v
+    assert client.get(f"/offers/{offer_id}", headers=h).status_code == 404
+
+    # Yeni yük yeniden kurulum beklemeden teklifin önerilerinde
+    load_id = _load(h, ist, ank, 1)
+    url = f"/offers/{offer_id}/suggested-loads"
+    assert [r["load_id"] for r in client.get(url, headers=carrier).json()] == [load_id]
+    with Session() as db:
+        assert [o for o, _ in suggestion_crud.list_for_load(db, load_id)] == [offer_id]
+
+    res = client.patch(
+        f"/offers/{offer_id}", json={"from_address_id": ank}, headers=carrier
+    )
+    assert res.status_code == 200 and res.json()["from_address_id"] == ank
+    assert client.get(url, headers=carrier).json() == []
+    with Session() as db:
+        assert suggestion_crud.list_for_load(db, load_id) == []
+    assert client.patch(f"/offers/{offer_id}", json={}, headers=h).status_code == 403
+
+    assert client.delete(f"/offers/{offer_id}", headers=h).status_code == 403
+    assert client.delete(f"/offers/{offer_id}", headers=carrier).status_code == 204
+    assert client.get(f"/offers/{offer_id}", headers=carrier).status_code == 404
+    assert offer_id not in matching_service._index.offers
+
+
+def _run_concurrently(*calls):
+    """Coroutine'leri tek event loop'ta eşzamanlı çalıştırır. Loop thread'i
+    bloklanırsa test takılmak yerine zaman aşımıyla başarısız olur."""
+    outcome = {}
+
+    async def gather():
+        return await asyncio.gather(*(call() for call in calls))
+
+    def main():
+        try:
+            outcome["result"] = asyncio.run(gather())
+        except BaseException as exc:
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=main, daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive(), "event loop kilitlendi"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+@pytest.fixture
+def async_matching_db(tmp_path, monkeypatch):
+    """Dosya tabanlı aiosqlite (DB_ASYNC modu); yükler ve teklifler hazır."""
+    path = tmp_path / "matching.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        user = User(email="async-matching@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        db.execute(
+            insert(Address), [{"country": "TR", "admin1": f"IL{i}"} for i in range(4)]
+        )
+        vehicle = Vehicle(owner_user_id=user.id)
+        db.add(vehicle)
+        db.flush()
+        db.execute(
+            insert(Load),
+            [
+                {
+                    "owner_user_id": user.id,
+                    "name": f"Yük {i}",
+                    "pickup_address_id": 1 + i % 4,
+                    "dropoff_address_id": 1 + (i + 1) % 4,
+                    "pickup_day": TODAY + timedelta(days=i % 3),
+                }
+                for i in range(200)
+            ],
+        )
+        db.execute(
+            insert(Offer),
+            [
+                {
+                    "vehicle_id": vehicle.id,
+                    "from_address_id": 1 + i % 4,
+                    "to_address_id": 1 + (i + 2) % 4,
+                    "depart_date": TODAY + timedelta(days=i % 3),
+                }
+                for i in range(40)
+            ],
+        )
+        db.commit()
+        ids = {"user": user.id, "vehicle": vehicle.id}
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    monkeypatch.setattr(matching_service, "rebuild_seconds", 3600)
+    matching_service.invalidate()
+    try:
+        yield async_sessionmaker(bind=async_engine, expire_on_commit=False), ids
+    finally:
+        matching_service.invalidate()
+        asyncio.run(async_engine.dispose())
+
+
+def test_cold_index_is_built_once_for_concurrent_async_requests(
+    async_matching_db, monkeypatch
+):
+    AsyncSession, ids = async_matching_db
+    rebuilds = []
+    rebuild = matching_service.rebuild
+
+    def counting_rebuild(db):
+        rebuilds.append(1)
+        return rebuild(db)
+
+    monkeypatch.setattr(matching_service, "rebuild", counting_rebuild)
+
+    def through_session(fn):
+        async def call():
+            async with AsyncSession() as db:
+                return await db.run_sync(fn)
+
+        return call
+
+    def corridor(db):
+        return matching_service.corridor_loads(
+            db, 1, user_id=ids["user"], detour_km=100
+        )
+
+    # Kurulum DB okumasında loop'a döner; diğer istekler loop'u bloklamadan bekler
+    *indexes, along = _run_concurrently(
+        *(through_session(matching_service.index) for _ in range(3)),
+        through_session(corridor),
+    )
+    assert rebuilds == [1]
+    assert indexes[0] is indexes[1] is indexes[2] is matching_service._index
+    assert len(indexes[0].loads) == 200 and len(indexes[0].offers) == 40
+    assert along is not None
@@ -0,0 +1,94 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import openapi
+from app.config import settings
+from app.main import app
+
+client = TestClient(app)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(autouse=True)
+def fresh_document():
+    """Her test belgeyi yeniden yükler (önbellek app.state'te)."""
+    app.state.openapi_document = None
+    yield
+    app.state.openapi_document = None
+
+
+def test_openapi_served_precompressed_with_etag(monkeypatch):
+    res = client.get("/openapi.json")
+    assert res.status_code == 200
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["cache-control"] == openapi.CACHE_CONTROL
+    schema = res.json()
+    assert "/loads/{load_id}" in schema["paths"]
+    assert schema["servers"][0]["url"] == settings.LOCAL_API_URL
+
+    # Belge bir kez üretilir; sonraki istekler önbellekteki baytları döner
+    monkeypatch.setattr(app, "openapi", lambda: pytest.fail("yeniden üretildi"))
+    tag = res.headers["etag"]
+    res = client.get("/openapi.json", headers={"If-None-Match": tag})
+    assert res.status_code == 304 and res.content == b""
+    res = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in res.headers
+    assert res.json() == schema
+
+
+def test_prerendered_document_per_env(tmp_path, monkeypatch, capsys):
+    template = str(tmp_path / "openapi.{env}.json")
+    monkeypatch.setattr(settings, "OPENAPI_FILE", template)
+    openapi.main(["--env", "staging"])
+    assert "openapi.staging.json" in capsys.readouterr().out
+    written = tmp_path / "openapi.staging.json"
+    gz = tmp_path / "openapi.staging.json.gz"
+    assert gzip.decompress(gz.read_bytes()) == written.read_bytes()
+
+    # Dosya varsa şema hiç üretilmez; .gz kopyası olduğu gibi gönderilir
+    monkeypatch.setattr(settings, "ENV", "staging")
+    monkeypatch.setattr(app, "openapi", lambda: pytest.fail("şema üretildi"))
+    res = client.get("/openapi.json")
+    assert res.status_code == 200
+    assert json.loads(written.read_bytes())["servers"][0]["description"] == "Staging"
+    assert res.json()["servers"][0]["url"] == settings.STAGING_API_URL
+
+
+# Soğuk başlangıç: taze bir süreçte `import app.main` süresi ve ağır modüller
+_IMPORT = textwrap.dedent(
+    """
+    import sys, time
+    t = time.perf_counter()
+    import app.main
+    ms = (time.perf_counter() - t) * 1000
+    print(round(ms), ",".join(m for m in ("jose", "passlib") if m in sys.modules))
+    """
+)
+
+# CI makineleri yavaş olabilir; bütçe ortam değişkeniyle daraltılabilir
+IMPORT_BUDGET_MS = int(os.environ.get("IMPORT_BUDGET_MS", "3000"))
+
+
+def test_import_time_budget(record_property):
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    ms, eager = int(out[0]), out[1:]
+    record_property("import_app_main_ms", ms)
+    print(f"import app.main: {ms} ms")
+    # JWT ve bcrypt kütüphaneleri ilk kullanımda yüklenir
+    assert eager == []
+    assert ms < IMPORT_BUDGET_MS, ms
@@ -113,3 +113,64 @@ def test_org_access_control():
     assert res.status_code == 404
     res = client.delete(f"/orgs/{org_id}", headers=h2)
     assert res.status_code == 403
+
+
+def test_org_scoped_listing_and_single_query_detail(monkeypatch):
+    from app.crud import org_user as org_user_crud
+    from app.models.enums import OrgRole
+
+    _register("sc-own@example.com")
+    admin = _register("sc-adm@example.com")
+    _register("sc-out@example.com")
+    h_owner = {
+        "Authorization": f"Bearer {_login('sc-own@example.com')['access_token']}"
+    }
+    org_id = client.post("/orgs/", json={"title": "Scope"}, headers=h_owner).json()[
+        "id"
+    ]
+    vids = [
+        client.post(
+            "/vehicles/",
+            json={"organization_id": org_id, "capacity_value": i},
+            headers=h_owner,
+        ).json()["id"]
+        for i in range(3)
+    ]
+    gen = app.dependency_overrides[get_db]()
+    db = next(gen)
+    try:
+        org_user_crud.assign_role(
+            db,
+            organization_id=org_id,
+            user_id=admin["id"],
+            role=OrgRole.corporate_admin,
+        )
+    finally:
+        db.close()
+    h_admin = {
+        "Authorization": f"Bearer {_login('sc-adm@example.com')['access_token']}"
+    }
+    h_out = {"Authorization": f"Bearer {_login('sc-out@example.com')['access_token']}"}
+
+    # Detay: admin görünürlüğü aynı sorguda çözülür, ayrı is_admin çağrısı yok
+    def no_second_query(*args, **kwargs):
+        raise AssertionError("is_admin çağrılmamalı")
+
+    monkeypatch.setattr(org_user_crud, "is_admin", no_second_query)
+    assert client.get(f"/vehicles/{vids[0]}", headers=h_admin).status_code == 200
+    assert client.get(f"/orgs/{org_id}", headers=h_admin).status_code == 200
+    assert client.get(f"/vehicles/{vids[0]}", headers=h_out).status_code == 404
+    assert client.get(f"/orgs/{org_id}", headers=h_out).status_code == 404
+
+    # Org listesi: sahip ve admin hepsini görür, dışarıdaki kullanıcı hiçbirini
+    res = client.get(f"/orgs/{org_id}/vehicles?limit=2", headers=h_admin)
+    assert [v["id"] for v in res.json()] == sorted(vids, reverse=True)[:2]
+    res = client.get(
+        f"/orgs/{org_id}/vehicles?after={res.headers['X-Next-Cursor']}",
+        headers=h_admin,
+    )
+    assert [v["id"] for v in res.json()] == [min(vids)]
+    res = client.get(f"/orgs/{org_id}/vehicles", headers=h_owner)
+    assert len(res.json()) == 3
+    assert client.get(f"/orgs/{org_id}/vehicles", headers=h_out).json() == []
+    assert client.get(f"/orgs/{org_id}/loads", headers=h_admin).json() == []
@@ -167,3 +167,42 @@ def test_loads_pagination_and_filter():
     res = client.get("/loads/?limit=1", headers=headers)
     assert res.status_code == 200
     assert len(res.json()) == 1
+
+
+def test_orgs_cursor_pagination_walks_all_pages():
+    _register("pc@example.com")
+    tokens = _login("pc@example.com")
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    titles = ["C1", "C2", "C3"]
+    for t in titles:
+        assert (
+            client.post("/orgs/", json={"title": t}, headers=headers).status_code == 201
+        )
+
+    first = client.get("/orgs/?limit=2", headers=headers)
+    assert first.status_code == 200
+    assert [o["title"] for o in first.json()] == ["C3", "C2"]
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get(f"/orgs/?limit=2&after={cursor}", headers=headers)
+    assert second.status_code == 200
+    assert [o["title"] for o in second.json()] == ["C1"]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_cursor_rejects_garbage_foreign_kind_and_offset():
+    _register("pe@example.com")
+    tokens = _login("pe@example.com")
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    from app.pagination import encode_cursor
+
+    assert client.get("/loads/?after=%%%", headers=headers).status_code == 400
+    vehicle_cursor = encode_cursor("vehicles", 10)
+    res = client.get(f"/loads/?after={vehicle_cursor}", headers=headers)
+    assert res.status_code == 400
+    res = client.get(
+        f"/loads/?after={encode_cursor('loads', 10)}&offset=5", headers=headers
+    )
+    assert res.status_code == 400
+    res = client.get(f"/loads/?after={encode_cursor('loads', 10)}", headers=headers)
+    assert res.status_code == 200
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import auth as auth_api
+from app.db import SessionLocal
+from app.deps import get_db
+from app.main import app
+from app.models.base import Base
+from app.passwords import PasswordPoolSaturated, PasswordService
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def own_db():
+    """Modül tek başına çalışsın: başka test modüllerinin override'ına dayanmaz."""
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+        engine.dispose()
+
+
+def test_password_service_process_pool_roundtrip():
+    svc = PasswordService(workers=1, max_pending=1)
+    try:
+        hashed = svc.hash("secret123")
+        assert svc.verify("secret123", hashed)
+        assert not svc.verify("wrong", hashed)
+    finally:
+        svc.shutdown()
+
+
+def test_password_service_rejects_when_saturated():
+    svc = PasswordService(workers=0, max_pending=1)
+    # tüm slotları elle doldur: yeni iş beklemeden reddedilmeli
+    assert svc._slots.acquire(blocking=False)
+    with pytest.raises(PasswordPoolSaturated):
+        svc.hash("secret123")
+    svc._slots.release()
+    assert svc.verify("secret123", svc.hash("secret123"))
+
+
+def test_inline_async_hashing_does_not_block_the_loop(monkeypatch):
+    svc = PasswordService(workers=0, max_pending=1)
+    ran_on = []
+    monkeypatch.setattr(
+        "app.passwords.get_password_hash",
+        lambda password: ran_on.append(threading.current_thread()) or "hash",
+    )
+
+    async def main():
+        loop_thread = threading.current_thread()
+        assert await svc.ahash("secret123") == "hash"
+        return loop_thread
+
+    try:
+        loop_thread = asyncio.run(main())
+    finally:
+        svc.shutdown()
+    assert ran_on and ran_on[0] is not loop_thread
+    # Slot iş bitince bırakılır
+    assert svc._slots.acquire(blocking=False)
+
+
+def test_login_returns_503_when_pool_saturated(own_db, monkeypatch):
+    email = "busy@example.com"
+    client.post("/auth/register", json={"email": email, "password": "secret123"})
+
+    async def _saturated(*args, **kwargs):
+        raise PasswordPoolSaturated()
+
+    monkeypatch.setattr(auth_api.password_service, "averify", _saturated)
+    res = client.post("/auth/login", json={"email": email, "password": "secret123"})
+    assert res.status_code == 503
+    assert res.headers.get("retry-after") == "1"
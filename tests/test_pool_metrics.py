@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy import exc as sa_exc
+from sqlalchemy import text
+
+from app.main import app
+from app.pool_metrics import (
+    InstrumentedQueuePool,
+    PoolMetrics,
+    pool_snapshot,
+    track_pre_ping_failures,
+)
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    eng = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+        pool_pre_ping=True,
+    )
+    yield eng
+    eng.dispose()
+
+
+def test_snapshot_reports_checked_out_and_overflow(engine):
+    c1 = engine.connect()
+    c2 = engine.connect()
+    snap = pool_snapshot(engine)
+    assert snap["checked_out"] == 2
+    assert snap["overflow"] == 1
+    assert snap["checkout_wait_ms"]["count"] == 2
+    assert snap["checkout_wait_ms"]["buckets"]["+Inf"] == 2
+    c1.close()
+    c2.close()
+    assert pool_snapshot(engine)["checked_out"] == 0
+
+
+def test_pool_timeout_is_counted(engine):
+    held = [engine.connect(), engine.connect()]
+    with pytest.raises(sa_exc.TimeoutError):
+        engine.connect()
+    snap = pool_snapshot(engine)
+    assert snap["timeouts"] == 1
+    assert snap["checkout_wait_ms"]["sum"] >= 50
+    for c in held:
+        c.close()
+
+
+def test_metrics_survive_dispose(engine):
+    with engine.connect() as c:
+        c.execute(text("SELECT 1"))
+    engine.dispose()
+    assert pool_snapshot(engine)["checkout_wait_ms"]["count"] == 1
+
+
+def test_pre_ping_failure_is_counted(engine):
+    track_pre_ping_failures(engine)
+    with engine.connect() as c:
+        raw = c.connection.dbapi_connection
+    raw.close()  # havuzdaki bağlantı sunucu tarafında kopmuş gibi
+    with engine.connect() as c:
+        assert c.execute(text("SELECT 1")).scalar() == 1
+    assert pool_snapshot(engine)["pre_ping_failures"] == 1
+
+
+def test_counters_are_not_lost_across_threads():
+    metrics = PoolMetrics()
+
+    def bump():
+        for _ in range(10_000):
+            metrics.count_timeout()
+            metrics.count_pre_ping_failure()
+
+    threads = [threading.Thread(target=bump) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert metrics.timeouts == metrics.pre_ping_failures == 80_000
+
+
+def test_db_pool_endpoint():
+    resp = TestClient(app).get("/metrics/db-pool")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert "sync" in data
+    assert data["config"]["pool_size"] >= 1
@@ -0,0 +1,188 @@
+"""CRUD sorguları PostgreSQL planlarında kendileri için tanımlanan index'i kullanmalı.
+
+Yalnızca PostgreSQL erişilebilirse çalışır (`EXPLAIN_DATABASE_URL`, yoksa
+`DATABASE_URL`); geçici bir şemada tablolar oluşturulur ve sonunda silinir.
+`enable_seqscan = off` küçük tablolarda da index'leri aday yapar; ancak uygun
+index yoksa planlayıcı birincil anahtar index'ini tarayıp filtreleyebilir, bu
+yüzden Seq Scan olmaması yetmez: her sorgu için beklenen index adı planda
+aranır.
+"""
+
+import os
+import uuid
+from typing import Any, Callable, Iterator, List
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.crud import load as load_crud
+from app.crud import org_user as org_user_crud
+from app.crud import organization as org_crud
+from app.crud import user as user_crud
+from app.crud import vehicle as vehicle_crud
+
+# ensure models registered
+from app.models import address as _address  # noqa: F401
+from app.models import org_user as _org_user  # noqa: F401
+from app.models import revoked_token as _revoked_token  # noqa: F401
+from app.models.address import Address
+from app.models.base import Base
+from app.models.enums import OrgRole
+
+PG_URL = os.getenv("EXPLAIN_DATABASE_URL") or settings.DATABASE_URL
+
+
+@pytest.fixture(scope="module")
+def pg() -> Iterator[dict]:
+    if not PG_URL.startswith("postgresql"):
+        pytest.skip("PostgreSQL gerekli")
+    schema = f"explain_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(PG_URL, connect_args={"connect_timeout": 3})
+    try:
+        with admin.begin() as conn:
+            conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+    except OperationalError:
+        admin.dispose()
+        pytest.skip("PostgreSQL erişilemiyor")
+
+    engine = create_engine(PG_URL, connect_args={"options": f"-csearch_path={schema}"})
+    try:
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            u = user_crud.create(db, email="plan@example.com", password_hash="x")
+            org = org_crud.create(db, title="Plan", owner_user_id=u.id)
+            org_user_crud.assign_role(
+                db, organization_id=org.id, user_id=u.id, role=OrgRole.corporate_admin
+            )
+            a = Address(country="TR", admin1="IST")
+            db.add(a)
+            db.commit()
+            ids = {"user": u.id, "org": org.id, "address": a.id}
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+        yield {"engine": engine, **ids}
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+        admin.dispose()
+
+
+def _seq_scans(plan: Any) -> List[str]:
+    found = []
+    if isinstance(plan, dict):
+        if plan.get("Node Type") == "Seq Scan":
+            found.append(plan.get("Relation Name", "?"))
+        for child in plan.get("Plans", []):
+            found.extend(_seq_scans(child))
+    elif isinstance(plan, list):
+        for item in plan:
+            found.extend(_seq_scans(item.get("Plan", item)))
+    return found
+
+
+def _index_names(plan: Any) -> List[str]:
+    found = []
+    if isinstance(plan, dict):
+        if "Index Name" in plan:
+            found.append(plan["Index Name"])
+        for child in plan.get("Plans", []):
+            found.extend(_index_names(child))
+    elif isinstance(plan, list):
+        for item in plan:
+            found.extend(_index_names(item.get("Plan", item)))
+    return found
+
+
+def _explain_selects(engine, fn: Callable[[Session], object]) -> List[tuple]:
+    """`fn`'in çalıştırdığı SELECT'leri yakalar ve her birinin planını döner."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    with sessionmaker(bind=engine)() as db:
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            fn(db)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        conn = db.connection()
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        return [
+            (
+                statement,
+                conn.exec_driver_sql(
+                    "EXPLAIN (FORMAT JSON) " + statement, parameters
+                ).scalar(),
+            )
+            for statement, parameters in captured
+        ]
+
+
+# sorgu adı -> (sorgu, planda görünmesi gereken index)
+QUERIES = {
+    "load.list_my": (
+        lambda db, ids: load_crud.list_my(db, ids["user"], limit=20),
+        "ix_load_owner_user_id_id",
+    ),
+    "load.list_my[org]": (
+        lambda db, ids: load_crud.list_my(
+            db, ids["user"], organization_id=ids["org"], limit=20
+        ),
+        "ix_load_owner_user_id_organization_id_id",
+    ),
+    "load.list_my[after]": (
+        lambda db, ids: load_crud.list_my(db, ids["user"], limit=20, after_id=1000),
+        "ix_load_owner_user_id_id",
+    ),
+    "load.get": (lambda db, ids: load_crud.get(db, 1), "load_pkey"),
+    "vehicle.list_my": (
+        lambda db, ids: vehicle_crud.list_my(db, ids["user"], limit=20),
+        "ix_vehicle_owner_user_id_id",
+    ),
+    "vehicle.list_my[org]": (
+        lambda db, ids: vehicle_crud.list_my(
+            db, ids["user"], organization_id=ids["org"], limit=20
+        ),
+        "ix_vehicle_owner_user_id_organization_id_id",
+    ),
+    "vehicle.get": (lambda db, ids: vehicle_crud.get(db, 1), "vehicle_pkey"),
+    "organization.list_by_owner": (
+        lambda db, ids: org_crud.list_by_owner(db, ids["user"], limit=20),
+        "ix_organization_owner_user_id_id",
+    ),
+    "organization.get": (
+        lambda db, ids: org_crud.get(db, ids["org"]),
+        "organization_pkey",
+    ),
+    "org_user.is_admin": (
+        lambda db, ids: org_user_crud.is_admin(db, ids["org"], ids["user"]),
+        "ix_orguser_organization_id_user_id",
+    ),
+    "org_user.membership_claims": (
+        lambda db, ids: org_user_crud.membership_claims(db, ids["user"]),
+        "ix_orguser_user_id",
+    ),
+    "user.get": (lambda db, ids: user_crud.get(db, ids["user"]), "user_pkey"),
+    "user.get_by_email": (
+        lambda db, ids: user_crud.get_by_email(db, "plan@example.com"),
+        "ix_user_email",
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+def test_crud_query_uses_index(pg, name):
+    query, index = QUERIES[name]
+    plans = _explain_selects(pg["engine"], lambda db: query(db, pg))
+    assert plans, f"{name} hiç SELECT çalıştırmadı"
+    for statement, plan in plans:
+        scans = _seq_scans(plan)
+        assert not scans, f"{name}: {scans} üzerinde Seq Scan\n{statement}"
+    used = [ix for _statement, plan in plans for ix in _index_names(plan)]
+    assert index in used, f"{name}: {index} kullanılmadı (kullanılan: {used})"
@@ -0,0 +1,166 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Generator
+
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.deps import get_db
+from app.main import app
+from app.models import revoked_token as _revoked_token  # noqa: F401
+from app.models import user as _user  # noqa: F401
+from app.models.base import Base
+from app.models.revoked_token import RevokedToken
+from app.revocation import BloomFilter, RevocationStore, revocation_store
+from app.security import create_refresh_token
+
+
+def _setup_test_db():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    @contextmanager
+    def _session_scope() -> Generator[Session, None, None]:
+        db = TestingSessionLocal()
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    def override_get_db() -> Generator[Session, None, None]:
+        with _session_scope() as s:
+            yield s
+
+    return override_get_db
+
+
+app.dependency_overrides[get_db] = _setup_test_db()
+client = TestClient(app)
+
+
+def _login(email: str, password: str = "secret123"):
+    client.post("/auth/register", json={"email": email, "password": password})
+    r = client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200
+    return r.json()
+
+
+def _refresh(token: str):
+    return client.post("/auth/refresh", json={"refresh_token": token})
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"k{i}" for i in range(1000)]
+    for k in keys:
+        bloom.add(k)
+    assert all(k in bloom for k in keys)
+    false_positives = sum(f"x{i}" in bloom for i in range(10000))
+    assert false_positives < 500
+
+
+def test_refresh_rotation_and_reuse_detection():
+    tokens = _login("rotate@example.com")
+    r1 = _refresh(tokens["refresh_token"])
+    assert r1.status_code == 200
+    rotated = r1.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    r2 = _refresh(rotated["refresh_token"])
+    assert r2.status_code == 200
+    rotated = r2.json()
+
+    # eski token ikinci kez kullanılırsa reddedilir ve tüm zincir iptal olur
+    assert _refresh(tokens["refresh_token"]).status_code == 401
+    assert _refresh(rotated["refresh_token"]).status_code == 401
+
+
+def test_logout_revokes_family():
+    tokens = _login("logout@example.com")
+    rotated = _refresh(tokens["refresh_token"]).json()
+    res = client.post("/auth/logout", json={"refresh_token": rotated["refresh_token"]})
+    assert res.status_code == 204
+    assert _refresh(rotated["refresh_token"]).status_code == 401
+
+    # yeni giriş yeni bir zincir başlatır
+    fresh = _login("logout@example.com")
+    assert _refresh(fresh["refresh_token"]).status_code == 200
+
+
+def test_refresh_without_jti_or_wrong_type_unauthorized():
+    tokens = _login("legacy@example.com")
+    assert _refresh(tokens["access_token"]).status_code == 401
+    assert _refresh("not-a-token").status_code == 401
+
+
+def test_not_revoked_check_skips_db():
+    tokens = _login("bloom@example.com")
+    before = revocation_store.stats()
+    assert _refresh(tokens["refresh_token"]).status_code == 200
+    after = revocation_store.stats()
+    assert after["db_checks"] == before["db_checks"]
+    assert after["filter_negatives"] == before["filter_negatives"] + 2
+
+
+def test_create_refresh_token_keeps_family():
+    claims = jwt.decode(
+        create_refresh_token("1", family="fam-1"),
+        settings.JWT_SECRET_KEY,
+        algorithms=[settings.JWT_ALGORITHM],
+    )
+    assert claims["fam"] == "fam-1" and claims["jti"] != "fam-1"
+
+
+def test_revocation_rebuild_is_single_flight_and_uses_own_session(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'revoked.db'}")
+    Base.metadata.create_all(bind=engine)
+    store = RevocationStore(capacity=100, error_rate=0.01, rebuild_seconds=3600)
+    expired = datetime.now(timezone.utc) - timedelta(days=1)
+    with Session(engine) as db:
+        db.add(RevokedToken(jti="old", user_id=None, expires_at=expired))
+        db.commit()
+
+    # Yeniden kurulum isteğin oturumunu commit etmez
+    with Session(engine) as db:
+        db.add(RevokedToken(jti="pending", user_id=None, expires_at=expired))
+        store.rebuild(db)
+        assert [t.jti for t in db.new] == ["pending"]
+        db.rollback()
+    with Session(engine) as db:
+        assert db.query(RevokedToken.jti).all() == []
+
+    # Kurulum sürerken gelen istek beklemez; filtre yoksa DB'ye sorar
+    store = RevocationStore(capacity=100, error_rate=0.01, rebuild_seconds=3600)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    real_rebuild = store.rebuild
+
+    def slow_rebuild(db):
+        calls.append(db)
+        started.set()
+        release.wait(5)
+        real_rebuild(db)
+
+    store.rebuild = slow_rebuild
+    with Session(engine) as db1, Session(engine) as db2:
+        worker = threading.Thread(target=store.is_revoked, args=(db1, "a"))
+        worker.start()
+        assert started.wait(5)
+        assert store.is_revoked(db2, "b") is False
+        assert store.stats() == {"filter_negatives": 0, "db_checks": 1}
+        release.set()
+        worker.join(5)
+    assert len(calls) == 1
+    with Session(engine) as db:
+        assert store.is_revoked(db, "c") is False
+    assert len(calls) == 1 and store.stats()["filter_negatives"] == 2
@@ -0,0 +1,199 @@
+import time
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import load as load_crud
+from app.crud import user as user_crud
+from app.deps import get_db
+from app.main import app
+from app.models.address import Address
+from app.models.base import Base
+from app.models.load import Load
+from app.replicas import WRITE_COOKIE, WRITE_HEADER, ReplicaSet, RoutingSession
+from app.security import create_access_token
+
+client = TestClient(app)
+
+
+def _engine(path):
+    eng = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=eng)
+    return eng
+
+
+def _seed(eng, load_names):
+    with sessionmaker(bind=eng)() as db:
+        u = user_crud.create(db, email="rep@example.com", password_hash="x")
+        a = Address(country="TR", admin1="IST")
+        db.add(a)
+        db.commit()
+        for name in load_names:
+            load_crud.create(
+                db,
+                owner_user_id=u.id,
+                organization_id=None,
+                name=name,
+                quantity_value=None,
+                quantity_unit=None,
+                category=None,
+                pickup_address_id=a.id,
+                dropoff_address_id=a.id,
+                pickup_day=date(2025, 12, 31),
+                intl=False,
+            )
+        return u.id, a.id
+
+
+@pytest.fixture
+def routed(tmp_path):
+    """Primary ve tek replika; replikada yalnızca orada bulunan bir yük vardır."""
+    primary = _engine(tmp_path / "primary.db")
+    replica = _engine(tmp_path / "replica.db")
+    user_id, address_id = _seed(primary, ["primary"])
+    _seed(replica, ["primary", "replica-only"])
+    replicas = ReplicaSet(
+        [replica], health_check_seconds=60, read_your_writes_seconds=60
+    )
+    replicas.check()
+    Session = sessionmaker(
+        class_=RoutingSession,
+        bind=primary,
+        autoflush=False,
+        info={"replicas": replicas},
+    )
+    yield Session, replicas, user_id, address_id
+    primary.dispose()
+    replica.dispose()
+
+
+def _names(db):
+    return sorted(db.scalars(select(Load.name)))
+
+
+def test_only_flagged_sessions_read_from_replica(routed):
+    Session, _, _, _ = routed
+    with Session() as db:
+        assert _names(db) == ["primary"]
+    with Session() as db:
+        db.info["replica_ok"] = True
+        assert _names(db) == ["primary", "replica-only"]
+
+
+def test_session_stays_on_primary_after_write(routed):
+    Session, replicas, user_id, address_id = routed
+    with Session() as db:
+        db.info.update(replica_ok=True, user_id=user_id)
+        db.add(
+            Load(
+                owner_user_id=user_id,
+                name="yeni",
+                pickup_address_id=address_id,
+                dropoff_address_id=address_id,
+                pickup_day=date(2025, 12, 31),
+            )
+        )
+        db.commit()
+        assert _names(db) == ["primary", "yeni"]
+    assert replicas.recently_wrote(user_id)
+
+
+def test_unhealthy_replica_is_skipped(tmp_path):
+    healthy = _engine(tmp_path / "ok.db")
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'x.db'}")
+    replicas = ReplicaSet(
+        [broken, healthy], health_check_seconds=60, read_your_writes_seconds=0
+    )
+    replicas.check()
+    assert [replicas.pick() for _ in range(3)] == [healthy] * 3
+    assert replicas.stats() == [
+        {"replica": 0, "healthy": False},
+        {"replica": 1, "healthy": True},
+    ]
+    down = ReplicaSet([broken], health_check_seconds=60, read_your_writes_seconds=0)
+    down.check()
+    assert down.pick() is None  # okumalar primary'ye düşer
+
+
+def test_health_check_runs_outside_the_request(tmp_path, monkeypatch):
+    healthy = _engine(tmp_path / "ok.db")
+    replicas = ReplicaSet(
+        [healthy], health_check_seconds=60, read_your_writes_seconds=0
+    )
+    calls = []
+
+    def slow_check():
+        calls.append(1)
+        time.sleep(0.5)
+        replicas._healthy[id(healthy)] = True
+
+    monkeypatch.setattr(replicas, "check", slow_check)
+    t0 = time.monotonic()
+    # İlk yoklama bitene kadar okumalar beklemeden primary'ye düşer
+    assert replicas.pick() is None
+    assert replicas.pick() is None
+    assert time.monotonic() - t0 < 0.3
+    deadline = time.monotonic() + 5
+    while replicas.pick() is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert replicas.pick() is healthy
+    assert calls == [1]  # aralık dolmadan yeniden yoklanmaz
+
+
+def test_get_endpoints_use_replica_until_user_writes(routed):
+    Session, replicas, user_id, address_id = routed
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        headers = {"Authorization": f"Bearer {create_access_token(str(user_id))}"}
+        names = [x["name"] for x in client.get("/loads/", headers=headers).json()]
+        assert sorted(names) == ["primary", "replica-only"]
+
+        created = client.post(
+            "/loads/",
+            json={
+                "name": "yazıldı",
+                "pickup_address_id": address_id,
+                "dropoff_address_id": address_id,
+                "pickup_day": "2025-12-31",
+            },
+            headers=headers,
+        )
+        assert created.status_code == 201
+        last_write = created.headers[WRITE_HEADER]
+        assert client.cookies.get(WRITE_COOKIE) == last_write
+        # read-your-writes: yeni yük replikada yok, okuma primary'den gelir
+        names = [x["name"] for x in client.get("/loads/", headers=headers).json()]
+        assert sorted(names) == ["primary", "yazıldı"]
+
+        # Başka bir worker: bellekteki kayıt yok, istemcinin geri gönderdiği
+        # çerez ya da başlık okumayı primary'de tutar
+        replicas._last_write.clear()
+        names = [x["name"] for x in client.get("/loads/", headers=headers).json()]
+        assert sorted(names) == ["primary", "yazıldı"]
+        client.cookies.clear()
+        res = client.get("/loads/", headers={**headers, WRITE_HEADER: last_write})
+        assert sorted(x["name"] for x in res.json()) == ["primary", "yazıldı"]
+        # Bilgi taşımayan (ya da eski değer gönderen) istemci replikadan okur
+        old = str(time.time() - 3600)
+        for extra in ({}, {WRITE_HEADER: old}, {WRITE_HEADER: "bozuk"}):
+            res = client.get("/loads/", headers={**headers, **extra})
+            assert WRITE_HEADER not in res.headers
+            assert sorted(x["name"] for x in res.json()) == ["primary", "replica-only"]
+    finally:
+        client.cookies.clear()
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
@@ -0,0 +1,127 @@
+import asyncio
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.crud import org_user as org_user_crud
+from app.db import SessionLocal
+from app.deps import get_db, is_org_admin
+from app.main import app
+from app.models.base import Base
+from app.models.enums import OrgRole
+from app.request_context import (
+    RequestContext,
+    _current,
+    checkout_metrics,
+    track_request_checkouts,
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def Session():
+    """Kendi DB'si; checkout'ları istek sayacına yazılır."""
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    track_request_checkouts(engine)
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield Session
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+
+
+def _headers(email):
+    client.post("/auth/register", json={"email": email, "password": "secret123"})
+    tokens = client.post(
+        "/auth/login", json={"email": email, "password": "secret123"}
+    ).json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def _checkouts(method, url, **kwargs):
+    checkout_metrics.reset()
+    res = client.request(method, url, **kwargs)
+    snap = checkout_metrics.snapshot()
+    assert snap["requests"] == 1
+    return res, snap["sum"]
+
+
+def test_rejected_requests_never_touch_the_pool(Session):
+    h = _headers("ctx@example.com")
+
+    res, n = _checkouts("GET", "/loads/", headers={"Authorization": "Bearer bozuk"})
+    assert res.status_code == 401 and n == 0
+    res, n = _checkouts("GET", "/loads/")
+    assert res.status_code == 401 and n == 0
+
+    # Önbellekteki token ile liste: tek bağlantı (ETag + sayfa aynı oturumda)
+    client.get("/auth/me", headers=h)
+    res, n = _checkouts("GET", "/loads/", headers=h)
+    assert res.status_code == 200 and n == 1
+
+    metrics = client.get("/metrics/db-pool").json()["checkouts_per_request"]
+    assert metrics["requests"] >= 1
+    assert metrics["buckets"]["+Inf"] == metrics["requests"]
+
+
+def test_org_admin_lookup_is_memoized_per_request(Session):
+    h = _headers("ctx-admin@example.com")
+    org = client.post("/orgs/", json={"title": "Nakliye"}, headers=h).json()
+    me = client.get("/auth/me", headers=h).json()
+
+    class Me:
+        id = me["id"]
+        org_roles = None
+
+    seen: List[str] = []
+    event.listen(
+        Session.kw["bind"],
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: seen.append(statement),
+    )
+
+    async def checks():
+        token = _current.set(RequestContext())
+        try:
+            with Session() as db:
+                first = await is_org_admin(db, Me, org["id"])
+                second = await is_org_admin(db, Me, org["id"])
+                assert first is second is True
+                assert len(seen) == 1
+                # Üyelik değişince (membership_version) kayıt düşer
+                org_user_crud.assign_role(
+                    db,
+                    organization_id=org["id"],
+                    user_id=Me.id,
+                    role=OrgRole.corporate_user,
+                )
+                seen.clear()
+                assert await is_org_admin(db, Me, org["id"]) is False
+                assert len(seen) == 1
+        finally:
+            _current.reset(token)
+
+    asyncio.run(checks())
@@ -0,0 +1,220 @@
+import time
+from contextlib import contextmanager
+from typing import Generator
+
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.auth_cache import token_cache
+from app.config import settings
+from app.crud import org_user as org_user_crud
+from app.deps import get_db
+from app.main import app
+
+# ensure models registered
+from app.models import org_user as _org_user  # noqa: F401
+from app.models import organization as _organization  # noqa: F401
+from app.models import user as _user  # noqa: F401
+from app.models.base import Base
+from app.models.enums import OrgRole
+from app.models.org_user import OrgUser
+from app.models.user import User
+
+
+def _setup_test_db():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    @contextmanager
+    def _session_scope() -> Generator[Session, None, None]:
+        db = TestingSessionLocal()
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    def override_get_db() -> Generator[Session, None, None]:
+        with _session_scope() as s:
+            yield s
+
+    return override_get_db
+
+
+app.dependency_overrides[get_db] = _setup_test_db()
+client = TestClient(app)
+
+
+def _register_and_login(email: str, password: str = "secret123"):
+    client.post("/auth/register", json={"email": email, "password": password})
+    r = client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200
+    return r.json()
+
+
+def _claims(token: str) -> dict:
+    return jwt.decode(
+        token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+    )
+
+
+def test_role_claims_skip_is_admin_until_membership_changes(monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_ROLE_CLAIMS", True)
+
+    t_owner = _register_and_login("claims-owner@example.com")
+    h_owner = {"Authorization": f"Bearer {t_owner['access_token']}"}
+    org_id = client.post("/orgs/", json={"title": "ClaimOrg"}, headers=h_owner).json()[
+        "id"
+    ]
+
+    # yeni token org admin claim'ini taşır
+    tokens = client.post(
+        "/auth/refresh", json={"refresh_token": t_owner["refresh_token"]}
+    ).json()
+    claims = _claims(tokens["access_token"])
+    assert claims["orgs"] == {str(org_id): "a"}
+    assert claims["mv"] == 1
+
+    calls = []
+    real_is_admin = org_user_crud.is_admin
+
+    def counting_is_admin(*args, **kwargs):
+        calls.append(args[1:])
+        return real_is_admin(*args, **kwargs)
+
+    monkeypatch.setattr(org_user_crud, "is_admin", counting_is_admin)
+    h_new = {"Authorization": f"Bearer {tokens['access_token']}"}
+    res = client.patch(f"/orgs/{org_id}", json={"title": "Yeni"}, headers=h_new)
+    assert res.status_code == 200
+    assert calls == []
+
+    # claim'siz kullanıcı, admin yapılınca sürüm değişir ve DB'ye düşülür
+    t_user = _register_and_login("claims-user@example.com")
+    h_user = {"Authorization": f"Bearer {t_user['access_token']}"}
+    u2_id = int(_claims(t_user["access_token"])["sub"])
+    assert (
+        client.patch(f"/orgs/{org_id}", json={"title": "X"}, headers=h_user).status_code
+        == 403
+    )
+    assert calls == []
+
+    gen = app.dependency_overrides[get_db]()
+    db = next(gen)
+    try:
+        org_user_crud.assign_role(
+            db, organization_id=org_id, user_id=u2_id, role=OrgRole.corporate_admin
+        )
+    finally:
+        db.close()
+
+    res = client.patch(f"/orgs/{org_id}", json={"title": "Zed"}, headers=h_user)
+    assert res.status_code == 200
+    assert calls == [(org_id, u2_id)]
+
+
+def test_role_revoked_in_another_worker_expires_with_claims_ttl(monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_ROLE_CLAIMS", True)
+    monkeypatch.setattr(settings, "AUTH_ROLE_CLAIMS_TTL_SECONDS", 300)
+
+    t = _register_and_login("claims-revoked@example.com")
+    h = {"Authorization": f"Bearer {t['access_token']}"}
+    org_id = client.post("/orgs/", json={"title": "RevOrg"}, headers=h).json()["id"]
+    tokens = client.post(
+        "/auth/refresh", json={"refresh_token": t["refresh_token"]}
+    ).json()
+    h = {"Authorization": f"Bearer {tokens['access_token']}"}
+    user_id = int(_claims(tokens["access_token"])["sub"])
+    assert (
+        client.patch(f"/orgs/{org_id}", json={"title": "Beta"}, headers=h).status_code
+        == 200
+    )
+
+    # Başka bir worker rolü geri alır: bu worker'da ORM olayı tetiklenmez
+    gen = app.dependency_overrides[get_db]()
+    db = next(gen)
+    try:
+        db.execute(
+            update(OrgUser)
+            .where(OrgUser.organization_id == org_id, OrgUser.user_id == user_id)
+            .values(role=OrgRole.corporate_user)
+        )
+        db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(membership_version=User.membership_version + 1)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    # Önbellekteki claim'li principal TTL dolana kadar geçerli
+    assert (
+        client.patch(f"/orgs/{org_id}", json={"title": "Gamma"}, headers=h).status_code
+        == 200
+    )
+    token_cache.clear()
+    monkeypatch.setattr(settings, "AUTH_ROLE_CLAIMS_TTL_SECONDS", 0)
+    # TTL dolunca sürüm DB'den okunur, claim bayat: DB'deki rol geçerli
+    assert (
+        client.patch(f"/orgs/{org_id}", json={"title": "Delta"}, headers=h).status_code
+        == 403
+    )
+    # Bayat claim'li token DB kontrolleriyle (tam TTL) önbellekte kalır
+    _, principal = token_cache._data[tokens["access_token"]]
+    assert principal.org_roles is None
+
+
+def test_role_claims_are_cached_for_short_ttl(monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_ROLE_CLAIMS", True)
+    monkeypatch.setattr(settings, "AUTH_ROLE_CLAIMS_TTL_SECONDS", 5)
+    t = _register_and_login("claims-ttl@example.com")
+    tokens = client.post(
+        "/auth/refresh", json={"refresh_token": t["refresh_token"]}
+    ).json()
+    token_cache.clear()
+    assert (
+        client.get(
+            "/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"}
+        ).status_code
+        == 200
+    )
+    expires_at, principal = token_cache._data[tokens["access_token"]]
+    assert principal.org_roles == {}
+    assert expires_at <= time.time() + 5
+
+
+def test_assign_role_bumps_membership_version_in_sql():
+    t = _register_and_login("claims-bump@example.com")
+    h = {"Authorization": f"Bearer {t['access_token']}"}
+    org_id = client.post("/orgs/", json={"title": "Artış"}, headers=h).json()["id"]
+    user_id = int(_claims(t["access_token"])["sub"])
+    assert client.get("/auth/me", headers=h).status_code == 200
+    assert t["access_token"] in token_cache._data
+
+    first = app.dependency_overrides[get_db]()
+    second = app.dependency_overrides[get_db]()
+    stale, other = next(first), next(second)
+    try:
+        # İlk oturum kullanıcıyı önceden yüklemiş; arada başka bir istek artırır
+        user = stale.get(User, user_id)
+        before = user.membership_version
+        for db in (other, stale):
+            org_user_crud.assign_role(
+                db,
+                organization_id=org_id,
+                user_id=user_id,
+                role=OrgRole.corporate_user,
+            )
+        assert user.membership_version == before + 2
+    finally:
+        stale.close()
+        other.close()
+    assert t["access_token"] not in token_cache._data
@@ -166,3 +166,88 @@ def test_vehicle_rbac_with_organization():
     assert res.status_code == 200
     res = client.delete(f"/vehicles/{vid}", headers=h_user)
     assert res.status_code == 204
+
+
+def _user_id(tokens) -> int:
+    return int(
+        jwt.decode(
+            tokens["access_token"],
+            settings.JWT_SECRET_KEY,
+            algorithms=[settings.JWT_ALGORITHM],
+        )["sub"]
+    )
+
+
+def _assign(org_id: int, user_id: int, role: OrgRole) -> None:
+    gen = app.dependency_overrides[get_db]()
+    db = next(gen)
+    try:
+        org_user_crud.assign_role(
+            db, organization_id=org_id, user_id=user_id, role=role
+        )
+    finally:
+        db.close()
+
+
+def _org_admin_can_modify_others_vehicle(prefix: str):
+    _register(f"{prefix}own@example.com")
+    h_owner = {
+        "Authorization": f"Bearer {_login(f'{prefix}own@example.com')['access_token']}"
+    }
+    org_id = client.post("/orgs/", json={"title": "AdmOrg"}, headers=h_owner).json()[
+        "id"
+    ]
+    vid = client.post(
+        "/vehicles/",
+        json={"organization_id": org_id, "capacity_value": 1},
+        headers=h_owner,
+    ).json()["id"]
+
+    _register(f"{prefix}mem@example.com")
+    _register(f"{prefix}adm@example.com")
+    member = _user_id(_login(f"{prefix}mem@example.com"))
+    admin = _user_id(_login(f"{prefix}adm@example.com"))
+    _assign(org_id, member, OrgRole.corporate_user)
+    _assign(org_id, admin, OrgRole.corporate_admin)
+    # rol atamasından sonra alınan token'lar (claim'ler güncel olsun)
+    h_member = {
+        "Authorization": f"Bearer {_login(f'{prefix}mem@example.com')['access_token']}"
+    }
+    h_admin = {
+        "Authorization": f"Bearer {_login(f'{prefix}adm@example.com')['access_token']}"
+    }
+
+    # üye (admin değil) ne güncelleyebilir ne silebilir; kayıt var -> 403
+    res = client.patch(f"/vehicles/{vid}", json={"can_dg": True}, headers=h_member)
+    assert res.status_code == 403
+    assert client.delete(f"/vehicles/{vid}", headers=h_member).status_code == 403
+
+    res = client.patch(f"/vehicles/{vid}", json={"can_dg": True}, headers=h_admin)
+    assert res.status_code == 200 and res.json()["can_dg"] is True
+    assert client.delete(f"/vehicles/{vid}", headers=h_admin).status_code == 204
+    assert client.delete(f"/vehicles/{vid}", headers=h_admin).status_code == 404
+
+
+def test_org_admin_can_modify_vehicle_owned_by_someone_else():
+    _org_admin_can_modify_others_vehicle("ex")
+
+
+def test_org_admin_write_uses_role_claims(monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_ROLE_CLAIMS", True)
+    _org_admin_can_modify_others_vehicle("cl")
+
+
+def test_vehicles_bulk_create():
+    _register("vbulk@example.com")
+    h = {"Authorization": f"Bearer {_login('vbulk@example.com')['access_token']}"}
+    items = [{"capacity_value": i, "can_food": i % 2 == 0} for i in range(5)]
+    items.append({"capacity_value": -1})
+    res = client.post("/vehicles/bulk", json={"items": items}, headers=h)
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert body["created"] == 5 and body["failed"] == 1
+    assert body["results"][5]["id"] is None and body["results"][5]["error"]
+    listed = client.get("/vehicles/", headers=h).json()
+    assert sorted(v["id"] for v in listed) == sorted(
+        r["id"] for r in body["results"][:5]
+    )
@@ -0,0 +1,100 @@
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import changes
+from app.db import SessionLocal
+from app.deps import get_db
+from app.main import app
+from app.models.address import Address
+from app.models.base import Base
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def statements(monkeypatch):
+    """Uygulamanın oturum ayarlarıyla (SessionLocal) çalışan DB; ifadeleri kaydeder."""
+    # Yazma sonrası olay abonelerinin (eşleştirme indeksi) sorguları ölçülmez
+    monkeypatch.setattr(changes, "_subscribers", [])
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(**{**SessionLocal.kw, "bind": engine})
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    seen: List[str] = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: seen.append(statement),
+    )
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield Session, seen
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+
+
+def test_writes_use_returning_without_reload(statements):
+    Session, seen = statements
+    client.post(
+        "/auth/register", json={"email": "rt@example.com", "password": "secret123"}
+    )
+    tokens = client.post(
+        "/auth/login", json={"email": "rt@example.com", "password": "secret123"}
+    ).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    client.get("/auth/me", headers=headers)  # token önbelleği
+    with Session() as db:
+        a = Address(country="TR", admin1="IST")
+        db.add(a)
+        db.commit()
+        address_id = a.id
+
+    seen.clear()
+    res = client.post(
+        "/loads/",
+        json={
+            "name": "Koli",
+            "pickup_address_id": address_id,
+            "dropoff_address_id": address_id,
+            "pickup_day": "2025-12-31",
+        },
+        headers=headers,
+    )
+    assert res.status_code == 201 and res.json()["id"]
+    assert len(seen) == 1 and "RETURNING" in seen[0]
+
+    vehicle_id = client.post(
+        "/vehicles/", json={"capacity_value": 1}, headers=headers
+    ).json()["id"]
+    seen.clear()
+    res = client.patch(
+        f"/vehicles/{vehicle_id}", json={"capacity_value": 2}, headers=headers
+    )
+    assert res.status_code == 200 and res.json()["capacity_value"] == 2
+    # Yetki koşulu WHERE'de: tek UPDATE ... RETURNING, ön SELECT / refresh yok
+    assert len(seen) == 1 and seen[0].startswith("UPDATE")
+    assert "orguser" in seen[0] and "RETURNING" in seen[0]
+
+    seen.clear()
+    assert client.delete(f"/vehicles/{vehicle_id}", headers=headers).status_code == 204
+    assert len(seen) == 1 and seen[0].startswith("DELETE")